@@ -0,0 +1,9 @@
+"""
+검색 계층 벤치마크
+
+table_catalog.csv로 인덱스를 만들고 질문→정답 테이블 골드셋을 각 검색기에 실행하여
+recall@k, MRR, 지연 시간(p50/p95/p99), 메모리를 JSON으로 보고합니다.
+
+실행:
+    python -m bench.retrieval --output bench_result.json
+"""
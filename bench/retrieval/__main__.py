@@ -0,0 +1,285 @@
+"""
+검색 계층 벤치마크 실행기
+
+예시:
+    # 결정적 해싱 임베딩으로 모든 검색기 실행
+    python -m bench.retrieval --output bench_result.json
+
+    # 인덱스 타입/벡터 압축/top_n 조합 비교
+    python -m bench.retrieval --index-types flat,hnsw --vector-codecs float32,int8 --top-n 3,5
+
+    # 실제 임베딩 공급자 사용 (EMBEDDING_PROVIDER 등 환경 변수 필요)
+    python -m bench.retrieval --embedding provider
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Sequence
+
+import faiss
+import numpy as np
+
+from bench.retrieval.embeddings import HashingEmbeddings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(BENCH_DIR))
+
+
+def _csv_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in _csv_list(value)]
+
+
+def _rss_mb() -> float:
+    """현재 프로세스 RSS(MB). /proc이 없으면 최대 RSS로 대체합니다."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def load_catalog_documents(csv_path: str):
+    """create_faiss.py와 같은 방식으로 카탈로그를 테이블 문서 목록으로 변환합니다."""
+    from llm_utils.catalog_source import load_catalog_documents as load_documents
+
+    return load_documents(csv_path)
+
+
+def load_gold(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def score_rankings(
+    rankings: Sequence[List[str]], gold: Sequence[Dict], ks: Sequence[int]
+) -> Dict[str, float]:
+    """질문별 테이블 순위 목록으로 recall@k와 MRR을 계산합니다."""
+    metrics = {}
+    for k in ks:
+        recalls = [
+            len(set(ranked[:k]) & set(item["tables"])) / len(item["tables"])
+            for ranked, item in zip(rankings, gold)
+        ]
+        metrics[f"recall@{k}"] = float(np.mean(recalls))
+
+    reciprocal_ranks = []
+    for ranked, item in zip(rankings, gold):
+        rank = next(
+            (i + 1 for i, table in enumerate(ranked) if table in item["tables"]), None
+        )
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+    metrics["mrr"] = float(np.mean(reciprocal_ranks))
+    return metrics
+
+
+def run_retriever(
+    retriever_name: str,
+    gold: Sequence[Dict],
+    top_n: int,
+    ks: Sequence[int],
+    repeat: int,
+    device: str,
+    column_top_k: int,
+) -> Dict:
+    """골드셋 전체를 한 검색기로 실행하여 정확도/지연 시간/메모리를 측정합니다."""
+    from llm_utils.retrieval import search_tables
+
+    def search(question):
+        # 라이브러리의 진행 로그는 결과 JSON과 섞이지 않도록 버림
+        with contextlib.redirect_stdout(io.StringIO()):
+            return search_tables(
+                question,
+                retriever_name=retriever_name,
+                top_n=top_n,
+                device=device,
+                column_top_k=column_top_k,
+            )
+
+    rss_before = _rss_mb()
+    warmup_start = time.perf_counter()
+    search(gold[0]["question"])
+    warmup_ms = (time.perf_counter() - warmup_start) * 1000
+
+    latencies, rankings = [], []
+    for round_index in range(repeat):
+        for item in gold:
+            start = time.perf_counter()
+            result = search(item["question"])
+            latencies.append((time.perf_counter() - start) * 1000)
+            if round_index == 0:
+                rankings.append(
+                    sorted(result, key=lambda table: result[table].get("rank", 0))
+                )
+
+    if not any(rankings):
+        raise RuntimeError("검색 결과가 비어 있습니다 (검색기 초기화 실패 여부를 확인하세요).")
+
+    return {
+        **score_rankings(rankings, gold, [k for k in ks if k <= top_n]),
+        "latency_ms": {
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+            "p99": float(np.percentile(latencies, 99)),
+            "mean": float(np.mean(latencies)),
+            "warmup": warmup_ms,
+        },
+        "memory_mb": {
+            "rss_delta": _rss_mb() - rss_before,
+            "rss": _rss_mb(),
+            "peak_rss": _peak_rss_mb(),
+        },
+        "n_queries": len(latencies),
+    }
+
+
+def main(argv=None) -> int:
+    from llm_utils.retrieval import RETRIEVER_NAMES
+    from llm_utils.vectordb import get_vector_db, vector_store_registry
+    from llm_utils.vectordb.faiss_index import INDEX_TYPES, VECTOR_CODECS, build_faiss_store
+    from llm_utils.vectordb.faiss_storage import save_faiss_store
+
+    parser = argparse.ArgumentParser(description="Lang2SQL 검색 계층 벤치마크")
+    parser.add_argument("--csv-path", default=os.path.join(PROJECT_ROOT, "table_catalog.csv"))
+    parser.add_argument("--gold", default=os.path.join(BENCH_DIR, "gold.jsonl"))
+    parser.add_argument(
+        "--embedding",
+        choices=["hashing", "provider"],
+        default="hashing",
+        help="hashing: 결정적 로컬 임베딩, provider: EMBEDDING_PROVIDER 설정 사용",
+    )
+    parser.add_argument("--dim", type=int, default=256, help="해싱 임베딩 차원")
+    parser.add_argument(
+        "--retrievers",
+        type=_csv_list,
+        default=list(RETRIEVER_NAMES),
+        help=f"쉼표로 구분한 검색기 목록 (기본값: {','.join(RETRIEVER_NAMES)})",
+    )
+    parser.add_argument("--top-n", type=_int_list, default=[5], help="예: 3,5")
+    parser.add_argument("--k", type=_int_list, default=[1, 3, 5], help="recall@k의 k 목록")
+    parser.add_argument("--index-types", type=_csv_list, default=["flat"], help=",".join(INDEX_TYPES))
+    parser.add_argument(
+        "--vector-codecs", type=_csv_list, default=["float32"], help=",".join(VECTOR_CODECS)
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="지연 시간 측정 반복 횟수")
+    parser.add_argument("--column-top-k", type=int, default=0)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본값: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    if args.embedding == "hashing":
+        os.environ["EMBEDDING_PROVIDER"] = f"bench-hashing-{args.dim}"
+        os.environ["EMBEDDING_CACHE"] = "off"
+        vector_store_registry.register_embeddings(HashingEmbeddings(size=args.dim))
+    embeddings = vector_store_registry.get_embeddings()
+
+    documents = load_catalog_documents(args.csv_path)
+    gold = load_gold(args.gold)
+    results = []
+
+    for index_type in args.index_types:
+        for vector_codec in args.vector_codecs:
+            config = {"index_type": index_type, "vector_codec": vector_codec}
+            with tempfile.TemporaryDirectory() as vectordb_dir:
+                rss_before = _rss_mb()
+                build_start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    store = build_faiss_store(
+                        documents, embeddings, index_type=index_type, vector_codec=vector_codec
+                    )
+                    save_faiss_store(store, vectordb_dir)
+                build_s = time.perf_counter() - build_start
+                del store
+
+                os.environ["VECTORDB_TYPE"] = "faiss"
+                os.environ["VECTORDB_LOCATION"] = vectordb_dir
+                vector_store_registry.invalidate()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    get_vector_db()
+                index_info = {
+                    "build_s": build_s,
+                    "index_bytes": _dir_size(vectordb_dir),
+                    "load_rss_delta_mb": _rss_mb() - rss_before,
+                }
+
+                for retriever_name in args.retrievers:
+                    for top_n in args.top_n:
+                        entry = {**config, "retriever": retriever_name, "top_n": top_n, **index_info}
+                        print(f"▶ {entry['index_type']}/{vector_codec} {retriever_name} top_n={top_n}", file=sys.stderr)
+                        try:
+                            entry.update(
+                                run_retriever(
+                                    retriever_name,
+                                    gold,
+                                    top_n,
+                                    args.k,
+                                    args.repeat,
+                                    args.device,
+                                    args.column_top_k,
+                                )
+                            )
+                        except Exception as e:
+                            entry["error"] = f"{type(e).__name__}: {e}"
+                        results.append(entry)
+                vector_store_registry.invalidate()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "embedding": os.environ.get("EMBEDDING_PROVIDER"),
+            "n_tables": len(documents),
+            "n_questions": len(gold),
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "faiss": faiss.__version__,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"결과 저장: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+벤치마크용 결정적 로컬 임베딩
+
+외부 API 없이 같은 입력에 항상 같은 벡터를 만들도록, 단어와 문자 n-gram을
+해시하여 고정 차원 벡터에 누적한 뒤 L2 정규화합니다. 어휘가 겹치는 텍스트일수록 가깝습니다.
+"""
+
+import hashlib
+import math
+import re
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+_TOKEN_RE = re.compile(r"[0-9A-Za-z_]+|[가-힣]+")
+
+
+class HashingEmbeddings(Embeddings):
+    """단어/문자 n-gram 해싱 임베딩"""
+
+    def __init__(self, size: int = 256, ngram: int = 2):
+        self.size = size
+        self.ngram = ngram
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        for token in _TOKEN_RE.findall(text.lower()):
+            features.append(token)
+            if len(token) > self.ngram:
+                features.extend(
+                    token[i : i + self.ngram] for i in range(len(token) - self.ngram + 1)
+                )
+        return features
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for feature in self._features(text):
+            digest = hashlib.md5(feature.encode("utf-8")).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.size
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
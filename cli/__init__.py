@@ -266,6 +266,41 @@ def run_streamlit_cli_command(port: int) -> None:
     is_flag=True,
     help="확장된 그래프(프로파일 추출 + 컨텍스트 보강) 사용 여부",
 )
+@click.option(
+    "--column-top-k",
+    type=int,
+    default=None,
+    help="테이블별로 프롬프트에 포함할 컬럼 수 (기본값: COLUMN_TOP_K 환경 변수, 0이면 전체)",
+)
+@click.option(
+    "--database",
+    "databases",
+    multiple=True,
+    help="검색할 테이블의 데이터베이스 (여러 번 지정 가능)",
+)
+@click.option(
+    "--schema",
+    "schemas",
+    multiple=True,
+    help="검색할 테이블의 스키마 (여러 번 지정 가능)",
+)
+@click.option(
+    "--tag",
+    "tags",
+    multiple=True,
+    help="검색할 테이블의 도메인 태그 (여러 번 지정 가능, 하나라도 일치하면 포함)",
+)
+@click.option(
+    "--owner",
+    "owners",
+    multiple=True,
+    help="검색할 테이블의 담당자 (여러 번 지정 가능)",
+)
+@click.option(
+    "--semantic-cache/--no-semantic-cache",
+    default=None,
+    help="유사 질문 응답 캐시 사용 여부 (기본값: SEMANTIC_CACHE_ENABLED 환경 변수)",
+)
 @click.option(
     "--vectordb-type",
     type=click.Choice(["faiss", "pgvector"]),
@@ -288,6 +323,12 @@ def query_command(
     top_n: int,
     device: str,
     use_enriched_graph: bool,
+    column_top_k: int = None,
+    databases: tuple = (),
+    schemas: tuple = (),
+    tags: tuple = (),
+    owners: tuple = (),
+    semantic_cache: bool = None,
     vectordb_type: str = "faiss",
     vectordb_location: str = None,
 ) -> None:
@@ -304,11 +345,15 @@ def query_command(
         top_n (int): 검색된 상위 테이블 수 제한
         device (str): LLM 실행에 사용할 디바이스
         use_enriched_graph (bool): 확장된 그래프 사용 여부
+        column_top_k (int): 테이블별로 프롬프트에 포함할 컬럼 수
+        databases, schemas, tags, owners (tuple): 테이블 검색 범위 조건
+        semantic_cache (bool): 유사 질문 응답 캐시 사용 여부
 
     예시:
         lang2sql query "고객 데이터를 기반으로 유니크한 유저 수를 카운트하는 쿼리"
         lang2sql query "고객 데이터를 기반으로 유니크한 유저 수를 카운트하는 쿼리" --use-enriched-graph
         lang2sql query "고객 데이터를 기반으로 유니크한 유저 수를 카운트하는 쿼리" --vectordb-type pgvector
+        lang2sql query "월별 청구 금액 추이" --database sales --tag finance
     """
 
     try:
@@ -329,6 +374,19 @@ def query_command(
             top_n=top_n,
             device=device,
             use_enriched_graph=use_enriched_graph,
+            column_top_k=column_top_k,
+            table_filters={
+                field: list(values)
+                for field, values in (
+                    ("database", databases),
+                    ("schema", schemas),
+                    ("tags", tags),
+                    ("owners", owners),
+                )
+                if values
+            }
+            or None,
+            use_semantic_cache=semantic_cache,
         )
 
         # SQL 추출 및 출력
@@ -349,3 +407,224 @@ def query_command(
     except Exception as e:
         logger.error("쿼리 처리 중 오류 발생: %s", e)
         raise
+
+
+@cli.command(name="pgvector-index")
+@click.option(
+    "--index-type",
+    type=click.Choice(["hnsw", "ivfflat"]),
+    default=None,
+    help="컬렉션에 유지할 ANN 인덱스 타입 (기본값: PGVECTOR_INDEX_TYPE 환경 변수, 없으면 hnsw)",
+)
+@click.option("--m", type=int, default=None, help="HNSW 노드당 연결 수 (기본값: 16)")
+@click.option("--ef-construction", type=int, default=None, help="HNSW 생성 시 탐색 후보 수 (기본값: 64)")
+@click.option("--lists", type=int, default=None, help="IVFFlat 클러스터 수 (기본값: 행 수에 따라 자동)")
+@click.option("--rebuild", is_flag=True, help="인덱스가 이미 있어도 삭제 후 다시 생성")
+@click.option("--report-only", is_flag=True, help="인덱스를 만들지 않고 상태만 출력")
+@click.option("--ef-search", type=int, default=None, help="EXPLAIN에 적용할 hnsw.ef_search")
+@click.option("--probes", type=int, default=None, help="EXPLAIN에 적용할 ivfflat.probes")
+@click.option("--top-n", type=int, default=5, help="EXPLAIN 질의의 LIMIT (기본값: 5)")
+@click.option("--analyze", is_flag=True, help="EXPLAIN ANALYZE로 실제 실행 시간까지 측정")
+@click.option("--show-plan", is_flag=True, help="실행 계획 전체(JSON)를 함께 출력")
+@click.option(
+    "--vectordb-location",
+    help="pgvector 연결 문자열 (기본값: PGVECTOR_* 환경 변수)",
+)
+def pgvector_index_command(
+    index_type: str,
+    m: int,
+    ef_construction: int,
+    lists: int,
+    rebuild: bool,
+    report_only: bool,
+    ef_search: int,
+    probes: int,
+    top_n: int,
+    analyze: bool,
+    show_plan: bool,
+    vectordb_location: str = None,
+) -> None:
+    """
+    pgvector 컬렉션의 ANN 인덱스를 생성/유지하고 상태를 출력하는 명령어입니다.
+
+    인덱스 크기, 사용 횟수(idx_scan)와 검색 질의의 실행 계획(EXPLAIN)을 JSON으로 출력하므로
+    카탈로그가 커지면서 순차 검색으로 바뀌지 않았는지 확인할 수 있습니다.
+
+    예시:
+        lang2sql pgvector-index
+        lang2sql pgvector-index --index-type ivfflat --lists 200 --rebuild
+        lang2sql pgvector-index --report-only --analyze --ef-search 80
+    """
+    import json
+
+    from llm_utils.vectordb.pgvector_db import open_pgvector_store
+    from llm_utils.vectordb.pgvector_index import (
+        ensure_pgvector_index,
+        pgvector_index_report,
+    )
+
+    try:
+        store = open_pgvector_store(vectordb_location)
+        if not report_only:
+            name = ensure_pgvector_index(
+                store,
+                index_type=index_type,
+                m=m,
+                ef_construction=ef_construction,
+                lists=lists,
+                rebuild=rebuild,
+            )
+            logger.info("pgvector index ready: %s", name)
+
+        report = pgvector_index_report(
+            store, k=top_n, ef_search=ef_search, probes=probes, analyze=analyze
+        )
+        if not show_plan:
+            report["explain"].pop("plan", None)
+        click.echo(json.dumps(report, ensure_ascii=False, indent=2, default=str))
+        if not report["explain"]["uses_index"]:
+            logger.warning("Search plan does not use an ANN index (sequential scan).")
+
+    except Exception as e:
+        logger.error("pgvector 인덱스 관리 중 오류 발생: %s", e)
+        raise
+
+
+@cli.command(name="pgvector-sync")
+@click.option(
+    "--keep-missing",
+    is_flag=True,
+    help="카탈로그에서 사라진 테이블도 컬렉션에서 삭제하지 않고 유지",
+)
+@click.option(
+    "--vectordb-location",
+    help="pgvector 연결 문자열 (기본값: PGVECTOR_* 환경 변수)",
+)
+@click.option(
+    "--concurrency",
+    type=int,
+    help="최대 동시 임베딩 요청 수 (기본값: EMBEDDING_CONCURRENCY 또는 4)",
+)
+@click.option("--rpm", type=float, help="임베딩 공급자의 분당 요청 수 한도 (EMBEDDING_RPM)")
+@click.option("--tpm", type=float, help="임베딩 공급자의 분당 토큰 수 한도 (EMBEDDING_TPM)")
+@click.option(
+    "--from-db",
+    is_flag=True,
+    help="DataHub 대신 운영 DB의 시스템 카탈로그(information_schema 등)에서 테이블 정보를 읽음",
+)
+@click.option("--db-type", help="--from-db로 읽을 DB 종류 (기본값: DB_TYPE 환경 변수)")
+@click.option("--db-schemas", help="--from-db로 읽을 스키마 (쉼표 구분, 기본값: 시스템 스키마 외 전체)")
+@click.option("--db-workers", type=int, help="동시에 읽을 스키마 수 (기본값: DB_CATALOG_WORKERS 또는 4)")
+def pgvector_sync_command(
+    keep_missing: bool,
+    vectordb_location: str = None,
+    concurrency: int = None,
+    rpm: float = None,
+    tpm: float = None,
+    from_db: bool = False,
+    db_type: str = None,
+    db_schemas: str = None,
+    db_workers: int = None,
+) -> None:
+    """
+    DataHub(또는 --from-db로 운영 DB) 카탈로그와 pgvector 컬렉션을 증분 동기화하는 명령어입니다.
+
+    내용이 바뀐 테이블만 RPM/TPM 한도 안에서 동시에 임베딩하여 COPY로 적재하고, 사라진 테이블은 삭제합니다.
+
+    예시:
+        lang2sql --datahub_server http://localhost:8080 pgvector-sync
+        lang2sql pgvector-sync --concurrency 8 --rpm 3000 --tpm 1000000
+        lang2sql pgvector-sync --from-db --db-type snowflake --db-schemas SALES,CRM
+    """
+    from llm_utils.vectordb.pgvector_db import sync_pgvector_db
+
+    for env_name, value in (
+        ("EMBEDDING_CONCURRENCY", concurrency),
+        ("EMBEDDING_RPM", rpm),
+        ("EMBEDDING_TPM", tpm),
+    ):
+        if value is not None:
+            os.environ[env_name] = str(value)
+
+    try:
+        documents = None
+        if from_db:
+            from llm_utils.db_catalog import load_db_catalog_documents
+            from llm_utils.table_document import split_list_field
+
+            documents = load_db_catalog_documents(
+                db_type,
+                schemas=split_list_field(db_schemas) or None,
+                max_workers=db_workers,
+            )
+        _, stats = sync_pgvector_db(
+            vectordb_location, documents=documents, delete_missing=not keep_missing
+        )
+        logger.info(
+            "pgvector sync finished: %d added, %d updated, %d deleted, %d unchanged",
+            stats["added"],
+            stats["updated"],
+            stats["deleted"],
+            stats["unchanged"],
+        )
+    except Exception as e:
+        logger.error("pgvector 동기화 중 오류 발생: %s", e)
+        raise
+
+
+@cli.command(name="faiss-versions")
+@click.option(
+    "--vectordb-location",
+    help="FAISS 인덱스 디렉토리 (기본값: VECTORDB_LOCATION 또는 './table_info_db')",
+)
+def faiss_versions_command(vectordb_location: str = None) -> None:
+    """
+    공개된 FAISS 인덱스 버전 목록을 출력하는 명령어입니다. 현재 버전에는 '*'가 표시됩니다.
+
+    예시:
+        lang2sql faiss-versions
+    """
+    from llm_utils.vectordb.faiss_db import resolve_faiss_path
+    from llm_utils.vectordb.faiss_versions import list_versions
+
+    path = resolve_faiss_path(vectordb_location or os.getenv("VECTORDB_LOCATION"))
+    versions = list_versions(path)
+    if not versions:
+        logger.info("No published FAISS index versions: %s", path)
+    for entry in versions:
+        marker = "*" if entry["current"] else " "
+        status = "" if entry["exists"] else " (removed)"
+        click.echo(f"{marker} {entry['version']}  {entry['published_at']}{status}")
+
+
+@cli.command(name="faiss-rollback")
+@click.option(
+    "--version",
+    "target_version",
+    help="되돌릴 버전 이름 (기본값: 현재 버전 직전에 공개한 버전)",
+)
+@click.option(
+    "--vectordb-location",
+    help="FAISS 인덱스 디렉토리 (기본값: VECTORDB_LOCATION 또는 './table_info_db')",
+)
+def faiss_rollback_command(target_version: str = None, vectordb_location: str = None) -> None:
+    """
+    FAISS 인덱스의 현재 버전(CURRENT)을 이전 버전으로 되돌리는 명령어입니다.
+
+    인덱스를 다시 만들지 않고 포인터만 원자적으로 교체하므로, 실행 중인 앱은 재시작 없이
+    다음 검색부터 되돌린 버전을 사용합니다.
+
+    예시:
+        lang2sql faiss-rollback
+        lang2sql faiss-rollback --version 20250101-120000-abc123
+    """
+    from llm_utils.vectordb.faiss_db import resolve_faiss_path
+    from llm_utils.vectordb.faiss_versions import rollback_version
+
+    path = resolve_faiss_path(vectordb_location or os.getenv("VECTORDB_LOCATION"))
+    try:
+        version = rollback_version(path, target_version)
+        logger.info("FAISS index rolled back to version %s: %s", version, path)
+    except Exception as e:
+        logger.error("FAISS 인덱스 버전 되돌리기 중 오류 발생: %s", e)
+        raise
@@ -1,51 +1,335 @@
 """
 create_faiss.py
 
-CSV 파일에서 테이블과 컬럼 정보를 불러와 OpenAI 임베딩으로 벡터화한 뒤,
+CSV(또는 Parquet) 파일에서 테이블과 컬럼 정보를 불러와 임베딩으로 벡터화한 뒤,
 FAISS 인덱스를 생성하고 로컬 디렉토리에 저장한다.
+CSV에 column_type 컬럼이 있으면 컬럼 타입도 문서 metadata에 함께 저장한다.
+database, schema, tags, owners 컬럼이 있으면 search_tables(filters=...)용 metadata로 저장한다.
+테이블 인덱스와 함께 컬럼 단위 2차 인덱스(OUTPUT_DIR/columns)도 생성한다.
+
+인덱스 디렉토리의 manifest.json에 테이블별 내용 해시를 기록하여, 다시 실행하면 새 테이블/바뀐 테이블만
+임베딩하고 삭제된 테이블은 삭제 표시(tombstone)한다. 삭제 표시 비율이 --compact-threshold를 넘으면
+저장된 벡터로 인덱스를 다시 만든다(재임베딩 없음). --full-rebuild로 전체를 다시 임베딩할 수 있다.
+
+테이블 수가 많으면 --index-type으로 근사 검색 인덱스(hnsw, ivf_flat, ivf_pq)를 선택할 수 있으며,
+생성 후 정확 검색 대비 recall@k가 출력된다.
+
+카탈로그가 매우 크면 --stream으로 카탈로그를 chunk 단위로 읽으며 테이블 문서를 만들고,
+--checkpoint-every개 테이블마다 벡터를 OUTPUT_DIR.partial에 저장한다. 중단된 뒤 같은 명령을 다시 실행하면
+마지막 체크포인트부터 이어서 진행하며, 인덱스는 모든 임베딩이 끝난 뒤 저장된 벡터로 한 번에 만든다.
+스트리밍 빌드는 같은 테이블의 행이 연속되어 있어야 한다(table_name으로 정렬된 카탈로그).
+임베딩은 --batch-size개씩 최대 --concurrency개 요청을 동시에 보내며, --rpm/--tpm 한도를 지키고
+429(요청 한도 초과)가 나면 동시 요청 수를 줄인 뒤 백오프한다. 진행률, 처리량, 예상 비용이 출력된다.
+
+--shards N을 주면 테이블 키의 해시로 카탈로그를 N개 샤드(OUTPUT_DIR/shards/shard-XXXXX)로 나누고
+--processes개 프로세스에서 샤드마다 임베딩과 인덱스 생성을 동시에 진행한다(--concurrency/--rpm/--tpm은
+전체 합계이며 프로세스 수로 나누어 적용). 기본적으로 샤드별 인덱스를 그대로 두고 검색 시 샤드를 동시에
+검색해 상위 k개를 합치며, --merge-shards를 주면 샤드를 OUTPUT_DIR의 단일 인덱스로 병합한다
+(flat 인덱스는 FAISS merge_from, 그 외는 샤드에 저장된 벡터로 재생성하며 재임베딩은 없다).
+
+인덱스는 OUTPUT_DIR/versions/<버전>에 만들고(증분 빌드는 현재 버전을 하드 링크로 복사해 시작),
+모든 스토어를 열어 검증한 뒤 OUTPUT_DIR/CURRENT를 원자적으로 바꿔 공개한다. 실행 중인 앱은 다음 검색부터
+새 버전을 다시 로드하며(재시작 불필요), 진행 중인 검색은 이전 버전으로 끝난다. 검증에 실패하면 공개하지 않는다.
+--rollback으로 직전 버전(또는 지정한 버전)으로 되돌리고, --list-versions로 버전 목록을 본다.
+최근 --keep-versions개 버전만 남긴다.
+
+--from-db를 주면 카탈로그 파일 대신 운영 DB(db_utils 커넥터, --db-type 또는 DB_TYPE)의 시스템 카탈로그에서
+테이블/컬럼/타입/코멘트를 읽는다. 스키마마다 조회 2번으로 읽고 --db-workers개 스키마를 동시에 읽으며,
+이후 증분 동기화/샤드 빌드/버전 공개는 카탈로그 파일과 같다 (--stream과는 함께 쓸 수 없다).
+
+사용 예:
+    python create_faiss.py
+    python create_faiss.py --index-type ivf_pq --nlist 1024 --train-sample 50000 --nprobe 16
+    python create_faiss.py --index-type hnsw --hnsw-m 32 --ef-search 64
+    python create_faiss.py --vector-codec int8
+    python create_faiss.py --full-rebuild
+    python create_faiss.py --csv-path catalog.parquet --stream --index-type ivf_pq --batch-size 128
+    python create_faiss.py --concurrency 8 --rpm 3000 --tpm 1000000
+    python create_faiss.py --shards 8 --processes 4 --index-type hnsw
+    python create_faiss.py --shards 8 --merge-shards
+    python create_faiss.py --list-versions
+    python create_faiss.py --rollback
+    python create_faiss.py --from-db --db-type postgresql --db-schemas sales,crm --db-workers 8
 
 환경 변수:
+    EMBEDDING_PROVIDER: 임베딩 공급자 (예: openai)
     OPEN_AI_KEY: OpenAI API 키
     OPEN_AI_EMBEDDING_MODEL: 사용할 임베딩 모델 이름
+    FAISS_INDEX_TYPE: --index-type 기본값 (기본값: flat)
+    FAISS_VECTOR_CODEC: --vector-codec 기본값 (기본값: float32)
+    FAISS_COMPACT_THRESHOLD: --compact-threshold 기본값 (기본값: 0.2)
+    EMBEDDING_CONCURRENCY / EMBEDDING_BATCH_SIZE: --concurrency / --batch-size 기본값
+    EMBEDDING_RPM / EMBEDDING_TPM: --rpm / --tpm 기본값 (기본값: 제한 없음)
+    EMBEDDING_COST_PER_1M_TOKENS: 예상 비용 계산용 100만 토큰당 비용(USD)
+    FAISS_KEEP_VERSIONS: --keep-versions 기본값 (기본값: 3)
+    EMBEDDING_MAX_RETRIES: 임베딩 재시도 최대 횟수 (기본값: 8)
+    EMBEDDING_RETRY_BASE_DELAY / EMBEDDING_RETRY_MAX_DELAY: 재시도 대기 시간(초) (기본값: 1 / 60)
+    DB_TYPE, <DB_TYPE>_HOST/_PORT/_USER/_PASSWORD/_DATABASE 등: --from-db 접속 정보 (db_utils)
+    DB_CATALOG_WORKERS: --db-workers 기본값 (기본값: 4)
 
 출력:
-    지정된 OUTPUT_DIR 경로에 FAISS 인덱스 저장
+    OUTPUT_DIR/versions/<버전>에 FAISS 인덱스 저장 (index.faiss + docstore.arrow + manifest.json),
+    OUTPUT_DIR/CURRENT에 현재 버전 이름 기록
 """
 
-import csv
+import argparse
 import os
-from collections import defaultdict
 
 from dotenv import load_dotenv
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
+
+from llm_utils.catalog_source import load_catalog_documents
+from llm_utils.llm import (
+    embedding_build_stats,
+    get_embedding_identity,
+    get_embeddings,
+    with_build_concurrency,
+)
+from llm_utils.column_index import sync_column_index
+from llm_utils.db_catalog import load_db_catalog_documents
+from llm_utils.table_document import document_key, split_list_field
+from llm_utils.vectordb.faiss_index import INDEX_TYPES, VECTOR_CODECS
+from llm_utils.vectordb.faiss_shards import build_sharded_catalog
+from llm_utils.vectordb.faiss_stream import stream_build_catalog
+from llm_utils.vectordb.faiss_sync import sync_faiss_store
+from llm_utils.vectordb.faiss_versions import build_version, list_versions, rollback_version
 
 load_dotenv()
 CSV_PATH = "./table_catalog.csv"  # 위 CSV 파일 경로
 OUTPUT_DIR = "./table_info_db"    # .env 파일의 VECTORDB_LOCATION 값과 동일하게 맞추세요.
 
-tables = defaultdict(lambda: {"desc": "", "columns": []})
-with open(CSV_PATH, newline="", encoding="utf-8-sig") as f:  # BOM 처리를 위해 utf-8-sig 사용
-    reader = csv.DictReader(f)
-    for row in reader:
-        t = row["table_name"].strip()
-        tables[t]["desc"] = row["table_description"].strip()
-        col = row["column_name"].strip()
-        col_desc = row["column_description"].strip()
-        tables[t]["columns"].append((col, col_desc))
-
-docs = []
-for t, info in tables.items():
-    cols = "\n".join([f"{c}: {d}" for c, d in info["columns"]])
-    page = f"{t}: {info['desc']}\nColumns:\n {cols}"
-    from langchain.schema import Document
-
-    docs.append(Document(page_content=page))
-
-emb = OpenAIEmbeddings(
-    model=os.getenv("OPEN_AI_EMBEDDING_MODEL"), openai_api_key=os.getenv("OPEN_AI_KEY")
-)
-db = FAISS.from_documents(docs, emb)
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-db.save_local(OUTPUT_DIR)
-print(f"FAISS index saved to: {OUTPUT_DIR}")
\ No newline at end of file
+
+def main():
+    parser = argparse.ArgumentParser(description="테이블 카탈로그(CSV/Parquet 또는 운영 DB)로 FAISS 인덱스를 생성합니다.")
+    parser.add_argument("--csv-path", default=CSV_PATH, help="테이블 카탈로그 CSV 또는 Parquet 경로")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="FAISS 인덱스 저장 디렉토리")
+    parser.add_argument(
+        "--index-type",
+        choices=INDEX_TYPES,
+        default=os.getenv("FAISS_INDEX_TYPE", "flat"),
+        help="인덱스 타입 (기본값: flat, 정확 검색)",
+    )
+    parser.add_argument(
+        "--vector-codec",
+        choices=VECTOR_CODECS,
+        default=os.getenv("FAISS_VECTOR_CODEC", "float32"),
+        help="테이블/컬럼 벡터 저장 방식 (fp16/int8/pq는 원본 벡터로 정확 재정렬)",
+    )
+    parser.add_argument("--hnsw-m", type=int, default=32, help="HNSW 노드당 연결 수")
+    parser.add_argument("--ef-construction", type=int, default=200, help="HNSW 생성 시 탐색 후보 수")
+    parser.add_argument("--ef-search", type=int, default=None, help="HNSW 검색 시 기본 탐색 후보 수")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF 클러스터 수 (기본값: 약 4·√N)")
+    parser.add_argument("--nprobe", type=int, default=None, help="IVF 검색 시 기본 탐색 클러스터 수")
+    parser.add_argument("--pq-m", type=int, default=None, help="PQ 서브벡터 수 (임베딩 차원의 약수)")
+    parser.add_argument("--pq-nbits", type=int, default=8, help="PQ 서브벡터당 비트 수")
+    parser.add_argument("--train-sample", type=int, default=None, help="IVF/PQ 학습에 사용할 샘플 수")
+    parser.add_argument("--recall-k", type=int, default=10, help="recall 측정 시 k")
+    parser.add_argument(
+        "--full-rebuild", action="store_true", help="manifest를 무시하고 모든 테이블을 다시 임베딩"
+    )
+    parser.add_argument(
+        "--compact-threshold",
+        type=float,
+        default=None,
+        help="삭제 표시된 위치 비율이 이 값을 넘으면 인덱스를 압축 (기본값: 0.2)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="카탈로그를 chunk 단위로 읽어 임베딩하고 중간 결과를 저장 (중단 후 다시 실행하면 이어서 진행)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=None, help="임베딩 요청 하나에 담을 문서 수 (기본값: 64)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=None, help="최대 동시 임베딩 요청 수 (기본값: 4)"
+    )
+    parser.add_argument("--rpm", type=float, default=None, help="임베딩 공급자의 분당 요청 수 한도")
+    parser.add_argument("--tpm", type=float, default=None, help="임베딩 공급자의 분당 토큰 수 한도")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="테이블을 N개 샤드로 나누어 프로세스 풀에서 빌드 (기본값: 0, 샤딩 안 함)",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=None, help="샤드 빌드 프로세스 수 (기본값: CPU 수)"
+    )
+    parser.add_argument(
+        "--merge-shards",
+        action="store_true",
+        help="샤드를 단일 인덱스로 병합 (기본값: 샤드별 인덱스를 병렬 검색)",
+    )
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=1000, help="스트리밍 빌드 시 체크포인트 간격(테이블 수)"
+    )
+    parser.add_argument(
+        "--chunk-rows", type=int, default=10000, help="스트리밍 빌드 시 Parquet을 한 번에 읽을 행 수"
+    )
+    parser.add_argument(
+        "--keep-versions",
+        type=int,
+        default=None,
+        help="남겨 둘 최근 인덱스 버전 수 (기본값: FAISS_KEEP_VERSIONS 또는 3)",
+    )
+    parser.add_argument(
+        "--rollback",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="VERSION",
+        help="인덱스를 다시 만들지 않고 현재 버전을 VERSION(생략하면 직전 버전)으로 되돌림",
+    )
+    parser.add_argument(
+        "--list-versions", action="store_true", help="공개된 인덱스 버전 목록을 출력"
+    )
+    parser.add_argument(
+        "--from-db",
+        action="store_true",
+        help="카탈로그 파일 대신 운영 DB의 시스템 카탈로그(information_schema 등)에서 테이블 정보를 읽음",
+    )
+    parser.add_argument(
+        "--db-type", default=None, help="--from-db로 읽을 DB 종류 (기본값: DB_TYPE 환경 변수)"
+    )
+    parser.add_argument(
+        "--db-schemas", default=None, help="--from-db로 읽을 스키마 (쉼표 구분, 기본값: 시스템 스키마 외 전체)"
+    )
+    parser.add_argument(
+        "--db-workers", type=int, default=None, help="동시에 읽을 스키마 수 (기본값: 4)"
+    )
+    args = parser.parse_args()
+    if args.shards > 1 and args.stream:
+        parser.error("--shards와 --stream은 함께 사용할 수 없습니다.")
+    if args.from_db and args.stream:
+        parser.error("--from-db와 --stream은 함께 사용할 수 없습니다.")
+
+    if args.list_versions:
+        for entry in list_versions(args.output_dir):
+            marker = "*" if entry["current"] else " "
+            status = "" if entry["exists"] else " (삭제됨)"
+            print(f"{marker} {entry['version']}  {entry['published_at']}{status}")
+        return
+    if args.rollback is not None:
+        rollback_version(args.output_dir, args.rollback or None)
+        return
+
+    emb = with_build_concurrency(
+        get_embeddings(),
+        max_concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        rpm=args.rpm,
+        tpm=args.tpm,
+    )
+    embedding_id = "/".join(get_embedding_identity())
+    build_kwargs = {
+        "index_type": args.index_type,
+        "hnsw_m": args.hnsw_m,
+        "ef_construction": args.ef_construction,
+        "nlist": args.nlist,
+        "pq_m": args.pq_m,
+        "pq_nbits": args.pq_nbits,
+        "train_sample": args.train_sample,
+        "ef_search": args.ef_search,
+        "nprobe": args.nprobe,
+        "recall_k": args.recall_k,
+        "vector_codec": args.vector_codec,
+    }
+
+    def load_documents():
+        if args.from_db:
+            return load_db_catalog_documents(
+                args.db_type,
+                schemas=split_list_field(args.db_schemas) or None,
+                max_workers=args.db_workers,
+            )
+        return load_catalog_documents(args.csv_path)
+
+    # 새 버전 디렉토리에서 빌드하고, 검증을 통과하면 CURRENT를 교체해 공개 (실행 중인 앱은 다음 검색부터 새 버전 사용)
+    def build(path):
+        if args.stream:
+            result = stream_build_catalog(
+                args.csv_path,
+                path,
+                emb,
+                embedding_id,
+                build_kwargs=build_kwargs,
+                column_vector_codec=args.vector_codec,
+                checkpoint_every=args.checkpoint_every,
+                chunk_rows=args.chunk_rows,
+                work_dir=args.output_dir.rstrip("/\\") + ".partial",
+            )
+            print(f"테이블 {result['tables']}개 (체크포인트 {result['resumed_from']}개에서 재개)")
+            return result
+        elif args.shards > 1:
+            docs = load_documents()
+            stats = build_sharded_catalog(
+                docs,
+                path,
+                args.shards,
+                embedding_id,
+                build_kwargs=build_kwargs,
+                column_vector_codec=args.vector_codec,
+                processes=args.processes,
+                merge=args.merge_shards,
+                compact_threshold=args.compact_threshold,
+                full_rebuild=args.full_rebuild,
+                max_concurrency=args.concurrency,
+                rpm=args.rpm,
+                tpm=args.tpm,
+                batch_size=args.batch_size,
+            )
+            print(
+                f"테이블 추가 {stats['added']}, 변경 {stats['updated']}, 삭제 {stats['deleted']}, "
+                f"유지 {stats['unchanged']} (샤드 {args.shards}개"
+                + (", 병합)" if args.merge_shards else ")")
+            )
+            if stats["embedding_documents"]:
+                print(
+                    f"임베딩 {stats['embedding_documents']}개 문서, 추정 {stats['embedding_tokens']} 토큰, "
+                    f"요청 {stats['embedding_requests']}회 (요청 한도 초과 {stats['embedding_throttled']}회)"
+                )
+            return stats
+        else:
+            docs = load_documents()
+            stats = sync_faiss_store(
+                path,
+                {document_key(doc.page_content, doc.metadata): [doc] for doc in docs},
+                emb,
+                embedding_id,
+                build_kwargs=build_kwargs,
+                compact_threshold=args.compact_threshold,
+                full_rebuild=args.full_rebuild,
+            )
+            print(
+                f"테이블 추가 {stats['added']}, 변경 {stats['updated']}, 삭제 {stats['deleted']}, "
+                f"유지 {stats['unchanged']}"
+            )
+            sync_column_index(
+                docs,
+                emb,
+                path,
+                embedding_id,
+                vector_codec=args.vector_codec,
+                full_rebuild=args.full_rebuild,
+            )
+            return stats
+
+    version, _ = build_version(
+        args.output_dir,
+        build,
+        emb,
+        seed=not (args.stream or args.full_rebuild),
+        keep=args.keep_versions,
+    )
+    usage = embedding_build_stats(emb)
+    if usage and usage["documents"]:
+        cost = usage["estimated_cost"]
+        print(
+            f"임베딩 {usage['documents']}개 문서, 추정 {usage['tokens']} 토큰, 요청 {usage['requests']}회 "
+            f"(요청 한도 초과 {usage['throttled']}회), {usage['docs_per_second']:.1f} docs/s"
+            + (f", 예상 비용 ${cost:.4f}" if cost is not None else "")
+        )
+    print(f"FAISS index saved to: {args.output_dir} (version {version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+DataHub 데이터셋 일괄 조회 모듈
+
+GraphQL scrollAcrossEntities 응답을 페이지 단위로 읽어 테이블 메타데이터로 바꿉니다.
+DataHub SDK 없이 GraphQL 응답(딕셔너리)만 다루므로 datahub 패키지 없이도 import할 수 있습니다.
+"""
+
+from data_utils.queries import SCROLL_DATASETS_QUERY
+
+
+def format_table_name(name, custom_properties):
+    """데이터셋 이름 앞에 dbt_unique_id의 데이터베이스(스키마) 부분을 붙인 테이블 이름"""
+    database_info = (custom_properties or {}).get("dbt_unique_id", "")
+    if database_info:
+        database_info = database_info.split(".")[-2]
+    return database_info + "." + name
+
+
+def table_schema(table_name):
+    """format_table_name이 앞에 붙인 dbt 스키마 부분 (없으면 None)"""
+    return table_name.split(".", 1)[0] or None
+
+
+def urn_name(urn):
+    """urn:li:tag:finance → finance, urn:li:corpuser:alice → alice"""
+    return urn.split(":", 3)[-1]
+
+
+def scroll_datasets(client, batch_size=500):
+    """
+    데이터셋 메타데이터를 GraphQL scrollAcrossEntities로 batch_size개씩 가져오는 제너레이터
+
+    URN마다 aspect를 따로 조회하지 않고, 한 요청으로 페이지 안의 모든 데이터셋의
+    이름, 설명, 스키마 필드(이름/설명/타입), 태그, 담당자를 가져옵니다.
+
+    Args:
+        batch_size (int): 요청 하나로 가져올 데이터셋 수
+
+    Yields:
+        tuple: (전체 데이터셋 수, 페이지의 데이터셋 메타데이터 딕셔너리 목록)
+               딕셔너리 키: urn, table_name, table_description, columns, tags, owners
+
+    Raises:
+        RuntimeError: GraphQL 요청이 실패한 경우 (scrollAcrossEntities를 지원하지 않는 서버 등)
+    """
+    scroll_id = None
+    while True:
+        variables = {
+            "input": {
+                "types": ["DATASET"],
+                "query": "*",
+                "count": batch_size,
+                "scrollId": scroll_id,
+                "keepAlive": "5m",
+            }
+        }
+        result = client.execute_graphql_query(SCROLL_DATASETS_QUERY, variables)
+        if result.get("error") or result.get("errors") or not result.get("data"):
+            raise RuntimeError(
+                f"DataHub 데이터셋 일괄 조회 실패: {result.get('errors') or result.get('message')}"
+            )
+        page = result["data"]["scrollAcrossEntities"]
+        yield page["total"], [
+            parse_dataset(item["entity"]) for item in page["searchResults"]
+        ]
+        scroll_id = page.get("nextScrollId")
+        if not scroll_id or not page["searchResults"]:
+            break
+
+
+def parse_dataset(entity):
+    """scrollAcrossEntities의 Dataset 엔티티를 get_table_name 등과 같은 형식으로 변환"""
+    properties = entity.get("properties") or {}
+    custom_properties = {
+        item["key"]: item["value"]
+        for item in properties.get("customProperties") or []
+    }
+    name = properties.get("name")
+    columns = []
+    for field in (entity.get("schemaMetadata") or {}).get("fields") or []:
+        native_type = field.get("nativeDataType")
+        columns.append(
+            {
+                "column_name": field["fieldPath"],
+                "column_description": field.get("description"),
+                "column_type": (
+                    native_type if native_type and native_type.strip() else None
+                ),
+            }
+        )
+    return {
+        "urn": entity["urn"],
+        "table_name": (
+            format_table_name(name, custom_properties) if name else None
+        ),
+        "table_description": properties.get("description"),
+        "columns": columns,
+        "tags": [
+            urn_name(item["tag"]["urn"])
+            for item in (entity.get("tags") or {}).get("tags") or []
+        ],
+        "owners": [
+            urn_name(item["owner"]["urn"])
+            for item in (entity.get("ownership") or {}).get("owners") or []
+            if item.get("owner")
+        ],
+    }
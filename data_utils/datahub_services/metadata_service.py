@@ -6,6 +6,8 @@ DataHub 메타데이터 서비스 모듈
 
 from datahub.metadata.schema_classes import (
     DatasetPropertiesClass,
+    GlobalTagsClass,
+    OwnershipClass,
     SchemaMetadataClass,
     UpstreamLineageClass,
 )
@@ -13,6 +15,7 @@ from datahub.ingestion.graph.client import DatahubClientConfig, DataHubGraph
 from collections import defaultdict
 
 from data_utils.datahub_services.base_client import DataHubBaseClient
+from data_utils.datahub_datasets import format_table_name, scroll_datasets, urn_name
 
 
 class MetadataService:
@@ -31,20 +34,22 @@ class MetadataService:
 
     def get_table_name(self, urn):
         """URN에 대한 테이블 이름 가져오기"""
+        return self.get_table_name_and_description(urn)[0]
+
+    def get_table_name_and_description(self, urn):
+        """URN에 대한 (테이블 이름, 테이블 설명)을 DatasetProperties 한 번 조회로 가져오기"""
         dataset_properties = self.datahub_graph.get_aspect(
             urn, aspect_type=DatasetPropertiesClass
         )
         if dataset_properties:
-            database_info = dataset_properties.get("customProperties", {}).get(
-                "dbt_unique_id", ""
+            return (
+                format_table_name(
+                    dataset_properties.get("name", None),
+                    dataset_properties.get("customProperties", {}),
+                ),
+                dataset_properties.get("description", None),
             )
-            if database_info:
-                database_info = database_info.split(".")[-2]
-            else:
-                database_info = ""
-            table_info = dataset_properties.get("name", None)
-            return database_info + "." + table_info
-        return None
+        return None, None
 
     def get_table_description(self, urn):
         """URN에 대한 테이블 설명 가져오기"""
@@ -55,6 +60,20 @@ class MetadataService:
             return dataset_properties.get("description", None)
         return None
 
+    def get_table_tags(self, urn):
+        """URN에 대한 태그 이름 목록 가져오기 (urn:li:tag:finance → finance)"""
+        global_tags = self.datahub_graph.get_aspect(urn, aspect_type=GlobalTagsClass)
+        if not global_tags:
+            return []
+        return [urn_name(tag.tag) for tag in global_tags.tags]
+
+    def get_table_owners(self, urn):
+        """URN에 대한 담당자 이름 목록 가져오기 (urn:li:corpuser:alice → alice)"""
+        ownership = self.datahub_graph.get_aspect(urn, aspect_type=OwnershipClass)
+        if not ownership:
+            return []
+        return [urn_name(owner.owner) for owner in ownership.owners]
+
     def get_column_names_and_descriptions(self, urn):
         """URN에 대한 컬럼 이름 및 설명 가져오기"""
         schema_metadata = self.datahub_graph.get_aspect(
@@ -78,6 +97,13 @@ class MetadataService:
                 )
         return columns
 
+    def scroll_datasets(self, batch_size=500):
+        """
+        데이터셋 메타데이터를 GraphQL scrollAcrossEntities로 batch_size개씩 가져오는 제너레이터
+        (datahub_datasets.scroll_datasets)
+        """
+        return scroll_datasets(self.client, batch_size)
+
     def get_table_lineage(
         self,
         urn,
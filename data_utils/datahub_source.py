@@ -56,6 +56,22 @@ class DatahubMetadataFetcher:
         """URN에 대한 테이블 설명 가져오기"""
         return self.metadata_service.get_table_description(urn)
 
+    def get_table_name_and_description(self, urn):
+        """URN에 대한 (테이블 이름, 테이블 설명)을 한 번의 aspect 조회로 가져오기"""
+        return self.metadata_service.get_table_name_and_description(urn)
+
+    def scroll_datasets(self, batch_size=500):
+        """데이터셋 메타데이터(이름, 설명, 컬럼, 태그, 담당자)를 페이지 단위로 일괄 조회"""
+        return self.metadata_service.scroll_datasets(batch_size)
+
+    def get_table_tags(self, urn):
+        """URN에 대한 태그 이름 목록 가져오기"""
+        return self.metadata_service.get_table_tags(urn)
+
+    def get_table_owners(self, urn):
+        """URN에 대한 담당자 이름 목록 가져오기"""
+        return self.metadata_service.get_table_owners(urn)
+
     def get_column_names_and_descriptions(self, urn):
         """URN에 대한 컬럼 이름 및 설명 가져오기"""
         return self.metadata_service.get_column_names_and_descriptions(urn)
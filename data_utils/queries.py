@@ -3692,3 +3692,55 @@ query getDataset($urn: String!) {
   }
 }
 """
+
+# 데이터셋 메타데이터(이름, 설명, 스키마 필드, 태그, 담당자)를 페이지 단위로 한 번에 가져오는 GraphQL 쿼리
+SCROLL_DATASETS_QUERY = """
+query scrollDatasets($input: ScrollAcrossEntitiesInput!) {
+  scrollAcrossEntities(input: $input) {
+    nextScrollId
+    count
+    total
+    searchResults {
+      entity {
+        urn
+        ... on Dataset {
+          properties {
+            name
+            description
+            customProperties {
+              key
+              value
+            }
+          }
+          schemaMetadata(version: 0) {
+            fields {
+              fieldPath
+              description
+              nativeDataType
+            }
+          }
+          tags {
+            tags {
+              tag {
+                urn
+              }
+            }
+          }
+          ownership {
+            owners {
+              owner {
+                ... on CorpUser {
+                  urn
+                }
+                ... on CorpGroup {
+                  urn
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
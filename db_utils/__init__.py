@@ -45,16 +45,16 @@ def get_db_connector(db_type: Optional[str] = None, config: Optional[DBConfig] =
     if config is None:
         config = load_config_from_env(db_type.upper())
 
-        connector_map = {
-            # "clickhouse": ClickHouseConnector,
-            "postgresql": PostgresConnector,
-            "mysql": MySQLConnector,
-            "mariadb": MariaDBConnector,
-            "oracle": OracleConnector,
-            "duckdb": DuckDBConnector,
-            "databricks": DatabricksConnector,
-            "snowflake": SnowflakeConnector,
-        }
+    connector_map = {
+        # "clickhouse": ClickHouseConnector,
+        "postgresql": PostgresConnector,
+        "mysql": MySQLConnector,
+        "mariadb": MariaDBConnector,
+        "oracle": OracleConnector,
+        "duckdb": DuckDBConnector,
+        "databricks": DatabricksConnector,
+        "snowflake": SnowflakeConnector,
+    }
 
     if db_type not in connector_map:
         logger.error(f"Unsupported DB type: {db_type}")
@@ -6,6 +6,7 @@ Lang2SQL 쿼리 실행을 위한 공용 모듈입니다.
 """
 
 import logging
+import os
 from typing import Dict, Any, Optional, Union
 
 from langchain_core.messages import HumanMessage
@@ -13,6 +14,13 @@ from langchain_core.messages import HumanMessage
 from llm_utils.graph_utils.enriched_graph import builder as enriched_builder
 from llm_utils.graph_utils.basic_graph import builder as basic_builder
 from llm_utils.llm_response_parser import LLMResponseParser
+from llm_utils.vectordb import vector_store_registry
+from engine.semantic_cache import (
+    SemanticCache,
+    build_cache_config,
+    current_index_version,
+    get_semantic_cache,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +33,10 @@ def execute_query(
     top_n: int = 5,
     device: str = "cpu",
     use_enriched_graph: bool = False,
+    column_top_k: Optional[int] = None,
+    table_filters: Optional[Dict[str, Any]] = None,
     session_state: Optional[Union[Dict[str, Any], Any]] = None,
+    use_semantic_cache: Optional[bool] = None,
 ) -> Dict[str, Any]:
     """
     자연어 쿼리를 SQL로 변환하고 실행 결과를 반환하는 공용 함수입니다.
@@ -41,13 +52,17 @@ def execute_query(
         top_n (int, optional): 검색된 상위 테이블 수 제한. 기본값은 5.
         device (str, optional): LLM 실행에 사용할 디바이스 ("cpu" 또는 "cuda"). 기본값은 "cpu".
         use_enriched_graph (bool, optional): 확장된 그래프 사용 여부. 기본값은 False.
+        column_top_k (Optional[int], optional): 테이블별로 프롬프트에 포함할 컬럼 수. None이면 COLUMN_TOP_K 환경 변수를 따름.
+        table_filters (Optional[Dict[str, Any]], optional): 테이블 검색 범위 조건 (database/schema/tags/owners).
         session_state (Optional[Union[Dict[str, Any], Any]], optional): Streamlit 세션 상태 (Streamlit에서만 사용).
+        use_semantic_cache (Optional[bool], optional): 유사 질문 캐시 사용 여부. None이면 SEMANTIC_CACHE_ENABLED 환경 변수를 따름.
 
     Returns:
         Dict[str, Any]: 다음 정보를 포함한 Lang2SQL 실행 결과 딕셔너리:
             - "generated_query": 생성된 SQL 쿼리 (`AIMessage`)
             - "messages": 전체 LLM 응답 메시지 목록
             - "searched_tables": 참조된 테이블 목록 등 추가 정보
+            - "semantic_cache": 캐시 사용 시 {"hit", "similarity"} 정보
     """
 
     logger.info("Processing query: %s", query)
@@ -62,6 +77,29 @@ def execute_query(
 
     logger.info("Using %s graph", graph_type)
 
+    if use_semantic_cache is None:
+        use_semantic_cache = (
+            os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+        )
+
+    if use_semantic_cache:
+        cache = get_semantic_cache()
+        config = build_cache_config(
+            graph_type=graph_type,
+            database_env=database_env,
+            retriever_name=retriever_name,
+            top_n=top_n,
+            column_top_k=column_top_k,
+            table_filters=table_filters,
+        )
+        scope = SemanticCache.make_scope(config, current_index_version())
+        # 임베딩 캐시 덕분에 테이블 검색 단계에서 같은 질문 벡터를 재사용
+        query_vector = vector_store_registry.get_embeddings().embed_query(query)
+        cached, similarity = cache.lookup(query, query_vector, scope)
+        if cached is not None:
+            cached["semantic_cache"] = {"hit": True, "similarity": similarity}
+            return cached
+
     # 그래프 선택 및 컴파일
     if session_state is not None:
         # Streamlit 환경: 세션 상태에서 그래프 재사용
@@ -82,9 +120,18 @@ def execute_query(
             "retriever_name": retriever_name,
             "top_n": top_n,
             "device": device,
+            "column_top_k": column_top_k,
+            "table_filters": table_filters,
         }
     )
 
+    if use_semantic_cache:
+        try:
+            cache.store(query, query_vector, scope, res)
+        except (TypeError, ValueError) as e:
+            logger.warning("Semantic cache store failed: %s", e)
+        res["semantic_cache"] = {"hit": False, "similarity": similarity}
+
     return res
 
 
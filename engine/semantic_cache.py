@@ -0,0 +1,260 @@
+"""
+Lang2SQL 시맨틱 응답 캐시 모듈입니다.
+
+어순이나 표현만 조금 다른 질문에 대해 전체 그래프(LLM 호출 여러 번)를 다시 실행하지 않도록,
+(질문 임베딩, 그래프 설정, 인덱스 버전) → 실행 결과를 로컬 SQLite에 저장하고
+코사인 유사도가 임계값 이상인 이전 질문이 있으면 저장된 결과를 반환합니다.
+조회마다 hit/miss와 최고 유사도를 기록하여 임계값 조정에 사용할 수 있습니다.
+
+환경 변수:
+    SEMANTIC_CACHE_ENABLED: "true"이면 execute_query에서 기본으로 사용 (기본값: false)
+    SEMANTIC_CACHE_THRESHOLD: 캐시 적중 코사인 유사도 임계값 (기본값: 0.95)
+    SEMANTIC_CACHE_PATH: SQLite 파일 경로 (기본값: ~/.cache/lang2sql/semantic_cache.sqlite3)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.load import dumpd, load
+
+from llm_utils.llm import get_embedding_identity
+from llm_utils.vectordb.faiss_db import faiss_index_version, resolve_faiss_path
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_path() -> str:
+    return os.path.join(
+        os.path.expanduser("~"), ".cache", "lang2sql", "semantic_cache.sqlite3"
+    )
+
+
+def _normalize(vector: Sequence[float]) -> np.ndarray:
+    array = np.asarray([vector], dtype=np.float32)
+    faiss.normalize_L2(array)
+    return array
+
+
+def current_index_version() -> str:
+    """
+    현재 벡터 DB 인덱스의 버전 문자열을 반환합니다. 인덱스가 다시 만들어지거나 동기화되면 값이 바뀝니다.
+
+    벡터 스토어 레지스트리와 같은 버전 함수를 사용하므로, 레지스트리가 스토어를 다시 로드할 때 캐시도 무효화됩니다.
+    """
+    vectordb_type = os.getenv("VECTORDB_TYPE", "faiss").lower()
+    location = os.getenv("VECTORDB_LOCATION")
+    if vectordb_type == "faiss":
+        return f"faiss:{faiss_index_version(resolve_faiss_path(location))}"
+    if vectordb_type == "pgvector":
+        # pgvector 의존성은 선택 사항이므로 사용할 때만 import
+        from llm_utils.vectordb.pgvector_db import (
+            pgvector_collection_version,
+            resolve_collection_name,
+            resolve_connection_string,
+        )
+
+        collection_name = resolve_collection_name()
+        version = pgvector_collection_version(
+            resolve_connection_string(location), collection_name
+        )
+        return f"pgvector:{collection_name}:{version}"
+    return f"{vectordb_type}:{location}"
+
+
+def build_cache_config(**graph_config) -> Dict[str, Any]:
+    """그래프 설정에 임베딩/LLM 설정을 더해 캐시 범위 판단용 설정을 만듭니다."""
+    provider, model = get_embedding_identity()
+    return {
+        **graph_config,
+        "embedding": f"{provider}:{model}",
+        "llm_provider": os.getenv("LLM_PROVIDER"),
+    }
+
+
+def serialize_result(result: Dict[str, Any]) -> str:
+    """그래프 실행 결과(메시지 포함)를 JSON 문자열로 직렬화합니다."""
+    result = dict(result)
+    profile = result.get("question_profile")
+    if hasattr(profile, "model_dump"):
+        result["question_profile"] = profile.model_dump()
+    return json.dumps(dumpd(result), ensure_ascii=False)
+
+
+def deserialize_result(payload: str) -> Dict[str, Any]:
+    """serialize_result로 저장한 결과를 메시지 객체까지 복원합니다. question_profile은 dict로 복원됩니다."""
+    with warnings.catch_warnings():
+        # langchain_core.load.load의 beta 경고 생략
+        warnings.simplefilter("ignore")
+        return load(json.loads(payload))
+
+
+class SemanticCache:
+    """질문 임베딩 기반 응답 캐시"""
+
+    def __init__(self, path: Optional[str] = None, threshold: float = 0.95):
+        self.path = os.path.abspath(path or default_cache_path())
+        self.threshold = threshold
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scope TEXT NOT NULL,
+                question TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_semantic_cache_scope ON semantic_cache (scope, id);
+            CREATE TABLE IF NOT EXISTS semantic_cache_log (
+                ts REAL NOT NULL,
+                scope TEXT NOT NULL,
+                question TEXT NOT NULL,
+                hit INTEGER NOT NULL,
+                similarity REAL,
+                matched_id INTEGER
+            );
+            """
+        )
+        self._conn.commit()
+        # scope -> (FAISS 내적 인덱스, 행 id 목록, 마지막으로 읽은 행 id)
+        self._indexes: Dict[str, Tuple[Any, list, int]] = {}
+
+    @staticmethod
+    def make_scope(config: Dict[str, Any], index_version: Any) -> str:
+        """그래프 설정과 인덱스 버전으로 캐시 범위 키(해시)를 만듭니다. 접속 정보는 저장하지 않습니다."""
+        raw = json.dumps(
+            {"config": config, "index_version": str(index_version)},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _sync_index(self, scope: str):
+        """다른 프로세스가 추가한 행까지 읽어 scope의 인메모리 인덱스를 갱신합니다."""
+        index, row_ids, last_id = self._indexes.get(scope, (None, [], 0))
+        rows = self._conn.execute(
+            "SELECT id, vector FROM semantic_cache WHERE scope = ? AND id > ? ORDER BY id",
+            (scope, last_id),
+        ).fetchall()
+        for row_id, blob in rows:
+            vector = np.frombuffer(blob, dtype=np.float32).reshape(1, -1)
+            if index is None:
+                index = faiss.IndexFlatIP(vector.shape[1])
+            index.add(vector)
+            row_ids.append(row_id)
+            last_id = row_id
+        self._indexes[scope] = (index, row_ids, last_id)
+        return index, row_ids
+
+    def lookup(
+        self, question: str, vector: Sequence[float], scope: str
+    ) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        가장 유사한 이전 질문을 찾습니다.
+
+        Returns:
+            (캐시된 결과 또는 None, 최고 코사인 유사도)
+        """
+        query = _normalize(vector)
+        with self._lock:
+            index, row_ids = self._sync_index(scope)
+            similarity, matched_id = 0.0, None
+            if index is not None and index.ntotal and index.d == query.shape[1]:
+                scores, positions = index.search(query, 1)
+                if positions[0][0] >= 0:
+                    similarity = float(scores[0][0])
+                    matched_id = row_ids[positions[0][0]]
+
+            hit = matched_id is not None and similarity >= self.threshold
+            payload = None
+            if hit:
+                payload = self._conn.execute(
+                    "SELECT payload FROM semantic_cache WHERE id = ?", (matched_id,)
+                ).fetchone()[0]
+
+            self._conn.execute(
+                "INSERT INTO semantic_cache_log (ts, scope, question, hit, similarity, matched_id)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (time.time(), scope, question, int(hit), similarity, matched_id),
+            )
+            self._conn.commit()
+
+        logger.info(
+            "Semantic cache %s (similarity=%.4f, threshold=%.2f)",
+            "hit" if hit else "miss",
+            similarity,
+            self.threshold,
+        )
+        return (deserialize_result(payload) if payload else None), similarity
+
+    def store(
+        self, question: str, vector: Sequence[float], scope: str, result: Dict[str, Any]
+    ) -> None:
+        """질문 임베딩과 실행 결과를 저장합니다."""
+        payload = serialize_result(result)
+        blob = _normalize(vector).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO semantic_cache (scope, question, vector, payload, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (scope, question, blob, payload, time.time()),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """조회 기록 기준 hit/miss 수와 평균 유사도를 반환합니다."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT hit, COUNT(*), AVG(similarity), MIN(similarity), MAX(similarity)"
+                " FROM semantic_cache_log GROUP BY hit"
+            ).fetchall()
+            entries = self._conn.execute("SELECT COUNT(*) FROM semantic_cache").fetchone()[0]
+
+        stats = {"entries": entries, "threshold": self.threshold}
+        for hit, count, avg_sim, min_sim, max_sim in rows:
+            stats["hit" if hit else "miss"] = {
+                "count": count,
+                "avg_similarity": avg_sim,
+                "min_similarity": min_sim,
+                "max_similarity": max_sim,
+            }
+        return stats
+
+    def clear(self) -> None:
+        """저장된 결과와 조회 기록을 모두 삭제합니다."""
+        with self._lock:
+            self._conn.execute("DELETE FROM semantic_cache")
+            self._conn.execute("DELETE FROM semantic_cache_log")
+            self._conn.commit()
+            self._indexes.clear()
+
+
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """환경 변수 설정으로 생성한 프로세스 공용 SemanticCache를 반환합니다."""
+    global _semantic_cache
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticCache(
+                path=os.getenv("SEMANTIC_CACHE_PATH"),
+                threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+            )
+        return _semantic_cache
@@ -5,7 +5,7 @@ FAISS 데이터베이스의 상태를 확인하고 관리할 수 있는 기능
 - 벡터 DB 상태 확인
 - 저장된 테이블 정보 조회
 - 검색 테스트
-- 새로운 테이블 정보 추가
+- 테이블 정보 추가/수정/삭제 (백그라운드 작업)
 """
 
 import sys
@@ -26,8 +26,16 @@ import traceback
 
 # LangSQL 모듈들
 from llm_utils.vectordb import get_vector_db
+from llm_utils.vectordb.documents import get_all_documents
 from llm_utils.retrieval import search_tables
 from llm_utils.llm import get_embeddings
+from llm_utils.table_document import get_table_record, split_list_field
+from llm_utils.table_editor import edit_table_document, get_table_document, submit_table_changes
+from llm_utils.background_jobs import FAILED, job_registry
+from llm_utils.vectordb.faiss_db import resolve_faiss_path
+from llm_utils.vectordb.faiss_storage import DOCSTORE_FILE, docstore_file
+from llm_utils.vectordb.faiss_versions import current_version, resolve_current_path, rollback_version
+from langchain.schema import Document
 
 # 페이지 설정
 st.set_page_config(
@@ -43,15 +51,20 @@ def get_vectordb_info():
     """벡터 DB 정보를 가져옵니다."""
     try:
         # 기본 경로
-        vectordb_path = os.path.join(os.getcwd(), "table_info_db")
+        base_path = os.path.join(os.getcwd(), "table_info_db")
+        # 버전 관리 디렉토리면 CURRENT가 가리키는 버전의 파일을 확인
+        vectordb_path = resolve_current_path(base_path)
         
         info = {
             "path": vectordb_path,
+            "base_path": base_path,
+            "version": current_version(base_path),
             "exists": os.path.exists(vectordb_path),
             "faiss_file": os.path.join(vectordb_path, "index.faiss"),
-            "pkl_file": os.path.join(vectordb_path, "index.pkl"),
+            "docstore_file": docstore_file(vectordb_path)
+            or os.path.join(vectordb_path, DOCSTORE_FILE),
             "faiss_exists": os.path.exists(os.path.join(vectordb_path, "index.faiss")),
-            "pkl_exists": os.path.exists(os.path.join(vectordb_path, "index.pkl")),
+            "docstore_exists": docstore_file(vectordb_path) is not None,
         }
         
         # 파일 크기 정보
@@ -61,10 +74,10 @@ def get_vectordb_info():
                 os.path.getmtime(info["faiss_file"])
             )
             
-        if info["pkl_exists"]:
-            info["pkl_size"] = os.path.getsize(info["pkl_file"]) / 1024  # KB
-            info["pkl_modified"] = datetime.fromtimestamp(
-                os.path.getmtime(info["pkl_file"])
+        if info["docstore_exists"]:
+            info["docstore_size"] = os.path.getsize(info["docstore_file"]) / 1024  # KB
+            info["docstore_modified"] = datetime.fromtimestamp(
+                os.path.getmtime(info["docstore_file"])
             )
             
         return info
@@ -85,50 +98,28 @@ def test_vectordb_connection():
 def extract_all_documents(db):
     """벡터 DB의 모든 문서를 추출합니다."""
     try:
-        # FAISS에서 모든 문서 가져오기
-        all_docs = []
-        
-        # docstore에서 직접 가져오기
-        if hasattr(db, 'docstore') and hasattr(db.docstore, '_dict'):
-            for doc_id, doc in db.docstore._dict.items():
-                all_docs.append({
-                    "id": doc_id,
-                    "content": doc.page_content,
-                    "metadata": doc.metadata
-                })
-        
-        return all_docs
+        # 인덱스 순서대로 모든 문서 가져오기 (FAISS/pgvector 공통)
+        return [
+            {"id": doc.id, "content": doc.page_content, "metadata": doc.metadata}
+            for doc in get_all_documents(db)
+        ]
     except Exception as e:
         st.error(f"문서 추출 중 오류: {e}")
         return []
 
-def parse_table_info(content: str) -> Dict:
-    """테이블 정보 텍스트를 파싱합니다."""
+def parse_table_info(content: str, metadata: Optional[Dict] = None) -> Dict:
+    """테이블 정보를 구조화합니다. metadata에 구조화 레코드가 있으면 파싱하지 않고 사용합니다."""
     try:
-        lines = content.split("\n")
-        
-        if ": " not in lines[0]:
+        record = get_table_record(Document(page_content=content, metadata=metadata or {}))
+        if record is None:
             return {"error": "잘못된 형식"}
-            
-        table_name, table_desc = lines[0].split(": ", 1)
-        
-        columns = {}
-        current_section = None
-        
-        for line in lines[1:]:
-            line = line.strip()
-            if line == "Columns:":
-                current_section = "columns"
-                continue
-                
-            if current_section == "columns" and ": " in line:
-                col_name, col_desc = line.split(": ", 1)
-                columns[col_name.strip()] = col_desc.strip()
-        
+
+        columns = {name: desc for name, desc, _ in record["columns"]}
         return {
-            "table_name": table_name,
-            "table_description": table_desc.strip(),
+            "table_name": record["table_name"],
+            "table_description": record["table_description"],
             "columns": columns,
+            "column_types": {name: col_type for name, _, col_type in record["columns"]},
             "column_count": len(columns)
         }
     except Exception as e:
@@ -146,6 +137,14 @@ with col1:
     if db_info:
         st.markdown("**📂 파일 경로:**")
         st.code(db_info["path"])
+        if db_info["version"]:
+            st.write(f"🏷️ 현재 버전: `{db_info['version']}`")
+            if st.button("⏪ 이전 버전으로 되돌리기"):
+                try:
+                    version = rollback_version(db_info["base_path"])
+                    st.success(f"버전 {version}으로 되돌렸습니다. 다음 검색부터 적용됩니다.")
+                except ValueError as e:
+                    st.warning(str(e))
         
         # 상태 표시
         if db_info["exists"]:
@@ -164,12 +163,12 @@ with col1:
                 st.error("❌ FAISS 파일 없음")
                 
         with col_b:
-            if db_info["pkl_exists"]:
-                st.success("✅ PKL 파일")
-                st.write(f"크기: {db_info['pkl_size']:.1f} KB")
-                st.write(f"수정: {db_info['pkl_modified'].strftime('%Y-%m-%d %H:%M')}")
+            if db_info["docstore_exists"]:
+                st.success(f"✅ 문서 저장소 ({os.path.basename(db_info['docstore_file'])})")
+                st.write(f"크기: {db_info['docstore_size']:.1f} KB")
+                st.write(f"수정: {db_info['docstore_modified'].strftime('%Y-%m-%d %H:%M')}")
             else:
-                st.error("❌ PKL 파일 없음")
+                st.error("❌ 문서 저장소 파일 없음")
     
     st.markdown("---")
     
@@ -192,11 +191,12 @@ with col2:
     st.subheader("🔍 DB 내용 탐색")
     
     # 탭 생성
-    tab1, tab2, tab3 = st.tabs(["📋 테이블 목록", "🔎 검색 테스트", "➕ 새 테이블 추가"])
+    tab1, tab2, tab3 = st.tabs(["📋 테이블 목록", "🔎 검색 테스트", "✏️ 테이블 편집"])
     
     with tab1:
         if st.session_state.get("db_connected", False):
-            db = st.session_state.get("vector_db")
+            # 편집으로 새 버전이 공개되었을 수 있으므로 레지스트리에서 현재 버전을 가져옴
+            db = get_vector_db()
             
             if st.button("📥 모든 테이블 정보 불러오기"):
                 with st.spinner("테이블 정보 로딩 중..."):
@@ -209,7 +209,7 @@ with col2:
                         table_data = []
                         
                         for doc in all_docs:
-                            parsed = parse_table_info(doc["content"])
+                            parsed = parse_table_info(doc["content"], doc["metadata"])
                             if "error" not in parsed:
                                 table_data.append({
                                     "테이블명": parsed["table_name"],
@@ -233,7 +233,7 @@ with col2:
                                 # 선택된 테이블의 전체 정보 표시
                                 selected_doc = None
                                 for doc in all_docs:
-                                    parsed = parse_table_info(doc["content"])
+                                    parsed = parse_table_info(doc["content"], doc["metadata"])
                                     if "error" not in parsed and parsed["table_name"] == selected_table:
                                         selected_doc = doc
                                         break
@@ -241,13 +241,13 @@ with col2:
                                 if selected_doc:
                                     st.markdown(f"### 📋 {selected_table} 상세 정보")
                                     
-                                    parsed = parse_table_info(selected_doc["content"])
+                                    parsed = parse_table_info(selected_doc["content"], selected_doc["metadata"])
                                     st.write(f"**설명:** {parsed['table_description']}")
                                     
                                     if parsed["columns"]:
                                         st.write("**컬럼 정보:**")
                                         columns_df = pd.DataFrame([
-                                            {"컬럼명": col, "설명": desc}
+                                            {"컬럼명": col, "타입": parsed["column_types"].get(col) or "", "설명": desc}
                                             for col, desc in parsed["columns"].items()
                                         ])
                                         st.dataframe(columns_df, use_container_width=True)
@@ -275,7 +275,7 @@ with col2:
         with col_search1:
             retriever_type = st.selectbox(
                 "검색 방식:",
-                ["기본", "Reranker"],
+                ["기본", "Reranker", "hybrid"],
                 key="search_retriever"
             )
         with col_search2:
@@ -317,22 +317,109 @@ with col2:
                 st.warning("검색어를 입력해주세요.")
     
     with tab3:
-        st.markdown("### ➕ 새로운 테이블 정보 추가")
-        st.info("현재는 읽기 전용입니다. 새로운 테이블 정보를 추가하려면 table_catalog.csv를 수정한 후 create_faiss.py를 실행하세요.")
-        
-        with st.expander("📝 테이블 정보 형식 예시"):
-            st.code("""
-테이블명: 설명
-Columns:
-컬럼명1: 컬럼 설명1
-컬럼명2: 컬럼 설명2
-            """)
-        
-        st.markdown("**💡 추가 방법:**")
+        st.markdown("### ✏️ 테이블 추가 / 수정 / 삭제")
+        st.caption(
+            "바뀐 테이블 문서만 다시 임베딩하여 새 인덱스 버전으로 공개합니다. "
+            "작업은 백그라운드에서 실행되며 완료되면 다음 검색부터 반영됩니다."
+        )
+
+        base_path = db_info["base_path"] if db_info else None
+        edit_table_name = st.text_input("테이블명:", key="edit_table_name").strip()
+        if edit_table_name:
+            try:
+                existing_doc = get_table_document(edit_table_name, base_path)
+            except Exception as e:
+                existing_doc = None
+                st.error(f"테이블 조회 중 오류: {e}")
+
+            existing_record = get_table_record(existing_doc) if existing_doc is not None else None
+            existing_meta = existing_doc.metadata if existing_doc is not None else {}
+            if existing_record:
+                st.info(f"기존 테이블을 수정합니다. (컬럼 {len(existing_record['columns'])}개)")
+            else:
+                st.info("인덱스에 없는 테이블입니다. 저장하면 새 테이블로 추가됩니다.")
+
+            with st.form(f"edit_table_form_{edit_table_name}"):
+                table_description = st.text_area(
+                    "테이블 설명:",
+                    value=existing_record["table_description"] if existing_record else "",
+                )
+                col_meta1, col_meta2 = st.columns(2)
+                with col_meta1:
+                    database = st.text_input("database:", value=existing_meta.get("database") or "")
+                    tags = st.text_input("tags (쉼표 구분):", value=", ".join(existing_meta.get("tags") or []))
+                with col_meta2:
+                    schema = st.text_input("schema:", value=existing_meta.get("schema") or "")
+                    owners = st.text_input("owners (쉼표 구분):", value=", ".join(existing_meta.get("owners") or []))
+
+                columns_df = st.data_editor(
+                    pd.DataFrame(
+                        [
+                            {"컬럼명": name, "설명": desc, "타입": col_type or ""}
+                            for name, desc, col_type in (existing_record["columns"] if existing_record else [])
+                        ],
+                        columns=["컬럼명", "설명", "타입"],
+                    ),
+                    num_rows="dynamic",
+                    use_container_width=True,
+                    key=f"edit_columns_{edit_table_name}",
+                )
+                save_clicked = st.form_submit_button("💾 저장")
+
+            if save_clicked:
+                columns = [
+                    (str(row["컬럼명"]).strip(), str(row["설명"] or ""), str(row["타입"] or "") or None)
+                    for _, row in columns_df.fillna("").iterrows()
+                    if str(row["컬럼명"]).strip()
+                ]
+                doc = edit_table_document(
+                    edit_table_name,
+                    table_description=table_description,
+                    columns=columns,
+                    vectordb_location=base_path,
+                    # 비워 둔 database/schema는 "database.schema.table" 테이블명에서 추출
+                    **{key: value for key, value in (("database", database), ("schema", schema)) if value},
+                    tags=split_list_field(tags),
+                    owners=split_list_field(owners),
+                )
+                job = submit_table_changes(upserts=[doc], vectordb_location=base_path)
+                st.success(f"저장 작업을 시작했습니다. (작업 ID: {job.id})")
+
+            if existing_record and st.button("🗑️ 테이블 삭제", key="delete_table"):
+                job = submit_table_changes(
+                    deletes=[edit_table_name], vectordb_location=base_path
+                )
+                st.success(f"삭제 작업을 시작했습니다. (작업 ID: {job.id})")
+
+        st.markdown("---")
+        st.markdown("#### ⏳ 작업 현황")
+
+        @st.fragment(run_every=1)
+        def show_jobs():
+            jobs = job_registry.list(queue=resolve_faiss_path(base_path))
+            if not jobs:
+                st.caption("실행한 작업이 없습니다.")
+            for job in jobs[:10]:
+                if job.status == FAILED:
+                    st.error(f"{job.name} - {job.message}")
+                    with st.expander("오류 상세"):
+                        st.code(job.error)
+                elif job.done:
+                    stats = job.result or {}
+                    st.success(
+                        f"{job.name} - 추가 {stats.get('added', 0)}, 변경 {stats.get('updated', 0)}, "
+                        f"삭제 {stats.get('deleted', 0)} (임베딩 {stats.get('embedded', 0)}개, "
+                        f"버전 {stats.get('version') or '변경 없음'})"
+                    )
+                else:
+                    st.progress(job.progress, text=f"{job.name} - {job.message}")
+
+        show_jobs()
+
+        st.markdown("**💡 참고:**")
         st.markdown("""
-1. `table_catalog.csv` 파일에 새로운 테이블/컬럼 정보 추가
-2. `create_faiss.py` 스크립트 실행하여 벡터 DB 재생성
-3. Streamlit 앱 재시작
+- 여기서 고친 내용은 인덱스에만 반영됩니다. `create_faiss.py`로 다시 동기화해도 유지하려면 `table_catalog.csv`에도 반영하세요.
+- 잘못 고쳤다면 왼쪽의 **이전 버전으로 되돌리기**로 직전 버전으로 돌아갈 수 있습니다.
         """)
 
 # 사이드바에 추가 정보
@@ -343,11 +430,11 @@ st.sidebar.markdown("""
 1. **DB 상태 확인**: FAISS 인덱스 파일 상태 모니터링
 2. **테이블 탐색**: 저장된 모든 테이블 정보 조회
 3. **검색 테스트**: 벡터 검색 기능 테스트
-4. **정보 관리**: 테이블 메타데이터 관리
+4. **테이블 편집**: 테이블 단위 추가/수정/삭제 (바뀐 문서만 임베딩)
 
 **주의사항:**
 - 수정 작업은 신중하게 진행하세요
-- 백업을 권장합니다
+- 편집은 새 인덱스 버전으로 공개되며, 이전 버전으로 되돌릴 수 있습니다
 """)
 
 # 환경 정보
@@ -135,6 +135,7 @@ _prev_cfg = st.session_state.get("graph_config", {})
 _retriever_options = {
     "기본": "벡터 검색 (기본)",
     "Reranker": "Reranker 검색 (정확도 향상)",
+    "hybrid": "하이브리드 검색 (BM25 + 벡터)",
 }
 _retriever_keys = list(_retriever_options.keys())
 _retriever_default = _prev_cfg.get("retriever_name", "기본")
@@ -637,6 +637,7 @@ device = "cpu"
 retriever_options = {
     "기본": "벡터 검색 (기본)",
     "Reranker": "Reranker 검색 (정확도 향상)",
+    "hybrid": "하이브리드 검색 (BM25 + 벡터)",
 }
 
 _retriever_keys = list(retriever_options.keys())
@@ -0,0 +1,131 @@
+"""
+백그라운드 작업 모듈 - 오래 걸리는 작업(인덱스 수정 등)을 스레드에서 실행하고 진행률을 조회
+
+Streamlit 페이지는 상호작용마다 스크립트를 처음부터 다시 실행하므로, 작업은 프로세스 단위
+레지스트리(job_registry)에 보관하고 페이지는 작업 ID로 상태를 조회합니다.
+작업 함수는 첫 인자로 progress(비율 0~1, 메시지) 콜백을 받습니다.
+
+같은 queue 이름으로 제출한 작업은 제출 순서대로 하나씩 실행됩니다(같은 인덱스를 고치는 작업끼리 충돌 방지).
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class BackgroundJob:
+    """작업 하나의 상태(진행률, 메시지, 결과, 오류)"""
+
+    def __init__(self, name: str, queue: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.queue = queue
+        self.status = PENDING
+        self.progress = 0.0
+        self.message = "대기 중"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def update(self, progress: float, message: Optional[str] = None) -> None:
+        self.progress = min(max(progress, 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobRegistry:
+    """스레드 안전한 백그라운드 작업 레지스트리 (queue마다 작업을 순서대로 실행)"""
+
+    def __init__(self, max_jobs: int = 100):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, BackgroundJob] = {}
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._max_jobs = max_jobs
+
+    def submit(
+        self, name: str, fn: Callable[..., Any], *args, queue: str = "default", **kwargs
+    ) -> BackgroundJob:
+        """fn(progress, *args, **kwargs)를 백그라운드에서 실행하고 작업 객체를 바로 반환합니다."""
+        job = BackgroundJob(name, queue)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+            executor = self._executors.get(queue)
+            if executor is None:
+                executor = self._executors[queue] = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"job-{queue}"
+                )
+        executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: BackgroundJob, fn: Callable[..., Any], args, kwargs) -> None:
+        job.status = RUNNING
+        job.update(0.0, "실행 중")
+        try:
+            job.result = fn(job.update, *args, **kwargs)
+        except Exception as e:
+            job.error = f"{e}\n{traceback.format_exc()}"
+            job.message = f"실패: {e}"
+            job.status = FAILED
+            print(f"❌ 백그라운드 작업 실패: {job.name} ({e})")
+        else:
+            job.update(1.0, "완료")
+            job.status = SUCCEEDED
+        finally:
+            job.finished_at = time.time()
+
+    def _evict(self) -> None:
+        # 끝난 작업부터 오래된 순서로 정리하여 최대 max_jobs개만 유지
+        finished = sorted(
+            (job for job in self._jobs.values() if job.done), key=lambda job: job.created_at
+        )
+        for job in finished[: max(0, len(self._jobs) - self._max_jobs)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> Optional[BackgroundJob]:
+        return self._jobs.get(job_id)
+
+    def list(self, queue: Optional[str] = None) -> List[BackgroundJob]:
+        """작업 목록을 최근 제출 순서로 반환합니다."""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if queue is None or job.queue == queue]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> BackgroundJob:
+        """작업이 끝날 때까지 기다립니다 (테스트/스크립트용)."""
+        job = self._jobs[job_id]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not job.done:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"작업이 시간 안에 끝나지 않았습니다: {job.name}")
+            time.sleep(0.05)
+        return job
+
+
+job_registry = JobRegistry()
@@ -0,0 +1,118 @@
+"""
+테이블 카탈로그 파일(CSV/Parquet) 읽기 모듈
+
+카탈로그는 컬럼 한 개가 한 행이며 다음 컬럼을 가집니다.
+    필수: table_name, table_description, column_name, column_description
+    선택: column_type, database, schema, tags, owners (tags/owners는 ; 또는 , 로 구분)
+
+load_catalog_documents는 전체를 읽어 테이블 문서 목록을 만들고(행 순서 무관),
+iter_catalog_documents는 chunk 단위로 읽으면서 테이블이 끝날 때마다 문서를 내보냅니다.
+스트리밍 읽기는 같은 테이블의 행이 연속해 있어야 합니다 (table_name으로 정렬된 카탈로그).
+"""
+
+import csv
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from langchain.schema import Document
+
+from llm_utils.table_document import build_table_document, split_list_field
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+
+def iter_catalog_rows(path: str, chunk_rows: int = 10000) -> Iterator[Dict[str, str]]:
+    """카탈로그 파일의 행을 순서대로 반환합니다. Parquet은 chunk_rows개씩 읽습니다."""
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+            yield from batch.to_pylist()
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as f:  # BOM 처리를 위해 utf-8-sig 사용
+        yield from csv.DictReader(f)
+
+
+def _text(row: Dict, field: str) -> str:
+    return str(row.get(field) or "").strip()
+
+
+class _TableAccumulator:
+    """한 테이블의 행을 모아 테이블 문서를 만듭니다."""
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.description = ""
+        self.columns: List = []
+        self.filters: Dict = {}
+
+    def add(self, row: Dict) -> None:
+        self.description = _text(row, "table_description")
+        # 선택 컬럼: 검색 필터용 database/schema/tags/owners
+        for field in ("database", "schema"):
+            if _text(row, field):
+                self.filters[field] = _text(row, field)
+        for field in ("tags", "owners"):
+            values = split_list_field(_text(row, field))
+            if values:
+                self.filters[field] = values
+        self.columns.append(
+            (
+                _text(row, "column_name"),
+                _text(row, "column_description"),
+                _text(row, "column_type") or None,
+            )
+        )
+
+    def document(self) -> Document:
+        return build_table_document(
+            self.table_name, self.description, self.columns, **self.filters
+        )
+
+
+def load_catalog_documents(path: str) -> List[Document]:
+    """카탈로그 파일 전체를 테이블 문서 목록으로 변환합니다 (같은 테이블 행이 흩어져 있어도 됨)."""
+    tables: Dict[str, _TableAccumulator] = {}
+    for row in iter_catalog_rows(path):
+        table_name = _text(row, "table_name")
+        tables.setdefault(table_name, _TableAccumulator(table_name)).add(row)
+    return [table.document() for table in tables.values()]
+
+
+def iter_catalog_documents(
+    rows: Iterable[Dict[str, str]], seen: Optional[set] = None
+) -> Iterator[Document]:
+    """
+    연속된 같은 table_name 행을 모아 테이블 문서를 하나씩 반환합니다 (메모리에는 한 테이블만 유지).
+
+    이미 끝난 테이블이 다시 나오면 카탈로그가 정렬되지 않은 것이므로 ValueError를 발생시킵니다.
+    """
+    seen = set() if seen is None else seen
+    current: Optional[_TableAccumulator] = None
+    for row in rows:
+        table_name = _text(row, "table_name")
+        if current is None or table_name != current.table_name:
+            if current is not None:
+                yield current.document()
+            if table_name in seen:
+                raise ValueError(
+                    f"테이블 '{table_name}'의 행이 연속되어 있지 않습니다. "
+                    "스트리밍 빌드는 table_name으로 정렬된 카탈로그가 필요합니다."
+                )
+            seen.add(table_name)
+            current = _TableAccumulator(table_name)
+        current.add(row)
+    if current is not None:
+        yield current.document()
+
+
+def catalog_fingerprint(path: str) -> Dict[str, object]:
+    """재개 가능 여부 판단용 카탈로그 파일 식별 정보 (경로, 크기, 수정 시각)."""
+    stat = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
@@ -0,0 +1,261 @@
+"""
+컬럼 단위 2차 인덱스 모듈
+
+테이블 인덱스 디렉토리 아래 `columns/`에 컬럼별 문서로 구성된 FAISS 인덱스를 저장하고,
+테이블 검색 이후 테이블마다 질문과 관련도가 높은 상위 k개 컬럼만 골라 프롬프트에 전달합니다.
+ID/날짜처럼 조인과 집계에 필요한 키 컬럼은 항상 유지합니다.
+
+환경 변수:
+    COLUMN_TOP_K: 테이블별로 유지할 컬럼 수 (기본값: 0, 0이면 모든 컬럼 유지)
+    KEY_COLUMN_PATTERN: 항상 유지할 키 컬럼명 정규식
+"""
+
+import os
+import re
+import threading
+import weakref
+from typing import Dict, List, Optional, Sequence
+
+import faiss
+import numpy as np
+from langchain.schema import Document
+
+from llm_utils.table_document import document_key, get_table_record
+from llm_utils.vectordb.faiss_db import resolve_faiss_path, faiss_index_version
+from llm_utils.vectordb.faiss_shards import sharded_store_paths
+from llm_utils.vectordb.faiss_versions import resolve_current_path
+from llm_utils.vectordb.faiss_index import build_faiss_store, search_index
+from llm_utils.vectordb.faiss_storage import load_faiss_store, save_faiss_store
+from llm_utils.vectordb.faiss_sync import sync_faiss_store
+from llm_utils.vectordb.registry import vector_store_registry
+
+COLUMN_INDEX_DIR = "columns"
+
+# ID, 번호, 날짜/연도 계열 컬럼명
+DEFAULT_KEY_COLUMN_PATTERN = (
+    r"(^|_)(id|no|key|seq)$|(^|_)(dt|date|ymd|ym|yy|yyyy|yr|year|month|time|ts)$"
+)
+
+
+def build_column_documents(table_documents: Sequence[Document]) -> List[Document]:
+    """테이블 문서 목록을 컬럼별 문서 목록으로 펼칩니다."""
+    column_docs = []
+    for table_doc in table_documents:
+        record = get_table_record(table_doc)
+        if record is None:
+            continue
+        table_name = record["table_name"]
+        for column_name, column_desc, column_type in record["columns"]:
+            column_docs.append(
+                Document(
+                    page_content=f"{table_name}.{column_name}: {column_desc}",
+                    metadata={
+                        "table_name": table_name,
+                        "column_name": column_name,
+                        "column_type": column_type,
+                    },
+                )
+            )
+    return column_docs
+
+
+def build_column_index(
+    table_documents: Sequence[Document],
+    embeddings,
+    vectordb_path: str,
+    vector_codec: Optional[str] = None,
+):
+    """
+    테이블 문서로 컬럼 인덱스를 만들어 `<vectordb_path>/columns`에 저장합니다.
+
+    vector_codec(float32|fp16|int8|pq, None이면 FAISS_VECTOR_CODEC)으로 컬럼 벡터를 압축할 수 있습니다.
+    테이블별 검색이므로 인덱스 타입은 항상 flat입니다.
+    """
+    column_docs = build_column_documents(table_documents)
+    if not column_docs:
+        return None
+    column_db = build_faiss_store(
+        column_docs, embeddings, index_type="flat", vector_codec=vector_codec
+    )
+    save_faiss_store(column_db, os.path.join(vectordb_path, COLUMN_INDEX_DIR))
+    print(f"컬럼 인덱스 저장 완료: {len(column_docs)}개 컬럼")
+    return column_db
+
+
+def sync_column_index(
+    table_documents: Sequence[Document],
+    embeddings,
+    vectordb_path: str,
+    embedding_id: str,
+    vector_codec: Optional[str] = None,
+    full_rebuild: bool = False,
+) -> Dict[str, int]:
+    """
+    컬럼 인덱스를 증분 갱신합니다 (faiss_sync). 컬럼 목록이 바뀐 테이블의 컬럼만 다시 임베딩합니다.
+    """
+    groups = {
+        document_key(doc.page_content, doc.metadata): build_column_documents([doc])
+        for doc in table_documents
+    }
+    stats = sync_faiss_store(
+        os.path.join(vectordb_path, COLUMN_INDEX_DIR),
+        groups,
+        embeddings,
+        embedding_id,
+        build_kwargs={"index_type": "flat", "vector_codec": vector_codec},
+        full_rebuild=full_rebuild,
+    )
+    print(f"컬럼 인덱스 갱신 완료: 컬럼 {stats['embedded']}개 임베딩")
+    return stats
+
+
+def _iter_column_metadata(column_db):
+    """(인덱스 위치, metadata)를 위치 순서대로 반환합니다."""
+    # Arrow docstore는 metadata 컬럼만 한 번에 읽음 (삭제된 행은 빈 metadata)
+    iter_metadata = getattr(column_db.docstore, "iter_metadata", None)
+    if iter_metadata is not None:
+        yield from enumerate(iter_metadata())
+        return
+    for position, doc_id in column_db.index_to_docstore_id.items():
+        doc = column_db.docstore.search(doc_id)
+        if isinstance(doc, Document):
+            yield position, doc.metadata
+
+
+class ColumnSelector:
+    """컬럼 인덱스에서 테이블별로 질문과 가까운 컬럼을 고르는 클래스"""
+
+    def __init__(self, column_db, key_column_pattern: Optional[str] = None):
+        self.column_db = column_db
+        self.key_column_re = re.compile(
+            key_column_pattern or DEFAULT_KEY_COLUMN_PATTERN, re.IGNORECASE
+        )
+        # 테이블명 -> (인덱스 위치 배열, 위치별 컬럼명)
+        positions: Dict[str, List[int]] = {}
+        names: Dict[int, str] = {}
+        for position, metadata in _iter_column_metadata(column_db):
+            table_name = metadata.get("table_name")
+            if table_name is None:
+                continue
+            positions.setdefault(table_name, []).append(position)
+            names[position] = metadata.get("column_name")
+        self.table_positions = {
+            table: np.asarray(ids, dtype=np.int64) for table, ids in positions.items()
+        }
+        self.column_names = names
+
+    def is_key_column(self, column_name: str) -> bool:
+        return bool(self.key_column_re.search(column_name))
+
+    def rank_columns(self, query_vector: Sequence[float], table_name: str, k: int) -> List[str]:
+        """테이블의 컬럼 중 질문 벡터와 가까운 상위 k개 컬럼명을 반환합니다."""
+        ids = self.table_positions.get(table_name)
+        if ids is None or k <= 0:
+            return []
+
+        query = np.asarray([query_vector], dtype=np.float32)
+        if self.column_db._normalize_L2:
+            faiss.normalize_L2(query)
+        # 해당 테이블의 컬럼 위치로만 검색 범위를 제한
+        _, indices = search_index(
+            self.column_db.index,
+            query,
+            min(k, len(ids)),
+            sel=faiss.IDSelectorBatch(ids),
+            exact_vectors=getattr(self.column_db, "exact_vectors", None),
+        )
+        return [self.column_names[i] for i in indices[0] if i >= 0]
+
+    def select(
+        self,
+        query_vector: Sequence[float],
+        table_name: str,
+        columns: Dict[str, str],
+        k: int,
+    ) -> Dict[str, str]:
+        """키 컬럼과 관련도 상위 k개 컬럼만 남긴 컬럼 딕셔너리를 반환합니다 (원래 순서 유지)."""
+        if k <= 0 or len(columns) <= k:
+            return columns
+        ranked = self.rank_columns(query_vector, table_name, k)
+        if not ranked:
+            return columns
+
+        keep = set(ranked)
+        keep.update(name for name in columns if self.is_key_column(name))
+        return {name: desc for name, desc in columns.items() if name in keep}
+
+
+class ShardedColumnSelector(ColumnSelector):
+    """샤드별 컬럼 인덱스 선택기를 테이블명으로 찾아 위임하는 클래스 (샤드 레이아웃용)"""
+
+    def __init__(
+        self, selectors: Sequence[ColumnSelector], key_column_pattern: Optional[str] = None
+    ):
+        self.selectors = list(selectors)
+        self.key_column_re = re.compile(
+            key_column_pattern or DEFAULT_KEY_COLUMN_PATTERN, re.IGNORECASE
+        )
+        self.table_selectors = {
+            table: selector for selector in self.selectors for table in selector.table_positions
+        }
+
+    def rank_columns(self, query_vector: Sequence[float], table_name: str, k: int) -> List[str]:
+        selector = self.table_selectors.get(table_name)
+        if selector is None:
+            return []
+        return selector.rank_columns(query_vector, table_name, k)
+
+
+_selectors: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_sharded_selectors: Dict[str, tuple] = {}
+_selectors_lock = threading.Lock()
+
+
+def _load_selector(path: str, location: str) -> ColumnSelector:
+    # location(버전과 무관한 경로)을 키로 써서 버전이 바뀌면 같은 캐시 항목을 다시 로드
+    column_db = vector_store_registry.get_store(
+        "faiss_columns",
+        location,
+        loader=lambda embeddings: load_faiss_store(path, embeddings),
+        version_fn=lambda: faiss_index_version(path),
+    )
+    with _selectors_lock:
+        selector = _selectors.get(column_db)
+        if selector is None:
+            selector = ColumnSelector(column_db, os.getenv("KEY_COLUMN_PATTERN"))
+            _selectors[column_db] = selector
+        return selector
+
+
+def get_column_selector(vectordb_location: Optional[str] = None) -> Optional[ColumnSelector]:
+    """현재 FAISS 인덱스의 컬럼 인덱스 선택기를 반환합니다. 컬럼 인덱스가 없으면 None."""
+    if os.getenv("VECTORDB_TYPE", "faiss").lower() != "faiss":
+        return None
+    if vectordb_location is None:
+        vectordb_location = os.getenv("VECTORDB_LOCATION")
+
+    vectordb_path = resolve_faiss_path(vectordb_location)
+    store_path = resolve_current_path(vectordb_path)
+    path = os.path.join(store_path, COLUMN_INDEX_DIR)
+    if faiss_index_version(path) is not None:
+        return _load_selector(path, os.path.join(vectordb_path, COLUMN_INDEX_DIR))
+
+    # 병합하지 않은 샤드 레이아웃: 샤드마다 컬럼 인덱스가 있음
+    shard_paths = [
+        os.path.join(shard_path, COLUMN_INDEX_DIR)
+        for shard_path in sharded_store_paths(store_path) or []
+    ]
+    selectors = tuple(
+        _load_selector(path, os.path.join(vectordb_path, os.path.relpath(path, store_path)))
+        for path in shard_paths
+        if faiss_index_version(path) is not None
+    )
+    if not selectors:
+        return None
+    with _selectors_lock:
+        cached = _sharded_selectors.get(vectordb_path)
+        if cached is None or cached[0] != selectors:
+            selector = ShardedColumnSelector(selectors, os.getenv("KEY_COLUMN_PATTERN"))
+            cached = (selectors, selector)
+            _sharded_selectors[vectordb_path] = cached
+        return cached[1]
@@ -0,0 +1,297 @@
+"""
+운영 DB의 시스템 카탈로그에서 테이블 문서를 만드는 모듈 (db_utils 커넥터 사용)
+
+DataHub(get_info_from_db)나 카탈로그 파일(create_faiss.py --csv-path) 없이, DB의
+information_schema/시스템 카탈로그에서 테이블·컬럼·타입·코멘트를 읽습니다.
+
+- 스키마마다 테이블 조회 1번, 컬럼 조회 1번만 실행합니다 (테이블마다 조회하지 않음).
+- 스키마들은 스레드 풀에서 동시에 읽으며, 커넥터는 연결을 공유할 수 없으므로 스레드마다 따로 만듭니다.
+- 결과는 load_catalog_documents와 같은 테이블 문서(구조화 metadata 포함)이므로
+  sync_faiss_store, build_sharded_catalog, sync_pgvector_db에 그대로 넣을 수 있습니다.
+- 테이블명은 "database.schema.table" 형식이며(데이터베이스 이름이 없는 DB는 "schema.table"),
+  테이블/컬럼 코멘트가 설명이 됩니다.
+
+사용 예:
+    from llm_utils.db_catalog import load_db_catalog_documents
+
+    docs = load_db_catalog_documents("postgresql", schemas=["sales", "crm"], max_workers=4)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain.schema import Document
+
+from llm_utils.table_document import build_table_document
+
+# DB 종류별 조회 SQL. {schema}는 따옴표를 이스케이프한 스키마 이름으로 바뀝니다.
+# 결과 컬럼: schemas -> schema_name / tables -> table_name, table_comment /
+#            columns -> table_name, column_name, data_type, column_comment (테이블, 컬럼 순서로 정렬)
+# database: 테이블명 앞에 붙일 데이터베이스(카탈로그) 이름을 가진 커넥터 속성
+CATALOG_QUERIES: Dict[str, Dict[str, Optional[str]]] = {
+    "postgresql": {
+        "database": "database",
+        "schemas": """
+            SELECT nspname AS schema_name FROM pg_catalog.pg_namespace
+            WHERE nspname NOT IN ('pg_catalog', 'information_schema')
+              AND nspname NOT LIKE 'pg\\_toast%' AND nspname NOT LIKE 'pg\\_temp%'
+            ORDER BY nspname
+        """,
+        "tables": """
+            SELECT c.relname AS table_name, obj_description(c.oid, 'pg_class') AS table_comment
+            FROM pg_catalog.pg_class c
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = '{schema}' AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+              AND NOT c.relispartition
+            ORDER BY c.relname
+        """,
+        "columns": """
+            SELECT c.relname AS table_name, a.attname AS column_name,
+                   format_type(a.atttypid, a.atttypmod) AS data_type,
+                   col_description(c.oid, a.attnum) AS column_comment
+            FROM pg_catalog.pg_attribute a
+            JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = '{schema}' AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+              AND NOT c.relispartition AND a.attnum > 0 AND NOT a.attisdropped
+            ORDER BY c.relname, a.attnum
+        """,
+    },
+    "mysql": {
+        "database": None,  # MySQL의 스키마가 곧 데이터베이스
+        "schemas": """
+            SELECT schema_name AS schema_name FROM information_schema.schemata
+            WHERE schema_name NOT IN ('mysql', 'information_schema', 'performance_schema', 'sys')
+            ORDER BY schema_name
+        """,
+        "tables": """
+            SELECT table_name AS table_name, table_comment AS table_comment
+            FROM information_schema.tables
+            WHERE table_schema = '{schema}'
+            ORDER BY table_name
+        """,
+        "columns": """
+            SELECT table_name AS table_name, column_name AS column_name,
+                   column_type AS data_type, column_comment AS column_comment
+            FROM information_schema.columns
+            WHERE table_schema = '{schema}'
+            ORDER BY table_name, ordinal_position
+        """,
+    },
+    "snowflake": {
+        "database": "database",
+        "schemas": """
+            SELECT schema_name AS schema_name FROM information_schema.schemata
+            WHERE schema_name <> 'INFORMATION_SCHEMA'
+            ORDER BY schema_name
+        """,
+        "tables": """
+            SELECT table_name AS table_name, comment AS table_comment
+            FROM information_schema.tables
+            WHERE table_schema = '{schema}'
+            ORDER BY table_name
+        """,
+        "columns": """
+            SELECT table_name AS table_name, column_name AS column_name,
+                   data_type AS data_type, comment AS column_comment
+            FROM information_schema.columns
+            WHERE table_schema = '{schema}'
+            ORDER BY table_name, ordinal_position
+        """,
+    },
+    "databricks": {
+        "database": "catalog",
+        "schemas": """
+            SELECT schema_name AS schema_name FROM information_schema.schemata
+            WHERE schema_name <> 'information_schema'
+            ORDER BY schema_name
+        """,
+        "tables": """
+            SELECT table_name AS table_name, comment AS table_comment
+            FROM information_schema.tables
+            WHERE table_schema = '{schema}'
+            ORDER BY table_name
+        """,
+        "columns": """
+            SELECT table_name AS table_name, column_name AS column_name,
+                   full_data_type AS data_type, comment AS column_comment
+            FROM information_schema.columns
+            WHERE table_schema = '{schema}'
+            ORDER BY table_name, ordinal_position
+        """,
+    },
+    "duckdb": {
+        "database": None,
+        "schemas": """
+            SELECT DISTINCT schema_name FROM duckdb_schemas()
+            WHERE NOT internal AND schema_name NOT IN ('information_schema', 'pg_catalog')
+            ORDER BY schema_name
+        """,
+        "tables": """
+            SELECT table_name, comment AS table_comment FROM duckdb_tables()
+            WHERE schema_name = '{schema}' AND NOT internal
+            UNION ALL
+            SELECT view_name AS table_name, comment AS table_comment FROM duckdb_views()
+            WHERE schema_name = '{schema}' AND NOT internal
+            ORDER BY table_name
+        """,
+        "columns": """
+            SELECT table_name, column_name, data_type, comment AS column_comment
+            FROM duckdb_columns()
+            WHERE schema_name = '{schema}' AND NOT internal
+            ORDER BY table_name, column_index
+        """,
+    },
+    "oracle": {
+        "database": None,
+        "schemas": """
+            SELECT username AS schema_name FROM all_users
+            WHERE oracle_maintained = 'N'
+            ORDER BY username
+        """,
+        "tables": """
+            SELECT t.table_name AS table_name, c.comments AS table_comment
+            FROM all_tables t
+            LEFT JOIN all_tab_comments c ON c.owner = t.owner AND c.table_name = t.table_name
+            WHERE t.owner = '{schema}'
+            ORDER BY t.table_name
+        """,
+        "columns": """
+            SELECT c.table_name AS table_name, c.column_name AS column_name,
+                   c.data_type AS data_type, m.comments AS column_comment
+            FROM all_tab_columns c
+            LEFT JOIN all_col_comments m
+              ON m.owner = c.owner AND m.table_name = c.table_name AND m.column_name = c.column_name
+            WHERE c.owner = '{schema}'
+            ORDER BY c.table_name, c.column_id
+        """,
+    },
+}
+CATALOG_QUERIES["mariadb"] = CATALOG_QUERIES["mysql"]
+
+
+def _literal(value: str) -> str:
+    return value.replace("'", "''")
+
+
+def _text(value: Any) -> str:
+    # NULL 코멘트는 pandas에서 None 또는 NaN으로 들어옴
+    if value is None or value != value:
+        return ""
+    return str(value).strip()
+
+
+def _run(connector, sql: str):
+    result = connector.run_sql(sql)
+    # Snowflake/Oracle은 따옴표 없는 별칭을 대문자로 반환
+    result.columns = [str(column).lower() for column in result.columns]
+    return result
+
+
+def list_db_schemas(connector, db_type: str) -> List[str]:
+    """시스템 스키마를 제외한 스키마 이름 목록을 반환합니다."""
+    result = _run(connector, CATALOG_QUERIES[db_type]["schemas"])
+    return [_text(name) for name in result["schema_name"]]
+
+
+def read_schema_documents(
+    connector, db_type: str, schema: str, database: Optional[str] = None
+) -> List[Document]:
+    """스키마 하나의 테이블 문서를 테이블 조회 1번과 컬럼 조회 1번으로 만듭니다."""
+    queries = CATALOG_QUERIES[db_type]
+    tables = _run(connector, queries["tables"].format(schema=_literal(schema)))
+    columns = _run(connector, queries["columns"].format(schema=_literal(schema)))
+
+    table_columns: Dict[str, List] = {_text(name): [] for name in tables["table_name"]}
+    for row in columns.itertuples(index=False):
+        specs = table_columns.get(_text(row.table_name))
+        if specs is not None:
+            specs.append(
+                (_text(row.column_name), _text(row.column_comment), _text(row.data_type) or None)
+            )
+
+    filters = {"schema": schema}
+    if database:
+        filters["database"] = database
+    documents = []
+    for row in tables.itertuples(index=False):
+        table = _text(row.table_name)
+        table_name = ".".join(part for part in (database, schema, table) if part)
+        documents.append(
+            build_table_document(
+                table_name, _text(row.table_comment), table_columns[table], **filters
+            )
+        )
+    return documents
+
+
+def load_db_catalog_documents(
+    db_type: Optional[str] = None,
+    config=None,
+    schemas: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+    connector_factory: Optional[Callable[[], Any]] = None,
+) -> List[Document]:
+    """
+    DB의 시스템 카탈로그에서 테이블 문서 목록을 만듭니다.
+
+    db_type/config는 db_utils.get_db_connector 인자이며(없으면 DB_TYPE과 접속 정보 환경 변수 사용),
+    schemas가 None이면 시스템 스키마를 제외한 모든 스키마를 읽습니다.
+    스키마는 max_workers개(기본값: DB_CATALOG_WORKERS 또는 4) 스레드에서 동시에 읽습니다.
+    connector_factory를 주면 get_db_connector 대신 사용합니다 (run_sql(sql) -> DataFrame인 객체).
+    """
+    db_type = (db_type or os.getenv("DB_TYPE") or "").lower()
+    if db_type not in CATALOG_QUERIES:
+        raise ValueError(
+            f"카탈로그를 읽을 수 없는 DB 종류입니다: {db_type or '(없음)'} "
+            f"(지원: {', '.join(sorted(CATALOG_QUERIES))})"
+        )
+    if connector_factory is None:
+        from db_utils import get_db_connector
+
+        connector_factory = lambda: get_db_connector(db_type, config)
+    if max_workers is None:
+        max_workers = int(os.getenv("DB_CATALOG_WORKERS", "4"))
+
+    local = threading.local()
+    connectors = []
+    connectors_lock = threading.Lock()
+
+    def connector():
+        # 커넥터(연결)는 스레드마다 하나씩 만들어 재사용
+        if getattr(local, "connector", None) is None:
+            local.connector = connector_factory()
+            with connectors_lock:
+                connectors.append(local.connector)
+        return local.connector
+
+    start = time.time()
+    try:
+        main = connector()
+        attribute = CATALOG_QUERIES[db_type]["database"]
+        database = getattr(main, attribute, None) if attribute else None
+        if schemas is None:
+            schemas = list_db_schemas(main, db_type)
+
+        def read(schema: str) -> List[Document]:
+            documents = read_schema_documents(connector(), db_type, schema, database)
+            print(f"📥 {schema}: 테이블 {len(documents)}개")
+            return documents
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(schemas) or 1))) as pool:
+            results = list(pool.map(read, schemas))
+    finally:
+        for opened in connectors:
+            close = getattr(opened, "close", None)
+            if close is not None:
+                close()
+
+    documents = [doc for result in results for doc in result]
+    print(
+        f"✅ {db_type} 카탈로그 읽기 완료: 스키마 {len(schemas)}개, 테이블 {len(documents)}개 "
+        f"({time.time() - start:.1f}초)"
+    )
+    return documents
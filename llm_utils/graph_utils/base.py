@@ -36,6 +36,8 @@ class QueryMakerState(TypedDict):
     retriever_name: str
     top_n: int
     device: str
+    column_top_k: int
+    table_filters: dict
 
 
 # 노드 함수: PROFILE_EXTRACTION 노드
@@ -126,6 +128,8 @@ def get_table_info_node(state: QueryMakerState):
         retriever_name=state["retriever_name"],
         top_n=state["top_n"],
         device=state["device"],
+        column_top_k=state.get("column_top_k"),
+        filters=state.get("table_filters"),
     )
     state["searched_tables"] = documents_dict
 
@@ -0,0 +1,128 @@
+"""
+어휘(BM25) + 벡터 하이브리드 검색기
+
+벡터 스토어에 저장된 테이블 문서로 BM25 역색인을 만들고,
+벡터 검색 결과와 Reciprocal Rank Fusion(RRF)으로 합칩니다.
+역색인은 벡터 스토어 인스턴스마다 한 번만 생성되어 메모리에 유지됩니다.
+"""
+
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain.schema import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+
+from llm_utils.lexical_index import BM25Index, reciprocal_rank_fusion
+from llm_utils.vectordb.documents import get_all_documents
+from llm_utils.vectordb.filters import FilterIndex, search_filter_kwargs
+
+_lexical_indexes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_lexical_filter_indexes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_lexical_lock = threading.Lock()
+
+
+def get_lexical_index(db) -> Tuple[BM25Index, List[Document]]:
+    """벡터 스토어 문서로 만든 BM25 색인과 문서 목록을 반환합니다."""
+    cached = _lexical_indexes.get(db)
+    if cached is not None:
+        return cached
+
+    with _lexical_lock:
+        cached = _lexical_indexes.get(db)
+        if cached is None:
+            documents = get_all_documents(db)
+            index = BM25Index.from_texts(
+                (position, doc.page_content) for position, doc in enumerate(documents)
+            )
+            cached = (index, documents)
+            _lexical_indexes[db] = cached
+            print(f"📚 BM25 역색인 생성 완료: {len(documents)}개 문서")
+        return cached
+
+
+def _lexical_filter_index(db, documents: List[Document]) -> FilterIndex:
+    """BM25 색인과 같은 문서 순서로 만든 필터 역색인을 반환합니다."""
+    cached = _lexical_filter_indexes.get(db)
+    if cached is None or cached.size != len(documents):
+        with _lexical_lock:
+            cached = FilterIndex(doc.metadata or {} for doc in documents)
+            _lexical_filter_indexes[db] = cached
+    return cached
+
+
+def hybrid_search(
+    db,
+    query: str,
+    k: int = 5,
+    fetch_k: int = 20,
+    rrf_k: int = 60,
+    dense: Optional[List[Tuple[Document, float]]] = None,
+    filters: Optional[Dict] = None,
+) -> List[Tuple[Document, float]]:
+    """
+    벡터 검색과 BM25 검색 결과를 RRF로 합쳐 상위 k개의 (문서, RRF 점수)를 반환합니다.
+
+    Args:
+        db: FAISS 또는 PGVector 스토어
+        query: 검색 질문
+        k: 반환할 문서 수
+        fetch_k: 각 검색기에서 가져올 후보 수
+        rrf_k: RRF 상수
+        dense: 미리 계산한 벡터 검색 결과. None이면 db에서 검색합니다.
+        filters: database/schema/tags/owners 조건. 벡터/BM25 검색 모두 조건에 맞는 문서만 대상으로 합니다.
+    """
+    fetch_k = max(fetch_k, k)
+    if dense is None:
+        dense = db.similarity_search_with_score(
+            query, k=fetch_k, **search_filter_kwargs(db, filters)
+        )
+    index, documents = get_lexical_index(db)
+    allowed = None
+    if filters:
+        positions = _lexical_filter_index(db, documents).positions(filters)
+        allowed = set(positions.tolist())
+    lexical = index.search(query, k=fetch_k, allowed=allowed)
+
+    # 같은 문서는 page_content로 식별
+    by_content = {doc.page_content: doc for doc, _ in dense}
+    for position, _ in lexical:
+        by_content.setdefault(documents[position].page_content, documents[position])
+
+    fused = reciprocal_rank_fusion(
+        [
+            [doc.page_content for doc, _ in dense],
+            [documents[position].page_content for position, _ in lexical],
+        ],
+        k=rrf_k,
+    )
+    return [(by_content[content], score) for content, score in fused[:k]]
+
+
+class HybridRetriever(BaseRetriever):
+    """hybrid_search를 LangChain 검색기 인터페이스로 제공합니다. 점수는 metadata["score"]에 담깁니다."""
+
+    vectorstore: Any
+    top_n: int = 5
+    fetch_k: int = 20
+    filters: Optional[Dict] = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        results = hybrid_search(
+            self.vectorstore,
+            query,
+            k=self.top_n,
+            fetch_k=self.fetch_k,
+            filters=self.filters,
+        )
+        return [
+            Document(
+                id=doc.id,
+                page_content=doc.page_content,
+                metadata={**doc.metadata, "score": score},
+            )
+            for doc, score in results
+        ]
@@ -0,0 +1,124 @@
+"""
+인메모리 BM25 역색인 모듈
+
+테이블명, 테이블 설명, 컬럼명/컬럼 설명 텍스트를 토큰화하여 역색인을 만들고,
+임베딩 호출 없이 질문과 어휘적으로 일치하는 테이블 문서를 찾습니다.
+
+토큰화 규칙:
+- 영문/숫자/밑줄 식별자(`ALL_KR_DISZ_CD_CON`, `acd_no_yy`)는 소문자로 바꿔 그대로 하나의 토큰으로 쓰고,
+  밑줄로 나눈 조각도 함께 토큰으로 추가합니다.
+- 한글 연속 구간은 문자 bigram으로 나눕니다 (`실손데이터` → 실손, 손데, 데이, 이터).
+  한 글자 구간은 unigram으로 씁니다.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Container, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+_IDENTIFIER_RE = re.compile(r"[A-Za-z0-9_]+")
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㆎ]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """한국어/식별자를 고려하여 텍스트를 BM25 토큰 목록으로 변환합니다."""
+    tokens = []
+    for match in _IDENTIFIER_RE.finditer(text):
+        word = match.group().lower().strip("_")
+        if not word:
+            continue
+        tokens.append(word)
+        parts = [p for p in word.split("_") if p]
+        if len(parts) > 1:
+            tokens.extend(parts)
+
+    for match in _HANGUL_RE.finditer(text):
+        word = match.group()
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class BM25Index:
+    """BM25(Okapi) 점수를 계산하는 인메모리 역색인"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[Hashable] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.avg_doc_length = 0.0
+
+    @classmethod
+    def from_texts(
+        cls, items: Iterable[Tuple[Hashable, str]], k1: float = 1.5, b: float = 0.75
+    ) -> "BM25Index":
+        """(doc_id, text) 목록으로 색인을 생성합니다."""
+        index = cls(k1=k1, b=b)
+        for doc_id, text in items:
+            index.add(doc_id, text)
+        return index
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        position = len(self.doc_ids)
+        counts = Counter(tokenize(text))
+        self.doc_ids.append(doc_id)
+        length = sum(counts.values())
+        self.doc_lengths.append(length)
+        for term, tf in counts.items():
+            self.postings[term].append((position, tf))
+        self.avg_doc_length += (length - self.avg_doc_length) / len(self.doc_ids)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.doc_ids)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(
+        self, query: str, k: int = 10, allowed: Optional[Container[Hashable]] = None
+    ) -> List[Tuple[Hashable, float]]:
+        """질문과 BM25 점수가 높은 상위 k개의 (doc_id, score)를 반환합니다. allowed가 있으면 그 doc_id만 대상으로 합니다."""
+        if not self.doc_ids:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        avg_length = self.avg_doc_length or 1.0
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for position, tf in postings:
+                if allowed is not None and self.doc_ids[position] not in allowed:
+                    continue
+                norm = 1.0 - self.b + self.b * self.doc_lengths[position] / avg_length
+                scores[position] += idf * tf * (self.k1 + 1.0) / (tf + self.k1 * norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.doc_ids[position], score) for position, score in ranked]
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]], k: int = 60
+) -> List[Tuple[Hashable, float]]:
+    """
+    여러 순위 목록을 Reciprocal Rank Fusion으로 합칩니다.
+
+    Args:
+        rankings: 각 검색기의 결과 키 목록 (순위 순서)
+        k: RRF 상수. 클수록 하위 순위의 영향이 커집니다.
+
+    Returns:
+        (키, RRF 점수) 목록. 점수 내림차순.
+    """
+    fused: Dict[Hashable, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            fused[key] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
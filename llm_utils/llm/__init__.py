@@ -7,12 +7,22 @@ from .factory import (
     get_llm_ollama,
     get_llm_huggingface,
     get_embeddings,
+    get_embedding_identity,
     get_embeddings_openai,
     get_embeddings_azure,
     get_embeddings_bedrock,
     get_embeddings_gemini,
     get_embeddings_ollama,
     get_embeddings_huggingface,
+    get_embeddings_local,
+)
+from .embedding_cache import CachedEmbeddings, embed_queries
+from .local_embeddings import LocalEmbeddings
+from .rate_limit import embed_with_retry
+from .concurrent_embeddings import (
+    ConcurrentEmbeddings,
+    embedding_build_stats,
+    with_build_concurrency,
 )
 
 __all__ = [
@@ -24,10 +34,19 @@ __all__ = [
     "get_llm_ollama",
     "get_llm_huggingface",
     "get_embeddings",
+    "get_embedding_identity",
     "get_embeddings_openai",
     "get_embeddings_azure",
     "get_embeddings_bedrock",
     "get_embeddings_gemini",
     "get_embeddings_ollama",
     "get_embeddings_huggingface",
+    "get_embeddings_local",
+    "LocalEmbeddings",
+    "CachedEmbeddings",
+    "embed_queries",
+    "embed_with_retry",
+    "ConcurrentEmbeddings",
+    "with_build_concurrency",
+    "embedding_build_stats",
 ]
@@ -0,0 +1,352 @@
+"""
+인덱스 빌드용 동시 임베딩 모듈
+
+LangChain 임베딩 클라이언트는 embed_documents를 순차적으로 호출하므로, 대량 빌드에서는 대부분의 시간을
+네트워크 대기로 보냅니다. ConcurrentEmbeddings는 문서를 batch_size개씩 나누어 여러 요청을 동시에 보내되
+공급자의 분당 요청 수(RPM)/토큰 수(TPM) 한도를 지키고, 요청 한도 초과(429)가 나면 동시 요청 수를 줄입니다.
+
+- RPM/TPM: 분당 한도만큼 채워지는 토큰 버킷으로 요청 전에 대기합니다.
+- 동시성: AIMD 방식. 성공이 이어지면 1씩 늘리고(최대 max_concurrency), 요청 한도 초과면 절반으로 줄이고
+  Retry-After(없으면 지수 백오프) 동안 모든 요청을 멈춥니다. 5xx/연결 오류는 해당 요청만 재시도합니다.
+- 진행률, 처리량(docs/s, tokens/s), 예상 비용을 출력합니다. 토큰 수는 UTF-8 바이트 수 / 3으로 추정합니다.
+
+임베딩 캐시(CachedEmbeddings)를 쓰는 경우 캐시 아래에 끼워 넣어 캐시에 없는 문서만 한도를 사용합니다.
+프로세스 내 로컬 모델(LocalEmbeddings)은 자체 배치를 사용하므로 감싸지 않습니다.
+
+환경 변수 (EMBEDDING_PROVIDER에 설정한 공급자의 한도):
+    EMBEDDING_CONCURRENCY: 최대 동시 요청 수 (기본값: 4)
+    EMBEDDING_BATCH_SIZE: 요청 하나에 담을 문서 수 (기본값: 64)
+    EMBEDDING_RPM: 분당 요청 수 한도 (기본값: 제한 없음)
+    EMBEDDING_TPM: 분당 토큰 수 한도 (기본값: 제한 없음)
+    EMBEDDING_COST_PER_1M_TOKENS: 100만 토큰당 비용(USD), 예상 비용 계산용 (기본값: 알려진 모델만)
+    EMBEDDING_MAX_RETRIES / EMBEDDING_RETRY_BASE_DELAY / EMBEDDING_RETRY_MAX_DELAY: rate_limit.py 참고
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from llm_utils.llm.embedding_cache import CachedEmbeddings, embed_queries
+from llm_utils.llm.local_embeddings import LocalEmbeddings
+from llm_utils.llm.rate_limit import embed_with_retry, is_rate_limit_error
+
+# 100만 토큰당 비용(USD). 모델 이름에 키가 포함되면 사용합니다.
+EMBEDDING_PRICES_PER_1M_TOKENS = {
+    "text-embedding-3-small": 0.02,
+    "text-embedding-3-large": 0.13,
+    "text-embedding-ada-002": 0.10,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수를 넉넉하게 추정합니다 (영문 약 3자, 한글 약 1자당 1토큰)."""
+    return max(1, len(text.encode("utf-8")) // 3)
+
+
+def _env_number(name: str, cast=float):
+    value = os.getenv(name)
+    return cast(value) if value not in (None, "") else None
+
+
+class RateLimiter:
+    """분당 요청 수/토큰 수 한도를 지키는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = rpm or 0.0
+        self._tokens = tpm or 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: int) -> None:
+        """요청 1회와 tokens개 토큰을 쓸 수 있을 때까지 기다립니다."""
+        # 한 요청이 TPM 전체보다 크면 버킷이 가득 찰 때까지만 기다림
+        tokens = min(tokens, self.tpm) if self.tpm else tokens
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait == 0.0:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= tokens
+                    return
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """요청 한도 초과 여부에 따라 동시 요청 수를 조절하는 세마포어 (AIMD)"""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self._active = 0
+        self._successes = 0
+        self._epoch = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> int:
+        """요청 슬롯을 얻고, 요청 시작 시점의 epoch를 반환합니다."""
+        with self._cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self._active >= self.limit:
+                    self._cond.wait()
+                else:
+                    self._active += 1
+                    return self._epoch
+
+    def release(self) -> None:
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_concurrency:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def on_throttle(self, epoch: int, delay: float) -> bool:
+        """
+        요청 한도 초과 시 동시성을 절반으로 줄이고 delay초 동안 모든 요청을 멈춥니다.
+
+        같은 시점에 출발한 요청들이 한꺼번에 실패해도 한 번만 줄이도록 epoch가 같을 때만 줄입니다.
+        """
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            if epoch != self._epoch:
+                return False
+            self._epoch += 1
+            self._successes = 0
+            self.limit = max(1, self.limit // 2)
+            return True
+
+
+class _LimitedBatch:
+    """요청마다 동시 요청 슬롯과 RPM/TPM 한도를 얻고 embed_documents를 호출합니다 (embed_with_retry용)"""
+
+    def __init__(self, owner: "ConcurrentEmbeddings", tokens: int):
+        self.owner = owner
+        self.tokens = tokens
+        self.epoch = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        concurrency = self.owner.concurrency
+        self.epoch = concurrency.acquire()
+        try:
+            self.owner.limiter.acquire(self.tokens)
+            vectors = self.owner.embeddings.embed_documents(texts)
+            concurrency.on_success()
+            return vectors
+        finally:
+            concurrency.release()
+
+
+class ConcurrentEmbeddings(Embeddings):
+    """embed_documents를 batch_size개씩 나누어 RPM/TPM 한도 안에서 동시에 호출하는 임베딩 래퍼"""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_concurrency: int = 4,
+        batch_size: int = 64,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        cost_per_1m_tokens: Optional[float] = None,
+        max_retries: int = 8,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        report_interval: float = 10.0,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.cost_per_1m_tokens = cost_per_1m_tokens
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.report_interval = report_interval
+        self.limiter = RateLimiter(rpm, tpm)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self._lock = threading.Lock()
+        self._stats = {"documents": 0, "tokens": 0, "requests": 0, "throttled": 0, "seconds": 0.0}
+
+    def _embed_batch(self, texts: List[str], progress: Dict) -> List[List[float]]:
+        batch = _LimitedBatch(self, sum(estimate_tokens(text) for text in texts))
+
+        def on_retry(e: BaseException, delay: float) -> float:
+            # 5xx/연결 오류는 이 요청만 백오프, 요청 한도 초과면 모든 요청을 멈춤
+            if not is_rate_limit_error(e):
+                return delay
+            with self._lock:
+                self._stats["throttled"] += 1
+            if self.concurrency.on_throttle(batch.epoch, delay):
+                print(
+                    f"⏳ 임베딩 요청 한도 초과: 동시 요청 {self.concurrency.limit}개로 줄이고 "
+                    f"{delay:.1f}초 대기"
+                )
+            return 0.0  # 대기는 acquire에서 모든 요청이 함께 함
+
+        vectors = embed_with_retry(
+            batch, texts, self.max_retries, self.base_delay, self.max_delay, on_retry=on_retry
+        )
+        self._record(len(texts), batch.tokens, progress)
+        return vectors
+
+    def _record(self, n_docs: int, tokens: int, progress: Dict) -> None:
+        with self._lock:
+            self._stats["documents"] += n_docs
+            self._stats["tokens"] += tokens
+            self._stats["requests"] += 1
+            progress["documents"] += n_docs
+            progress["tokens"] += tokens
+            now = time.monotonic()
+            if now - progress["reported"] < self.report_interval:
+                return
+            progress["reported"] = now
+            print(f"  🚀 {self._format(progress, now)}")
+
+    def _format(self, progress: Dict, now: float) -> str:
+        elapsed = max(now - progress["start"], 1e-9)
+        line = (
+            f"임베딩 {progress['documents']}/{progress['total']} "
+            f"({progress['documents'] / elapsed:.1f} docs/s, "
+            f"{progress['tokens'] / elapsed:.0f} tokens/s, 동시 요청 {self.concurrency.limit}개"
+        )
+        cost = self.estimated_cost(progress["tokens"])
+        if cost is not None:
+            line += f", 예상 비용 ${cost:.4f}"
+        return line + ")"
+
+    def estimated_cost(self, tokens: int) -> Optional[float]:
+        if self.cost_per_1m_tokens is None:
+            return None
+        return tokens * self.cost_per_1m_tokens / 1_000_000
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = list(texts)
+        batches = [
+            texts[start : start + self.batch_size]
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        start = time.monotonic()
+        progress = {"total": len(texts), "documents": 0, "tokens": 0, "start": start, "reported": start}
+        if len(batches) <= 1:
+            vectors = [v for batch in batches for v in self._embed_batch(batch, progress)]
+        else:
+            workers = min(self.concurrency.max_concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(
+                    executor.map(lambda batch: self._embed_batch(batch, progress), batches)
+                )
+            vectors = [v for batch_vectors in results for v in batch_vectors]
+            print(f"✅ {self._format(progress, time.monotonic())}")
+        with self._lock:
+            self._stats["seconds"] += time.monotonic() - start
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return embed_queries(self.embeddings, texts)
+
+    def stats(self) -> Dict[str, float]:
+        """지금까지의 누적 문서 수, 추정 토큰 수, 요청 수, 한도 초과 횟수, 처리량, 예상 비용"""
+        with self._lock:
+            stats = dict(self._stats)
+        seconds = max(stats["seconds"], 1e-9)
+        stats["docs_per_second"] = stats["documents"] / seconds
+        stats["tokens_per_second"] = stats["tokens"] / seconds
+        stats["estimated_cost"] = self.estimated_cost(stats["tokens"])
+        return stats
+
+
+def default_cost_per_1m_tokens(model: Optional[str]) -> Optional[float]:
+    """EMBEDDING_COST_PER_1M_TOKENS, 없으면 알려진 모델의 가격을 반환합니다."""
+    cost = _env_number("EMBEDDING_COST_PER_1M_TOKENS")
+    if cost is not None or not model:
+        return cost
+    for name, price in EMBEDDING_PRICES_PER_1M_TOKENS.items():
+        if name in model:
+            return price
+    return None
+
+
+def with_build_concurrency(
+    embeddings: Embeddings,
+    max_concurrency: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    model: Optional[str] = None,
+) -> Embeddings:
+    """
+    인덱스 빌드용으로 임베딩을 ConcurrentEmbeddings로 감쌉니다. 인자가 None이면 환경 변수를 사용합니다.
+
+    CachedEmbeddings면 캐시 아래의 공급자 클라이언트를 감싼 새 캐시 래퍼를 반환하며(저장소는 공유),
+    이미 감싸져 있거나 로컬 모델이면 그대로 반환합니다.
+    """
+    if isinstance(embeddings, CachedEmbeddings):
+        inner = with_build_concurrency(
+            embeddings.embeddings, max_concurrency, batch_size, rpm, tpm, model or embeddings.model
+        )
+        if inner is embeddings.embeddings:
+            return embeddings
+        return CachedEmbeddings(
+            inner,
+            provider=embeddings.provider,
+            model=embeddings.model,
+            cache_size=embeddings.cache_size,
+            store=embeddings.store,
+        )
+    if isinstance(embeddings, (ConcurrentEmbeddings, LocalEmbeddings)):
+        return embeddings
+
+    if max_concurrency is None:
+        max_concurrency = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+    if batch_size is None:
+        batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    return ConcurrentEmbeddings(
+        embeddings,
+        max_concurrency=max_concurrency,
+        batch_size=batch_size,
+        rpm=rpm if rpm is not None else _env_number("EMBEDDING_RPM"),
+        tpm=tpm if tpm is not None else _env_number("EMBEDDING_TPM"),
+        cost_per_1m_tokens=default_cost_per_1m_tokens(model or getattr(embeddings, "model", None)),
+        max_retries=int(os.getenv("EMBEDDING_MAX_RETRIES", "8")),
+        base_delay=float(os.getenv("EMBEDDING_RETRY_BASE_DELAY", "1")),
+        max_delay=float(os.getenv("EMBEDDING_RETRY_MAX_DELAY", "60")),
+    )
+
+
+def embedding_build_stats(embeddings: Embeddings) -> Optional[Dict[str, float]]:
+    """with_build_concurrency로 감싼 임베딩의 누적 통계를 반환합니다. 감싸지 않았으면 None."""
+    if isinstance(embeddings, CachedEmbeddings):
+        embeddings = embeddings.embeddings
+    if isinstance(embeddings, ConcurrentEmbeddings):
+        return embeddings.stats()
+    return None
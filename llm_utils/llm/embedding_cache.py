@@ -0,0 +1,242 @@
+"""
+임베딩 캐시 모듈
+
+(공급자, 모델, 정규화된 텍스트 해시) 키로 임베딩 벡터를 캐시합니다.
+- 메모리 LRU: 같은 프로세스에서 하나의 요청을 처리하는 모든 소비자가 같은 벡터를 재사용
+- 디스크(SQLite): Streamlit 워커와 CLI 등 여러 프로세스가 공유
+
+환경 변수:
+    EMBEDDING_CACHE: "on"(기본값, 메모리+디스크), "memory"(메모리만), "off"(캐시 비활성화)
+    EMBEDDING_CACHE_PATH: SQLite 파일 경로 (기본값: ~/.cache/lang2sql/embeddings.sqlite3)
+    EMBEDDING_CACHE_SIZE: 메모리 LRU 항목 수 (기본값: 2048)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def default_cache_path() -> str:
+    return os.path.join(
+        os.path.expanduser("~"), ".cache", "lang2sql", "embeddings.sqlite3"
+    )
+
+
+# embed_query가 embed_documents([text])[0]과 같은(질의 전용 지시문/접두어가 없는) 공급자 클라이언트.
+# 클래스 이름으로 확인하므로 설치하지 않은 공급자 패키지를 import하지 않습니다.
+SYMMETRIC_QUERY_EMBEDDINGS = (
+    "OpenAIEmbeddings",
+    "AzureOpenAIEmbeddings",
+    "OllamaEmbeddings",
+    "HuggingFaceEndpointEmbeddings",
+)
+
+
+def _class_names(embeddings: Embeddings) -> set:
+    return {cls.__name__ for cls in type(embeddings).__mro__}
+
+
+def embed_queries(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """
+    여러 질문을 질의(query) 임베딩으로 계산합니다.
+
+    embed_documents는 문서용 접두어(e5의 "passage: " 등)와 문서 캐시를 쓰므로 그대로 쓰지 않습니다.
+    - embed_queries를 지원하는 임베딩(로컬 모델, 캐시): 한 번에 계산
+    - 질의를 문서와 똑같이 임베딩하는 공급자(OpenAI, Azure, Ollama, HF Endpoint): embed_documents 한 번 호출
+    - Gemini: task_type=RETRIEVAL_QUERY로 embed_documents 한 번 호출
+    - 그 외(Bedrock Cohere처럼 질의를 다르게 다루는 공급자): embed_query 반복
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    batch_fn = getattr(embeddings, "embed_queries", None)
+    if batch_fn is not None:
+        return batch_fn(texts)
+    names = _class_names(embeddings)
+    if names.intersection(SYMMETRIC_QUERY_EMBEDDINGS):
+        return embeddings.embed_documents(texts)
+    if "GoogleGenerativeAIEmbeddings" in names:
+        task_type = getattr(embeddings, "task_type", None) or "RETRIEVAL_QUERY"
+        return embeddings.embed_documents(texts, task_type=task_type)
+    return [embeddings.embed_query(text) for text in texts]
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 계산을 위해 유니코드 정규화(NFC) 후 연속 공백을 하나로 합칩니다."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class SQLiteEmbeddingStore:
+    """여러 프로세스가 공유하는 SQLite 임베딩 저장소"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> dict:
+        if not keys:
+            return {}
+        found = {}
+        with self._lock:
+            # SQLite 바인딩 변수 개수 제한을 피하기 위해 나눠서 조회
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, items: dict) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in items.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(path: Optional[str] = None) -> SQLiteEmbeddingStore:
+    """경로별로 하나의 SQLite 저장소 인스턴스를 공유합니다."""
+    path = os.path.abspath(path or default_cache_path())
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SQLiteEmbeddingStore(path)
+        return store
+
+
+class CachedEmbeddings(Embeddings):
+    """메모리 LRU와 선택적 디스크 계층을 갖춘 임베딩 래퍼"""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        provider: str,
+        model: str,
+        cache_size: int = 2048,
+        store: Optional[SQLiteEmbeddingStore] = None,
+    ):
+        self.embeddings = embeddings
+        self.provider = provider
+        self.model = model
+        self.cache_size = cache_size
+        self.store = store
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, kind: str, text: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{self.provider}:{self.model}:{kind}:{digest}"
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.cache_size:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, keys: List[str]) -> dict:
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+
+        if self.store is not None:
+            missing = [key for key in keys if key not in found]
+            from_disk = self.store.get_many(missing)
+            for key, vector in from_disk.items():
+                self._remember(key, vector)
+            found.update(from_disk)
+        return found
+
+    def _embed(self, kind: str, texts: List[str], embed_fn) -> List[List[float]]:
+        keys = [self._key(kind, text) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+
+        # 캐시에 없는 텍스트만 (중복 제거 후) 한 번에 임베딩
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = embed_fn(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            for key, vector in computed.items():
+                self._remember(key, vector)
+            if self.store is not None:
+                self.store.put_many(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("document", texts, self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(
+            "query", [text], lambda t: [self.embeddings.embed_query(t[0])]
+        )[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 질문을 embed_query와 같은 캐시 항목으로 조회하고, 없는 질문만 한 번에 임베딩합니다."""
+        return self._embed(
+            "query", list(texts), lambda t: embed_queries(self.embeddings, t)
+        )
+
+
+def wrap_with_cache(embeddings: Embeddings, provider: str, model: str) -> Embeddings:
+    """EMBEDDING_CACHE 설정에 따라 임베딩 클라이언트를 캐시로 감쌉니다."""
+    mode = os.getenv("EMBEDDING_CACHE", "on").lower()
+    if mode == "off":
+        return embeddings
+
+    store = None
+    if mode != "memory":
+        try:
+            store = get_embedding_store(os.getenv("EMBEDDING_CACHE_PATH"))
+        except sqlite3.Error as e:
+            print(f"임베딩 디스크 캐시를 열 수 없어 메모리 캐시만 사용합니다: {e}")
+
+    return CachedEmbeddings(
+        embeddings,
+        provider=provider,
+        model=model,
+        cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "2048")),
+        store=store,
+    )
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Optional, Tuple
 
 from langchain.llms.base import BaseLanguageModel
 from langchain_aws import ChatBedrockConverse, BedrockEmbeddings
@@ -17,6 +17,9 @@ from langchain_openai import (
     OpenAIEmbeddings,
 )
 
+from llm_utils.llm.embedding_cache import wrap_with_cache
+from llm_utils.llm.local_embeddings import get_local_embeddings, local_embedding_model_id
+
 
 def get_llm(**kwargs) -> BaseLanguageModel:
     """
@@ -105,16 +108,49 @@ def get_llm_huggingface(**kwargs) -> BaseLanguageModel:
     )
 
 
+# 임베딩 공급자별 모델 이름을 담고 있는 환경 변수
+EMBEDDING_MODEL_ENV_VARS = {
+    "openai": "OPEN_AI_EMBEDDING_MODEL",
+    "azure": "AZURE_OPENAI_EMBEDDING_MODEL",
+    "bedrock": "AWS_BEDROCK_EMBEDDING_MODEL",
+    "gemini": "GEMINI_EMBEDDING_MODEL",
+    "ollama": "OLLAMA_EMBEDDING_MODEL",
+    "huggingface": "HUGGING_FACE_EMBEDDING_MODEL",
+    "local": "LOCAL_EMBEDDING_MODEL",
+}
+
+
+def get_embedding_identity() -> Tuple[str, str]:
+    """
+    현재 환경 변수 기준 (임베딩 공급자, 모델 이름)을 반환합니다.
+
+    임베딩 클라이언트나 벡터 스토어를 캐시할 때 키로 사용합니다.
+    """
+    provider = os.getenv("EMBEDDING_PROVIDER")
+    if provider is None:
+        raise ValueError("EMBEDDING_PROVIDER environment variable is not set.")
+
+    if provider == "local":
+        return provider, local_embedding_model_id()
+
+    model_env = EMBEDDING_MODEL_ENV_VARS.get(provider)
+    model = os.getenv(model_env, "") if model_env else ""
+    return provider, model
+
+
 def get_embeddings() -> Optional[BaseLanguageModel]:
     """
     return embedding model interface
+
+    EMBEDDING_CACHE 설정에 따라 메모리/디스크 임베딩 캐시로 감싸서 반환합니다.
     """
-    provider = os.getenv("EMBEDDING_PROVIDER")
+    provider, model = get_embedding_identity()
     print(provider)
 
-    if provider is None:
-        raise ValueError("EMBEDDING_PROVIDER environment variable is not set.")
+    return wrap_with_cache(_get_provider_embeddings(provider), provider, model)
+
 
+def _get_provider_embeddings(provider: str) -> BaseLanguageModel:
     if provider == "openai":
         return get_embeddings_openai()
 
@@ -130,6 +166,12 @@ def get_embeddings() -> Optional[BaseLanguageModel]:
     elif provider == "ollama":
         return get_embeddings_ollama()
 
+    elif provider == "huggingface":
+        return get_embeddings_huggingface()
+
+    elif provider == "local":
+        return get_embeddings_local()
+
     else:
         raise ValueError(f"Invalid Embedding API Provider: {provider}")
 
@@ -179,3 +221,7 @@ def get_embeddings_huggingface() -> BaseLanguageModel:
         repo_id=os.getenv("HUGGING_FACE_EMBEDDING_REPO_ID"),
         huggingfacehub_api_token=os.getenv("HUGGING_FACE_EMBEDDING_API_TOKEN"),
     )
+
+
+def get_embeddings_local() -> BaseLanguageModel:
+    return get_local_embeddings()
@@ -0,0 +1,272 @@
+"""
+로컬 CPU 문장 임베딩 모듈 (EMBEDDING_PROVIDER=local)
+
+네트워크 호출 없이 프로세스 안에서 sentence-embedding 모델을 실행합니다.
+모델은 프로세스당 한 번만 로드되며, 문서는 배치 단위로 임베딩하고
+여러 스레드에서 동시에 들어온 질의는 짧은 대기 시간 동안 모아 한 번에 임베딩합니다.
+모델 이름 대신 로컬 디렉토리 경로를 지정하면 인터넷 연결 없이(air-gapped) 사용할 수 있습니다.
+
+환경 변수:
+    LOCAL_EMBEDDING_MODEL: sentence-transformers 호환 모델 이름 또는 로컬 경로
+        (기본값: intfloat/multilingual-e5-small)
+    LOCAL_EMBEDDING_BACKEND: "torch"(기본값, sentence-transformers) 또는
+        "onnx" (ONNX Runtime + int8 동적 양자화, CPU 전용)
+    LOCAL_EMBEDDING_DEVICE: torch 백엔드 장치 (기본값: cpu)
+    LOCAL_EMBEDDING_BATCH_SIZE: 한 번에 임베딩할 문장 수 (기본값: 32)
+    LOCAL_EMBEDDING_THREADS: 추론 스레드 수 (기본값: 프레임워크 기본값)
+    LOCAL_EMBEDDING_BATCH_WAIT_MS: 동시 질의를 모으는 최대 대기 시간 (기본값: 2, 0이면 묶지 않음)
+    LOCAL_EMBEDDING_QUERY_PREFIX / LOCAL_EMBEDDING_DOCUMENT_PREFIX:
+        질의/문서 앞에 붙일 문자열 (e5 계열 모델은 기본값 "query: " / "passage: ")
+    LOCAL_EMBEDDING_CACHE_DIR: ONNX 변환 모델 저장 위치 (기본값: ~/.cache/lang2sql/embeddings)
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_LOCAL_EMBEDDING_MODEL = "intfloat/multilingual-e5-small"
+
+
+def _local_settings() -> Tuple[str, str, str]:
+    model_name = os.getenv("LOCAL_EMBEDDING_MODEL") or DEFAULT_LOCAL_EMBEDDING_MODEL
+    backend = os.getenv("LOCAL_EMBEDDING_BACKEND", "torch").lower()
+    # ONNX int8 모드는 CPU 추론 전용
+    device = "cpu" if backend == "onnx" else os.getenv("LOCAL_EMBEDDING_DEVICE", "cpu")
+    return model_name, backend, device
+
+
+def local_embedding_model_id() -> str:
+    """임베딩 캐시/인덱스 구분에 사용할 로컬 모델 식별자. int8 양자화는 벡터가 달라지므로 구분합니다."""
+    model_name, backend, _ = _local_settings()
+    return f"{model_name}@onnx-int8" if backend == "onnx" else model_name
+
+
+def _default_prefixes(model_name: str) -> Tuple[str, str]:
+    if "e5" in os.path.basename(model_name.rstrip("/")).lower():
+        return "query: ", "passage: "
+    return "", ""
+
+
+def _set_torch_threads(threads: Optional[int]) -> None:
+    if threads:
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+class _SentenceTransformerEncoder:
+    """sentence-transformers로 임베딩합니다."""
+
+    def __init__(self, model_name: str, device: str, threads: Optional[int]):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as exc:
+            raise ImportError(
+                "로컬 임베딩을 사용하려면 'pip install sentence-transformers'를 실행하세요."
+            ) from exc
+
+        _set_torch_threads(threads)
+        print(f"🔄 로컬 임베딩 모델 로드 중: {model_name}")
+        self.model = SentenceTransformer(model_name, device=device)
+
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+
+
+class _OnnxEncoder:
+    """ONNX Runtime으로 int8 양자화된 임베딩 모델을 실행합니다 (CPU 전용, mean pooling)."""
+
+    def __init__(self, model_name: str, threads: Optional[int]):
+        try:
+            import onnxruntime
+            from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            from transformers import AutoTokenizer
+        except ImportError as exc:
+            raise ImportError(
+                "ONNX 로컬 임베딩을 사용하려면 'pip install optimum[onnxruntime]'를 실행하세요."
+            ) from exc
+
+        cache_dir = os.getenv(
+            "LOCAL_EMBEDDING_CACHE_DIR",
+            os.path.join(os.path.expanduser("~"), ".cache", "lang2sql", "embeddings"),
+        )
+        onnx_path = os.path.join(
+            cache_dir, model_name.strip("/").replace("/", "__") + "_onnx_int8"
+        )
+        if not os.path.isdir(onnx_path):
+            print(f"⚙️ 로컬 임베딩 모델을 ONNX int8로 변환 중: {model_name}")
+            ort_model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name, export=True
+            )
+            quantizer = ORTQuantizer.from_pretrained(ort_model)
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=onnx_path, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(onnx_path)
+
+        session_options = onnxruntime.SessionOptions()
+        if threads:
+            session_options.intra_op_num_threads = threads
+        print(f"🔄 로컬 임베딩 모델(ONNX int8) 로드 중: {onnx_path}")
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            onnx_path, file_name="model_quantized.onnx", session_options=session_options
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_path)
+
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start : start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=512,
+                return_tensors="np",
+            )
+            hidden = np.asarray(self.model(**inputs).last_hidden_state)
+            mask = inputs["attention_mask"][..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            vectors.append(
+                pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            )
+        return np.concatenate(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+
+class _QueryBatcher:
+    """여러 스레드에서 동시에 들어온 질의를 모아 한 번의 모델 호출로 임베딩합니다."""
+
+    def __init__(self, encode, batch_size: int, wait_seconds: float):
+        self._encode = encode
+        self._batch_size = batch_size
+        self._wait_seconds = wait_seconds
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> List[float]:
+        future: Future = Future()
+        self._queue.put((text, future))
+        self._ensure_worker()
+        return future.result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="local-embedding-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._wait_seconds
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                vectors = self._encode([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), vector in zip(batch, vectors):
+                    future.set_result(vector)
+
+
+class LocalEmbeddings(Embeddings):
+    """프로세스 내 CPU 임베딩 모델을 LangChain Embeddings 인터페이스로 제공합니다."""
+
+    def __init__(
+        self,
+        encoder,
+        batch_size: int = 32,
+        batch_wait_ms: float = 2.0,
+        query_prefix: str = "",
+        document_prefix: str = "",
+    ):
+        self.encoder = encoder
+        self.batch_size = batch_size
+        self.query_prefix = query_prefix
+        self.document_prefix = document_prefix
+        self._batcher = (
+            _QueryBatcher(self._encode, batch_size, batch_wait_ms / 1000)
+            if batch_wait_ms > 0
+            else None
+        )
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors = self.encoder.encode(texts, batch_size=self.batch_size)
+        return np.asarray(vectors, dtype=np.float32).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode([self.document_prefix + text for text in texts])
+
+    def embed_query(self, text: str) -> List[float]:
+        text = self.query_prefix + text
+        if self._batcher is None:
+            return self._encode([text])[0]
+        return self._batcher.submit(text)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 질문을 질의 접두어로 한 번의 모델 호출에 임베딩합니다."""
+        return self._encode([self.query_prefix + text for text in texts])
+
+
+_local_embeddings_pool: Dict[Tuple[str, str, str], LocalEmbeddings] = {}
+_local_embeddings_pool_lock = threading.Lock()
+
+
+def get_local_embeddings() -> LocalEmbeddings:
+    """프로세스 내에서 공유되는 로컬 임베딩 모델을 반환합니다. 최초 호출 시에만 로드합니다."""
+    key = _local_settings()
+    embeddings = _local_embeddings_pool.get(key)
+    if embeddings is not None:
+        return embeddings
+
+    with _local_embeddings_pool_lock:
+        embeddings = _local_embeddings_pool.get(key)
+        if embeddings is None:
+            model_name, backend, device = key
+            threads = int(os.getenv("LOCAL_EMBEDDING_THREADS", "0")) or None
+            if backend == "onnx":
+                encoder = _OnnxEncoder(model_name, threads)
+            elif backend == "torch":
+                encoder = _SentenceTransformerEncoder(model_name, device, threads)
+            else:
+                raise ValueError(f"지원하지 않는 로컬 임베딩 backend: {backend}")
+
+            query_prefix, document_prefix = _default_prefixes(model_name)
+            embeddings = LocalEmbeddings(
+                encoder,
+                batch_size=int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32")),
+                batch_wait_ms=float(os.getenv("LOCAL_EMBEDDING_BATCH_WAIT_MS", "2")),
+                query_prefix=os.getenv("LOCAL_EMBEDDING_QUERY_PREFIX", query_prefix),
+                document_prefix=os.getenv(
+                    "LOCAL_EMBEDDING_DOCUMENT_PREFIX", document_prefix
+                ),
+            )
+            _local_embeddings_pool[key] = embeddings
+        return embeddings
@@ -0,0 +1,111 @@
+"""
+임베딩 API 재시도 모듈
+
+대량 인덱스 빌드 중 공급자가 429(rate limit)나 일시적인 5xx/연결 오류를 반환하면
+지수 백오프(+jitter)로 다시 시도합니다. 응답에 Retry-After 헤더가 있으면 그 시간만큼 기다립니다.
+
+환경 변수:
+    EMBEDDING_MAX_RETRIES: 최대 재시도 횟수 (기본값: 8)
+    EMBEDDING_RETRY_BASE_DELAY: 첫 재시도 대기 시간(초), 이후 2배씩 증가 (기본값: 1)
+    EMBEDDING_RETRY_MAX_DELAY: 재시도 대기 시간 상한(초) (기본값: 60)
+"""
+
+import os
+import random
+import time
+from typing import Callable, List, Optional, Sequence
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for source in (exc, getattr(exc, "response", None)):
+        for attr in ("status_code", "status", "http_status"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+    # botocore ClientError
+    response = getattr(exc, "response", None)
+    if isinstance(response, dict):
+        return response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """공급자의 요청 한도 초과(429/throttling) 오류인지 확인합니다."""
+    if _status_code(exc) == 429:
+        return True
+    name = type(exc).__name__.lower()
+    message = str(exc).lower()
+    return (
+        "ratelimit" in name
+        or "throttl" in name
+        or "rate limit" in message
+        or "throttl" in message
+        or "too many requests" in message
+    )
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """다시 시도할 만한 오류(429, 5xx, 타임아웃/연결 오류)인지 확인합니다."""
+    if is_rate_limit_error(exc) or _status_code(exc) in _RETRYABLE_STATUS:
+        return True
+    name = type(exc).__name__.lower()
+    return isinstance(exc, (TimeoutError, ConnectionError)) or "timeout" in name or "connection" in name
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """응답의 Retry-After 헤더(초)를 반환합니다. 없으면 None."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """attempt번째 재시도 대기 시간. 2배씩 늘리고 절반~전체 구간에서 무작위로 고릅니다."""
+    delay = min(max_delay, base_delay * (2 ** attempt))
+    return random.uniform(delay / 2, delay)
+
+
+def embed_with_retry(
+    embeddings,
+    texts: Sequence[str],
+    max_retries: Optional[int] = None,
+    base_delay: Optional[float] = None,
+    max_delay: Optional[float] = None,
+    on_retry: Optional[Callable[[BaseException, float], float]] = None,
+) -> List[List[float]]:
+    """
+    embed_documents를 호출하고, 재시도 가능한 오류면 백오프 후 다시 시도합니다.
+
+    on_retry(오류, 대기 시간)를 주면 재시도 안내를 출력하는 대신 호출하고, 반환한 시간(초)만큼 기다립니다.
+    """
+    if max_retries is None:
+        max_retries = int(os.getenv("EMBEDDING_MAX_RETRIES", "8"))
+    if base_delay is None:
+        base_delay = float(os.getenv("EMBEDDING_RETRY_BASE_DELAY", "1"))
+    if max_delay is None:
+        max_delay = float(os.getenv("EMBEDDING_RETRY_MAX_DELAY", "60"))
+
+    attempt = 0
+    while True:
+        try:
+            return embeddings.embed_documents(list(texts))
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable_error(e):
+                raise
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = backoff_delay(attempt, base_delay, max_delay)
+            if on_retry is not None:
+                delay = on_retry(e, delay)
+            else:
+                kind = "요청 한도 초과" if is_rate_limit_error(e) else type(e).__name__
+                print(f"⏳ 임베딩 {kind}, {delay:.1f}초 후 재시도 ({attempt + 1}/{max_retries})")
+            time.sleep(delay)
+            attempt += 1
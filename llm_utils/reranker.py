@@ -0,0 +1,202 @@
+"""
+한국어 Cross-Encoder reranker 모듈
+
+모델은 프로세스당 한 번만 로드되어 재사용되며, (query, doc) 쌍을 배치 단위로 점수화합니다.
+최근 계산한 쌍의 점수는 제한된 크기의 LRU 캐시에 보관합니다.
+
+환경 변수:
+    RERANKER_BACKEND: "torch"(기본값) 또는 "onnx" (ONNX Runtime + int8 동적 양자화, CPU 전용)
+    RERANKER_BATCH_SIZE: 한 번에 점수화할 쌍의 수 (기본값: 32)
+    RERANKER_CACHE_SIZE: 쌍 점수 LRU 캐시 크기 (기본값: 4096, 0이면 비활성화)
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_community.cross_encoders import HuggingFaceCrossEncoder
+from langchain_community.cross_encoders.base import BaseCrossEncoder
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+RERANKER_MODEL_NAME = "Dongjin-kr/ko-reranker"
+
+
+def _local_model_path() -> str:
+    return os.path.join(os.getcwd(), "ko_reranker_local")
+
+
+def _ensure_local_model() -> str:
+    """로컬에 저장된 reranker 모델 경로를 반환합니다. 없으면 다운로드 후 저장합니다."""
+    local_model_path = _local_model_path()
+
+    # 로컬에 저장된 모델이 있으면 불러오고, 없으면 다운로드 후 저장
+    if os.path.exists(local_model_path) and os.path.isdir(local_model_path):
+        print("🔄 ko-reranker 모델 로컬에서 로드 중...")
+    else:
+        print("⬇️ ko-reranker 모델 다운로드 및 저장 중...")
+        model = AutoModelForSequenceClassification.from_pretrained(RERANKER_MODEL_NAME)
+        tokenizer = AutoTokenizer.from_pretrained(RERANKER_MODEL_NAME)
+        model.save_pretrained(local_model_path)
+        tokenizer.save_pretrained(local_model_path)
+    return local_model_path
+
+
+def load_reranker_model(device: str = "cpu"):
+    """한국어 reranker 모델을 로드하거나 다운로드합니다."""
+    return HuggingFaceCrossEncoder(
+        model_name=_ensure_local_model(),
+        model_kwargs={"device": device},
+    )
+
+
+class _OnnxCrossEncoder:
+    """ONNX Runtime으로 int8 양자화된 cross-encoder를 실행합니다 (CPU 전용)."""
+
+    def __init__(self, model_path: str):
+        try:
+            from optimum.onnxruntime import (
+                ORTModelForSequenceClassification,
+                ORTQuantizer,
+            )
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        except ImportError as exc:
+            raise ImportError(
+                "ONNX reranker를 사용하려면 'pip install optimum[onnxruntime]'를 실행하세요."
+            ) from exc
+
+        onnx_path = model_path + "_onnx_int8"
+        if not os.path.isdir(onnx_path):
+            print("⚙️ ko-reranker 모델을 ONNX int8로 변환 중...")
+            ort_model = ORTModelForSequenceClassification.from_pretrained(
+                model_path, export=True
+            )
+            quantizer = ORTQuantizer.from_pretrained(ort_model)
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=onnx_path, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(model_path).save_pretrained(onnx_path)
+
+        self.model = ORTModelForSequenceClassification.from_pretrained(
+            onnx_path, file_name="model_quantized.onnx"
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_path)
+
+    def predict(self, pairs: List[Tuple[str, str]], batch_size: int) -> np.ndarray:
+        scores = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start : start + batch_size]
+            inputs = self.tokenizer(
+                [q for q, _ in batch],
+                [d for _, d in batch],
+                padding=True,
+                truncation=True,
+                max_length=512,
+                return_tensors="np",
+            )
+            logits = np.asarray(self.model(**inputs).logits)
+            if logits.shape[-1] > 1:
+                logits = logits[:, 1]
+            # sentence_transformers CrossEncoder와 같은 범위가 되도록 sigmoid 적용
+            scores.append(1.0 / (1.0 + np.exp(-logits.reshape(-1))))
+        return np.concatenate(scores) if scores else np.zeros(0)
+
+
+class RerankerModel(BaseCrossEncoder):
+    """배치 점수화와 쌍 점수 LRU 캐시를 갖춘 상주형 cross-encoder"""
+
+    def __init__(
+        self,
+        device: str = "cpu",
+        backend: str = "torch",
+        batch_size: int = 32,
+        cache_size: int = 4096,
+    ):
+        model_path = _ensure_local_model()
+        self.backend = backend
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        if backend == "onnx":
+            self._encoder = _OnnxCrossEncoder(model_path)
+        elif backend == "torch":
+            self._encoder = load_reranker_model(device).client
+        else:
+            raise ValueError(f"지원하지 않는 reranker backend: {backend}")
+
+    @staticmethod
+    def _pair_key(query: str, text: str) -> str:
+        digest = hashlib.sha1()
+        digest.update(query.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _predict(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        if self.backend == "onnx":
+            scores = self._encoder.predict(pairs, batch_size=self.batch_size)
+        else:
+            scores = self._encoder.predict(
+                pairs, batch_size=self.batch_size, show_progress_bar=False
+            )
+        scores = np.asarray(scores)
+        # 일부 모델은 (not_relevant, relevant) 두 점수를 반환
+        if scores.ndim > 1:
+            scores = scores[:, 1]
+        return [float(s) for s in scores]
+
+    def score(self, text_pairs: List[Tuple[str, str]]) -> List[float]:
+        """(query, doc) 쌍의 점수를 반환합니다. 캐시에 없는 쌍만 모델로 계산합니다."""
+        keys = [self._pair_key(q, d) for q, d in text_pairs]
+        scores: List[Optional[float]] = [None] * len(text_pairs)
+
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[i] = self._cache[key]
+
+        missing = [i for i, s in enumerate(scores) if s is None]
+        if missing:
+            computed = self._predict([text_pairs[i] for i in missing])
+            with self._cache_lock:
+                for i, value in zip(missing, computed):
+                    scores[i] = value
+                    if self.cache_size > 0:
+                        self._cache[keys[i]] = value
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return scores
+
+
+_reranker_pool: Dict[Tuple[str, str], RerankerModel] = {}
+_reranker_pool_lock = threading.Lock()
+
+
+def get_reranker_model(device: str = "cpu") -> RerankerModel:
+    """프로세스 내에서 공유되는 reranker 모델을 반환합니다. 최초 호출 시에만 로드합니다."""
+    backend = os.getenv("RERANKER_BACKEND", "torch").lower()
+    if backend == "onnx":
+        # ONNX int8 모드는 CPU 추론 전용
+        device = "cpu"
+    key = (device, backend)
+
+    model = _reranker_pool.get(key)
+    if model is not None:
+        return model
+
+    with _reranker_pool_lock:
+        model = _reranker_pool.get(key)
+        if model is None:
+            model = RerankerModel(
+                device=device,
+                backend=backend,
+                batch_size=int(os.getenv("RERANKER_BATCH_SIZE", "32")),
+                cache_size=int(os.getenv("RERANKER_CACHE_SIZE", "4096")),
+            )
+            _reranker_pool[key] = model
+        return model
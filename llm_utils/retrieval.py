@@ -1,51 +1,61 @@
+import inspect
 import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain.schema import Document
 from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
 from langchain.retrievers import ContextualCompressionRetriever
 from langchain.retrievers.document_compressors import CrossEncoderReranker
-from langchain_community.cross_encoders import HuggingFaceCrossEncoder
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
-from llm_utils.vectordb import get_vector_db
+from llm_utils.llm import embed_queries
+from llm_utils.vectordb import get_vector_db, vector_store_registry
+from llm_utils.vectordb.faiss_shards import ShardedFAISS, search_faiss_store
+from llm_utils.vectordb.filters import search_filter_kwargs
+from llm_utils.column_index import get_column_selector
+from llm_utils.table_document import get_table_record
+from llm_utils.reranker import get_reranker_model
+from llm_utils.hybrid_retriever import HybridRetriever, hybrid_search
 
+# searched_tables 항목에서 컬럼이 아닌 키
+TABLE_INFO_KEYS = ("table_description", "score", "rank")
 
-def load_reranker_model(device: str = "cpu"):
-    """한국어 reranker 모델을 로드하거나 다운로드합니다."""
-    local_model_path = os.path.join(os.getcwd(), "ko_reranker_local")
+# get_retriever에서 지원하는 검색기 이름
+RETRIEVER_NAMES = ("기본", "Reranker", "hybrid")
 
-    # 로컬에 저장된 모델이 있으면 불러오고, 없으면 다운로드 후 저장
-    if os.path.exists(local_model_path) and os.path.isdir(local_model_path):
-        print("🔄 ko-reranker 모델 로컬에서 로드 중...")
-    else:
-        print("⬇️ ko-reranker 모델 다운로드 및 저장 중...")
-        model = AutoModelForSequenceClassification.from_pretrained(
-            "Dongjin-kr/ko-reranker"
-        )
-        tokenizer = AutoTokenizer.from_pretrained("Dongjin-kr/ko-reranker")
-        model.save_pretrained(local_model_path)
-        tokenizer.save_pretrained(local_model_path)
 
-    return HuggingFaceCrossEncoder(
-        model_name=local_model_path,
-        model_kwargs={"device": device},
-    )
-
-
-def get_retriever(retriever_name: str = "기본", top_n: int = 5, device: str = "cpu"):
+def get_retriever(
+    retriever_name: str = "기본",
+    top_n: int = 5,
+    device: str = "cpu",
+    filters: Optional[Dict] = None,
+):
     """검색기 타입에 따라 적절한 검색기를 생성합니다.
 
     Args:
-        retriever_name: 사용할 검색기 이름 ("기본", "재순위", 등)
+        retriever_name: 사용할 검색기 이름 ("기본", "Reranker", "hybrid")
         top_n: 반환할 상위 결과 개수
+        filters: database/schema/tags/owners 조건 (llm_utils.vectordb.filters 참고)
     """
     print(device)
+
+    def search_kwargs():
+        return {"k": top_n, **search_filter_kwargs(get_vector_db(), filters)}
+
     retrievers = {
-        "기본": lambda: get_vector_db().as_retriever(search_kwargs={"k": top_n}),
+        "기본": lambda: get_vector_db().as_retriever(search_kwargs=search_kwargs()),
         "Reranker": lambda: ContextualCompressionRetriever(
             base_compressor=CrossEncoderReranker(
-                model=load_reranker_model(device), top_n=top_n
+                model=get_reranker_model(device), top_n=top_n
             ),
-            base_retriever=get_vector_db().as_retriever(search_kwargs={"k": top_n}),
+            base_retriever=get_vector_db().as_retriever(search_kwargs=search_kwargs()),
+        ),
+        "hybrid": lambda: HybridRetriever(
+            vectorstore=get_vector_db(),
+            top_n=top_n,
+            fetch_k=max(top_n * 4, 20),
+            filters=filters,
         ),
     }
 
@@ -58,74 +68,164 @@ def get_retriever(retriever_name: str = "기본", top_n: int = 5, device: str =
     return retrievers[retriever_name]()
 
 
+def _select_relevant_columns(
+    query_vector: Sequence[float], documents_dict: dict, column_top_k: int
+) -> None:
+    """컬럼 인덱스가 있으면 테이블별로 키 컬럼 + 관련도 상위 column_top_k개 컬럼만 남깁니다."""
+    selector = get_column_selector()
+    if selector is None:
+        print("⚠️ 컬럼 인덱스가 없어 모든 컬럼을 유지합니다.")
+        return
+
+    for table_name, info in documents_dict.items():
+        columns = {k: v for k, v in info.items() if k not in TABLE_INFO_KEYS}
+        selected = selector.select(query_vector, table_name, columns, column_top_k)
+        if len(selected) < len(columns):
+            print(f"✂️ '{table_name}' 컬럼 {len(columns)}개 → {len(selected)}개")
+        documents_dict[table_name] = {
+            **{k: info[k] for k in TABLE_INFO_KEYS if k in info},
+            **selected,
+        }
+
+
+def _to_documents_dict(doc_res: List[Tuple[Document, float]]) -> dict:
+    """(문서, 점수) 목록을 searched_tables 형태의 딕셔너리로 변환합니다."""
+    documents_dict = {}
+    for i, (doc, score) in enumerate(doc_res):
+        try:
+            first_line = doc.page_content.split("\n", 1)[0]
+            print(f"📄 처리 중인 문서 {i+1}: {first_line[:50]}...")
+
+            # 테이블명, 설명, 컬럼 정보 추출 (metadata의 구조화 레코드 우선)
+            record = get_table_record(doc)
+            if record is None:
+                print(f"⚠️ 경고: 테이블 정보 형식이 올바르지 않습니다: {first_line}")
+                continue
+            table_name = record["table_name"]
+            table_desc = record["table_description"]
+            columns = {name: desc for name, desc, _ in record["columns"]}
+
+            # 딕셔너리 저장 (유사도 점수 포함)
+            documents_dict[table_name] = {
+                "table_description": table_desc,
+                "score": f"{score:.3f}",  # 유사도 점수 추가
+                "rank": i + 1,  # 순위 추가
+                **columns,  # 컬럼 정보 추가
+            }
+            print(f"✅ 테이블 '{table_name}' 처리 완료 (유사도: {score:.3f})")
+
+        except Exception as e:
+            print(f"❌ 문서 처리 중 오류 발생: {e}")
+            print(f"문제가 된 문서: {doc.page_content[:100]}...")
+            continue
+    return documents_dict
+
+
+def _is_faiss(db) -> bool:
+    return isinstance(db, ShardedFAISS) or (
+        hasattr(db, "index") and hasattr(db, "index_to_docstore_id")
+    )
+
+
+def _store_search_kwargs(
+    db, filters: Optional[Dict], ef_search: Optional[int], nprobe: Optional[int]
+) -> dict:
+    """FAISS가 아닌 스토어의 검색 인자. 요청별 튜닝을 지원하면(pgvector) ef_search/probes도 전달합니다."""
+    kwargs = search_filter_kwargs(db, filters)
+    parameters = inspect.signature(db.similarity_search_with_score_by_vector).parameters
+    if "ef_search" in parameters:
+        kwargs.update(ef_search=ef_search, probes=nprobe)
+    return kwargs
+
+
 def search_tables(
-    query: str, retriever_name: str = "기본", top_n: int = 5, device: str = "cpu"
+    query: str,
+    retriever_name: str = "기본",
+    top_n: int = 5,
+    device: str = "cpu",
+    column_top_k: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    filters: Optional[Dict] = None,
 ):
-    """쿼리에 맞는 테이블 정보를 검색합니다."""
+    """
+    쿼리에 맞는 테이블 정보를 검색합니다.
+
+    Args:
+        column_top_k: 테이블별로 유지할 컬럼 수. None이면 COLUMN_TOP_K 환경 변수, 0이면 모든 컬럼 유지.
+        ef_search: HNSW 인덱스 탐색 후보 수. None이면 FAISS_EF_SEARCH(pgvector: PGVECTOR_EF_SEARCH)
+            환경 변수 또는 인덱스 저장값.
+        nprobe: IVF 인덱스 탐색 클러스터 수 (pgvector: ivfflat.probes). None이면 FAISS_NPROBE
+            (pgvector: PGVECTOR_PROBES) 환경 변수 또는 인덱스 저장값.
+            ("기본"/"hybrid" 검색기에 적용)
+        filters: 검색 대상 테이블 조건. 예: {"database": "sales", "tags": ["finance"], "owners": "alice"}
+            조건에 맞는 테이블만 검색합니다 (FAISS는 ID 비트맵, pgvector는 SQL 조건).
+    """
+    if column_top_k is None:
+        column_top_k = int(os.getenv("COLUMN_TOP_K", "0"))
     print(f"🔍 검색 시작: '{query}' (retriever: {retriever_name}, top_n: {top_n})")
+    if filters:
+        print(f"🏷️ 필터: {filters}")
     
     try:
         if retriever_name == "기본":
             db = get_vector_db()
             print(f"✅ 벡터 DB 로드 성공")
             
-            # similarity_search_with_score를 사용하여 유사도 점수도 함께 가져옴
-            doc_score_pairs = db.similarity_search_with_score(query, k=top_n)
-            doc_res = [(doc, score) for doc, score in doc_score_pairs]
+            if _is_faiss(db):
+                query_vector = vector_store_registry.get_embeddings().embed_query(query)
+                doc_res = _faiss_batch_search(
+                    db,
+                    np.asarray([query_vector], dtype=np.float32),
+                    top_n,
+                    ef_search=ef_search,
+                    nprobe=nprobe,
+                    filters=filters,
+                )[0]
+            else:
+                # similarity_search_with_score를 사용하여 유사도 점수도 함께 가져옴
+                doc_score_pairs = db.similarity_search_with_score(
+                    query, k=top_n, **_store_search_kwargs(db, filters, ef_search, nprobe)
+                )
+                doc_res = [(doc, score) for doc, score in doc_score_pairs]
             print(f"📊 검색 결과: {len(doc_res)}개 문서 찾음")
+        elif retriever_name == "hybrid":
+            db = get_vector_db()
+            fetch_k = max(top_n * 4, 20)
+            if _is_faiss(db):
+                query_vector = vector_store_registry.get_embeddings().embed_query(query)
+                dense = _faiss_batch_search(
+                    db,
+                    np.asarray([query_vector], dtype=np.float32),
+                    fetch_k,
+                    ef_search=ef_search,
+                    nprobe=nprobe,
+                    filters=filters,
+                )[0]
+            else:
+                dense = db.similarity_search_with_score(
+                    query, k=fetch_k, **_store_search_kwargs(db, filters, ef_search, nprobe)
+                )
+            doc_res = hybrid_search(
+                db, query, k=top_n, fetch_k=fetch_k, dense=dense, filters=filters
+            )
+            print(f"📊 hybrid 검색 결과: {len(doc_res)}개 문서 찾음")
         else:
             retriever = get_retriever(
-                retriever_name=retriever_name, top_n=top_n, device=device
+                retriever_name=retriever_name, top_n=top_n, device=device, filters=filters
             )
             docs = retriever.invoke(query)
             # Reranker의 경우 score 정보가 없으므로 기본값 설정
             doc_res = [(doc, getattr(doc, 'metadata', {}).get('score', 0.5)) for doc in docs]
-            print(f"📊 Reranker 검색 결과: {len(doc_res)}개 문서 찾음")
+            print(f"📊 {retriever_name} 검색 결과: {len(doc_res)}개 문서 찾음")
 
         # 결과를 사전 형태로 변환
-        documents_dict = {}
-        for i, (doc, score) in enumerate(doc_res):
-            try:
-                lines = doc.page_content.split("\n")
-                print(f"📄 처리 중인 문서 {i+1}: {lines[0][:50]}...")
-
-                # 테이블명 및 설명 추출
-                if ": " not in lines[0]:
-                    print(f"⚠️ 경고: 테이블 정보 형식이 올바르지 않습니다: {lines[0]}")
-                    continue
-                    
-                table_name, table_desc = lines[0].split(": ", 1)
-
-                # 섹션별로 정보 추출 (테이블/컬럼만 사용)
-                columns = {}
-                current_section = None
-
-                for j, line in enumerate(lines[1:], 1):
-                    line = line.strip()
-
-                    # 섹션 헤더 확인
-                    if line == "Columns:":
-                        current_section = "columns"
-                        continue
-
-                    # 각 섹션의 내용 파싱
-                    if current_section == "columns" and ": " in line:
-                        col_name, col_desc = line.split(": ", 1)
-                        columns[col_name.strip()] = col_desc.strip()
-
-                # 딕셔너리 저장 (유사도 점수 포함)
-                documents_dict[table_name] = {
-                    "table_description": table_desc.strip(),
-                    "score": f"{score:.3f}",  # 유사도 점수 추가
-                    "rank": i + 1,  # 순위 추가
-                    **columns,  # 컬럼 정보 추가
-                }
-                print(f"✅ 테이블 '{table_name}' 처리 완료 (유사도: {score:.3f})")
-                
-            except Exception as e:
-                print(f"❌ 문서 처리 중 오류 발생: {e}")
-                print(f"문제가 된 문서: {doc.page_content[:100]}...")
-                continue
+        documents_dict = _to_documents_dict(doc_res)
+
+        if column_top_k > 0 and documents_dict:
+            # 임베딩 캐시 덕분에 테이블 검색에서 계산한 질문 벡터를 그대로 재사용
+            query_vector = vector_store_registry.get_embeddings().embed_query(query)
+            _select_relevant_columns(query_vector, documents_dict, column_top_k)
 
         print(f"🎯 최종 결과: {len(documents_dict)}개 테이블 반환")
         return documents_dict
@@ -136,3 +236,90 @@ def search_tables(
         import traceback
         traceback.print_exc()
         return {}
+
+
+def _faiss_batch_search(
+    db,
+    vectors: np.ndarray,
+    k: int,
+    ef_search: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    filters: Optional[Dict] = None,
+) -> List[List[Tuple[Document, float]]]:
+    """질문 벡터 행렬로 FAISS 인덱스를 한 번에 검색합니다. filters가 있으면 조건에 맞는 위치만 검색합니다."""
+    return search_faiss_store(
+        db, vectors, k, ef_search=ef_search, nprobe=nprobe, filters=filters
+    )
+
+
+def search_tables_batch(
+    queries: Sequence[str],
+    retriever_name: str = "기본",
+    top_n: int = 5,
+    device: str = "cpu",
+    column_top_k: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    filters: Optional[Dict] = None,
+) -> List[dict]:
+    """
+    여러 질문의 테이블 정보를 한 번에 검색합니다.
+
+    질문은 search_tables와 같은 질의 임베딩(embed_queries: 질의 접두어와 질의 캐시 사용)으로 한 번에 계산하고,
+    FAISS는 질문 행렬로 한 번만 검색합니다.
+    반환값은 질문 순서대로 search_tables와 같은 형태의 딕셔너리 목록입니다.
+
+    Args:
+        retriever_name: "기본" 또는 "hybrid". 그 외 검색기는 질문마다 search_tables를 호출합니다.
+        ef_search, nprobe, filters: search_tables와 동일한 검색 옵션
+    """
+    queries = list(queries)
+    if not queries:
+        return []
+    if retriever_name not in ("기본", "hybrid"):
+        return [
+            search_tables(
+                q, retriever_name, top_n, device, column_top_k, ef_search, nprobe, filters
+            )
+            for q in queries
+        ]
+    if column_top_k is None:
+        column_top_k = int(os.getenv("COLUMN_TOP_K", "0"))
+    print(f"🔍 배치 검색 시작: {len(queries)}개 질문 (retriever: {retriever_name}, top_n: {top_n})")
+
+    db = get_vector_db()
+    vectors = embed_queries(vector_store_registry.get_embeddings(), queries)
+    fetch_k = top_n if retriever_name == "기본" else max(top_n * 4, 20)
+
+    if _is_faiss(db):
+        dense_results = _faiss_batch_search(
+            db,
+            np.asarray(vectors, dtype=np.float32),
+            fetch_k,
+            ef_search=ef_search,
+            nprobe=nprobe,
+            filters=filters,
+        )
+    else:
+        dense_results = [
+            db.similarity_search_with_score_by_vector(
+                vector, k=fetch_k, **_store_search_kwargs(db, filters, ef_search, nprobe)
+            )
+            for vector in vectors
+        ]
+
+    results = []
+    for query, vector, dense in zip(queries, vectors, dense_results):
+        if retriever_name == "hybrid":
+            doc_res = hybrid_search(
+                db, query, k=top_n, fetch_k=fetch_k, dense=dense, filters=filters
+            )
+        else:
+            doc_res = dense
+        documents_dict = _to_documents_dict(doc_res)
+        if column_top_k > 0 and documents_dict:
+            _select_relevant_columns(vector, documents_dict, column_top_k)
+        results.append(documents_dict)
+
+    print(f"🎯 배치 검색 완료: {len(results)}개 질문")
+    return results
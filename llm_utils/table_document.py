@@ -0,0 +1,162 @@
+"""
+테이블 문서 포맷 모듈
+
+벡터 DB에 저장되는 테이블 문서의 생성과 해석을 한 곳에서 담당합니다.
+
+page_content 형식 (임베딩 대상):
+    테이블명: 테이블 설명
+    Columns:
+     컬럼명1: 컬럼 설명1
+    컬럼명2: 컬럼 설명2
+
+metadata 형식 (검색 결과를 문자열 파싱 없이 복원하기 위한 구조화 레코드):
+    {
+        "table_name": "bill",
+        "table_description": "인청구서",
+        "columns": [["clm_id", "보험 청구를 식별하는 ID", "varchar"], ...],  # [이름, 설명, 타입]
+        # 선택: 검색 필터 (llm_utils.vectordb.filters)
+        "database": "sales", "schema": "public", "tags": ["finance"], "owners": ["alice"],
+    }
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from langchain.schema import Document
+
+ColumnSpec = Union[Tuple[str, str], Tuple[str, str, Optional[str]], Dict[str, str]]
+
+
+def _normalize_column(column: ColumnSpec) -> List[Optional[str]]:
+    """(이름, 설명[, 타입]) 튜플 또는 get_column_names_and_descriptions 형식 dict를 [이름, 설명, 타입]으로 변환합니다."""
+    if isinstance(column, dict):
+        name = column.get("column_name") or column.get("name")
+        desc = column.get("column_description") or column.get("description")
+        col_type = column.get("column_type") or column.get("type")
+    else:
+        name, desc = column[0], column[1]
+        col_type = column[2] if len(column) > 2 else None
+    return [str(name).strip(), (desc or "").strip(), col_type or None]
+
+
+def format_table_document(
+    table_name: str, table_description: str, columns: Iterable[ColumnSpec]
+) -> str:
+    """테이블명, 설명, 컬럼 목록으로 문서 텍스트를 만듭니다."""
+    column_info_str = "\n".join(
+        f"{name}: {desc}" for name, desc, _ in map(_normalize_column, columns)
+    )
+    return f"{table_name}: {table_description}\nColumns:\n {column_info_str}"
+
+
+def build_table_document(
+    table_name: str,
+    table_description: str,
+    columns: Sequence[ColumnSpec],
+    **extra_metadata,
+) -> Document:
+    """page_content와 구조화 metadata를 함께 갖는 테이블 문서를 만듭니다."""
+    normalized = [_normalize_column(column) for column in columns]
+    table_description = (table_description or "").strip()
+    # 검색 필터용 database/schema: 지정하지 않으면 "database.schema.table" 형식의 테이블명에서만 추출
+    # ("a.table"은 DataHub의 dbt 스키마나 MySQL/DuckDB/Oracle의 schema.table일 수 있어 추론하지 않음)
+    parts = table_name.split(".")
+    if len(parts) == 3 and all(parts):
+        extra_metadata.setdefault("database", parts[0])
+        extra_metadata.setdefault("schema", parts[1])
+    return Document(
+        page_content=format_table_document(table_name, table_description, normalized),
+        metadata={
+            **extra_metadata,
+            "table_name": table_name,
+            "table_description": table_description,
+            "columns": normalized,
+        },
+    )
+
+
+def split_list_field(value: Optional[str]) -> List[str]:
+    """CSV의 "a;b" 또는 "a,b" 형식 값을 목록으로 나눕니다 (tags/owners 컬럼용)."""
+    if not value:
+        return []
+    return [item.strip() for item in value.replace(";", ",").split(",") if item.strip()]
+
+
+def parse_table_document(
+    content: str,
+) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    """
+    문서 텍스트에서 (테이블명, 테이블 설명, {컬럼명: 컬럼 설명})을 추출합니다.
+
+    첫 줄에 ": "가 없으면 테이블 문서가 아닌 것으로 보고 None을 반환합니다.
+    컬럼 줄에 ": "가 없으면 설명이 빈 컬럼으로 취급합니다.
+    """
+    lines = content.split("\n")
+    if ": " not in lines[0]:
+        return None
+
+    table_name, table_desc = lines[0].split(": ", 1)
+
+    # 섹션별로 정보 추출 (테이블/컬럼만 사용)
+    columns = {}
+    current_section = None
+    for line in lines[1:]:
+        line = line.strip()
+
+        # 섹션 헤더 확인
+        if line == "Columns:":
+            current_section = "columns"
+            continue
+
+        # 각 섹션의 내용 파싱
+        if current_section == "columns" and line:
+            col_name, sep, col_desc = line.partition(": ")
+            if not sep:
+                # 설명이 비어 있는 "컬럼명:" 줄
+                col_name = col_name.rstrip(":")
+            columns[col_name.strip()] = col_desc.strip()
+
+    return table_name, table_desc.strip(), columns
+
+
+def get_table_record(doc: Document) -> Optional[Dict]:
+    """
+    문서의 구조화 레코드(table_name, table_description, columns)를 반환합니다.
+
+    metadata에 레코드가 있으면 그대로 사용하고(파싱 없음), 예전 인덱스처럼 없으면
+    page_content를 파싱하여 같은 형식으로 만듭니다. 테이블 문서가 아니면 None.
+    """
+    metadata = doc.metadata or {}
+    if "table_name" in metadata and "columns" in metadata:
+        return metadata
+
+    parsed = parse_table_document(doc.page_content)
+    if parsed is None:
+        return None
+    table_name, table_desc, columns = parsed
+    return {
+        "table_name": table_name,
+        "table_description": table_desc,
+        "columns": [[name, desc, None] for name, desc in columns.items()],
+    }
+
+
+def content_hash(page_content: str, metadata: Optional[Mapping]) -> str:
+    """문서 내용과 metadata의 해시. 키 순서와 무관하게 같은 값을 반환합니다."""
+    payload = json.dumps(
+        [page_content or "", metadata or {}],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def document_key(page_content: str, metadata: Optional[Mapping]) -> str:
+    """동기화 단위(테이블)를 구분하는 키. table_name이 없으면 내용 해시를 사용합니다."""
+    table_name = (metadata or {}).get("table_name")
+    if table_name:
+        return str(table_name)
+    return "#" + content_hash(page_content, metadata)
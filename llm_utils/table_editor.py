@@ -0,0 +1,208 @@
+"""
+테이블 단위 인덱스 수정 모듈 (DB Builder 페이지와 Python API)
+
+테이블 설명 하나를 고치려고 create_faiss.py로 전체를 다시 만들지 않도록, 지정한 테이블 문서만
+추가/교체/삭제합니다.
+
+- 바뀐 테이블 문서와 그 테이블의 컬럼 문서만 임베딩하고(faiss_sync.patch_faiss_store),
+  기존 위치는 삭제 표시(tombstone)합니다. 구조화 metadata(table_document)도 함께 갱신됩니다.
+- 현재 버전을 하드 링크로 복사한 새 버전에서 고친 뒤 검증하고 CURRENT를 교체하므로(faiss_versions),
+  실행 중인 앱은 재시작 없이 다음 검색부터 수정 내용을 사용하고 잘못되면 rollback_version으로 되돌릴 수 있습니다.
+- 샤드 레이아웃이면 테이블이 속한 샤드만 고칩니다.
+- 같은 인덱스를 고치는 작업은 순서대로 실행됩니다. 프로세스 안에서는 submit_table_changes의 인덱스 경로별
+  작업 큐로, 프로세스 사이(Streamlit 워커 여러 개, create_faiss.py)에서는 build_version의 LOCK 파일 잠금으로
+  시드 복사부터 공개까지 한 작업씩 진행하므로 앞서 공개한 수정을 덮어쓰지 않습니다.
+
+create_faiss.py는 카탈로그 파일을 기준으로 동기화하므로, 여기서 고친 내용은 카탈로그에도 반영해야
+다음 create_faiss.py 실행 후에도 유지됩니다.
+
+사용 예:
+    from llm_utils.table_editor import edit_table_document, upsert_tables, delete_tables
+
+    doc = edit_table_document("sales.orders", table_description="주문 내역 (취소 포함)")
+    upsert_tables([doc])
+    delete_tables(["sales.old_orders"])
+"""
+
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain.schema import Document
+
+from llm_utils.background_jobs import BackgroundJob, job_registry
+from llm_utils.column_index import COLUMN_INDEX_DIR, build_column_documents
+from llm_utils.llm import get_embedding_identity
+from llm_utils.table_document import (
+    ColumnSpec,
+    build_table_document,
+    document_key,
+    get_table_record,
+)
+from llm_utils.vectordb.faiss_db import resolve_faiss_path
+from llm_utils.vectordb.faiss_shards import read_shard_layout, shard_of, shard_path
+from llm_utils.vectordb.faiss_storage import ArrowDocstore, DOCSTORE_FILE, docstore_file
+from llm_utils.vectordb.faiss_sync import docstore_groups, patch_faiss_store, read_manifest
+from llm_utils.vectordb.faiss_versions import build_version, resolve_current_path
+from llm_utils.vectordb.registry import vector_store_registry
+
+ProgressFn = Callable[..., None]
+STAT_NAMES = ("added", "updated", "deleted", "unchanged", "embedded")
+
+def _resolve_path(vectordb_location: Optional[str]) -> str:
+    return resolve_faiss_path(vectordb_location or os.getenv("VECTORDB_LOCATION"))
+
+
+def _table_store_path(store_path: str, key: str) -> str:
+    """테이블 키가 들어 있는(들어갈) 스토어 디렉토리 (단일 스토어 또는 해당 샤드)."""
+    if docstore_file(store_path) is not None:
+        return store_path
+    layout = read_shard_layout(store_path)
+    if layout is None:
+        raise FileNotFoundError(f"FAISS 인덱스를 찾을 수 없습니다: {store_path}")
+    return shard_path(store_path, shard_of(key, layout["n_shards"]))
+
+
+def get_table_document(
+    table_name: str, vectordb_location: Optional[str] = None
+) -> Optional[Document]:
+    """
+    현재 버전 인덱스에서 테이블 문서를 manifest 위치로 바로 찾아 반환합니다. 없으면 None.
+
+    manifest가 없는 예전 인덱스는 docstore에서 테이블명으로 찾습니다.
+    """
+    store_path = resolve_current_path(_resolve_path(vectordb_location))
+    path = _table_store_path(store_path, table_name)
+    manifest = read_manifest(path)
+    groups = manifest["groups"] if manifest is not None else docstore_groups(path)
+    group = (groups or {}).get(table_name)
+    if not group or not group["positions"]:
+        return None
+    return ArrowDocstore(os.path.join(path, DOCSTORE_FILE)).document_at(group["positions"][0])
+
+
+def edit_table_document(
+    table_name: str,
+    table_description: Optional[str] = None,
+    columns: Optional[Sequence[ColumnSpec]] = None,
+    vectordb_location: Optional[str] = None,
+    **metadata,
+) -> Document:
+    """
+    기존 테이블 문서에 바꿀 값만 덮어쓴 새 문서를 만듭니다 (인덱스는 바꾸지 않음, upsert_tables로 반영).
+
+    None인 인자는 기존 값을 유지합니다. 인덱스에 없는 테이블이면 새 테이블 문서를 만듭니다.
+    metadata로 database/schema/tags/owners 등 검색 필터 값을 바꿀 수 있습니다.
+    """
+    existing = get_table_document(table_name, vectordb_location)
+    record = get_table_record(existing) if existing is not None else None
+    extra = {
+        key: value
+        for key, value in (existing.metadata if existing is not None else {}).items()
+        if key not in ("table_name", "table_description", "columns")
+    }
+    extra.update(metadata)
+    if table_description is None:
+        table_description = record["table_description"] if record else ""
+    if columns is None:
+        columns = record["columns"] if record else []
+    return build_table_document(table_name, table_description, columns, **extra)
+
+
+def apply_table_changes(
+    upserts: Sequence[Document] = (),
+    deletes: Sequence[str] = (),
+    vectordb_location: Optional[str] = None,
+    embeddings=None,
+    embedding_id: Optional[str] = None,
+    progress: Optional[ProgressFn] = None,
+) -> Dict[str, Any]:
+    """
+    테이블 문서 추가/교체(upserts)와 삭제(deletes, 테이블명)를 새 인덱스 버전으로 반영하고 공개합니다.
+
+    테이블/컬럼 인덱스 통계 합계(added/updated/deleted/unchanged/embedded)와 공개한 version을 반환합니다.
+    바뀐 내용이 없으면 새 버전을 만들지 않으며 version은 None입니다.
+    progress(비율, 메시지)로 진행 상황을 알립니다.
+    """
+    progress = progress or (lambda fraction, message=None: None)
+    vectordb_path = _resolve_path(vectordb_location)
+    if embeddings is None:
+        embeddings = vector_store_registry.get_embeddings()
+    if embedding_id is None:
+        embedding_id = "/".join(get_embedding_identity())
+    upsert_groups = {document_key(doc.page_content, doc.metadata): [doc] for doc in upserts}
+    deletes = [key for key in deletes if key not in upsert_groups]
+
+    def build(path: str) -> Dict[str, Any]:
+        targets: Dict[str, Tuple[Dict[str, List[Document]], List[str]]] = {}
+        for key, docs in upsert_groups.items():
+            targets.setdefault(_table_store_path(path, key), ({}, []))[0][key] = docs
+        for key in deletes:
+            targets.setdefault(_table_store_path(path, key), ({}, []))[1].append(key)
+
+        totals = {name: 0 for name in STAT_NAMES}
+        for i, (store_path, (groups, removed)) in enumerate(targets.items()):
+            name = os.path.relpath(store_path, path)
+            progress(0.1 + 0.7 * i / len(targets), f"테이블 인덱스 갱신 중: {name}")
+            stats = patch_faiss_store(store_path, groups, removed, embeddings, embedding_id)
+            for stat in STAT_NAMES:
+                totals[stat] += stats[stat]
+
+            column_path = os.path.join(store_path, COLUMN_INDEX_DIR)
+            if read_manifest(column_path) is not None:
+                progress(0.1 + 0.7 * (i + 0.5) / len(targets), f"컬럼 인덱스 갱신 중: {name}")
+                column_stats = patch_faiss_store(
+                    column_path,
+                    {key: build_column_documents(docs) for key, docs in groups.items()},
+                    removed,
+                    embeddings,
+                    embedding_id,
+                )
+                totals["embedded"] += column_stats["embedded"]
+        progress(0.85, "새 버전 검증 중")
+        return totals
+
+    progress(0.05, "새 버전 준비 중")
+    version, stats = build_version(
+        vectordb_path,
+        build,
+        embeddings,
+        publish_if=lambda stats: any(stats[name] for name in ("added", "updated", "deleted")),
+    )
+    print(
+        f"✏️ 테이블 추가 {stats['added']}, 변경 {stats['updated']}, 삭제 {stats['deleted']} "
+        f"(문서 {stats['embedded']}개 임베딩)"
+    )
+    progress(1.0, f"버전 {version} 공개" if version else "바뀐 내용 없음")
+    return {**stats, "version": version}
+
+
+def upsert_tables(documents: Sequence[Document], **kwargs) -> Dict[str, Any]:
+    """테이블 문서를 추가하거나 같은 테이블명의 문서를 교체합니다 (apply_table_changes 인자 사용)."""
+    return apply_table_changes(upserts=documents, **kwargs)
+
+
+def delete_tables(table_names: Sequence[str], **kwargs) -> Dict[str, Any]:
+    """테이블을 인덱스에서 삭제합니다 (apply_table_changes 인자 사용)."""
+    return apply_table_changes(deletes=table_names, **kwargs)
+
+
+def submit_table_changes(
+    upserts: Sequence[Document] = (),
+    deletes: Sequence[str] = (),
+    vectordb_location: Optional[str] = None,
+    name: Optional[str] = None,
+) -> BackgroundJob:
+    """apply_table_changes를 백그라운드 작업으로 실행합니다. 같은 인덱스의 작업은 순서대로 실행됩니다."""
+    vectordb_path = _resolve_path(vectordb_location)
+    if name is None:
+        tables = [doc.metadata.get("table_name") for doc in upserts] + list(deletes)
+        name = "테이블 수정: " + ", ".join(str(table) for table in tables[:3])
+        if len(tables) > 3:
+            name += f" 외 {len(tables) - 3}개"
+    return job_registry.submit(
+        name,
+        lambda progress: apply_table_changes(
+            upserts, deletes, vectordb_path, progress=progress
+        ),
+        queue=vectordb_path,
+    )
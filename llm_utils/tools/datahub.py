@@ -1,12 +1,17 @@
 import os
-from typing import List, Dict, Optional, TypeVar, Callable, Iterable, Any
+import threading
+from typing import TYPE_CHECKING, List, Dict, Optional, TypeVar, Callable, Iterable, Any
 
 from langchain.schema import Document
 
-from data_utils.datahub_source import DatahubMetadataFetcher
+from data_utils.datahub_datasets import table_schema
+from llm_utils.table_document import build_table_document
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor
 
+if TYPE_CHECKING:
+    from data_utils.datahub_source import DatahubMetadataFetcher
+
 T = TypeVar("T")
 R = TypeVar("R")
 
@@ -29,33 +34,46 @@ def parallel_process(
 def set_gms_server(gms_server: str):
     try:
         os.environ["DATAHUB_SERVER"] = gms_server
-        fetcher = DatahubMetadataFetcher(gms_server=gms_server)
+        fetcher = _get_fetcher()
     except ValueError as e:
         raise ValueError(f"GMS 서버 설정 실패: {str(e)}")
 
 
+# 페처를 만들 때마다 GMS 헬스 체크 요청이 나가므로 서버별로 하나만 만들어 재사용
+_fetchers: Dict[str, "DatahubMetadataFetcher"] = {}
+_fetchers_lock = threading.Lock()
+
+
 def _get_fetcher():
     gms_server = os.getenv("DATAHUB_SERVER")
     if not gms_server:
         raise ValueError("GMS 서버가 설정되지 않았습니다.")
-    return DatahubMetadataFetcher(gms_server=gms_server)
+    # DataHub SDK는 페처를 처음 만들 때 불러옴
+    from data_utils.datahub_source import DatahubMetadataFetcher
+
+    with _fetchers_lock:
+        if gms_server not in _fetchers:
+            _fetchers[gms_server] = DatahubMetadataFetcher(gms_server=gms_server)
+        return _fetchers[gms_server]
 
 
-def _process_urn(urn: str, fetcher: DatahubMetadataFetcher) -> tuple[str, str]:
-    table_name = fetcher.get_table_name(urn)
-    table_description = fetcher.get_table_description(urn)
-    return (table_name, table_description)
+def _process_urn(
+    urn: str, fetcher: "DatahubMetadataFetcher"
+) -> tuple[str, Optional[str], Optional[str]]:
+    table_name, table_description = fetcher.get_table_name_and_description(urn)
+    return (urn, table_name, table_description)
 
 
 def _process_column_info(
-    urn: str, table_name: str, fetcher: DatahubMetadataFetcher
+    urn: str, table_name: str, fetcher: "DatahubMetadataFetcher"
 ) -> Optional[List[Dict[str, str]]]:
     if fetcher.get_table_name(urn) == table_name:
         return fetcher.get_column_names_and_descriptions(urn)
     return None
 
 
-def _get_table_info(max_workers: int = 8) -> Dict[str, str]:
+def _get_table_info(max_workers: int = 8) -> Dict[str, tuple[str, str]]:
+    """테이블 이름 → (URN, 설명). 설명이 없는 테이블은 제외합니다."""
     fetcher = _get_fetcher()
     urns = fetcher.get_urns()
     table_info = {}
@@ -67,58 +85,95 @@ def _get_table_info(max_workers: int = 8) -> Dict[str, str]:
         desc="테이블 정보 수집 중",
     )
 
-    for table_name, table_description in results:
+    for urn, table_name, table_description in results:
         if table_name and table_description:
-            table_info[table_name] = table_description
+            table_info[table_name] = (urn, table_description)
 
     return table_info
 
 
-def _get_column_info(
-    table_name: str, urn_table_mapping: Dict[str, str], max_workers: int = 8
-) -> List[Dict[str, str]]:
-    target_urn = urn_table_mapping.get(table_name)
-    if not target_urn:
-        return []
+def _get_column_info(urn: str) -> List[Dict[str, str]]:
+    return _get_fetcher().get_column_names_and_descriptions(urn)
 
-    fetcher = _get_fetcher()
-    column_info = fetcher.get_column_names_and_descriptions(target_urn)
 
-    return column_info
+def _schema_filter(table_name: str) -> Dict[str, str]:
+    """"<dbt 스키마>.<테이블>" 형식 테이블명의 스키마 검색 필터 (database로 추론되지 않도록 직접 지정)"""
+    schema = table_schema(table_name)
+    return {"schema": schema} if schema else {}
 
 
-def get_info_from_db(max_workers: int = 8) -> List[Document]:
+def _get_info_per_urn(max_workers: int = 8) -> List[Document]:
+    """URN마다 aspect를 조회하는 방식 (scrollAcrossEntities를 지원하지 않는 GMS용)"""
     table_info = _get_table_info(max_workers=max_workers)
-
     fetcher = _get_fetcher()
-    urns = list(fetcher.get_urns())
-    urn_table_mapping = {}
-    for urn in urns:
-        table_name = fetcher.get_table_name(urn)
-        if table_name:
-            urn_table_mapping[table_name] = urn
-
-    def process_table_info(item: tuple[str, str]) -> str:
-        table_name, table_description = item
-        column_info = _get_column_info(
-            table_name, urn_table_mapping, max_workers=max_workers
-        )
-        column_info_str = "\n".join(
-            [
-                f"{col['column_name']}: {col['column_description']}"
-                for col in column_info
-            ]
+
+    def process_table_info(item: tuple[str, tuple[str, str]]) -> Document:
+        table_name, (urn, table_description) = item
+        # 컬럼 타입과 검색 필터(태그/담당자)까지 구조화 metadata로 보존
+        return build_table_document(
+            table_name,
+            table_description,
+            _get_column_info(urn),
+            urn=urn,
+            tags=fetcher.get_table_tags(urn),
+            owners=fetcher.get_table_owners(urn),
+            **_schema_filter(table_name),
         )
-        return f"{table_name}: {table_description}\nColumns:\n {column_info_str}"
 
-    table_info_str_list = parallel_process(
+    return parallel_process(
         table_info.items(),
         process_table_info,
         max_workers=max_workers,
         desc="컬럼 정보 수집 중",
     )
 
-    return [Document(page_content=info) for info in table_info_str_list]
+
+def _get_info_bulk(batch_size: int) -> List[Document]:
+    """scrollAcrossEntities 한 요청으로 batch_size개 데이터셋의 메타데이터를 모두 가져오는 방식"""
+    fetcher = _get_fetcher()
+    datasets: Dict[str, Dict[str, Any]] = {}
+    progress = None
+    for total, page in fetcher.scroll_datasets(batch_size=batch_size):
+        if progress is None:
+            progress = tqdm(total=total, desc="DataHub 메타데이터 수집 중")
+        progress.update(len(page))
+        for dataset in page:
+            # 설명이 없는 테이블은 제외 (같은 이름이면 나중 URN 사용)
+            if dataset["table_name"] and dataset["table_description"]:
+                datasets[dataset["table_name"]] = dataset
+    if progress is not None:
+        progress.close()
+
+    return [
+        build_table_document(
+            table_name,
+            dataset["table_description"],
+            dataset["columns"],
+            urn=dataset["urn"],
+            tags=dataset["tags"],
+            owners=dataset["owners"],
+            **_schema_filter(table_name),
+        )
+        for table_name, dataset in datasets.items()
+    ]
+
+
+def get_info_from_db(
+    max_workers: int = 8, batch_size: Optional[int] = None
+) -> List[Document]:
+    """
+    DataHub의 모든 데이터셋을 테이블 문서 목록으로 가져옵니다.
+
+    GraphQL scrollAcrossEntities로 batch_size개(기본값: DATAHUB_BATCH_SIZE 또는 500)씩
+    이름, 설명, 컬럼, 태그, 담당자를 한 번에 가져오며, 서버가 지원하지 않으면 URN별 조회로 대체합니다.
+    """
+    if batch_size is None:
+        batch_size = int(os.getenv("DATAHUB_BATCH_SIZE", "500"))
+    try:
+        return _get_info_bulk(batch_size)
+    except RuntimeError as e:
+        print(f"⚠️ DataHub 일괄 조회를 사용할 수 없어 URN별로 조회합니다: {e}")
+        return _get_info_per_urn(max_workers=max_workers)
 
 
 def get_metadata_from_db() -> List[Dict]:
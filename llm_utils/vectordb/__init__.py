@@ -3,5 +3,6 @@ VectorDB 모듈 - FAISS와 pgvector를 지원하는 벡터 데이터베이스 
 """
 
 from .factory import get_vector_db
+from .registry import VectorStoreRegistry, vector_store_registry
 
-__all__ = ["get_vector_db"]
+__all__ = ["get_vector_db", "VectorStoreRegistry", "vector_store_registry"]
@@ -0,0 +1,45 @@
+"""
+벡터 스토어에 저장된 문서를 열거하는 유틸리티
+"""
+
+from typing import List
+
+from langchain.schema import Document
+from sqlalchemy import select
+
+
+def get_all_documents(db) -> List[Document]:
+    """FAISS 또는 PGVector 스토어에 저장된 모든 문서를 반환합니다."""
+    # FAISS 샤드: 샤드 순서대로 이어 붙임
+    if hasattr(db, "shards"):
+        return [doc for shard in db.shards for doc in get_all_documents(shard)]
+
+    # FAISS: 인덱스 순서대로 docstore에서 조회
+    if hasattr(db, "index_to_docstore_id") and hasattr(db, "docstore"):
+        documents = []
+        for doc_id in db.index_to_docstore_id.values():
+            doc = db.docstore.search(doc_id)
+            if isinstance(doc, Document):
+                if doc.id is None:
+                    doc.id = doc_id
+                documents.append(doc)
+        return documents
+
+    # PGVector: 컬렉션의 모든 행 조회 (임베딩 컬럼은 읽지 않음)
+    if hasattr(db, "EmbeddingStore") and hasattr(db, "_make_sync_session"):
+        store = db.EmbeddingStore
+        with db._make_sync_session() as session:
+            collection = db.get_collection(session)
+            if collection is None:
+                return []
+            rows = session.execute(
+                select(store.id, store.document, store.cmetadata).where(
+                    store.collection_id == collection.uuid
+                )
+            ).all()
+        return [
+            Document(id=row.id, page_content=row.document, metadata=row.cmetadata or {})
+            for row in rows
+        ]
+
+    raise ValueError(f"문서를 열거할 수 없는 벡터 스토어입니다: {type(db).__name__}")
@@ -5,11 +5,21 @@ VectorDB 팩토리 모듈 - 환경 변수에 따라 적절한 VectorDB 인스턴
 import os
 from typing import Optional
 
-from llm_utils.vectordb.faiss_db import get_faiss_vector_db
+from llm_utils.vectordb.faiss_db import (
+    get_faiss_vector_db,
+    resolve_faiss_path,
+    faiss_index_version,
+)
+from llm_utils.vectordb.registry import vector_store_registry
 
 # PGVector 관련 라이브러리 optional import
 try:
-    from llm_utils.vectordb.pgvector_db import get_pgvector_db
+    from llm_utils.vectordb.pgvector_db import (
+        get_pgvector_db,
+        pgvector_collection_version,
+        resolve_connection_string,
+        resolve_collection_name,
+    )
     PGVECTOR_AVAILABLE = True
 except ImportError:
     PGVECTOR_AVAILABLE = False
@@ -22,6 +32,9 @@ def get_vector_db(
     """
     VectorDB 타입과 위치에 따라 적절한 VectorDB 인스턴스를 반환합니다.
 
+    로드된 인스턴스는 프로세스 단위 레지스트리에 보관되며, FAISS 인덱스 파일 또는
+    pgvector 컬렉션 문서 수가 변경된 경우에만 다시 로드합니다.
+
     Args:
         vectordb_type: VectorDB 타입 ("faiss" 또는 "pgvector"). None인 경우 환경 변수에서 읽음.
         vectordb_location: VectorDB 위치 (FAISS: 디렉토리 경로, pgvector: 연결 문자열). None인 경우 환경 변수에서 읽음.
@@ -36,10 +49,28 @@ def get_vector_db(
         vectordb_location = os.getenv("VECTORDB_LOCATION")
 
     if vectordb_type == "faiss":
-        return get_faiss_vector_db(vectordb_location)
+        path = resolve_faiss_path(vectordb_location)
+        return vector_store_registry.get_store(
+            "faiss",
+            path,
+            loader=lambda embeddings: get_faiss_vector_db(path, embeddings=embeddings),
+            version_fn=lambda: faiss_index_version(path),
+        )
     elif vectordb_type == "pgvector":
         if PGVECTOR_AVAILABLE:
-            return get_pgvector_db(vectordb_location)
+            connection_string = resolve_connection_string(vectordb_location)
+            collection_name = resolve_collection_name()
+            return vector_store_registry.get_store(
+                "pgvector",
+                f"{connection_string}#{collection_name}",
+                loader=lambda embeddings: get_pgvector_db(
+                    connection_string, collection_name, embeddings=embeddings
+                ),
+                # 문서 수와 동기화 버전(컬렉션 행 하나의 TTL 캐시된 SQL 조회)이 바뀌면 다시 로드
+                version_fn=lambda: pgvector_collection_version(
+                    connection_string, collection_name
+                ),
+            )
         else:
             raise ImportError(
                 "pgvector 관련 라이브러리가 설치되지 않았습니다. 'pip install pgvector langchain-postgres psycopg[binary]'를 실행하거나 'faiss'를 사용하세요."
@@ -3,36 +3,99 @@ FAISS VectorDB 구현
 """
 
 import os
-from langchain_community.vectorstores import FAISS
-from typing import Optional
+from typing import Optional, Tuple
 
-from llm_utils.llm import get_embeddings
+from llm_utils.llm import get_embeddings, with_build_concurrency
+from llm_utils.vectordb.faiss_index import build_faiss_store
+from llm_utils.vectordb.faiss_shards import load_sharded_store, sharded_store_paths
+from llm_utils.vectordb.faiss_storage import (
+    INDEX_FILE,
+    docstore_file,
+    load_faiss_store,
+    save_faiss_store,
+)
+from llm_utils.vectordb.faiss_versions import (
+    build_version,
+    current_version,
+    resolve_current_path,
+    version_path,
+)
 
 
-def get_faiss_vector_db(vectordb_path: Optional[str] = None):
-    """FAISS 벡터 데이터베이스를 로드하거나 생성합니다."""
-    embeddings = get_embeddings()
-
-    # 기본 경로 설정
+def resolve_faiss_path(vectordb_path: Optional[str] = None) -> str:
+    """FAISS 인덱스 디렉토리의 절대 경로를 반환합니다. None이면 ./table_info_db."""
     if vectordb_path is None:
         vectordb_path = os.path.join(os.getcwd(), "table_info_db")
+    return os.path.abspath(vectordb_path)
+
 
-    try:
-        db = FAISS.load_local(
-            vectordb_path,
-            embeddings,
-            allow_dangerous_deserialization=True,
+def faiss_index_version(vectordb_path: str) -> Optional[Tuple]:
+    """
+    인덱스 파일과 문서 저장소 파일의 (mtime, 크기)로 구성된 버전을 반환합니다. 파일이 없으면 None.
+
+    병합하지 않은 샤드 레이아웃이면 샤드별 버전의 튜플을 반환합니다.
+    버전 관리 디렉토리면 CURRENT가 가리키는 버전 이름을 앞에 붙이므로, 버전을 교체하면 값이 바뀝니다.
+    """
+    version = current_version(vectordb_path)
+    if version is not None:
+        store_version = faiss_index_version(version_path(vectordb_path, version))
+        return (version,) + store_version if store_version is not None else None
+    docstore_path = docstore_file(vectordb_path)
+    if docstore_path is None:
+        shard_paths = sharded_store_paths(vectordb_path)
+        if shard_paths is None:
+            return None
+        versions = tuple(
+            faiss_index_version(path) for path in shard_paths if docstore_file(path) is not None
         )
-        print(f"기존 FAISS 인덱스를 로드했습니다: {vectordb_path}")
-    except Exception as e:
-        print(f"FAISS 인덱스 로드 실패: {e}")
+        return versions if versions and None not in versions else None
+    version = []
+    for path in (os.path.join(vectordb_path, INDEX_FILE), docstore_path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        version.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def get_faiss_vector_db(vectordb_path: Optional[str] = None, embeddings=None):
+    """FAISS 벡터 데이터베이스를 로드하거나 생성합니다."""
+    if embeddings is None:
+        embeddings = get_embeddings()
+
+    # 기본 경로 설정
+    vectordb_path = resolve_faiss_path(vectordb_path)
+
+    # 버전 관리 디렉토리면 CURRENT가 가리키는 버전을 읽음
+    store_path = resolve_current_path(vectordb_path)
+    if faiss_index_version(store_path) is not None:
+        if docstore_file(store_path) is None:
+            # 샤드 레이아웃: 샤드를 동시에 검색하고 상위 k개를 합침
+            db = load_sharded_store(store_path, embeddings)
+            print(f"기존 FAISS 샤드 인덱스를 로드했습니다: {store_path} (샤드 {len(db.shards)}개)")
+        else:
+            # 인덱스는 mmap, 문서는 Arrow 파일에서 필요할 때만 읽음 (pickle 미사용)
+            db = load_faiss_store(store_path, embeddings)
+            print(f"기존 FAISS 인덱스를 로드했습니다: {store_path}")
+    else:
+        print(f"FAISS 인덱스가 없습니다: {vectordb_path}")
         # DataHub 없이도 작동하도록 수정
         try:
             from llm_utils.tools import get_info_from_db
             documents = get_info_from_db()
-            db = FAISS.from_documents(documents, embeddings)
-            db.save_local(vectordb_path)
-            print(f"DataHub에서 VectorDB를 새로 생성했습니다: {vectordb_path}")
+            # 빌드 중에는 RPM/TPM 한도 안에서 동시에 임베딩 (검색용 임베딩은 그대로)
+            build_embeddings = with_build_concurrency(embeddings)
+            from llm_utils.column_index import build_column_index
+
+            def build(path):
+                save_faiss_store(build_faiss_store(documents, build_embeddings), path)
+                build_column_index(documents, build_embeddings, path)
+
+            # 새 버전 디렉토리에 만들고 검증한 뒤 공개 (다른 프로세스는 완성된 인덱스만 봄)
+            version, _ = build_version(vectordb_path, build, embeddings, seed=False)
+            db = load_faiss_store(version_path(vectordb_path, version), embeddings)
+            print(f"DataHub에서 VectorDB를 새로 생성했습니다: {vectordb_path} (버전 {version})")
         except ImportError:
             # DataHub가 없으면 에러 메시지와 함께 종료
             raise FileNotFoundError(
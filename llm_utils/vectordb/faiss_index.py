@@ -0,0 +1,522 @@
+"""
+FAISS 인덱스 타입 선택 모듈
+
+테이블 수가 많은 카탈로그를 위해 flat(정확 검색) 외에 HNSW, IVF-Flat, IVF-PQ 인덱스를 생성합니다.
+IVF/PQ 학습은 전체 벡터 중 일부 샘플로 수행하며, 생성 후 정확 검색 대비 recall@k와
+검색 지연 시간을 측정하여 보고합니다.
+
+벡터 저장 방식(vector_codec):
+    float32: 원본 그대로 저장
+    fp16 / int8: 스칼라 양자화 (메모리 1/2, 1/4)
+    pq: Product Quantization 코드 (가장 큰 카탈로그용)
+손실 압축(fp16/int8/pq, ivf_pq)이면 원본 float32 벡터를 별도 파일(vectors.npy)에 두고
+압축 인덱스에서 k×VECTOR_RERANK_FACTOR개 후보를 찾은 뒤 원본 벡터로 정확한 거리를 다시 계산합니다.
+원본 파일은 mmap으로 열기 때문에 후보 행만 메모리에 올라옵니다.
+
+검색 시점 옵션:
+    ef_search: HNSW 탐색 후보 수 (클수록 정확, 느림)
+    nprobe: IVF에서 탐색할 클러스터 수 (클수록 정확, 느림)
+
+환경 변수:
+    FAISS_INDEX_TYPE: 기본 인덱스 타입 (flat|hnsw|ivf_flat|ivf_pq, 기본값: flat)
+    FAISS_EF_SEARCH: 검색 시 기본 efSearch
+    FAISS_NPROBE: 검색 시 기본 nprobe
+    FAISS_VECTOR_CODEC: 기본 벡터 저장 방식 (float32|fp16|int8|pq, 기본값: float32)
+    VECTOR_RERANK_FACTOR: 정확 재정렬 시 후보 배수 (기본값: 4)
+"""
+
+import math
+import os
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+from langchain.schema import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from llm_utils.vectordb.filters import faiss_id_selector
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+VECTOR_CODECS = ("float32", "fp16", "int8", "pq")
+
+_SQ_TYPES = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+def default_nlist(n_vectors: int) -> int:
+    """벡터 수에 맞는 IVF 클러스터 수(약 4·√n)를 반환합니다."""
+    return max(1, min(n_vectors, int(4 * math.sqrt(n_vectors))))
+
+
+def default_pq_m(dim: int) -> int:
+    """차원을 나누어떨어지게 하는 PQ 서브벡터 수(서브벡터당 약 8차원)를 반환합니다."""
+    for m in range(max(1, dim // 8), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def create_index(
+    dim: int,
+    index_type: str = "flat",
+    n_vectors: int = 0,
+    hnsw_m: int = 32,
+    ef_construction: int = 200,
+    nlist: Optional[int] = None,
+    pq_m: Optional[int] = None,
+    pq_nbits: int = 8,
+    n_train: Optional[int] = None,
+    vector_codec: str = "float32",
+) -> faiss.Index:
+    """
+    학습 전 상태의 L2 거리 FAISS 인덱스를 생성합니다.
+
+    n_train(학습 샘플 수)이 작으면 클러스터 수와 PQ 비트 수를 학습 가능한 범위로 줄입니다.
+    ivf_pq는 항상 PQ 코드를 사용하므로 vector_codec을 무시합니다.
+    """
+    if vector_codec not in VECTOR_CODECS:
+        raise ValueError(
+            f"지원하지 않는 벡터 저장 방식: {vector_codec}. {', '.join(VECTOR_CODECS)} 중 하나를 사용하세요."
+        )
+    n_train = n_train or n_vectors
+    if vector_codec == "pq" or index_type == "ivf_pq":
+        pq_m = pq_m or default_pq_m(dim)
+        if dim % pq_m != 0:
+            raise ValueError(f"pq_m({pq_m})은 임베딩 차원({dim})의 약수여야 합니다.")
+        # 코드북 학습에는 2^nbits개 이상의 벡터가 필요
+        if n_train:
+            pq_nbits = max(1, min(pq_nbits, int(math.log2(n_train))))
+    sq_type = _SQ_TYPES.get(vector_codec)
+
+    if index_type == "flat":
+        if sq_type is not None:
+            return faiss.IndexScalarQuantizer(dim, sq_type, faiss.METRIC_L2)
+        if vector_codec == "pq":
+            return faiss.IndexPQ(dim, pq_m, pq_nbits)
+        return faiss.IndexFlatL2(dim)
+    if index_type == "hnsw":
+        if sq_type is not None:
+            index = faiss.IndexHNSWSQ(dim, sq_type, hnsw_m)
+        elif vector_codec == "pq":
+            index = faiss.IndexHNSWPQ(dim, pq_m, hnsw_m, pq_nbits)
+        else:
+            index = faiss.IndexHNSWFlat(dim, hnsw_m)
+        index.hnsw.efConstruction = ef_construction
+        return index
+
+    nlist = nlist or default_nlist(n_vectors)
+    if n_train:
+        nlist = min(nlist, n_train)
+    quantizer = faiss.IndexFlatL2(dim)
+    if index_type == "ivf_flat":
+        if sq_type is not None:
+            return faiss.IndexIVFScalarQuantizer(quantizer, dim, nlist, sq_type)
+        if vector_codec == "pq":
+            return faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, pq_nbits)
+        return faiss.IndexIVFFlat(quantizer, dim, nlist)
+    if index_type == "ivf_pq":
+        return faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, pq_nbits)
+    raise ValueError(
+        f"지원하지 않는 인덱스 타입: {index_type}. {', '.join(INDEX_TYPES)} 중 하나를 사용하세요."
+    )
+
+
+def is_lossy(index_type: str, vector_codec: str) -> bool:
+    """원본 벡터를 그대로 저장하지 않는 조합이면 True (정확 재정렬 대상)."""
+    return vector_codec != "float32" or index_type == "ivf_pq"
+
+
+def train_index(
+    index: faiss.Index, vectors: np.ndarray, train_sample: Optional[int] = None, seed: int = 0
+) -> None:
+    """IVF 계열 인덱스를 무작위 샘플로 학습합니다. 학습이 필요 없으면 아무것도 하지 않습니다."""
+    if index.is_trained:
+        return
+    if train_sample and train_sample < len(vectors):
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(len(vectors), train_sample, replace=False)]
+    else:
+        sample = vectors
+    start = time.perf_counter()
+    index.train(sample)
+    print(f"🧮 인덱스 학습 완료: 샘플 {len(sample)}개 ({time.perf_counter() - start:.2f}s)")
+
+
+def set_search_defaults(
+    index: faiss.Index, ef_search: Optional[int] = None, nprobe: Optional[int] = None
+) -> None:
+    """검색 시 기본 efSearch/nprobe를 인덱스에 저장합니다 (IVF nprobe 기본값: min(nlist, 8))."""
+    if ef_search and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+    if hasattr(index, "nprobe"):
+        index.nprobe = nprobe or min(index.nlist, 8)
+
+
+def search_parameters(
+    index: faiss.Index,
+    ef_search: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    sel=None,
+) -> Optional[faiss.SearchParameters]:
+    """
+    인덱스 타입에 맞는 검색 파라미터를 만듭니다.
+
+    인덱스 객체의 설정을 바꾸지 않고 호출마다 전달하므로, 여러 스레드가 공유하는 인덱스에도 안전합니다.
+    None이면 FAISS_EF_SEARCH/FAISS_NPROBE 환경 변수, 그것도 없으면 인덱스에 저장된 값을 사용합니다.
+    """
+    if ef_search is None and os.getenv("FAISS_EF_SEARCH"):
+        ef_search = int(os.getenv("FAISS_EF_SEARCH"))
+    if nprobe is None and os.getenv("FAISS_NPROBE"):
+        nprobe = int(os.getenv("FAISS_NPROBE"))
+
+    base = faiss.downcast_index(index)
+    # IDSelector만 넘길 때도 인덱스 타입에 맞는 파라미터 객체가 필요하므로 저장값을 채움
+    if isinstance(base, faiss.IndexHNSW) and (ef_search or sel is not None):
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = ef_search or base.hnsw.efSearch
+    elif isinstance(base, faiss.IndexIVF) and (nprobe or sel is not None):
+        params = faiss.SearchParametersIVF()
+        params.nprobe = nprobe or base.nprobe
+    elif sel is not None:
+        params = faiss.SearchParameters()
+    else:
+        return None
+    if sel is not None:
+        params.sel = sel
+    return params
+
+
+def rerank_exact(
+    queries: np.ndarray,
+    candidates: np.ndarray,
+    exact_vectors: np.ndarray,
+    k: int,
+    inner_product: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """후보 위치들의 원본 벡터로 정확한 거리(L2 제곱 또는 내적)를 계산해 상위 k개를 반환합니다."""
+    distances = np.full((len(queries), k), -np.inf if inner_product else np.inf, dtype=np.float32)
+    positions = np.full((len(queries), k), -1, dtype=np.int64)
+    for row, (query, cand) in enumerate(zip(queries, candidates)):
+        # mmap 파일을 앞에서부터 읽도록 정렬
+        cand = np.unique(cand[cand >= 0])
+        if not len(cand):
+            continue
+        sub = np.asarray(exact_vectors[cand], dtype=np.float32)
+        if inner_product:
+            scores = sub @ query
+            order = np.argsort(-scores)[:k]
+        else:
+            scores = ((sub - query) ** 2).sum(axis=1)
+            order = np.argsort(scores)[:k]
+        distances[row, : len(order)] = scores[order]
+        positions[row, : len(order)] = cand[order]
+    return distances, positions
+
+
+def default_rerank_factor() -> int:
+    return int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+
+
+def widen_for_filter(
+    index: faiss.Index,
+    n_allowed: int,
+    ef_search: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    max_ef_search: int = 4096,
+) -> Tuple[Optional[int], Optional[int]]:
+    """
+    IDSelector로 일부 위치만 허용할 때 ef_search/nprobe를 허용 비율에 반비례하여 늘립니다.
+
+    HNSW/IVF는 허용되지 않은 벡터도 탐색 경로로 사용하므로, 조건에 맞는 테이블이 적으면
+    기본 탐색 범위 안에서 k개를 채우지 못할 수 있습니다.
+    """
+    if n_allowed <= 0 or n_allowed >= index.ntotal:
+        return ef_search, nprobe
+    scale = index.ntotal / n_allowed
+    base = faiss.downcast_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        ef = ef_search or int(os.getenv("FAISS_EF_SEARCH", "0")) or base.hnsw.efSearch
+        ef_search = min(max_ef_search, int(np.ceil(ef * scale)))
+    elif isinstance(base, faiss.IndexIVF):
+        probe = nprobe or int(os.getenv("FAISS_NPROBE", "0")) or base.nprobe
+        nprobe = min(base.nlist, int(np.ceil(probe * scale)))
+    return ef_search, nprobe
+
+
+def search_index(
+    index: faiss.Index,
+    vectors: np.ndarray,
+    k: int,
+    ef_search: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    sel=None,
+    exact_vectors: Optional[np.ndarray] = None,
+    rerank_factor: Optional[int] = None,
+    n_allowed: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    검색 파라미터를 적용해 (거리, 위치) 행렬을 반환합니다.
+
+    exact_vectors(원본 float32 벡터)가 있으면 k×rerank_factor개 후보를 찾은 뒤
+    원본 벡터로 정확한 거리를 계산해 상위 k개를 반환합니다.
+    sel과 함께 허용 위치 수(n_allowed)를 주면 허용 비율에 맞춰 탐색 범위를 넓힙니다.
+    """
+    if sel is not None and n_allowed is not None:
+        ef_search, nprobe = widen_for_filter(index, n_allowed, ef_search, nprobe)
+    params = search_parameters(index, ef_search=ef_search, nprobe=nprobe, sel=sel)
+    fetch_k = k if exact_vectors is None else k * (rerank_factor or default_rerank_factor())
+    if params is None:
+        distances, positions = index.search(vectors, fetch_k)
+    else:
+        distances, positions = index.search(vectors, fetch_k, params=params)
+    if exact_vectors is None:
+        return distances, positions
+    return rerank_exact(
+        vectors,
+        positions,
+        exact_vectors,
+        k,
+        inner_product=index.metric_type == faiss.METRIC_INNER_PRODUCT,
+    )
+
+
+class RerankingFAISS(FAISS):
+    """
+    손실 압축 인덱스에서 후보를 찾고 원본 벡터로 점수를 다시 계산하는 FAISS 스토어
+
+    exact_vectors가 None이면 FAISS와 동일하게 동작합니다. 점수는 float32 정확 검색과 같은 척도입니다.
+    """
+
+    def __init__(self, *args, exact_vectors: Optional[np.ndarray] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.exact_vectors = exact_vectors
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter=None,
+        fetch_k: int = 20,
+        filters: Optional[Dict] = None,
+        **kwargs,
+    ) -> List[Tuple[Document, float]]:
+        """
+        filters(database/schema/tags/owners 조건)를 주면 조건에 맞는 위치만 IDSelector로 검색합니다.
+        LangChain의 filter(검색 후 거르기)를 주면 fetch_k개를 찾은 뒤 거릅니다.
+        삭제 표시(tombstone)된 위치는 항상 제외합니다.
+        """
+        sel, n_allowed = faiss_id_selector(self, filters)
+        if sel is None and (filter is not None or self.exact_vectors is None):
+            return super().similarity_search_with_score_by_vector(
+                embedding, k=k, filter=filter, fetch_k=fetch_k, **kwargs
+            )
+
+        if n_allowed == 0:
+            return []
+        vector = np.asarray([embedding], dtype=np.float32)
+        if self._normalize_L2:
+            faiss.normalize_L2(vector)
+        n_fetch = k if filter is None else fetch_k
+        scores, positions = search_index(
+            self.index,
+            vector,
+            n_fetch if n_allowed is None else min(n_fetch, n_allowed),
+            sel=sel,
+            exact_vectors=self.exact_vectors,
+            n_allowed=n_allowed,
+        )
+        results = []
+        for score, position in zip(scores[0], positions[0]):
+            if position == -1:
+                continue
+            doc = self.docstore.search(self.index_to_docstore_id[position])
+            if isinstance(doc, Document):
+                results.append((doc, float(score)))
+        if filter is not None:
+            filter_func = self._create_filter_func(filter)
+            results = [(doc, score) for doc, score in results if filter_func(doc.metadata)][:k]
+        return results
+
+
+def evaluate_recall(
+    index: faiss.Index,
+    vectors: np.ndarray,
+    k: int = 10,
+    n_queries: int = 200,
+    ef_search: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    seed: int = 0,
+    exact_vectors: Optional[np.ndarray] = None,
+) -> Dict[str, float]:
+    """
+    정확 검색(flat) 대비 recall@k와 질의당 평균 검색 시간을 측정합니다.
+
+    인덱스에 들어간 벡터 중 일부를 질의로 사용합니다. exact_vectors를 주면 정확 재정렬 후 결과도 측정합니다.
+    """
+    k = min(k, len(vectors))
+    rng = np.random.default_rng(seed)
+    n_queries = min(n_queries, len(vectors))
+    queries = vectors[rng.choice(len(vectors), n_queries, replace=False)]
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    start = time.perf_counter()
+    _, truth = exact.search(queries, k)
+    exact_ms = (time.perf_counter() - start) * 1000 / n_queries
+
+    start = time.perf_counter()
+    _, found = search_index(index, queries, k, ef_search=ef_search, nprobe=nprobe)
+    ann_ms = (time.perf_counter() - start) * 1000 / n_queries
+
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    report = {
+        f"recall@{k}": hits / (n_queries * k),
+        "exact_ms_per_query": exact_ms,
+        "ann_ms_per_query": ann_ms,
+        "n_queries": n_queries,
+    }
+    if exact_vectors is not None:
+        start = time.perf_counter()
+        _, reranked = search_index(
+            index, queries, k, ef_search=ef_search, nprobe=nprobe, exact_vectors=exact_vectors
+        )
+        report["reranked_ms_per_query"] = (time.perf_counter() - start) * 1000 / n_queries
+        hits = sum(len(set(t) & set(f)) for t, f in zip(truth, reranked))
+        report[f"reranked_recall@{k}"] = hits / (n_queries * k)
+    return report
+
+
+def stored_vectors(index: faiss.Index, exact_vectors: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    인덱스에 들어 있는 벡터를 위치 순서대로 반환합니다 (다시 임베딩하지 않고 인덱스를 재구성할 때 사용).
+
+    손실 압축 인덱스는 원본 벡터(exact_vectors)를, 그 외에는 인덱스에서 복원한 벡터를 사용합니다.
+    """
+    if exact_vectors is not None:
+        return np.asarray(exact_vectors, dtype=np.float32)
+    base = faiss.downcast_index(index)
+    if isinstance(base, faiss.IndexIVF):
+        base.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def build_faiss_store(
+    documents: Sequence[Document],
+    embeddings,
+    index_type: Optional[str] = None,
+    hnsw_m: int = 32,
+    ef_construction: int = 200,
+    nlist: Optional[int] = None,
+    pq_m: Optional[int] = None,
+    pq_nbits: int = 8,
+    train_sample: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    recall_k: int = 10,
+    vector_codec: Optional[str] = None,
+) -> RerankingFAISS:
+    """
+    지정한 인덱스 타입/벡터 저장 방식으로 LangChain FAISS 스토어를 생성합니다.
+
+    정확 검색(flat + float32)이 아니면 생성 후 정확 검색 대비 recall@k를 출력합니다. ef_search/nprobe는
+    인덱스에 기본값으로 저장되며 검색 시 search_tables 인자로 덮어쓸 수 있습니다.
+    손실 압축이면 원본 벡터를 exact_vectors로 보관하여 저장 시 vectors.npy로 기록합니다.
+    """
+    texts = [doc.page_content for doc in documents]
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    return build_faiss_store_from_vectors(
+        documents,
+        vectors,
+        embeddings,
+        index_type=index_type,
+        hnsw_m=hnsw_m,
+        ef_construction=ef_construction,
+        nlist=nlist,
+        pq_m=pq_m,
+        pq_nbits=pq_nbits,
+        train_sample=train_sample,
+        ef_search=ef_search,
+        nprobe=nprobe,
+        recall_k=recall_k,
+        vector_codec=vector_codec,
+    )
+
+
+def build_faiss_store_from_vectors(
+    documents: Sequence[Document],
+    vectors: np.ndarray,
+    embeddings,
+    index_type: Optional[str] = None,
+    hnsw_m: int = 32,
+    ef_construction: int = 200,
+    nlist: Optional[int] = None,
+    pq_m: Optional[int] = None,
+    pq_nbits: int = 8,
+    train_sample: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    recall_k: int = 10,
+    vector_codec: Optional[str] = None,
+) -> RerankingFAISS:
+    """이미 계산한 임베딩(documents와 같은 순서)으로 build_faiss_store와 같은 스토어를 생성합니다."""
+    index_type = (index_type or os.getenv("FAISS_INDEX_TYPE", "flat")).lower()
+    vector_codec = (vector_codec or os.getenv("FAISS_VECTOR_CODEC", "float32")).lower()
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    index = create_index(
+        vectors.shape[1],
+        index_type,
+        n_vectors=len(vectors),
+        hnsw_m=hnsw_m,
+        ef_construction=ef_construction,
+        nlist=nlist,
+        pq_m=pq_m,
+        pq_nbits=pq_nbits,
+        n_train=min(train_sample or len(vectors), len(vectors)),
+        vector_codec=vector_codec,
+    )
+    train_index(index, vectors, train_sample)
+    start = time.perf_counter()
+    index.add(vectors)
+    print(
+        f"🏗️ {index_type}/{vector_codec} 인덱스 생성 완료: {index.ntotal}개 벡터 "
+        f"({time.perf_counter() - start:.2f}s, "
+        f"{len(faiss.serialize_index(index)) / max(vectors.nbytes, 1):.2f}× float32 크기)"
+    )
+
+    set_search_defaults(index, ef_search, nprobe)
+
+    exact_vectors = vectors if is_lossy(index_type, vector_codec) else None
+    if (index_type != "flat" or exact_vectors is not None) and len(vectors) > 1:
+        k = min(recall_k, len(vectors))
+        report = evaluate_recall(index, vectors, k=k, exact_vectors=exact_vectors)
+        print(
+            f"📈 정확 검색 대비 recall@{k}: {report[f'recall@{k}']:.4f} "
+            f"(exact {report['exact_ms_per_query']:.3f}ms / "
+            f"{index_type} {report['ann_ms_per_query']:.3f}ms per query)"
+        )
+        if exact_vectors is not None:
+            print(
+                f"📈 정확 재정렬 후 recall@{k}: {report[f'reranked_recall@{k}']:.4f} "
+                f"({report['reranked_ms_per_query']:.3f}ms per query)"
+            )
+
+    ids: List[str] = [doc.id or str(uuid.uuid4()) for doc in documents]
+    docstore = InMemoryDocstore(
+        {
+            doc_id: Document(id=doc_id, page_content=doc.page_content, metadata=doc.metadata)
+            for doc_id, doc in zip(ids, documents)
+        }
+    )
+    return RerankingFAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=dict(enumerate(ids)),
+        exact_vectors=exact_vectors,
+    )
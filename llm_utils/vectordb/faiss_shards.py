@@ -0,0 +1,503 @@
+"""
+FAISS 샤드 인덱스 모듈 (create_faiss.py --shards N)
+
+컬럼이 수백만 개인 카탈로그는 한 프로세스에서 인덱스 하나를 만들면 CPU와 메모리가 한계에 닿습니다.
+테이블 키의 해시로 카탈로그를 N개 샤드로 나누고, 프로세스 풀에서 샤드마다 임베딩과 인덱스 생성을 합니다.
+
+- 각 샤드는 완전한 FAISS 스토어(index.faiss, docstore.arrow, manifest.json, columns/)이며 faiss_sync로
+  증분 갱신하므로, 다시 빌드하면 샤드마다 바뀐 테이블만 임베딩합니다.
+- 샤드 레이아웃(기본값): 검색 시 샤드를 스레드로 동시에 검색하고(FAISS 검색은 GIL을 풀어 줌)
+  샤드별 상위 k개를 점수로 합칩니다(ShardedFAISS).
+- 병합(merge=True): 샤드를 OUTPUT_DIR의 단일 인덱스로 합칩니다. flat/float32 인덱스는 FAISS merge_from으로
+  벡터를 다시 계산하지 않고 이어 붙이고, 학습이 필요한 인덱스(IVF/PQ/SQ)와 HNSW는 샤드마다 독립적으로
+  학습/연결되어 그대로 합칠 수 없으므로 샤드에 저장된 벡터로 한 번 다시 만듭니다(재임베딩 없음).
+  샤드는 다음 증분 빌드를 위해 남겨 둡니다.
+
+디렉토리 구조:
+    OUTPUT_DIR/shards.json              {"format": ..., "n_shards": 4, "merged": false, "settings": {...}}
+    OUTPUT_DIR/shards/shard-00000/      샤드 스토어 (columns/ 포함)
+    OUTPUT_DIR/index.faiss ...          병합한 경우에만 (있으면 샤드 대신 이 인덱스를 사용)
+
+샤드 수를 바꾸면 테이블이 다른 샤드로 옮겨 가므로 샤드를 모두 다시 만듭니다.
+"""
+
+import hashlib
+import heapq
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+from langchain.schema import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.vectorstores import VectorStore
+
+from llm_utils.table_document import document_key
+from llm_utils.vectordb.faiss_index import (
+    RerankingFAISS,
+    build_faiss_store_from_vectors,
+    search_index,
+    stored_vectors,
+)
+from llm_utils.vectordb.faiss_storage import (
+    DOCSTORE_FILE,
+    EXACT_VECTORS_FILE,
+    INDEX_FILE,
+    ArrowDocstore,
+    docstore_file,
+    load_faiss_store,
+    save_faiss_store,
+)
+from llm_utils.vectordb.faiss_sync import MANIFEST_FILE, read_manifest, write_manifest
+from llm_utils.vectordb.filters import faiss_id_selector
+
+SHARDS_FILE = "shards.json"
+SHARDS_DIR = "shards"
+SHARDS_FORMAT = "lang2sql-faiss-shards-1"
+COLUMN_INDEX_DIR = "columns"  # column_index.COLUMN_INDEX_DIR (column_index가 faiss_db를 import하므로 중복 정의)
+
+
+def shard_of(key: str, n_shards: int) -> int:
+    """테이블 키가 속한 샤드 번호 (프로세스/실행과 무관하게 항상 같음)."""
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % n_shards
+
+
+def shard_path(vectordb_path: str, shard: int) -> str:
+    return os.path.join(vectordb_path, SHARDS_DIR, f"shard-{shard:05d}")
+
+
+def read_shard_layout(vectordb_path: str) -> Optional[Dict[str, Any]]:
+    """shards.json을 읽습니다. 없거나 형식이 다르면 None."""
+    try:
+        with open(os.path.join(vectordb_path, SHARDS_FILE), encoding="utf-8") as f:
+            layout = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return layout if layout.get("format") == SHARDS_FORMAT else None
+
+
+def sharded_store_paths(vectordb_path: str) -> Optional[List[str]]:
+    """샤드 레이아웃이면 샤드 디렉토리 목록, 아니면 None."""
+    layout = read_shard_layout(vectordb_path)
+    if layout is None:
+        return None
+    return [shard_path(vectordb_path, shard) for shard in range(layout["n_shards"])]
+
+
+def search_faiss_store(
+    db,
+    vectors: np.ndarray,
+    k: int,
+    ef_search: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    filters: Optional[Dict] = None,
+) -> List[List[Tuple[Document, float]]]:
+    """질문 벡터 행렬로 FAISS 스토어(단일 또는 샤드)를 검색합니다. filters가 있으면 조건에 맞는 위치만 검색합니다."""
+    if isinstance(db, ShardedFAISS):
+        return db.search_batch(vectors, k, ef_search=ef_search, nprobe=nprobe, filters=filters)
+
+    sel, n_allowed = faiss_id_selector(db, filters)
+    if n_allowed == 0:
+        return [[] for _ in range(len(vectors))]
+    if n_allowed is not None:
+        k = min(k, n_allowed)
+
+    if db._normalize_L2:
+        faiss.normalize_L2(vectors)
+    scores, indices = search_index(
+        db.index,
+        vectors,
+        k,
+        ef_search=ef_search,
+        nprobe=nprobe,
+        sel=sel,
+        exact_vectors=getattr(db, "exact_vectors", None),
+        n_allowed=n_allowed,
+    )
+
+    results = []
+    for row_scores, row_indices in zip(scores, indices):
+        doc_res = []
+        for score, i in zip(row_scores, row_indices):
+            if i == -1:
+                continue
+            doc = db.docstore.search(db.index_to_docstore_id[i])
+            if isinstance(doc, Document):
+                doc_res.append((doc, float(score)))
+        results.append(doc_res)
+    return results
+
+
+class ShardedFAISS(VectorStore):
+    """여러 FAISS 샤드를 동시에 검색하고 상위 k개를 합치는 벡터 스토어"""
+
+    def __init__(
+        self,
+        shards: Sequence[RerankingFAISS],
+        embedding_function,
+        max_workers: Optional[int] = None,
+    ):
+        self.shards = list(shards)
+        self.embedding_function = embedding_function
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or len(self.shards) or 1)
+
+    @property
+    def embeddings(self):
+        return self.embedding_function
+
+    def _higher_is_better(self) -> bool:
+        return any(
+            shard.distance_strategy == DistanceStrategy.MAX_INNER_PRODUCT for shard in self.shards
+        )
+
+    def search_batch(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        ef_search: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[List[Tuple[Document, float]]]:
+        """모든 샤드에서 질문마다 상위 k개를 찾고 점수 순으로 합칩니다."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        futures = [
+            # normalize_L2가 질문 행렬을 제자리에서 바꾸므로 샤드마다 복사본 사용
+            self._executor.submit(
+                search_faiss_store, shard, vectors.copy(), k, ef_search, nprobe, filters
+            )
+            for shard in self.shards
+        ]
+        per_shard = [future.result() for future in futures]
+        pick = heapq.nlargest if self._higher_is_better() else heapq.nsmallest
+        return [
+            pick(
+                k,
+                (pair for shard_results in per_shard for pair in shard_results[row]),
+                key=lambda pair: pair[1],
+            )
+            for row in range(len(vectors))
+        ]
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filters: Optional[Dict] = None,
+        ef_search: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        return self.search_batch(
+            np.asarray([embedding], dtype=np.float32),
+            k,
+            ef_search=ef_search,
+            nprobe=nprobe,
+            filters=filters,
+        )[0]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(
+            self.embedding_function.embed_query(query), k=k, **kwargs
+        )
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        return [
+            doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k=k, **kwargs)
+        ]
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, **kwargs):
+        raise NotImplementedError("ShardedFAISS는 build_sharded_catalog로 생성합니다.")
+
+
+def load_sharded_store(vectordb_path: str, embeddings) -> ShardedFAISS:
+    """샤드 레이아웃의 모든 샤드를 열어 ShardedFAISS로 반환합니다 (비어 있는 샤드는 제외)."""
+    paths = sharded_store_paths(vectordb_path)
+    if paths is None:
+        raise FileNotFoundError(f"FAISS 샤드 레이아웃이 아닙니다: {vectordb_path}")
+    shards = [
+        load_faiss_store(path, embeddings) for path in paths if docstore_file(path) is not None
+    ]
+    return ShardedFAISS(shards, embeddings)
+
+
+def _build_shard(
+    path: str,
+    documents: List[Document],
+    embeddings_factory: Callable,
+    embedding_id: str,
+    build_kwargs: Dict[str, Any],
+    column_vector_codec: Optional[str],
+    build_columns: bool,
+    compact_threshold: Optional[float],
+    full_rebuild: bool,
+    embedding_limits: Dict[str, Any],
+    omp_threads: int,
+) -> Dict[str, Any]:
+    """프로세스 풀 작업: 샤드 하나를 임베딩하고 증분 갱신합니다."""
+    from llm_utils.column_index import sync_column_index
+    from llm_utils.llm.concurrent_embeddings import embedding_build_stats, with_build_concurrency
+    from llm_utils.vectordb.faiss_sync import sync_faiss_store
+
+    if not documents:
+        # 이전에 테이블이 있던 샤드가 비었으면 남은 스토어를 지움
+        shutil.rmtree(path, ignore_errors=True)
+        empty = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0, "embedded": 0}
+        return {"tables": empty, "columns": empty, "embedding": None}
+
+    faiss.omp_set_num_threads(omp_threads)
+    embeddings = with_build_concurrency(embeddings_factory(), **embedding_limits)
+    stats = {
+        "tables": sync_faiss_store(
+            path,
+            {document_key(doc.page_content, doc.metadata): [doc] for doc in documents},
+            embeddings,
+            embedding_id,
+            build_kwargs,
+            compact_threshold=compact_threshold,
+            full_rebuild=full_rebuild,
+        )
+    }
+    if build_columns:
+        stats["columns"] = sync_column_index(
+            documents,
+            embeddings,
+            path,
+            embedding_id,
+            vector_codec=column_vector_codec,
+            full_rebuild=full_rebuild,
+        )
+    stats["embedding"] = embedding_build_stats(embeddings)
+    return stats
+
+
+def _worker_embedding_limits(
+    workers: int,
+    max_concurrency: Optional[int],
+    rpm: Optional[float],
+    tpm: Optional[float],
+    batch_size: Optional[int],
+) -> Dict[str, Any]:
+    """공급자 한도는 프로세스 전체 합계이므로 워커 수로 나눕니다."""
+    if max_concurrency is None:
+        max_concurrency = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+    if rpm is None and os.getenv("EMBEDDING_RPM"):
+        rpm = float(os.environ["EMBEDDING_RPM"])
+    if tpm is None and os.getenv("EMBEDDING_TPM"):
+        tpm = float(os.environ["EMBEDDING_TPM"])
+    return {
+        "max_concurrency": max(1, -(-max_concurrency // workers)),
+        "rpm": rpm / workers if rpm else None,
+        "tpm": tpm / workers if tpm else None,
+        "batch_size": batch_size,
+    }
+
+
+def _live_entries(path: str):
+    """샤드 스토어의 (manifest group, 살아 있는 위치 배열, 문서 저장소, 인덱스, 원본 벡터)."""
+    manifest = read_manifest(path)
+    docstore = ArrowDocstore(os.path.join(path, DOCSTORE_FILE))
+    index = faiss.read_index(os.path.join(path, INDEX_FILE))
+    vectors_path = os.path.join(path, EXACT_VECTORS_FILE)
+    exact = np.load(vectors_path, mmap_mode="r") if os.path.exists(vectors_path) else None
+    live = np.array(
+        sorted(p for group in manifest["groups"].values() for p in group["positions"]),
+        dtype=np.int64,
+    )
+    return manifest, live, docstore, index, exact
+
+
+def merge_shard_stores(
+    paths: Iterable[str],
+    output_dir: str,
+    embeddings,
+    build_kwargs: Dict[str, Any],
+) -> int:
+    """
+    샤드 스토어들을 output_dir의 단일 스토어로 합치고 manifest를 다시 씁니다. 벡터 수를 반환합니다.
+
+    모든 샤드가 삭제 표시 없는 flat/float32 인덱스면 merge_from으로 이어 붙이고,
+    그 외에는 샤드에 저장된 벡터로 인덱스를 다시 만듭니다.
+    """
+    entries = [_live_entries(path) for path in paths if docstore_file(path) is not None]
+    entries = [entry for entry in entries if entry[0] is not None and len(entry[1])]
+    if not entries:
+        print(f"⚠️ 병합할 샤드가 없습니다: {output_dir}")
+        return 0
+
+    documents: List[Document] = []
+    groups: Dict[str, Dict[str, Any]] = {}
+    mergeable = True
+    for manifest, live, docstore, index, exact in entries:
+        remap = {int(old): len(documents) + new for new, old in enumerate(live)}
+        documents.extend(docstore.document_at(int(p)) for p in live)
+        for key, group in manifest["groups"].items():
+            groups[key] = {"hash": group["hash"], "positions": [remap[p] for p in group["positions"]]}
+        mergeable = (
+            mergeable
+            and type(faiss.downcast_index(index)) in (faiss.IndexFlatL2, faiss.IndexFlatIP)
+            and len(live) == index.ntotal
+        )
+
+    first = entries[0]
+    if mergeable:
+        index = faiss.downcast_index(first[3])
+        for _, _, _, other, _ in entries[1:]:
+            index.merge_from(faiss.downcast_index(other), 0)
+        print(f"🧩 샤드 {len(entries)}개를 merge_from으로 병합: {index.ntotal}개 벡터")
+        docstore = first[2]
+        ids = [doc.id for doc in documents]
+        db = RerankingFAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=InMemoryDocstore(dict(zip(ids, documents))),
+            index_to_docstore_id=dict(enumerate(ids)),
+            normalize_L2=json.loads(docstore.schema_metadata.get("normalize_L2", "false")),
+            distance_strategy=DistanceStrategy(
+                docstore.schema_metadata.get(
+                    "distance_strategy", DistanceStrategy.EUCLIDEAN_DISTANCE.value
+                )
+            ),
+        )
+    else:
+        vectors = np.vstack(
+            [stored_vectors(index, exact)[live] for _, live, _, index, exact in entries]
+        )
+        print(f"🧩 샤드 {len(entries)}개의 저장된 벡터로 인덱스를 다시 만듭니다: {len(vectors)}개 벡터")
+        db = build_faiss_store_from_vectors(documents, vectors, embeddings, **build_kwargs)
+
+    save_faiss_store(db, output_dir)
+    write_manifest(output_dir, {**first[0], "groups": groups})
+    return db.index.ntotal
+
+
+def _remove_single_store(vectordb_path: str) -> None:
+    """샤드 레이아웃으로 바꿀 때 OUTPUT_DIR에 남은 단일(병합) 스토어를 지웁니다."""
+    for name in (INDEX_FILE, DOCSTORE_FILE, EXACT_VECTORS_FILE, MANIFEST_FILE, "index.pkl"):
+        path = os.path.join(vectordb_path, name)
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(os.path.join(vectordb_path, COLUMN_INDEX_DIR), ignore_errors=True)
+
+
+def _pool_context():
+    # spawn: 부모의 OpenMP 스레드/SQLite 연결을 물려받지 않음 (스크립트는 __main__ 가드 필요)
+    return multiprocessing.get_context("spawn")
+
+
+def build_sharded_catalog(
+    documents: Sequence[Document],
+    output_dir: str,
+    n_shards: int,
+    embedding_id: str,
+    build_kwargs: Optional[Dict[str, Any]] = None,
+    column_vector_codec: Optional[str] = None,
+    embeddings_factory: Optional[Callable] = None,
+    processes: Optional[int] = None,
+    merge: bool = False,
+    build_columns: bool = True,
+    compact_threshold: Optional[float] = None,
+    full_rebuild: bool = False,
+    max_concurrency: Optional[int] = None,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    테이블 문서를 n_shards개 샤드로 나누어 프로세스 풀에서 샤드 스토어를 만들고 레이아웃을 기록합니다.
+
+    embeddings_factory는 워커 프로세스에서 임베딩 클라이언트를 만드는 함수(피클 가능, 기본값 get_embeddings)입니다.
+    RPM/TPM/동시 요청 수는 전체 합계이며 워커 수로 나누어 적용합니다.
+    merge=True면 샤드를 output_dir의 단일 인덱스로 합칩니다.
+    테이블 인덱스의 added/updated/deleted/unchanged/embedded 합계를 반환합니다.
+    """
+    if embeddings_factory is None:
+        from llm_utils.llm import get_embeddings
+
+        embeddings_factory = get_embeddings
+    build_kwargs = dict(build_kwargs or {})
+    n_shards = max(1, n_shards)
+    workers = max(1, min(processes or os.cpu_count() or 1, n_shards))
+
+    layout = read_shard_layout(output_dir)
+    if layout is not None and layout["n_shards"] != n_shards:
+        print(f"🧹 샤드 수가 바뀌어 샤드를 다시 만듭니다: {layout['n_shards']} → {n_shards}")
+        shutil.rmtree(os.path.join(output_dir, SHARDS_DIR), ignore_errors=True)
+
+    shard_documents: List[List[Document]] = [[] for _ in range(n_shards)]
+    for doc in documents:
+        shard_documents[shard_of(document_key(doc.page_content, doc.metadata), n_shards)].append(doc)
+    print(
+        f"🔀 테이블 {len(documents)}개를 샤드 {n_shards}개로 나누어 프로세스 {workers}개로 빌드합니다 "
+        f"(샤드당 {min(map(len, shard_documents))}~{max(map(len, shard_documents))}개)"
+    )
+
+    limits = _worker_embedding_limits(workers, max_concurrency, rpm, tpm, batch_size)
+    omp_threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        futures = [
+            pool.submit(
+                _build_shard,
+                shard_path(output_dir, shard),
+                docs,
+                embeddings_factory,
+                embedding_id,
+                build_kwargs,
+                column_vector_codec,
+                build_columns,
+                compact_threshold,
+                full_rebuild,
+                limits,
+                omp_threads,
+            )
+            for shard, docs in enumerate(shard_documents)
+        ]
+        results = [future.result() for future in futures]
+
+    totals = {name: 0 for name in ("added", "updated", "deleted", "unchanged", "embedded")}
+    for result in results:
+        for name in totals:
+            totals[name] += result["tables"][name]
+    for name in ("documents", "tokens", "requests", "throttled"):
+        totals[f"embedding_{name}"] = sum(
+            (result["embedding"] or {}).get(name, 0) for result in results
+        )
+
+    os.makedirs(output_dir, exist_ok=True)
+    layout = {
+        "format": SHARDS_FORMAT,
+        "n_shards": n_shards,
+        "merged": merge,
+        "settings": {"embedding": embedding_id, **build_kwargs},
+    }
+    with open(os.path.join(output_dir, SHARDS_FILE + ".tmp"), "w", encoding="utf-8") as f:
+        json.dump(layout, f, ensure_ascii=False)
+    os.replace(os.path.join(output_dir, SHARDS_FILE + ".tmp"), os.path.join(output_dir, SHARDS_FILE))
+
+    paths = [shard_path(output_dir, shard) for shard in range(n_shards)]
+    if merge:
+        embeddings = embeddings_factory()
+        merge_shard_stores(paths, output_dir, embeddings, build_kwargs)
+        if build_columns:
+            merge_shard_stores(
+                [os.path.join(path, COLUMN_INDEX_DIR) for path in paths],
+                os.path.join(output_dir, COLUMN_INDEX_DIR),
+                embeddings,
+                {"index_type": "flat", "vector_codec": column_vector_codec},
+            )
+    else:
+        _remove_single_store(output_dir)
+    return totals
@@ -0,0 +1,364 @@
+"""
+FAISS 인덱스 저장 형식 모듈 (pickle 미사용)
+
+디렉토리 구성:
+    index.faiss     FAISS 벡터 인덱스. 메모리 매핑(mmap)으로 읽어 여러 프로세스가 페이지 캐시를 공유합니다.
+    docstore.arrow  문서 저장소 (Arrow IPC 파일, 비압축). 역시 mmap으로 열고 필요한 행만 읽습니다.
+    vectors.npy     (손실 압축 인덱스일 때만) 정확 재정렬용 원본 float32 벡터. mmap으로 엽니다.
+
+docstore.arrow 컬럼:
+    id, page_content, metadata(JSON)  인덱스 위치(행 번호) 순서의 문서
+    id_hash, id_row                   문서 ID 해시 오름차순 정렬 배열과 해당 행 번호 (ID → 행 이진 탐색용)
+
+삭제된 행(tombstone, faiss_sync의 증분 갱신)은 id가 빈 문자열이고 ID 탐색 배열에서 빠지며,
+검색 시 IDSelector로 제외됩니다. 압축(compaction) 때 인덱스를 다시 만들면서 사라집니다.
+
+버전 관리하지 않는 디렉토리에 다시 저장하면 파일을 하나씩 교체하므로, 읽는 쪽이 새 docstore.arrow와
+이전 index.faiss를 함께 열 수 있습니다. load_faiss_store는 세 파일의 행 수가 같은지 확인하고 다르면 다시 읽습니다.
+(같은 디렉토리에 columns/, manifest.json, LOCK이 함께 있어 디렉토리 통째 교체는 하지 않음.
+ 원자적 교체가 필요하면 faiss_versions의 CURRENT 포인터를 사용)
+
+기존 형식(index.pkl)은 pickle 역직렬화가 필요하므로 FAISS_ALLOW_PICKLE=true일 때만 읽으며,
+읽은 뒤 같은 디렉토리에 새 형식으로 변환하여 저장합니다.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections.abc import Mapping
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+import faiss
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from langchain.schema import Document
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+
+from llm_utils.vectordb.faiss_index import RerankingFAISS
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.arrow"
+LEGACY_DOCSTORE_FILE = "index.pkl"
+EXACT_VECTORS_FILE = "vectors.npy"
+FORMAT_VERSION = "lang2sql-faiss-arrow-1"
+# 삭제된 인덱스 위치의 문서 ID
+TOMBSTONE_ID = ""
+# 저장 중인 파일을 섞어 읽었을 때 다시 읽는 횟수
+LOAD_RETRIES = 5
+
+_MMAP_FLAGS = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+
+
+def _id_hash(doc_id: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def docstore_file(vectordb_path: str) -> Optional[str]:
+    """디렉토리의 문서 저장소 파일 경로를 반환합니다 (새 형식 우선). 없으면 None."""
+    for name in (DOCSTORE_FILE, LEGACY_DOCSTORE_FILE):
+        path = os.path.join(vectordb_path, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _column_numpy(table: pa.Table, name: str) -> np.ndarray:
+    column = table.column(name)
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy(zero_copy_only=True)
+    return column.to_numpy()
+
+
+class ArrowDocstore(Docstore):
+    """mmap한 Arrow 파일에서 문서를 필요할 때만 읽는 읽기 전용 docstore"""
+
+    def __init__(self, path: str):
+        self.path = path
+        reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+        self.schema_metadata = {
+            k.decode(): v.decode() for k, v in (reader.schema.metadata or {}).items()
+        }
+        # 단일 배치면 컬럼이 mmap 영역을 그대로 가리킴 (복사 없음).
+        # 스트리밍 빌드로 여러 배치에 나눠 쓴 파일은 ID 해시 배열만 하나로 합침
+        table = reader.read_all()
+        ids = table.column("id")
+        self._ids = ids.chunk(0) if ids.num_chunks == 1 else ids
+        self._contents = table.column("page_content")
+        self._metadata = table.column("metadata")
+        if table.num_rows:
+            self._hashes = _column_numpy(table, "id_hash")
+            self._hash_rows = _column_numpy(table, "id_row")
+        else:
+            self._ids = pa.array([], pa.string())
+            self._hashes = np.empty(0, dtype=np.uint64)
+            self._hash_rows = np.empty(0, dtype=np.int64)
+        self._deleted: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def id_at(self, row: int) -> str:
+        return self._ids[row].as_py()
+
+    def document_at(self, row: int) -> Document:
+        """행 번호(= FAISS 인덱스 위치)의 문서를 읽습니다."""
+        metadata = self._metadata[row].as_py()
+        return Document(
+            id=self.id_at(row),
+            page_content=self._contents[row].as_py(),
+            metadata=json.loads(metadata) if metadata else {},
+        )
+
+    def iter_metadata(self) -> Iterator[dict]:
+        """행 순서대로 metadata만 읽습니다 (Document를 만들지 않음)."""
+        for chunk in self._metadata.chunks:
+            for metadata in chunk.to_pylist():
+                yield json.loads(metadata) if metadata else {}
+
+    def deleted_positions(self) -> np.ndarray:
+        """삭제 표시(tombstone)된 행 번호 배열을 반환합니다."""
+        if self._deleted is None:
+            if len(self._ids):
+                mask = pc.equal(self._ids, TOMBSTONE_ID).to_numpy(zero_copy_only=False)
+                self._deleted = np.flatnonzero(mask).astype(np.int64)
+            else:
+                self._deleted = np.empty(0, dtype=np.int64)
+        return self._deleted
+
+    def row_of(self, doc_id: str) -> Optional[int]:
+        """문서 ID의 행 번호를 해시 이진 탐색으로 찾습니다."""
+        if doc_id == TOMBSTONE_ID:
+            return None
+        target = np.uint64(_id_hash(doc_id))
+        pos = int(np.searchsorted(self._hashes, target))
+        while pos < len(self._hashes) and self._hashes[pos] == target:
+            row = int(self._hash_rows[pos])
+            if row >= 0 and self.id_at(row) == doc_id:
+                return row
+            pos += 1
+        return None
+
+    def search(self, search: str) -> Union[str, Document]:
+        row = self.row_of(search)
+        if row is None:
+            return f"ID {search} not found."
+        return self.document_at(row)
+
+
+class ArrowIndexToDocstoreId(Mapping):
+    """FAISS 인덱스 위치 → 문서 ID 매핑. 행 번호가 곧 인덱스 위치이므로 별도 딕셔너리를 만들지 않습니다."""
+
+    def __init__(self, docstore: ArrowDocstore):
+        self.docstore = docstore
+
+    def __getitem__(self, position: int) -> str:
+        if not 0 <= position < len(self.docstore):
+            raise KeyError(position)
+        return self.docstore.id_at(position)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self.docstore)))
+
+    def __len__(self) -> int:
+        return len(self.docstore)
+
+
+def id_hashes(ids: Sequence[str]) -> np.ndarray:
+    """문서 ID 목록의 해시 배열 (docstore.arrow의 ID 탐색용)."""
+    return np.array([_id_hash(doc_id) for doc_id in ids], dtype=np.uint64)
+
+
+def write_docstore(
+    path: str,
+    batches: Iterable[Tuple[Sequence[str], Sequence[str], Sequence[str]]],
+    hashes: np.ndarray,
+    live: Optional[np.ndarray] = None,
+    distance_strategy: str = DistanceStrategy.EUCLIDEAN_DISTANCE.value,
+    normalize_L2: bool = False,
+) -> None:
+    """
+    (ID, page_content, metadata JSON) 배치들을 docstore.arrow 형식으로 씁니다.
+
+    hashes는 행 순서의 ID 해시, live는 삭제되지 않은 행 표시(None이면 모두 유효)입니다.
+    배치를 차례로 쓰므로 문서 전체를 메모리에 올리지 않고도 쓸 수 있습니다.
+    """
+    live_rows = np.arange(len(hashes)) if live is None else np.flatnonzero(live)
+    order = np.argsort(hashes[live_rows], kind="stable")
+    # 삭제된 행 수만큼 (최댓값, -1)로 채워 컬럼 길이를 맞춤 (정렬 순서 유지)
+    n_pad = len(hashes) - len(live_rows)
+    sorted_hashes = np.concatenate(
+        [hashes[live_rows][order], np.full(n_pad, np.iinfo(np.uint64).max, dtype=np.uint64)]
+    )
+    sorted_rows = np.concatenate(
+        [live_rows[order].astype(np.int64), np.full(n_pad, -1, dtype=np.int64)]
+    )
+
+    schema = pa.schema(
+        [
+            ("id", pa.string()),
+            ("page_content", pa.large_string()),
+            ("metadata", pa.large_string()),
+            ("id_hash", pa.uint64()),
+            ("id_row", pa.int64()),
+        ],
+        metadata={
+            "format": FORMAT_VERSION,
+            "distance_strategy": str(distance_strategy),
+            "normalize_L2": json.dumps(bool(normalize_L2)),
+        },
+    )
+    offset = 0
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            for ids, contents, metadatas in batches:
+                if not len(ids):
+                    continue
+                end = offset + len(ids)
+                writer.write_batch(
+                    pa.record_batch(
+                        [
+                            pa.array(ids, pa.string()),
+                            pa.array(contents, pa.large_string()),
+                            pa.array(metadatas, pa.large_string()),
+                            pa.array(sorted_hashes[offset:end], pa.uint64()),
+                            pa.array(sorted_rows[offset:end], pa.int64()),
+                        ],
+                        schema=schema,
+                    )
+                )
+                offset = end
+    if offset != len(hashes):
+        raise ValueError(f"docstore 행 수({offset})가 ID 해시 수({len(hashes)})와 다릅니다.")
+
+
+def save_faiss_store(db: FAISS, vectordb_path: str) -> None:
+    """
+    FAISS 스토어를 index.faiss + docstore.arrow 형식으로 저장합니다.
+
+    index_to_docstore_id가 TOMBSTONE_ID인 위치는 삭제된 행으로 저장합니다.
+    """
+    os.makedirs(vectordb_path, exist_ok=True)
+
+    ids, contents, metadatas = [], [], []
+    for position in range(db.index.ntotal):
+        doc_id = db.index_to_docstore_id[position]
+        if doc_id == TOMBSTONE_ID:
+            ids.append(TOMBSTONE_ID)
+            contents.append("")
+            metadatas.append("")
+            continue
+        doc = db.docstore.search(doc_id)
+        if not isinstance(doc, Document):
+            raise ValueError(f"docstore에 문서가 없습니다: {doc_id}")
+        ids.append(doc_id)
+        contents.append(doc.page_content)
+        metadatas.append(json.dumps(doc.metadata or {}, ensure_ascii=False, default=str))
+
+    live = np.array([doc_id != TOMBSTONE_ID for doc_id in ids], dtype=bool)
+    hashes = np.array(
+        [_id_hash(doc_id) if alive else 0 for doc_id, alive in zip(ids, live)],
+        dtype=np.uint64,
+    )
+
+    # 임시 파일에 쓴 뒤 교체하여, 이미 mmap으로 열려 있는 파일을 덮어쓰지 않음
+    docstore_path = os.path.join(vectordb_path, DOCSTORE_FILE)
+    index_path = os.path.join(vectordb_path, INDEX_FILE)
+    write_docstore(
+        docstore_path + ".tmp",
+        [(ids, contents, metadatas)],
+        hashes,
+        live=live,
+        distance_strategy=str(db.distance_strategy.value),
+        normalize_L2=bool(db._normalize_L2),
+    )
+    faiss.write_index(db.index, index_path + ".tmp")
+    os.replace(docstore_path + ".tmp", docstore_path)
+
+    vectors_path = os.path.join(vectordb_path, EXACT_VECTORS_FILE)
+    exact_vectors = getattr(db, "exact_vectors", None)
+    if exact_vectors is not None:
+        with open(vectors_path + ".tmp", "wb") as f:
+            np.save(f, np.asarray(exact_vectors, dtype=np.float32))
+        os.replace(vectors_path + ".tmp", vectors_path)
+    elif os.path.exists(vectors_path):
+        os.remove(vectors_path)
+
+    # 인덱스 파일을 마지막에 교체 (버전 판단 기준)
+    os.replace(index_path + ".tmp", index_path)
+
+    legacy_path = os.path.join(vectordb_path, LEGACY_DOCSTORE_FILE)
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+
+def read_faiss_index(index_path: str) -> faiss.Index:
+    """FAISS 인덱스를 mmap으로 읽습니다. 지원하지 않는 인덱스면 일반 읽기로 대체합니다."""
+    try:
+        return faiss.read_index(index_path, _MMAP_FLAGS)
+    except RuntimeError:
+        return faiss.read_index(index_path)
+
+
+def load_faiss_store(vectordb_path: str, embeddings) -> RerankingFAISS:
+    """index.faiss + docstore.arrow (+ vectors.npy) 형식의 FAISS 스토어를 엽니다."""
+    docstore_path = os.path.join(vectordb_path, DOCSTORE_FILE)
+    if not os.path.exists(docstore_path):
+        return _migrate_legacy_store(vectordb_path, embeddings)
+
+    vectors_path = os.path.join(vectordb_path, EXACT_VECTORS_FILE)
+    for attempt in range(LOAD_RETRIES):
+        docstore = ArrowDocstore(docstore_path)
+        index = read_faiss_index(os.path.join(vectordb_path, INDEX_FILE))
+        exact_vectors = (
+            np.load(vectors_path, mmap_mode="r") if os.path.exists(vectors_path) else None
+        )
+        # 다른 프로세스가 save_faiss_store로 파일을 교체하는 중이면 행 수가 어긋남
+        if len(docstore) == index.ntotal and (
+            exact_vectors is None or len(exact_vectors) == index.ntotal
+        ):
+            break
+        time.sleep(0.05 * (attempt + 1))
+    else:
+        raise ValueError(
+            f"FAISS 인덱스({index.ntotal}개)와 docstore({len(docstore)}개)의 행 수가 다릅니다: "
+            f"{vectordb_path}"
+        )
+    return RerankingFAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=ArrowIndexToDocstoreId(docstore),
+        normalize_L2=json.loads(docstore.schema_metadata.get("normalize_L2", "false")),
+        distance_strategy=DistanceStrategy(
+            docstore.schema_metadata.get(
+                "distance_strategy", DistanceStrategy.EUCLIDEAN_DISTANCE.value
+            )
+        ),
+        exact_vectors=exact_vectors,
+    )
+
+
+def _migrate_legacy_store(vectordb_path: str, embeddings) -> FAISS:
+    """index.pkl 형식을 새 형식으로 변환합니다 (FAISS_ALLOW_PICKLE=true 필요)."""
+    if not os.path.exists(os.path.join(vectordb_path, LEGACY_DOCSTORE_FILE)):
+        raise FileNotFoundError(f"FAISS 문서 저장소를 찾을 수 없습니다: {vectordb_path}")
+    if os.getenv("FAISS_ALLOW_PICKLE", "false").lower() != "true":
+        raise ValueError(
+            f"이전 형식(index.pkl)의 FAISS 인덱스입니다: {vectordb_path}\n"
+            "pickle 역직렬화는 기본적으로 사용하지 않습니다. 해결 방법:\n"
+            "1. create_faiss.py로 인덱스를 다시 생성하세요\n"
+            "2. 또는 신뢰할 수 있는 파일이라면 FAISS_ALLOW_PICKLE=true로 한 번 실행하여 새 형식으로 변환하세요"
+        )
+
+    legacy = FAISS.load_local(
+        vectordb_path, embeddings, allow_dangerous_deserialization=True
+    )
+    save_faiss_store(legacy, vectordb_path)
+    print(f"FAISS 인덱스를 새 저장 형식(docstore.arrow)으로 변환했습니다: {vectordb_path}")
+    return load_faiss_store(vectordb_path, embeddings)
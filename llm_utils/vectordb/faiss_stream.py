@@ -0,0 +1,386 @@
+"""
+FAISS 인덱스 스트리밍 빌드 모듈 (create_faiss.py --stream)
+
+아주 큰 CSV/Parquet 카탈로그를 한 번에 메모리에 올리지 않고 인덱스를 만듭니다.
+
+- 카탈로그를 chunk 단위로 읽으며(catalog_source.iter_catalog_documents) 테이블 문서를 하나씩 만듭니다.
+- checkpoint_every개 테이블마다 모은 문서를 batch_size개씩 동시에 임베딩하고(llm.concurrent_embeddings,
+  RPM/TPM 한도와 429 백오프 적용), 문서와 벡터를 작업 디렉토리에 조각(part)으로 쓰고 state.json을 갱신합니다.
+  중간에 실패하면 같은 명령으로 다시 실행했을 때 마지막 체크포인트 다음 테이블부터 이어서 임베딩합니다.
+- 카탈로그를 모두 읽으면 조각을 차례로 읽어 인덱스에 추가하고(IVF/PQ는 전체 조각에서 뽑은 샘플로 학습),
+  docstore.arrow/vectors.npy도 조각 단위로 써서 최종 디렉토리로 교체합니다.
+  manifest.json도 함께 기록하므로 이후에는 faiss_sync로 증분 갱신할 수 있습니다.
+
+메모리에는 인덱스와 체크포인트 한 구간의 문서/벡터만 유지합니다.
+
+작업 디렉토리 (<output_dir>.partial/):
+    state.json                 처리한 테이블 수, 조각 수, 빌드 설정, 카탈로그 파일 정보
+    tables/part-00000.arrow    조각 문서 (id, page_content, metadata)
+    tables/part-00000.npy      조각 벡터 (float32)
+    tables/part-00000.json     조각의 manifest group (키 → 해시, 조각 안 상대 위치)
+    columns/...                컬럼 인덱스 조각 (형식 동일)
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+import faiss
+import numpy as np
+import pyarrow as pa
+from langchain.schema import Document
+
+from llm_utils.catalog_source import (
+    catalog_fingerprint,
+    iter_catalog_documents,
+    iter_catalog_rows,
+)
+from llm_utils.column_index import COLUMN_INDEX_DIR, build_column_documents
+from llm_utils.llm.concurrent_embeddings import with_build_concurrency
+from llm_utils.table_document import document_key
+from llm_utils.vectordb.faiss_index import create_index, is_lossy, set_search_defaults
+from llm_utils.vectordb.faiss_storage import (
+    DOCSTORE_FILE,
+    EXACT_VECTORS_FILE,
+    INDEX_FILE,
+    LEGACY_DOCSTORE_FILE,
+    id_hashes,
+    write_docstore,
+)
+from llm_utils.vectordb.faiss_sync import MANIFEST_FORMAT, group_hash, write_manifest
+
+STATE_FILE = "state.json"
+# IVF/PQ 학습 샘플 수 기본값 (train_sample을 지정하지 않았을 때)
+DEFAULT_STREAM_TRAIN_SAMPLE = 100_000
+
+_PART_SCHEMA = pa.schema(
+    [("id", pa.string()), ("page_content", pa.large_string()), ("metadata", pa.large_string())]
+)
+
+
+def _part_path(part_dir: str, part: int, ext: str) -> str:
+    return os.path.join(part_dir, f"part-{part:05d}.{ext}")
+
+
+def _replace_json(path: str, value: Dict[str, Any]) -> None:
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(value, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+class _PartWriter:
+    """한 인덱스(테이블 또는 컬럼)의 문서를 모았다가 임베딩하여 조각 파일로 쓰는 클래스"""
+
+    def __init__(self, part_dir: str, embeddings):
+        self.part_dir = part_dir
+        self.embeddings = embeddings
+        os.makedirs(part_dir, exist_ok=True)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.documents: List[Document] = []
+        self.groups: Dict[str, Dict[str, Any]] = {}
+
+    def add_group(self, key: str, documents: Sequence[Document]) -> None:
+        start = len(self.documents)
+        self.documents.extend(documents)
+        self.groups[key] = {
+            "hash": group_hash(documents),
+            "offsets": list(range(start, len(self.documents))),
+        }
+
+    def flush(self, part: int) -> int:
+        """모은 문서를 임베딩하고 조각 파일을 씁니다. 조각의 문서 수를 반환합니다."""
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in self.documents])
+        n_docs = len(self.documents)
+
+        batch = pa.record_batch(
+            [
+                pa.array([str(uuid.uuid4()) for _ in self.documents], pa.string()),
+                pa.array([doc.page_content for doc in self.documents], pa.large_string()),
+                pa.array(
+                    [
+                        json.dumps(doc.metadata or {}, ensure_ascii=False, default=str)
+                        for doc in self.documents
+                    ],
+                    pa.large_string(),
+                ),
+            ],
+            schema=_PART_SCHEMA,
+        )
+        arrow_path = _part_path(self.part_dir, part, "arrow")
+        with pa.OSFile(arrow_path + ".tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, _PART_SCHEMA) as writer:
+                writer.write_batch(batch)
+        os.replace(arrow_path + ".tmp", arrow_path)
+
+        npy_path = _part_path(self.part_dir, part, "npy")
+        with open(npy_path + ".tmp", "wb") as f:
+            np.save(f, np.asarray(vectors, dtype=np.float32))
+        os.replace(npy_path + ".tmp", npy_path)
+
+        _replace_json(_part_path(self.part_dir, part, "json"), {"groups": self.groups})
+        self._reset()
+        return n_docs
+
+
+def _remove_parts_from(part_dir: str, first_invalid: int) -> None:
+    """체크포인트에 기록되지 않은(중단 시점에 쓰다 만) 조각 파일을 지웁니다."""
+    if not os.path.isdir(part_dir):
+        return
+    for name in os.listdir(part_dir):
+        if not name.startswith("part-"):
+            continue
+        number = name[len("part-") :].split(".", 1)[0]
+        if not number.isdigit() or int(number) >= first_invalid or name.endswith(".tmp"):
+            os.remove(os.path.join(part_dir, name))
+
+
+def _load_part_vectors(part_dir: str, n_parts: int) -> List[np.ndarray]:
+    return [np.load(_part_path(part_dir, part, "npy"), mmap_mode="r") for part in range(n_parts)]
+
+
+def _sample_rows(parts: List[np.ndarray], n_sample: int, seed: int = 0) -> np.ndarray:
+    """전체 조각에서 무작위로 n_sample개 벡터를 모읍니다 (IVF/PQ 학습용)."""
+    sizes = np.array([len(part) for part in parts])
+    total = int(sizes.sum())
+    rows = np.sort(np.random.default_rng(seed).choice(total, min(n_sample, total), replace=False))
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    sample = []
+    for part, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        local = rows[(rows >= start) & (rows < end)] - start
+        if len(local):
+            sample.append(np.asarray(parts[part][local], dtype=np.float32))
+    return np.vstack(sample)
+
+
+def finalize_parts(
+    part_dir: str,
+    n_parts: int,
+    output_dir: str,
+    settings: Dict[str, Any],
+    build_kwargs: Dict[str, Any],
+) -> int:
+    """
+    조각들로 인덱스/docstore/manifest를 만들어 output_dir에 씁니다. 인덱스 벡터 수를 반환합니다.
+
+    인덱스 파일을 마지막에 교체하므로, 실행 중인 앱은 교체가 끝난 뒤 새 인덱스를 읽습니다.
+    """
+    parts = _load_part_vectors(part_dir, n_parts)
+    sizes = [len(part) for part in parts]
+    total = sum(sizes)
+    if total == 0:
+        print(f"⚠️ 인덱싱할 문서가 없습니다: {output_dir}")
+        return 0
+    dim = next(part.shape[1] for part in parts if len(part))
+
+    index_type = (build_kwargs.get("index_type") or os.getenv("FAISS_INDEX_TYPE", "flat")).lower()
+    vector_codec = (
+        build_kwargs.get("vector_codec") or os.getenv("FAISS_VECTOR_CODEC", "float32")
+    ).lower()
+    n_train = min(build_kwargs.get("train_sample") or DEFAULT_STREAM_TRAIN_SAMPLE, total)
+    index = create_index(
+        dim,
+        index_type,
+        n_vectors=total,
+        hnsw_m=build_kwargs.get("hnsw_m", 32),
+        ef_construction=build_kwargs.get("ef_construction", 200),
+        nlist=build_kwargs.get("nlist"),
+        pq_m=build_kwargs.get("pq_m"),
+        pq_nbits=build_kwargs.get("pq_nbits", 8),
+        n_train=n_train,
+        vector_codec=vector_codec,
+    )
+    if not index.is_trained:
+        start = time.perf_counter()
+        index.train(_sample_rows(parts, n_train))
+        print(f"🧮 인덱스 학습 완료: 샘플 {n_train}개 ({time.perf_counter() - start:.2f}s)")
+    start = time.perf_counter()
+    for part in parts:
+        if len(part):
+            index.add(np.ascontiguousarray(part, dtype=np.float32))
+    set_search_defaults(index, build_kwargs.get("ef_search"), build_kwargs.get("nprobe"))
+    print(
+        f"🏗️ {index_type}/{vector_codec} 인덱스 생성 완료: {index.ntotal}개 벡터 "
+        f"({time.perf_counter() - start:.2f}s)"
+    )
+
+    os.makedirs(output_dir, exist_ok=True)
+    docstore_path = os.path.join(output_dir, DOCSTORE_FILE)
+    index_path = os.path.join(output_dir, INDEX_FILE)
+    vectors_path = os.path.join(output_dir, EXACT_VECTORS_FILE)
+
+    hashes = []
+    for part in range(n_parts):
+        with pa.memory_map(_part_path(part_dir, part, "arrow"), "r") as source:
+            ids = pa.ipc.open_file(source).read_all().column("id").to_pylist()
+        hashes.append(id_hashes(ids))
+
+    def batches():
+        for part in range(n_parts):
+            with pa.memory_map(_part_path(part_dir, part, "arrow"), "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+                yield (
+                    table.column("id").to_pylist(),
+                    table.column("page_content").to_pylist(),
+                    table.column("metadata").to_pylist(),
+                )
+
+    write_docstore(docstore_path + ".tmp", batches(), np.concatenate(hashes))
+    faiss.write_index(index, index_path + ".tmp")
+    os.replace(docstore_path + ".tmp", docstore_path)
+
+    if is_lossy(index_type, vector_codec):
+        exact = np.lib.format.open_memmap(
+            vectors_path + ".tmp", mode="w+", dtype=np.float32, shape=(total, dim)
+        )
+        offset = 0
+        for part in parts:
+            if len(part):
+                exact[offset : offset + len(part)] = part
+                offset += len(part)
+        exact.flush()
+        del exact
+        os.replace(vectors_path + ".tmp", vectors_path)
+    elif os.path.exists(vectors_path):
+        os.remove(vectors_path)
+
+    groups, offset = {}, 0
+    for part, size in enumerate(sizes):
+        with open(_part_path(part_dir, part, "json"), encoding="utf-8") as f:
+            for key, group in json.load(f)["groups"].items():
+                groups[key] = {
+                    "hash": group["hash"],
+                    "positions": [offset + i for i in group["offsets"]],
+                }
+        offset += size
+    write_manifest(
+        output_dir,
+        {"format": MANIFEST_FORMAT, "settings": settings, "groups": groups},
+    )
+
+    # 인덱스 파일을 마지막에 교체 (버전 판단 기준)
+    os.replace(index_path + ".tmp", index_path)
+    legacy_path = os.path.join(output_dir, LEGACY_DOCSTORE_FILE)
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+    return index.ntotal
+
+
+def stream_build_catalog(
+    catalog_path: str,
+    output_dir: str,
+    embeddings,
+    embedding_id: str,
+    build_kwargs: Optional[Dict[str, Any]] = None,
+    column_vector_codec: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    checkpoint_every: int = 1000,
+    chunk_rows: int = 10000,
+    build_columns: bool = True,
+    work_dir: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    카탈로그 파일을 스트리밍으로 읽어 테이블 인덱스(output_dir)와 컬럼 인덱스(output_dir/columns)를 만듭니다.
+
+    같은 인자로 다시 실행하면 마지막 체크포인트부터 이어서 진행합니다. 카탈로그 파일이나 빌드 설정이
+    바뀌었으면 처음부터 다시 시작합니다. 처리한 테이블 수와 이번 실행에서 건너뛴 테이블 수를 반환합니다.
+    임베딩은 with_build_concurrency로 감싸 batch_size개씩(None이면 EMBEDDING_BATCH_SIZE) 동시에 요청합니다.
+    work_dir는 체크포인트 디렉토리입니다 (None이면 <output_dir>.partial). output_dir가 실행마다 바뀌는
+    경우(버전 디렉토리)에도 이어서 진행하려면 고정된 경로를 넘깁니다.
+    """
+    build_kwargs = dict(build_kwargs or {})
+    if work_dir is None:
+        work_dir = output_dir.rstrip("/\\") + ".partial"
+    state_path = os.path.join(work_dir, STATE_FILE)
+    table_settings = {"embedding": embedding_id}
+    table_settings.update({k: v for k, v in build_kwargs.items() if k != "recall_k"})
+    column_settings = {
+        "embedding": embedding_id,
+        "index_type": "flat",
+        "vector_codec": column_vector_codec,
+    }
+    state = {
+        "settings": {"tables": table_settings, "columns": column_settings if build_columns else None},
+        "source": catalog_fingerprint(catalog_path),
+        "tables_done": 0,
+        "parts": 0,
+        "documents": {"tables": 0, "columns": 0},
+    }
+
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = None
+    if (
+        previous is not None
+        and previous.get("settings") == state["settings"]
+        and previous.get("source") == state["source"]
+    ):
+        state = previous
+        print(
+            f"♻️ 체크포인트에서 이어서 진행합니다: 테이블 {state['tables_done']}개 처리됨 "
+            f"(조각 {state['parts']}개)"
+        )
+    elif os.path.isdir(work_dir):
+        print(f"🧹 설정 또는 카탈로그가 바뀌어 이전 작업을 버립니다: {work_dir}")
+        shutil.rmtree(work_dir)
+    os.makedirs(work_dir, exist_ok=True)
+
+    embeddings = with_build_concurrency(embeddings, batch_size=batch_size)
+    writers = {"tables": _PartWriter(os.path.join(work_dir, "tables"), embeddings)}
+    if build_columns:
+        writers["columns"] = _PartWriter(os.path.join(work_dir, "columns"), embeddings)
+    for writer in writers.values():
+        _remove_parts_from(writer.part_dir, state["parts"])
+
+    resumed_from = state["tables_done"]
+    start = time.perf_counter()
+
+    def checkpoint(tables_done: int) -> None:
+        for name, writer in writers.items():
+            state["documents"][name] += writer.flush(state["parts"])
+        state["parts"] += 1
+        state["tables_done"] = tables_done
+        _replace_json(state_path, state)
+        elapsed = time.perf_counter() - start
+        rate = (tables_done - resumed_from) / elapsed if elapsed else 0.0
+        print(
+            f"💾 체크포인트: 테이블 {tables_done}개 처리 "
+            f"(컬럼 {state['documents']['columns']}개, {rate:.1f} tables/s)"
+        )
+
+    pending = 0
+    n_tables = resumed_from
+    documents = iter_catalog_documents(iter_catalog_rows(catalog_path, chunk_rows))
+    for n_tables, doc in enumerate(documents, 1):
+        if n_tables <= resumed_from:
+            continue
+        key = document_key(doc.page_content, doc.metadata)
+        writers["tables"].add_group(key, [doc])
+        if build_columns:
+            writers["columns"].add_group(key, build_column_documents([doc]))
+        pending += 1
+        if pending >= checkpoint_every:
+            checkpoint(n_tables)
+            pending = 0
+    if pending:
+        checkpoint(n_tables)
+
+    finalize_parts(
+        writers["tables"].part_dir, state["parts"], output_dir, table_settings, build_kwargs
+    )
+    if build_columns:
+        finalize_parts(
+            writers["columns"].part_dir,
+            state["parts"],
+            os.path.join(output_dir, COLUMN_INDEX_DIR),
+            column_settings,
+            {"index_type": "flat", "vector_codec": column_vector_codec},
+        )
+    shutil.rmtree(work_dir)
+    return {"tables": n_tables, "resumed_from": resumed_from}
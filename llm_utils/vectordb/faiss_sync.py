@@ -0,0 +1,405 @@
+"""
+FAISS 인덱스 증분 갱신 모듈 (create_faiss.py)
+
+인덱스 디렉토리에 테이블별 내용 해시와 인덱스 위치를 manifest.json으로 기록해 두고,
+다음 빌드에서는 새 테이블/바뀐 테이블만 임베딩하여 기존 인덱스 뒤에 추가합니다.
+
+- 바뀐 테이블과 사라진 테이블의 기존 위치는 삭제 표시(tombstone)만 하고 인덱스에서 바로 빼지 않습니다
+  (HNSW 등은 개별 삭제를 지원하지 않음). 검색은 IDSelector로 삭제된 위치를 제외합니다.
+- 삭제된 위치 비율(단편화)이 FAISS_COMPACT_THRESHOLD를 넘거나 인덱스 설정이 바뀌면 압축(compaction)합니다.
+  압축은 살아 있는 벡터(손실 압축이면 vectors.npy의 원본, 아니면 인덱스에서 복원)로 인덱스를
+  다시 만들므로 임베딩을 다시 호출하지 않으며, IVF/PQ는 이때 다시 학습합니다.
+- 임베딩 모델이 바뀌었거나 manifest가 없으면 전체를 다시 임베딩합니다.
+  테이블 단위 수정(patch_faiss_store)은 manifest가 없는 예전 인덱스면 docstore로 manifest를 만들어 사용합니다.
+
+manifest.json:
+    {
+        "format": "lang2sql-faiss-manifest-1",
+        "settings": {"embedding": "openai/text-embedding-3-small", "index_type": "hnsw", ...},
+        "groups": {"sales.orders": {"hash": "...", "positions": [0]}, ...},
+    }
+    group은 갱신 단위(테이블)이며, 컬럼 인덱스에서는 한 테이블의 컬럼 문서들이 하나의 group입니다.
+
+환경 변수:
+    FAISS_COMPACT_THRESHOLD: 압축을 시작할 삭제 위치 비율 (기본값: 0.2)
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import faiss
+import numpy as np
+from langchain.schema import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+
+from llm_utils.table_document import content_hash, document_key, get_table_record
+from llm_utils.vectordb.faiss_index import (
+    RerankingFAISS,
+    build_faiss_store,
+    build_faiss_store_from_vectors,
+    stored_vectors,
+)
+from llm_utils.vectordb.faiss_storage import (
+    DOCSTORE_FILE,
+    EXACT_VECTORS_FILE,
+    INDEX_FILE,
+    TOMBSTONE_ID,
+    ArrowDocstore,
+    save_faiss_store,
+)
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_FORMAT = "lang2sql-faiss-manifest-1"
+
+
+def group_hash(documents: Sequence[Document]) -> str:
+    """group에 속한 문서들의 내용 해시를 하나로 합칩니다."""
+    digest = hashlib.sha256()
+    for doc in documents:
+        digest.update(content_hash(doc.page_content, doc.metadata).encode("ascii"))
+    return digest.hexdigest()
+
+
+def read_manifest(vectordb_path: str) -> Optional[Dict[str, Any]]:
+    """manifest.json을 읽습니다. 없거나 형식이 다르면 None."""
+    path = os.path.join(vectordb_path, MANIFEST_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == MANIFEST_FORMAT else None
+
+
+def write_manifest(vectordb_path: str, manifest: Dict[str, Any]) -> None:
+    path = os.path.join(vectordb_path, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def docstore_groups(vectordb_path: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    manifest.json 없이 만든 인덱스(예전 create_faiss.py, 배포된 table_info_db 등)의 docstore로
+    manifest group({키: {"hash", "positions"}})을 만듭니다. docstore가 없으면 None.
+
+    구조화 metadata가 없는 문서는 page_content에서 읽은 테이블명을 키로 사용하므로,
+    같은 테이블명으로 upsert하면 기존 문서를 교체합니다.
+    """
+    path = os.path.join(vectordb_path, DOCSTORE_FILE)
+    if not os.path.exists(path):
+        return None
+    docstore = ArrowDocstore(path)
+    deleted = set(docstore.deleted_positions().tolist())
+    members: Dict[str, List[int]] = {}
+    documents: Dict[str, List[Document]] = {}
+    for position in range(len(docstore)):
+        if position in deleted:
+            continue
+        doc = docstore.document_at(position)
+        record = get_table_record(doc)
+        key = str(record["table_name"]) if record else document_key(doc.page_content, doc.metadata)
+        members.setdefault(key, []).append(position)
+        documents.setdefault(key, []).append(doc)
+    return {
+        key: {"hash": group_hash(documents[key]), "positions": positions}
+        for key, positions in members.items()
+    }
+
+
+def _bootstrap_manifest(vectordb_path: str, embedding_id: str) -> Optional[Dict[str, Any]]:
+    """manifest가 없는 인덱스의 manifest를 docstore와 인덱스 타입으로 만듭니다 (현재 임베딩 모델로 만든 것으로 간주)."""
+    groups = docstore_groups(vectordb_path)
+    if groups is None:
+        return None
+    print(f"📝 manifest.json이 없는 인덱스입니다. docstore로 manifest를 만들어 갱신합니다: {vectordb_path}")
+    settings: Dict[str, Any] = {"embedding": embedding_id}
+    index = faiss.read_index(os.path.join(vectordb_path, INDEX_FILE))
+    if isinstance(index, faiss.IndexFlat) and not os.path.exists(
+        os.path.join(vectordb_path, EXACT_VECTORS_FILE)
+    ):
+        settings.update({"index_type": "flat", "vector_codec": "float32"})
+    return _manifest(settings, groups)
+
+
+def _manifest(settings: Dict[str, Any], groups: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {"format": MANIFEST_FORMAT, "settings": settings, "groups": groups}
+
+
+def _full_build(
+    vectordb_path: str,
+    groups: Mapping[str, Sequence[Document]],
+    embeddings,
+    settings: Dict[str, Any],
+    build_kwargs: Dict[str, Any],
+) -> Dict[str, int]:
+    documents, entries = [], {}
+    for key, docs in groups.items():
+        entries[key] = {
+            "hash": group_hash(docs),
+            "positions": list(range(len(documents), len(documents) + len(docs))),
+        }
+        documents.extend(docs)
+    save_faiss_store(build_faiss_store(documents, embeddings, **build_kwargs), vectordb_path)
+    write_manifest(vectordb_path, _manifest(settings, entries))
+    return {
+        "added": len(groups),
+        "updated": 0,
+        "deleted": 0,
+        "unchanged": 0,
+        "embedded": len(documents),
+    }
+
+
+def sync_faiss_store(
+    vectordb_path: str,
+    groups: Mapping[str, Sequence[Document]],
+    embeddings,
+    embedding_id: str,
+    build_kwargs: Optional[Dict[str, Any]] = None,
+    compact_threshold: Optional[float] = None,
+    full_rebuild: bool = False,
+) -> Dict[str, int]:
+    """
+    groups({갱신 단위 키: 문서 목록})와 같아지도록 FAISS 인덱스 디렉토리를 갱신합니다.
+
+    build_kwargs는 build_faiss_store 인자(index_type, vector_codec, hnsw_m, ...)이며,
+    embedding_id(임베딩 공급자/모델)와 함께 manifest에 기록되어 설정 변경 여부를 판단합니다.
+    added/updated/deleted/unchanged(group 수)와 embedded(임베딩한 문서 수)를 반환합니다.
+    """
+    build_kwargs = dict(build_kwargs or {})
+    if compact_threshold is None:
+        compact_threshold = float(os.getenv("FAISS_COMPACT_THRESHOLD", "0.2"))
+    settings = {"embedding": embedding_id}
+    settings.update({k: v for k, v in build_kwargs.items() if k != "recall_k"})
+
+    if not any(groups.values()):
+        print(f"⚠️ 인덱싱할 문서가 없어 인덱스를 갱신하지 않습니다: {vectordb_path}")
+        return {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0, "embedded": 0}
+
+    manifest = None if full_rebuild else read_manifest(vectordb_path)
+    if (
+        manifest is None
+        or manifest["settings"].get("embedding") != embedding_id
+        or not os.path.exists(os.path.join(vectordb_path, DOCSTORE_FILE))
+    ):
+        print(f"🏗️ 전체 인덱스를 생성합니다: {vectordb_path}")
+        return _full_build(vectordb_path, groups, embeddings, settings, build_kwargs)
+
+    old_groups = manifest["groups"]
+    hashes = {key: group_hash(docs) for key, docs in groups.items()}
+    changed = {
+        key: docs
+        for key, docs in groups.items()
+        if old_groups.get(key, {}).get("hash") != hashes[key]
+    }
+    removed = [key for key in old_groups if key not in groups]
+    stats = {
+        "added": sum(1 for key in changed if key not in old_groups),
+        "updated": sum(1 for key in changed if key in old_groups),
+        "deleted": len(removed),
+        "unchanged": len(groups) - len(changed),
+        "embedded": 0,
+    }
+    if not changed and not removed and manifest["settings"] == settings:
+        print(f"✅ 변경된 테이블이 없습니다: {vectordb_path}")
+        return stats
+
+    stats["embedded"] = _apply_changes(
+        vectordb_path,
+        manifest,
+        settings,
+        build_kwargs,
+        list(groups),
+        hashes,
+        changed,
+        removed,
+        embeddings,
+        compact_threshold,
+    )
+    return stats
+
+
+def patch_faiss_store(
+    vectordb_path: str,
+    upserts: Mapping[str, Sequence[Document]],
+    deletes: Sequence[str],
+    embeddings,
+    embedding_id: str,
+    compact_threshold: Optional[float] = None,
+) -> Dict[str, int]:
+    """
+    지정한 group만 추가/교체(upserts)하거나 삭제(deletes)합니다. 나머지 group은 manifest 그대로 유지합니다.
+
+    sync_faiss_store와 달리 전체 group 목록이 필요 없으므로, 테이블 하나를 고칠 때 바뀐 문서만 임베딩합니다.
+    인덱스 설정은 manifest에 기록된 값을 그대로 사용하며, 임베딩 모델이 다르면 ValueError.
+    manifest가 없는 예전 인덱스는 docstore로 manifest를 만들어(docstore_groups) 갱신 후 함께 저장합니다.
+    """
+    if compact_threshold is None:
+        compact_threshold = float(os.getenv("FAISS_COMPACT_THRESHOLD", "0.2"))
+    manifest = None
+    if os.path.exists(os.path.join(vectordb_path, DOCSTORE_FILE)):
+        manifest = read_manifest(vectordb_path) or _bootstrap_manifest(vectordb_path, embedding_id)
+    if manifest is None:
+        raise ValueError(f"증분 갱신할 수 있는 FAISS 인덱스(docstore.arrow)가 없습니다: {vectordb_path}")
+    settings = manifest["settings"]
+    if settings.get("embedding") != embedding_id:
+        raise ValueError(
+            f"인덱스의 임베딩 모델({settings.get('embedding')})과 현재 모델({embedding_id})이 다릅니다. "
+            "create_faiss.py로 전체를 다시 만드세요."
+        )
+    build_kwargs = {k: v for k, v in settings.items() if k != "embedding"}
+
+    old_groups = manifest["groups"]
+    deleted = {key for key in deletes if key in old_groups and key not in upserts}
+    hashes = {key: group["hash"] for key, group in old_groups.items() if key not in deleted}
+    changed = {}
+    for key, docs in upserts.items():
+        new_hash = group_hash(docs)
+        if old_groups.get(key, {}).get("hash") != new_hash:
+            changed[key] = docs
+        hashes[key] = new_hash
+    stats = {
+        "added": sum(1 for key in changed if key not in old_groups),
+        "updated": sum(1 for key in changed if key in old_groups),
+        "deleted": len(deleted),
+        "unchanged": len(hashes) - len(changed),
+        "embedded": 0,
+    }
+    if not changed and not deleted:
+        print(f"✅ 변경된 테이블이 없습니다: {vectordb_path}")
+        return stats
+    if not hashes:
+        raise ValueError(f"모든 테이블을 삭제할 수 없습니다: {vectordb_path}")
+
+    stats["embedded"] = _apply_changes(
+        vectordb_path,
+        manifest,
+        settings,
+        build_kwargs,
+        list(hashes),
+        hashes,
+        changed,
+        sorted(deleted),
+        embeddings,
+        compact_threshold,
+    )
+    return stats
+
+
+def _apply_changes(
+    vectordb_path: str,
+    manifest: Dict[str, Any],
+    settings: Dict[str, Any],
+    build_kwargs: Dict[str, Any],
+    keys: Sequence[str],
+    hashes: Mapping[str, str],
+    changed: Mapping[str, Sequence[Document]],
+    removed: Sequence[str],
+    embeddings,
+    compact_threshold: float,
+) -> int:
+    """
+    changed group을 임베딩해 추가하고 changed/removed group의 기존 위치를 삭제 표시한 뒤 저장합니다.
+
+    keys는 갱신 후 manifest의 group 순서, hashes는 그 group들의 내용 해시입니다. 임베딩한 문서 수를 반환합니다.
+    """
+    old_groups = manifest["groups"]
+    dead = {
+        position
+        for key in list(changed) + list(removed)
+        for position in old_groups.get(key, {}).get("positions", [])
+    }
+    kept = [key for key in keys if key not in changed]
+    settings_changed = manifest["settings"] != settings
+
+    new_docs: List[Document] = [doc for docs in changed.values() for doc in docs]
+    new_vectors = None
+    if new_docs:
+        new_vectors = np.asarray(
+            embeddings.embed_documents([doc.page_content for doc in new_docs]),
+            dtype=np.float32,
+        )
+
+    docstore = ArrowDocstore(os.path.join(vectordb_path, DOCSTORE_FILE))
+    index = faiss.read_index(os.path.join(vectordb_path, INDEX_FILE))
+    vectors_path = os.path.join(vectordb_path, EXACT_VECTORS_FILE)
+    exact_vectors = np.load(vectors_path) if os.path.exists(vectors_path) else None
+    tombstones = dead | set(docstore.deleted_positions().tolist())
+    n_total = index.ntotal + len(new_docs)
+    fragmentation = len(tombstones) / max(n_total, 1)
+
+    new_positions: Dict[str, List[int]] = {}
+    if settings_changed or fragmentation > compact_threshold:
+        reason = "인덱스 설정 변경" if settings_changed else f"단편화 {fragmentation:.1%}"
+        print(f"🧹 인덱스 압축 ({reason}): 삭제된 위치 {len(tombstones)}개 제거")
+        live = np.array(
+            [p for p in range(index.ntotal) if p not in tombstones], dtype=np.int64
+        )
+        remap = {int(old): new for new, old in enumerate(live)}
+        documents = [docstore.document_at(int(p)) for p in live] + new_docs
+        vectors = stored_vectors(index, exact_vectors)[live]
+        if new_vectors is not None:
+            vectors = np.vstack([vectors, new_vectors]) if len(vectors) else new_vectors
+        db = build_faiss_store_from_vectors(documents, vectors, embeddings, **build_kwargs)
+        for key in kept:
+            new_positions[key] = [remap[p] for p in old_groups[key]["positions"]]
+        next_position = len(live)
+    else:
+        print(
+            f"➕ {len(new_docs)}개 문서 추가, {len(dead)}개 위치 삭제 표시 "
+            f"(단편화 {fragmentation:.1%})"
+        )
+        next_position = index.ntotal
+        if new_vectors is not None:
+            index.add(new_vectors)
+            if exact_vectors is not None:
+                exact_vectors = np.vstack([exact_vectors, new_vectors])
+
+        index_to_docstore_id, live_docs = {}, {}
+        for position in range(next_position):
+            if position in tombstones:
+                index_to_docstore_id[position] = TOMBSTONE_ID
+                continue
+            doc = docstore.document_at(position)
+            index_to_docstore_id[position] = doc.id
+            live_docs[doc.id] = doc
+        for offset, doc in enumerate(new_docs):
+            doc_id = str(uuid.uuid4())
+            index_to_docstore_id[next_position + offset] = doc_id
+            live_docs[doc_id] = Document(
+                id=doc_id, page_content=doc.page_content, metadata=doc.metadata
+            )
+        db = RerankingFAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=InMemoryDocstore(live_docs),
+            index_to_docstore_id=index_to_docstore_id,
+            normalize_L2=json.loads(docstore.schema_metadata.get("normalize_L2", "false")),
+            distance_strategy=DistanceStrategy(
+                docstore.schema_metadata.get(
+                    "distance_strategy", DistanceStrategy.EUCLIDEAN_DISTANCE.value
+                )
+            ),
+            exact_vectors=exact_vectors,
+        )
+        for key in kept:
+            new_positions[key] = old_groups[key]["positions"]
+
+    for key, docs in changed.items():
+        new_positions[key] = list(range(next_position, next_position + len(docs)))
+        next_position += len(docs)
+
+    save_faiss_store(db, vectordb_path)
+    write_manifest(
+        vectordb_path,
+        _manifest(
+            settings,
+            {key: {"hash": hashes[key], "positions": new_positions[key]} for key in keys},
+        ),
+    )
+    return len(new_docs)
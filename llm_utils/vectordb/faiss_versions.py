@@ -0,0 +1,417 @@
+"""
+FAISS 인덱스 버전 관리 모듈
+
+create_faiss.py가 인덱스 디렉토리에 바로 쓰면 실행 중인 앱이 반쯤 쓰인 인덱스를 읽을 수 있습니다.
+빌드는 새 버전 디렉토리에서 진행하고, 검증을 통과하면 CURRENT 파일을 원자적으로 교체(os.replace)하여 공개합니다.
+
+- 증분 빌드(faiss_sync)는 현재 버전을 하드 링크로 복사한 디렉토리에서 진행합니다. 저장 함수는 모두
+  임시 파일을 쓴 뒤 교체하므로, 링크를 공유하는 이전 버전의 파일은 바뀌지 않습니다.
+- 실행 중인 프로세스는 faiss_index_version이 CURRENT가 가리키는 버전을 포함하므로 다음 검색에서
+  새 버전을 다시 로드합니다(vector_store_registry). 이미 진행 중인 검색은 이전 스토어 객체를 그대로 쓰며,
+  오래된 버전 디렉토리를 지워도 mmap으로 연 파일은 닫힐 때까지 유효합니다.
+- rollback_version은 CURRENT를 직전에 공개한 버전으로 되돌립니다.
+- 시드 복사부터 공개까지는 LOCK 파일 잠금(version_lock)을 잡고 진행하므로, 여러 Streamlit 워커나
+  DB Builder와 create_faiss.py가 동시에 고쳐도 같은 CURRENT에서 시작해 한쪽 수정을 덮어쓰지 않습니다.
+
+디렉토리 구조:
+    VECTORDB_PATH/CURRENT                     현재 버전 이름
+    VECTORDB_PATH/LOCK                        버전 생성/공개 잠금 파일
+    VECTORDB_PATH/versions.json               공개 이력 {"format": ..., "published": [{"version": ..., ...}]}
+    VECTORDB_PATH/versions/<버전>/            FAISS 스토어 (단일 또는 샤드 레이아웃, columns/ 포함)
+    VECTORDB_PATH/versions/<버전>.building/   빌드 중인 버전 (공개 직전에 이름을 바꿈)
+
+CURRENT가 없으면 VECTORDB_PATH 자체를 스토어로 읽습니다(버전 관리 이전 형식). 첫 버전은 이 스토어를
+복사해 시작하고, 공개한 뒤 최상위 스토어 파일을 정리합니다.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+
+from llm_utils.vectordb.faiss_shards import (
+    COLUMN_INDEX_DIR,
+    SHARDS_DIR,
+    SHARDS_FILE,
+    sharded_store_paths,
+)
+from llm_utils.vectordb.faiss_storage import (
+    DOCSTORE_FILE,
+    EXACT_VECTORS_FILE,
+    INDEX_FILE,
+    LEGACY_DOCSTORE_FILE,
+    ArrowDocstore,
+    docstore_file,
+    load_faiss_store,
+)
+from llm_utils.vectordb.faiss_sync import MANIFEST_FILE, read_manifest
+
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = "LOCK"
+VERSIONS_DIR = "versions"
+HISTORY_FILE = "versions.json"
+HISTORY_FORMAT = "lang2sql-faiss-versions-1"
+BUILDING_SUFFIX = ".building"
+# 버전 관리 이전 형식에서 최상위 디렉토리에 있던 스토어 항목
+STORE_ENTRIES = (
+    INDEX_FILE,
+    DOCSTORE_FILE,
+    LEGACY_DOCSTORE_FILE,
+    EXACT_VECTORS_FILE,
+    MANIFEST_FILE,
+    SHARDS_FILE,
+    SHARDS_DIR,
+    COLUMN_INDEX_DIR,
+)
+
+
+def version_path(vectordb_path: str, version: str) -> str:
+    return os.path.join(vectordb_path, VERSIONS_DIR, version)
+
+
+def current_version(vectordb_path: str) -> Optional[str]:
+    """CURRENT가 가리키는 버전 이름. 버전 관리 전이거나 버전 디렉토리가 없으면 None."""
+    try:
+        with open(os.path.join(vectordb_path, CURRENT_FILE), encoding="utf-8") as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version if version and os.path.isdir(version_path(vectordb_path, version)) else None
+
+
+def resolve_current_path(vectordb_path: str) -> str:
+    """현재 버전의 스토어 디렉토리를 반환합니다. 버전 관리 전 형식이면 vectordb_path 그대로."""
+    version = current_version(vectordb_path)
+    return vectordb_path if version is None else version_path(vectordb_path, version)
+
+
+_held_locks = threading.local()
+
+
+def _lock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue  # LK_LOCK은 약 10초 동안만 재시도
+
+
+def _unlock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def version_lock(vectordb_path: str) -> Iterator[None]:
+    """
+    버전 생성/공개/되돌리기를 프로세스(와 스레드) 사이에서 직렬화하는 LOCK 파일 잠금입니다.
+
+    같은 스레드에서 다시 잡으면 그대로 통과합니다 (build_version 안의 publish_version 등).
+    """
+    key = os.path.abspath(vectordb_path)
+    held = getattr(_held_locks, "paths", None)
+    if held is None:
+        held = _held_locks.paths = set()
+    if key in held:
+        yield
+        return
+
+    os.makedirs(vectordb_path, exist_ok=True)
+    with open(os.path.join(vectordb_path, LOCK_FILE), "a+b") as f:
+        _lock_file(f)
+        held.add(key)
+        try:
+            yield
+        finally:
+            held.discard(key)
+            _unlock_file(f)
+
+
+def _read_history(vectordb_path: str) -> List[Dict[str, Any]]:
+    try:
+        with open(os.path.join(vectordb_path, HISTORY_FILE), encoding="utf-8") as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return history.get("published", []) if history.get("format") == HISTORY_FORMAT else []
+
+
+def _replace_file(path: str, text: str) -> None:
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def list_versions(vectordb_path: str) -> List[Dict[str, Any]]:
+    """공개 이력을 오래된 순서로 반환합니다. 각 항목에 current/exists 여부를 붙입니다."""
+    current = current_version(vectordb_path)
+    return [
+        {
+            **entry,
+            "current": entry["version"] == current,
+            "exists": os.path.isdir(version_path(vectordb_path, entry["version"])),
+        }
+        for entry in _read_history(vectordb_path)
+    ]
+
+
+def _copy_store(source: str, target: str) -> None:
+    """스토어 항목을 하드 링크로 복사합니다 (링크를 만들 수 없는 파일 시스템이면 실제 복사)."""
+
+    def link_or_copy(src: str, dst: str) -> None:
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    os.makedirs(target, exist_ok=True)
+    for name in STORE_ENTRIES:
+        src = os.path.join(source, name)
+        dst = os.path.join(target, name)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, copy_function=link_or_copy)
+        elif os.path.exists(src):
+            link_or_copy(src, dst)
+
+
+def create_version(vectordb_path: str, seed: bool = True) -> Tuple[str, str]:
+    """
+    빌드용 새 버전 디렉토리(<버전>.building)를 만들고 (버전 이름, 경로)를 반환합니다.
+
+    seed=True면 현재 버전(없으면 최상위의 이전 형식 스토어)을 하드 링크로 복사해 증분 빌드를 이어 갑니다.
+    """
+    version = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    path = version_path(vectordb_path, version) + BUILDING_SUFFIX
+    os.makedirs(path)
+    if seed:
+        _copy_store(resolve_current_path(vectordb_path), path)
+    return version, path
+
+
+def validate_faiss_store(store_path: str, embeddings=None) -> List[str]:
+    """
+    공개 전에 스토어를 검사하고 문제 목록을 반환합니다 (빈 목록이면 통과).
+
+    모든 테이블/컬럼 스토어를 실제로 열어 인덱스 벡터 수와 문서 수, manifest 위치가 맞는지 확인하고
+    저장된 벡터 하나로 검색해 봅니다. embeddings가 있으면 질의 임베딩 차원이 인덱스와 같은지도 확인합니다.
+    """
+    if docstore_file(store_path) is not None:
+        table_paths = [store_path]
+    else:
+        table_paths = [p for p in sharded_store_paths(store_path) or [] if docstore_file(p)]
+    if not table_paths:
+        return [f"인덱스가 없습니다: {store_path}"]
+
+    column_paths = [
+        os.path.join(path, COLUMN_INDEX_DIR)
+        for path in table_paths
+        if docstore_file(os.path.join(path, COLUMN_INDEX_DIR)) is not None
+    ]
+    problems: List[str] = []
+    dimensions = set()
+    live_tables = 0
+    for path in table_paths + column_paths:
+        try:
+            db = load_faiss_store(path, embeddings)
+        except Exception as e:
+            problems.append(f"{path}: 스토어를 열 수 없습니다 ({e})")
+            continue
+        n_vectors = db.index.ntotal
+        dimensions.add(db.index.d)
+        if not isinstance(db.docstore, ArrowDocstore):
+            continue  # pickle 형식에서 변환 중인 스토어
+        if n_vectors != len(db.docstore):
+            problems.append(f"{path}: 벡터 {n_vectors}개와 문서 {len(db.docstore)}개가 다릅니다")
+            continue
+        manifest = read_manifest(path)
+        positions = [
+            p for group in (manifest or {}).get("groups", {}).values() for p in group["positions"]
+        ]
+        if positions and max(positions) >= n_vectors:
+            problems.append(f"{path}: manifest 위치가 인덱스 범위를 벗어났습니다")
+        deleted = db.docstore.deleted_positions()
+        if path in table_paths:
+            live_tables += n_vectors - len(deleted)
+        if n_vectors == len(deleted):
+            continue
+        # 삭제 표시되지 않은 첫 위치 (삭제 수 + 1개 안에 반드시 있음)
+        position = int(np.setdiff1d(np.arange(len(deleted) + 1), deleted)[0])
+        try:
+            if db.exact_vectors is not None:
+                vector = db.exact_vectors[position]
+            else:
+                vector = db.index.reconstruct(position)
+        except RuntimeError:
+            continue  # 복원을 지원하지 않는 인덱스는 검색 확인을 건너뜀
+        if not db.similarity_search_with_score_by_vector(list(map(float, vector)), k=1):
+            problems.append(f"{path}: 저장된 벡터로 검색한 결과가 없습니다")
+
+    if live_tables == 0:
+        problems.append(f"테이블 문서가 없습니다: {store_path}")
+    if len(dimensions) > 1:
+        problems.append(f"스토어마다 벡터 차원이 다릅니다: {sorted(dimensions)}")
+    if embeddings is not None and dimensions:
+        dimension = len(embeddings.embed_query("lang2sql index validation"))
+        if dimension not in dimensions:
+            problems.append(f"임베딩 차원 {dimension}이 인덱스 차원 {sorted(dimensions)}과 다릅니다")
+    return problems
+
+
+def _prune_versions(vectordb_path: str, keep: int) -> None:
+    """최근에 공개한 keep개 버전과 현재 버전만 남기고 지웁니다 (빌드 중인 디렉토리는 그대로)."""
+    history = [entry["version"] for entry in _read_history(vectordb_path)]
+    keep_set = set(history[-keep:]) if keep > 0 else set()
+    current = current_version(vectordb_path)
+    if current is not None:
+        keep_set.add(current)
+    versions_dir = os.path.join(vectordb_path, VERSIONS_DIR)
+    for name in os.listdir(versions_dir):
+        if name in keep_set or name.endswith(BUILDING_SUFFIX):
+            continue
+        print(f"🧹 오래된 인덱스 버전을 지웁니다: {name}")
+        shutil.rmtree(os.path.join(versions_dir, name), ignore_errors=True)
+
+
+def _remove_unversioned_store(vectordb_path: str) -> None:
+    """첫 버전을 공개한 뒤 최상위에 남은 이전 형식 스토어를 지웁니다."""
+    for name in STORE_ENTRIES:
+        path = os.path.join(vectordb_path, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def _set_current(vectordb_path: str, version: str) -> None:
+    _replace_file(os.path.join(vectordb_path, CURRENT_FILE), version + "\n")
+
+
+def publish_version(
+    vectordb_path: str,
+    version: str,
+    keep: Optional[int] = None,
+    info: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    빌드한 버전(<버전>.building)을 공개합니다: 이름을 바꾸고 CURRENT를 원자적으로 교체합니다.
+
+    keep(None이면 FAISS_KEEP_VERSIONS, 기본값 3)개를 넘는 오래된 버전은 지웁니다.
+    info는 공개 이력에 함께 기록할 값(빌드 통계 등)입니다.
+    """
+    if keep is None:
+        keep = int(os.getenv("FAISS_KEEP_VERSIONS", "3"))
+    with version_lock(vectordb_path):
+        _publish_version(vectordb_path, version, keep, info)
+
+
+def _publish_version(
+    vectordb_path: str, version: str, keep: int, info: Optional[Dict[str, Any]]
+) -> None:
+    building = version_path(vectordb_path, version) + BUILDING_SUFFIX
+    if os.path.isdir(building):
+        os.rename(building, version_path(vectordb_path, version))
+    previous = current_version(vectordb_path)
+
+    history = _read_history(vectordb_path)
+    history.append(
+        {
+            "version": version,
+            "published_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "previous": previous,
+            **(info or {}),
+        }
+    )
+    _replace_file(
+        os.path.join(vectordb_path, HISTORY_FILE),
+        json.dumps({"format": HISTORY_FORMAT, "published": history}, ensure_ascii=False, indent=2),
+    )
+    _set_current(vectordb_path, version)
+    print(f"🚀 인덱스 버전을 공개했습니다: {version}")
+
+    if previous is None:
+        _remove_unversioned_store(vectordb_path)
+    _prune_versions(vectordb_path, keep)
+
+
+def build_version(
+    vectordb_path: str,
+    build: Callable[[str], Any],
+    embeddings=None,
+    seed: bool = True,
+    keep: Optional[int] = None,
+    publish_if: Optional[Callable[[Any], bool]] = None,
+) -> Tuple[Optional[str], Any]:
+    """
+    새 버전 디렉토리에서 build(경로)를 실행하고, 검증을 통과하면 공개합니다. (버전, build 반환값)을 반환합니다.
+
+    빌드가 실패하거나 검증에 실패하면 버전 디렉토리를 지우고 예외를 발생시키며 CURRENT는 그대로입니다.
+    publish_if(build 반환값)가 False면(바뀐 내용 없음 등) 공개하지 않고 (None, 반환값)을 반환합니다.
+    시드 복사부터 공개까지 version_lock을 잡으므로 다른 프로세스의 빌드는 공개가 끝날 때까지 기다립니다.
+    """
+    with version_lock(vectordb_path):
+        version, path = create_version(vectordb_path, seed=seed)
+        try:
+            result = build(path)
+            if publish_if is not None and not publish_if(result):
+                shutil.rmtree(path, ignore_errors=True)
+                print(f"✅ 바뀐 내용이 없어 새 버전을 공개하지 않습니다: {vectordb_path}")
+                return None, result
+            problems = validate_faiss_store(path, embeddings)
+            if problems:
+                raise ValueError("인덱스 검증 실패:\n" + "\n".join(f"- {p}" for p in problems))
+        except BaseException:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+        info = {"stats": result} if isinstance(result, dict) else None
+        publish_version(vectordb_path, version, keep=keep, info=info)
+        return version, result
+
+
+def rollback_version(vectordb_path: str, version: Optional[str] = None) -> str:
+    """
+    CURRENT를 version(None이면 현재 버전 직전에 공개한, 아직 남아 있는 버전)으로 되돌리고 그 이름을 반환합니다.
+
+    공개 이력은 바꾸지 않으므로 다시 실행하면 한 단계 더 이전 버전으로 돌아갑니다.
+    """
+    with version_lock(vectordb_path):
+        return _rollback_version(vectordb_path, version)
+
+
+def _rollback_version(vectordb_path: str, version: Optional[str]) -> str:
+    current = current_version(vectordb_path)
+    if version is None:
+        history = [entry["version"] for entry in _read_history(vectordb_path)]
+        before = history[: history.index(current)] if current in history else history
+        candidates = [
+            v for v in reversed(before) if os.path.isdir(version_path(vectordb_path, v))
+        ]
+        if not candidates:
+            raise ValueError(f"되돌릴 이전 인덱스 버전이 없습니다: {vectordb_path}")
+        version = candidates[0]
+    elif not os.path.isdir(version_path(vectordb_path, version)):
+        raise ValueError(f"인덱스 버전이 없습니다: {version}")
+    _set_current(vectordb_path, version)
+    print(f"⏪ 인덱스 버전을 되돌렸습니다: {current} → {version}")
+    return version
@@ -0,0 +1,192 @@
+"""
+테이블 문서 metadata 필터 모듈
+
+search_tables(filters=...)로 데이터베이스/스키마, 도메인 태그, 담당자 조건에 맞는 테이블만 검색합니다.
+
+필터 형식:
+    {"database": "sales", "tags": ["finance", "billing"], "owners": "alice"}
+    - 키는 FILTER_FIELDS 중 하나이며, 여러 키는 AND로 결합
+    - 값은 문자열 또는 목록(목록은 OR, 즉 하나라도 일치하면 통과)
+    - tags/owners처럼 metadata 값이 목록인 필드는 원소 중 하나라도 일치하면 통과
+
+FAISS는 스토어마다 (필드, 값) → 인덱스 위치 역색인을 한 번 만들어 두고, 조건에 맞는 위치만
+IDSelector로 넘겨 검색합니다 (조건에 맞지 않는 벡터는 거리 계산을 하지 않음).
+pgvector는 같은 조건을 jsonb 필터로 변환하여 SQL WHERE 절에서 거릅니다.
+"""
+
+import threading
+import weakref
+from collections import defaultdict
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple, Union
+
+import faiss
+import numpy as np
+
+from llm_utils.vectordb.documents import get_all_documents
+
+FILTER_FIELDS = ("database", "schema", "tags", "owners")
+
+FilterValue = Union[str, Sequence[str]]
+
+_filter_indexes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_filter_lock = threading.Lock()
+
+
+def normalize_filters(
+    filters: Optional[Mapping[str, FilterValue]],
+) -> Dict[str, Tuple[str, ...]]:
+    """필터를 {필드: (값, ...)} 형태로 정규화합니다. 값이 비어 있는 필드는 제외합니다."""
+    normalized = {}
+    for field, value in (filters or {}).items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(
+                f"지원하지 않는 필터 필드: {field} (사용 가능: {', '.join(FILTER_FIELDS)})"
+            )
+        values = [value] if isinstance(value, str) else list(value or ())
+        values = tuple(dict.fromkeys(str(v) for v in values if v not in (None, "")))
+        if values:
+            normalized[field] = values
+    return normalized
+
+
+def metadata_values(metadata: Mapping, field: str) -> Tuple[str, ...]:
+    """
+    문서 metadata에서 필드 값을 튜플로 반환합니다.
+
+    database/schema가 없으면 "database.schema.table" 형식의 테이블명에서만 추출합니다 (build_table_document와 같음).
+    """
+    value = metadata.get(field)
+    if value is None and field in ("database", "schema"):
+        parts = str(metadata.get("table_name") or "").split(".")
+        if len(parts) == 3:
+            value = parts[0] if field == "database" else parts[1]
+    if value in (None, ""):
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(str(v) for v in value)
+
+
+def matches_filters(metadata: Mapping, filters: Optional[Mapping[str, FilterValue]]) -> bool:
+    """metadata가 모든 필터 조건을 만족하는지 확인합니다."""
+    return all(
+        set(metadata_values(metadata, field)) & set(values)
+        for field, values in normalize_filters(filters).items()
+    )
+
+
+def to_pgvector_filter(filters: Optional[Mapping[str, FilterValue]]) -> Optional[Dict]:
+    """
+    필터를 langchain_postgres PGVector의 filter 형식으로 변환합니다.
+
+    $eq는 jsonb_path_match(lax 모드)로 비교되므로 metadata 값이 목록이면 원소 중 하나와 일치해도 참입니다.
+    """
+    clauses = []
+    for field, values in normalize_filters(filters).items():
+        conditions = [{field: {"$eq": value}} for value in values]
+        clauses.append(conditions[0] if len(conditions) == 1 else {"$or": conditions})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def search_filter_kwargs(db, filters: Optional[Mapping[str, FilterValue]]) -> Dict:
+    """
+    벡터 스토어 검색 메서드(similarity_search*)에 넘길 필터 인자를 만듭니다.
+
+    FAISS 스토어(샤드 포함)는 filters(IDSelector 사전 필터), pgvector는 filter(jsonb 조건)로 전달합니다.
+    """
+    if not normalize_filters(filters):
+        return {}
+    if hasattr(db, "index_to_docstore_id") or hasattr(db, "shards"):
+        return {"filters": filters}
+    return {"filter": to_pgvector_filter(filters)}
+
+
+class FilterIndex:
+    """(필드, 값) → 문서 위치 역색인. 위치는 FAISS 인덱스 위치(= get_all_documents 순서)입니다."""
+
+    def __init__(self, metadatas: Iterable[Mapping]):
+        postings = defaultdict(list)
+        size = 0
+        for position, metadata in enumerate(metadatas):
+            for field in FILTER_FIELDS:
+                for value in set(metadata_values(metadata, field)):
+                    postings[(field, value)].append(position)
+            size = position + 1
+        self.size = size
+        self._postings = {
+            key: np.asarray(positions, dtype=np.int64) for key, positions in postings.items()
+        }
+
+    def positions(self, filters: Optional[Mapping[str, FilterValue]]) -> Optional[np.ndarray]:
+        """조건에 맞는 위치 배열(오름차순)을 반환합니다. 필터가 없으면 None."""
+        normalized = normalize_filters(filters)
+        if not normalized:
+            return None
+
+        result = None
+        for field, values in normalized.items():
+            matched = np.unique(
+                np.concatenate(
+                    [self._postings.get((field, value), np.empty(0, np.int64)) for value in values]
+                )
+            )
+            result = matched if result is None else np.intersect1d(result, matched, assume_unique=True)
+        return result
+
+    def facets(self) -> Dict[str, Dict[str, int]]:
+        """필드별 값과 테이블 수를 반환합니다 (필터 선택지 표시용)."""
+        facets: Dict[str, Dict[str, int]] = {field: {} for field in FILTER_FIELDS}
+        for (field, value), positions in sorted(self._postings.items()):
+            facets[field][value] = len(positions)
+        return facets
+
+
+def _iter_store_metadata(db) -> Iterable[Mapping]:
+    # Arrow docstore는 Document를 만들지 않고 metadata 컬럼만 읽음
+    iter_metadata = getattr(getattr(db, "docstore", None), "iter_metadata", None)
+    if iter_metadata is not None:
+        return iter_metadata()
+    return (doc.metadata or {} for doc in get_all_documents(db))
+
+
+def get_filter_index(db) -> FilterIndex:
+    """벡터 스토어의 필터 역색인을 반환합니다. 스토어 인스턴스마다 한 번만 만듭니다."""
+    cached = _filter_indexes.get(db)
+    if cached is not None:
+        return cached
+
+    with _filter_lock:
+        cached = _filter_indexes.get(db)
+        if cached is None:
+            cached = FilterIndex(_iter_store_metadata(db))
+            _filter_indexes[db] = cached
+        return cached
+
+
+def deleted_positions(db) -> np.ndarray:
+    """FAISS 스토어에서 삭제 표시(tombstone)된 인덱스 위치 배열을 반환합니다."""
+    getter = getattr(getattr(db, "docstore", None), "deleted_positions", None)
+    if getter is None:
+        return np.empty(0, dtype=np.int64)
+    return getter()
+
+
+def faiss_id_selector(db, filters: Optional[Mapping[str, FilterValue]]):
+    """
+    FAISS 스토어에서 조건에 맞는 위치만 검색하도록 (IDSelector, 허용 위치 수)를 반환합니다.
+
+    삭제된 위치(tombstone)는 항상 제외합니다. 필터도 삭제된 위치도 없으면 (None, None)을 반환합니다.
+    """
+    if not normalize_filters(filters):
+        deleted = deleted_positions(db)
+        if not len(deleted):
+            return None, None
+        return (
+            faiss.IDSelectorNot(faiss.IDSelectorBatch(deleted)),
+            db.index.ntotal - len(deleted),
+        )
+    # 삭제된 행은 metadata가 비어 있어 어떤 조건에도 맞지 않음
+    positions = get_filter_index(db).positions(filters)
+    return faiss.IDSelectorBatch(positions), len(positions)
@@ -1,47 +1,232 @@
 """
 pgvector VectorDB 구현
+
+연결은 연결 문자열별로 공유하는 SQLAlchemy 커넥션 풀을 사용하며, 컬렉션 존재 여부와 버전은
+임베딩 검색 없이 증분 동기화가 컬렉션 행에 기록한 버전 스탬프 조회(PGVECTOR_EXISTS_TTL 동안 캐시)로 확인합니다.
+컬렉션마다 HNSW/IVFFlat 부분 인덱스를 관리하고(pgvector_index.py), 검색은 그 인덱스 식으로 질의합니다.
+카탈로그 적재/갱신은 바뀐 테이블만 임베딩하여 COPY로 적재하는 증분 동기화(pgvector_sync.py)를 사용합니다.
+
+PGVECTOR_VECTOR_TYPE=halfvec이면 임베딩을 halfvec(float16)으로 변환한 식에 인덱스를 만들고
+그 인덱스로 k×VECTOR_RERANK_FACTOR개 후보를 찾은 뒤, 원본 vector 컬럼으로 정확한 거리를 다시 계산합니다.
+인덱스 크기(메모리에 올라가는 부분)가 절반으로 줄고 반환 점수는 vector 검색과 같습니다.
+pgvector 0.7 이상이 필요합니다.
 """
 
 import os
-from typing import Optional
-import psycopg2
-from sqlalchemy.orm import Session
-from langchain_postgres.vectorstores import PGVector
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import sqlalchemy
+from pgvector.sqlalchemy import HALFVEC, VECTOR
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, ProgrammingError
+from langchain.schema import Document
+from langchain_postgres.vectorstores import DistanceStrategy, PGVector
 
 from llm_utils.tools import get_info_from_db
 from llm_utils.llm import get_embeddings
+from llm_utils.vectordb.faiss_index import default_rerank_factor
+from llm_utils.vectordb.pgvector_index import apply_search_settings, ensure_pgvector_index
+from llm_utils.vectordb.pgvector_sync import SYNC_STAMP_KEY, sync_pgvector_collection
 
+_VECTOR_SQL_TYPES = {"vector": VECTOR, "halfvec": HALFVEC}
 
-def _check_collection_exists(connection_string: str, collection_name: str) -> bool:
-    """PostgreSQL에서 collection이 존재하는지 확인합니다."""
-    try:
-        # 연결 문자열에서 연결 정보 추출
-        conn = psycopg2.connect(connection_string)
-        cursor = conn.cursor()
-
-        # langchain_pg_embedding 테이블에서 collection_name이 존재하는지 확인
-        cursor.execute(
-            "SELECT COUNT(*) FROM langchain_pg_embedding WHERE collection_name = %s",
-            (collection_name,),
+
+class IndexedPGVector(PGVector):
+    """
+    컬렉션별 ANN 부분 인덱스(pgvector_index.ensure_pgvector_index)를 사용하도록 검색하는 PGVector
+
+    정렬 식을 인덱스 식(embedding::vector(d))과 같게 쓰고 collection_id를 상수로 비교하며,
+    요청마다 ef_search(HNSW)/probes(IVFFlat)를 현재 트랜잭션에만 적용합니다.
+    """
+
+    vector_type = "vector"
+    # True면 인덱스로 k×VECTOR_RERANK_FACTOR개 후보를 찾고 원본 vector로 재정렬
+    rerank = False
+
+    def _indexed_distance(self, embedding: List[float]):
+        indexed = sqlalchemy.cast(
+            self.EmbeddingStore.embedding,
+            _VECTOR_SQL_TYPES[self.vector_type](len(embedding)),
         )
-        result = cursor.fetchone()
-        count = result[0] if result else 0
+        if self._distance_strategy == DistanceStrategy.EUCLIDEAN:
+            return indexed.l2_distance(embedding)
+        if self._distance_strategy == DistanceStrategy.MAX_INNER_PRODUCT:
+            return indexed.max_inner_product(embedding)
+        return indexed.cosine_distance(embedding)
 
-        cursor.close()
-        conn.close()
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+    ) -> List[Tuple[Document, float]]:
+        embedding = self.embeddings.embed_query(query)
+        return self.similarity_search_with_score_by_vector(
+            embedding, k=k, filter=filter, ef_search=ef_search, probes=probes
+        )
 
-        return count > 0
-    except Exception as e:
-        print(f"Collection 존재 여부 확인 중 오류: {e}")
-        return False
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+    ) -> List[Tuple[Document, float]]:
+        limit = k * default_rerank_factor() if self.rerank else k
+        with self._make_sync_session() as session:
+            collection = self.get_collection(session)
+            if not collection:
+                raise ValueError("Collection not found")
+            apply_search_settings(session, limit, ef_search=ef_search, probes=probes)
 
+            # 부분 인덱스(collection_id 조건)를 사용하도록 컬렉션 ID를 상수로 비교
+            filter_by = [
+                self.EmbeddingStore.collection_id
+                == sqlalchemy.literal(collection.uuid, literal_execute=True)
+            ]
+            if filter:
+                filter_clauses = self._create_filter_clause(filter)
+                if filter_clauses is not None:
+                    filter_by.append(filter_clauses)
 
-def get_pgvector_db(
-    connection_string: Optional[str] = None, collection_name: Optional[str] = None
-):
-    """pgvector 벡터 데이터베이스를 로드하거나 생성합니다."""
-    embeddings = get_embeddings()
+            if self.rerank:
+                candidates = (
+                    sqlalchemy.select(self.EmbeddingStore.id)
+                    .where(*filter_by)
+                    .order_by(self._indexed_distance(embedding))
+                    .limit(limit)
+                )
+                query = session.query(
+                    self.EmbeddingStore,
+                    self.distance_strategy(embedding).label("distance"),
+                ).filter(self.EmbeddingStore.id.in_(candidates.scalar_subquery()))
+            else:
+                query = session.query(
+                    self.EmbeddingStore,
+                    self._indexed_distance(embedding).label("distance"),
+                ).filter(*filter_by)
+            results = query.order_by(sqlalchemy.asc("distance")).limit(k).all()
+        return self._results_to_docs_and_scores(results)
+
+
+class HalfvecPGVector(IndexedPGVector):
+    """halfvec 인덱스로 후보를 찾고 원본 vector로 재정렬하는 PGVector"""
+
+    vector_type = "halfvec"
+    rerank = True
+
+
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+# (연결 문자열, 컬렉션 이름) -> (확인 시각, (문서 수, 동기화 버전) 또는 None)
+_collection_states: Dict[
+    Tuple[str, str], Tuple[float, Optional[Tuple[int, Optional[str]]]]
+] = {}
+_collection_states_lock = threading.Lock()
+
+
+def get_pgvector_engine(connection_string: str) -> Engine:
+    """
+    연결 문자열별로 공유하는 SQLAlchemy 엔진(커넥션 풀)을 반환합니다.
+
+    환경 변수:
+        PGVECTOR_POOL_SIZE: 유지할 연결 수 (기본값: 5)
+        PGVECTOR_POOL_MAX_OVERFLOW: 추가로 열 수 있는 연결 수 (기본값: 10)
+        PGVECTOR_POOL_RECYCLE: 연결 재사용 최대 시간(초) (기본값: 1800)
+    """
+    engine = _engines.get(connection_string)
+    if engine is not None:
+        return engine
+
+    with _engines_lock:
+        engine = _engines.get(connection_string)
+        if engine is None:
+            engine = sqlalchemy.create_engine(
+                connection_string,
+                pool_size=int(os.getenv("PGVECTOR_POOL_SIZE", "5")),
+                max_overflow=int(os.getenv("PGVECTOR_POOL_MAX_OVERFLOW", "10")),
+                pool_recycle=int(os.getenv("PGVECTOR_POOL_RECYCLE", "1800")),
+                pool_pre_ping=True,
+            )
+            _engines[connection_string] = engine
+        return engine
+
+
+def _read_collection_state(
+    connection_string: str, collection_name: str
+) -> Optional[Tuple[int, Optional[str]]]:
+    try:
+        with get_pgvector_engine(connection_string).connect() as conn:
+            row = conn.execute(
+                sqlalchemy.text(
+                    "SELECT s.stamp, CASE WHEN s.stamp IS NULL THEN "
+                    "(SELECT count(*) FROM langchain_pg_embedding e WHERE e.collection_id = s.uuid) "
+                    "END FROM (SELECT uuid, "
+                    f"CAST(cmetadata AS jsonb) -> '{SYNC_STAMP_KEY}' AS stamp "
+                    "FROM langchain_pg_collection WHERE name = :name) s"
+                ),
+                {"name": collection_name},
+            ).first()
+    except ProgrammingError:
+        # langchain_pg_* 테이블이 아직 없음
+        return None
+    if row is None:
+        return None
+    stamp, count = row
+    if stamp:
+        return int(stamp["documents"]), stamp["version"]
+    # 스탬프를 기록하기 전(sync_pgvector_db로 동기화한 적 없는) 컬렉션은 문서 수만 사용
+    return int(count), None
+
+
+def collection_state(
+    connection_string: str, collection_name: str, ttl: Optional[float] = None
+) -> Optional[Tuple[int, Optional[str]]]:
+    """
+    컬렉션의 (문서 수, 동기화 버전)을 반환합니다. 컬렉션(또는 테이블)이 없으면 None.
+
+    sync_pgvector_db가 삭제/적재와 같은 트랜잭션에서 컬렉션 cmetadata에 기록한 스탬프를
+    컬렉션 행 하나만 읽어 확인합니다 (스탬프가 없는 예전 컬렉션은 (문서 수, None)).
+    결과는 ttl초 동안 캐시하며(None이면 PGVECTOR_EXISTS_TTL 환경 변수, 기본값 60초),
+    만료 후 동시에 들어온 요청 중 하나만 다시 조회합니다.
+    """
+    if ttl is None:
+        ttl = float(os.getenv("PGVECTOR_EXISTS_TTL", "60"))
+    key = (connection_string, collection_name)
+    cached = _collection_states.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+
+    with _collection_states_lock:
+        cached = _collection_states.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+        state = _read_collection_state(connection_string, collection_name)
+        _collection_states[key] = (now, state)
+        return state
 
+
+def count_collection_documents(
+    connection_string: str, collection_name: str, ttl: Optional[float] = None
+) -> Optional[int]:
+    """컬렉션의 문서 수를 반환합니다 (collection_state, TTL 캐시). 컬렉션이 없으면 None."""
+    state = collection_state(connection_string, collection_name, ttl)
+    return state[0] if state is not None else None
+
+
+def invalidate_collection_count(connection_string: str, collection_name: str) -> None:
+    """컬렉션 내용을 바꾼 뒤 캐시된 문서 수/버전을 버립니다."""
+    _collection_states.pop((connection_string, collection_name), None)
+
+
+def resolve_connection_string(connection_string: Optional[str] = None) -> str:
+    """연결 문자열을 반환합니다. None이면 PGVECTOR_* 환경 변수로 구성합니다."""
     if connection_string is None:
         # 환경 변수에서 연결 정보 읽기 (기존 방식)
         host = os.getenv("PGVECTOR_HOST", "localhost")
@@ -50,32 +235,124 @@ def get_pgvector_db(
         password = os.getenv("PGVECTOR_PASSWORD", "postgres")
         database = os.getenv("PGVECTOR_DATABASE", "postgres")
         connection_string = f"postgresql://{user}:{password}@{host}:{port}/{database}"
+    return connection_string
+
 
+def resolve_collection_name(collection_name: Optional[str] = None) -> str:
+    """컬렉션 이름을 반환합니다. None이면 PGVECTOR_COLLECTION 환경 변수를 사용합니다."""
     if collection_name is None:
         collection_name = os.getenv("PGVECTOR_COLLECTION", "lang2sql_table_info_db")
-    try:
-        vector_store = PGVector(
-            embeddings=embeddings,
-            collection_name=collection_name,
-            connection=connection_string,
+    return collection_name
+
+
+def pgvector_store_class():
+    """PGVECTOR_VECTOR_TYPE(vector|halfvec)에 맞는 스토어 클래스를 반환합니다."""
+    if os.getenv("PGVECTOR_VECTOR_TYPE", "vector").lower() == "halfvec":
+        return HalfvecPGVector
+    return IndexedPGVector
+
+
+def open_pgvector_store(
+    connection_string: Optional[str] = None,
+    collection_name: Optional[str] = None,
+    embeddings=None,
+) -> IndexedPGVector:
+    """
+    이미 있는 컬렉션을 공유 커넥션 풀로 엽니다 (문서 수 확인, 인덱싱, vector 확장 생성 없음).
+
+    PGVector 생성자는 항상 테이블 생성(CREATE TABLE IF NOT EXISTS)과 컬렉션 get-or-create를
+    실행하므로, 테이블과 컬렉션이 이미 있으면 조회만 하고 없으면 만듭니다.
+    인덱스 관리처럼 검색하지 않는 작업은 embeddings 없이 열 수 있습니다.
+    """
+    return pgvector_store_class()(
+        embeddings=embeddings,
+        collection_name=resolve_collection_name(collection_name),
+        connection=get_pgvector_engine(resolve_connection_string(connection_string)),
+        create_extension=False,
+    )
+
+
+def get_pgvector_db(
+    connection_string: Optional[str] = None,
+    collection_name: Optional[str] = None,
+    embeddings=None,
+):
+    """
+    pgvector 벡터 데이터베이스를 로드하거나 생성합니다.
+
+    연결은 연결 문자열별로 공유하는 커넥션 풀을 사용하고, 컬렉션 존재 여부는
+    임베딩 검색 대신 SQL 문서 수 조회(TTL 캐시)로 확인합니다.
+    """
+    if embeddings is None:
+        embeddings = get_embeddings()
+
+    connection_string = resolve_connection_string(connection_string)
+    collection_name = resolve_collection_name(collection_name)
+    if count_collection_documents(connection_string, collection_name):
+        vector_store = open_pgvector_store(connection_string, collection_name, embeddings)
+    else:
+        print(f"pgvector 컬렉션이 비어 있거나 없습니다: {collection_name}")
+        # 컬렉션이 없으면 문서를 인덱싱 (COPY 일괄 적재, 일부만 적재된 컬렉션은 남은 테이블만 임베딩)
+        vector_store, _ = sync_pgvector_db(
+            connection_string, collection_name, embeddings, ensure_index=False
         )
 
-        results = vector_store.similarity_search("test", k=1)
-        if not results:
-            raise RuntimeError(f"Collection '{collection_name}' is empty")
+    # 컬렉션별 HNSW/IVFFlat 부분 인덱스 (이미 있으면 건너뜀, PGVECTOR_INDEX_TYPE=none이면 생략)
+    try:
+        ensure_pgvector_index(vector_store)
+    except DBAPIError as e:
+        print(f"⚠️ pgvector 인덱스를 만들지 못했습니다 (순차 검색으로 동작): {e}")
+    return vector_store
+
+
+def sync_pgvector_db(
+    connection_string: Optional[str] = None,
+    collection_name: Optional[str] = None,
+    embeddings=None,
+    documents: Optional[List[Document]] = None,
+    delete_missing: bool = True,
+    ensure_index: bool = True,
+) -> Tuple[IndexedPGVector, Dict[str, int]]:
+    """
+    카탈로그 문서와 pgvector 컬렉션을 증분 동기화합니다 (pgvector_sync.sync_pgvector_collection).
 
-        # 컬렉션이 존재하면 실제 검색도 진행해 볼 수 있습니다.
-        vector_store.similarity_search("test", k=1)
-        return vector_store
+    바뀐 테이블만 임베딩하고 사라진 테이블은 삭제하며, 컬렉션이 없으면 만듭니다.
+    documents가 None이면 get_info_from_db()로 카탈로그 전체를 가져옵니다.
+    (스토어, {"added", "updated", "deleted", "unchanged"})를 반환합니다.
+    """
+    if embeddings is None:
+        embeddings = get_embeddings()
+    connection_string = resolve_connection_string(connection_string)
+    collection_name = resolve_collection_name(collection_name)
 
-    except Exception as e:
-        print(f"exception: {e}")
-        # 컬렉션이 없거나 불러오기에 실패한 경우, 문서를 다시 인덱싱
+    # 생성자가 langchain_pg_* 테이블과 컬렉션이 없으면 만듦
+    vector_store = pgvector_store_class()(
+        embeddings=embeddings,
+        collection_name=collection_name,
+        connection=get_pgvector_engine(connection_string),
+    )
+    if documents is None:
         documents = get_info_from_db()
-        vector_store = PGVector.from_documents(
-            documents=documents,
-            embedding=embeddings,
-            connection=connection_string,
-            collection_name=collection_name,
-        )
-        return vector_store
+    stats = sync_pgvector_collection(
+        vector_store, documents, delete_missing=delete_missing
+    )
+    invalidate_collection_count(connection_string, collection_name)
+    print(f"✅ pgvector 동기화 완료: {stats}")
+
+    if ensure_index:
+        ensure_pgvector_index(vector_store)
+    return vector_store, stats
+
+
+def pgvector_collection_version(
+    connection_string: Optional[str] = None, collection_name: Optional[str] = None
+) -> Optional[Tuple[int, Optional[str]]]:
+    """
+    레지스트리/시맨틱 캐시 무효화 기준이 되는 컬렉션 버전 (문서 수, 동기화 버전; TTL 캐시)을 반환합니다.
+
+    sync_pgvector_db로 테이블을 추가/삭제하거나 같은 행 ID로 다시 적재하면 값이 바뀝니다.
+    """
+    return collection_state(
+        resolve_connection_string(connection_string),
+        resolve_collection_name(collection_name),
+    )
@@ -0,0 +1,283 @@
+"""
+pgvector ANN 인덱스 관리 모듈
+
+langchain_pg_embedding 테이블은 여러 컬렉션이 함께 쓰고 embedding 컬럼에 차원이 없으므로,
+컬렉션마다 `embedding::vector(d)`(또는 halfvec(d)) 식에 collection_id 조건의 부분 인덱스를 만듭니다.
+검색(pgvector_db.IndexedPGVector)은 같은 식과 상수 collection_id로 질의하므로 플래너가 이 인덱스를 사용합니다.
+
+환경 변수:
+    PGVECTOR_INDEX_TYPE: hnsw(기본값) | ivfflat | none (none이면 인덱스를 만들지 않음)
+    PGVECTOR_HNSW_M / PGVECTOR_HNSW_EF_CONSTRUCTION: HNSW 생성 파라미터 (기본값: 16 / 64)
+    PGVECTOR_IVFFLAT_LISTS: IVFFlat 클러스터 수 (기본값: 행 수/1000, 100만 행 초과 시 √행 수)
+    PGVECTOR_EF_SEARCH / PGVECTOR_PROBES: 검색 시 기본 hnsw.ef_search / ivfflat.probes
+"""
+
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+import sqlalchemy
+from langchain_postgres.vectorstores import DistanceStrategy
+
+PGVECTOR_INDEX_TYPES = ("hnsw", "ivfflat")
+
+_OPERATORS = {
+    DistanceStrategy.EUCLIDEAN: ("l2", "<->"),
+    DistanceStrategy.COSINE: ("cosine", "<=>"),
+    DistanceStrategy.MAX_INNER_PRODUCT: ("ip", "<#>"),
+}
+
+_TABLE = "langchain_pg_embedding"
+
+
+def default_index_type() -> Optional[str]:
+    index_type = os.getenv("PGVECTOR_INDEX_TYPE", "hnsw").lower()
+    return None if index_type == "none" else index_type
+
+
+def default_lists(n_rows: int) -> int:
+    """pgvector 권장값: 100만 행 이하는 행 수/1000, 초과하면 √행 수"""
+    if n_rows > 1_000_000:
+        return int(math.sqrt(n_rows))
+    return max(1, n_rows // 1000)
+
+
+def apply_search_settings(
+    session,
+    limit: int,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+) -> None:
+    """
+    현재 트랜잭션에만 적용되는 검색 파라미터를 설정합니다 (SET LOCAL과 동일).
+
+    HNSW는 ef_search개까지만 반환하므로 ef_search는 최소 limit 이상으로 맞춥니다.
+    """
+    if ef_search is None and os.getenv("PGVECTOR_EF_SEARCH"):
+        ef_search = int(os.getenv("PGVECTOR_EF_SEARCH"))
+    if probes is None and os.getenv("PGVECTOR_PROBES"):
+        probes = int(os.getenv("PGVECTOR_PROBES"))
+
+    settings = {"hnsw.ef_search": max(ef_search or 40, limit)}
+    if probes:
+        settings["ivfflat.probes"] = probes
+    for name, value in settings.items():
+        session.execute(
+            sqlalchemy.text("SELECT set_config(:name, :value, true)"),
+            {"name": name, "value": str(int(value))},
+        )
+
+
+def index_expression(vector_type: str, dimensions: int) -> str:
+    return f"(embedding::{vector_type}({int(dimensions)}))"
+
+
+def index_name(collection_uuid, index_type: str, vector_type: str) -> str:
+    return f"ix_{vector_type}_{index_type}_{collection_uuid.hex}"
+
+
+def _collection(vector_store):
+    with vector_store._make_sync_session() as session:
+        return vector_store.get_collection(session)
+
+
+def collection_dimensions(vector_store) -> Optional[int]:
+    """저장된 임베딩의 차원을 조회합니다 (임베딩 호출 없이)."""
+    with vector_store._make_sync_session() as session:
+        collection = vector_store.get_collection(session)
+        if collection is None:
+            return None
+        return session.execute(
+            sqlalchemy.select(
+                sqlalchemy.func.vector_dims(vector_store.EmbeddingStore.embedding)
+            )
+            .where(vector_store.EmbeddingStore.collection_id == collection.uuid)
+            .limit(1)
+        ).scalar()
+
+
+def list_collection_indexes(vector_store) -> List[Dict[str, Any]]:
+    """컬렉션의 ANN 부분 인덱스 목록(이름, 정의, 크기, 사용 횟수)을 반환합니다."""
+    collection = _collection(vector_store)
+    if collection is None:
+        return []
+    with vector_store._engine.connect() as conn:
+        rows = conn.execute(
+            sqlalchemy.text(
+                "SELECT i.indexname, i.indexdef, "
+                "pg_relation_size(quote_ident(i.schemaname) || '.' || quote_ident(i.indexname)) AS size_bytes, "
+                "coalesce(s.idx_scan, 0) AS idx_scan "
+                "FROM pg_indexes i "
+                "LEFT JOIN pg_stat_user_indexes s "
+                "ON s.schemaname = i.schemaname AND s.indexrelname = i.indexname "
+                "WHERE i.tablename = :table AND i.indexdef LIKE :collection "
+                "AND (i.indexdef LIKE '%USING hnsw%' OR i.indexdef LIKE '%USING ivfflat%') "
+                "ORDER BY i.indexname"
+            ),
+            {"table": _TABLE, "collection": f"%{collection.uuid}%"},
+        ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def ensure_pgvector_index(
+    vector_store,
+    index_type: Optional[str] = None,
+    dimensions: Optional[int] = None,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    lists: Optional[int] = None,
+    rebuild: bool = False,
+) -> Optional[str]:
+    """
+    컬렉션에 ANN 부분 인덱스가 있도록 보장하고 인덱스 이름을 반환합니다.
+
+    같은 컬렉션의 다른 ANN 인덱스(다른 타입, 예전 이름)는 삭제합니다. 인덱스는
+    CREATE INDEX CONCURRENTLY로 만들어 생성 중에도 쓰기를 막지 않습니다.
+    컬렉션이 비어 있으면(IVFFlat은 데이터로 학습하므로) 만들지 않고 None을 반환합니다.
+    """
+    index_type = index_type or default_index_type()
+    if index_type is None:
+        return None
+    if index_type not in PGVECTOR_INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 pgvector 인덱스 타입: {index_type}")
+
+    collection = _collection(vector_store)
+    if collection is None:
+        return None
+    dimensions = dimensions or collection_dimensions(vector_store)
+    if not dimensions:
+        return None
+
+    vector_type = getattr(vector_store, "vector_type", "vector")
+    opclass = f"{vector_type}_{_OPERATORS[vector_store._distance_strategy][0]}_ops"
+    name = index_name(collection.uuid, index_type, vector_type)
+
+    if index_type == "hnsw":
+        params = (
+            f"m = {int(m or os.getenv('PGVECTOR_HNSW_M', '16'))}, "
+            f"ef_construction = {int(ef_construction or os.getenv('PGVECTOR_HNSW_EF_CONSTRUCTION', '64'))}"
+        )
+    else:
+        if lists is None and os.getenv("PGVECTOR_IVFFLAT_LISTS"):
+            lists = int(os.getenv("PGVECTOR_IVFFLAT_LISTS"))
+        if lists is None:
+            with vector_store._engine.connect() as conn:
+                n_rows = conn.execute(
+                    sqlalchemy.text(f"SELECT count(*) FROM {_TABLE} WHERE collection_id = :uuid"),
+                    {"uuid": collection.uuid},
+                ).scalar()
+            lists = default_lists(n_rows)
+        params = f"lists = {int(lists)}"
+
+    # CONCURRENTLY는 트랜잭션 밖에서 실행해야 함
+    with vector_store._engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as conn:
+        for existing in list_collection_indexes(vector_store):
+            if existing["indexname"] != name or rebuild:
+                print(f"🧹 pgvector 인덱스 삭제: {existing['indexname']}")
+                conn.execute(
+                    sqlalchemy.text(f'DROP INDEX CONCURRENTLY IF EXISTS "{existing["indexname"]}"')
+                )
+        conn.execute(
+            sqlalchemy.text(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON {_TABLE} '
+                f"USING {index_type} ({index_expression(vector_type, dimensions)} {opclass}) "
+                f"WITH ({params}) "
+                f"WHERE collection_id = '{collection.uuid}'"
+            )
+        )
+    return name
+
+
+def explain_search(
+    vector_store,
+    k: int = 5,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    analyze: bool = False,
+) -> Dict[str, Any]:
+    """
+    검색과 같은 형태의 질의에 대한 실행 계획을 반환합니다.
+
+    질의 벡터는 컬렉션에 저장된 임베딩 하나를 사용하므로 임베딩 API를 호출하지 않습니다.
+    """
+    collection = _collection(vector_store)
+    if collection is None:
+        raise ValueError(f"컬렉션이 없습니다: {vector_store.collection_name}")
+    dimensions = collection_dimensions(vector_store)
+    vector_type = getattr(vector_store, "vector_type", "vector")
+    operator = _OPERATORS[vector_store._distance_strategy][1]
+    expression = index_expression(vector_type, dimensions)
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+
+    with vector_store._make_sync_session() as session:
+        sample = session.execute(
+            sqlalchemy.text(
+                f"SELECT embedding::text FROM {_TABLE} WHERE collection_id = :uuid LIMIT 1"
+            ),
+            {"uuid": collection.uuid},
+        ).scalar()
+        apply_search_settings(session, k, ef_search=ef_search, probes=probes)
+        plan = session.execute(
+            sqlalchemy.text(
+                f"EXPLAIN ({options}) SELECT id FROM {_TABLE} "
+                f"WHERE collection_id = '{collection.uuid}' "
+                f"ORDER BY {expression} {operator} CAST(:query AS {vector_type}({int(dimensions)})) "
+                f"LIMIT {int(k)}"
+            ),
+            {"query": sample},
+        ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    plan = plan[0]
+
+    used = []
+
+    def walk(node):
+        if node.get("Index Name"):
+            used.append(node["Index Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return {
+        "uses_index": bool(used),
+        "indexes": used,
+        "total_cost": plan["Plan"].get("Total Cost"),
+        "execution_time_ms": plan.get("Execution Time"),
+        "plan": plan,
+    }
+
+
+def pgvector_index_report(
+    vector_store,
+    k: int = 5,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    analyze: bool = False,
+) -> Dict[str, Any]:
+    """컬렉션 문서 수, 테이블/인덱스 크기, 인덱스 사용 횟수와 검색 실행 계획을 모아 반환합니다."""
+    collection = _collection(vector_store)
+    if collection is None:
+        raise ValueError(f"컬렉션이 없습니다: {vector_store.collection_name}")
+    with vector_store._engine.connect() as conn:
+        n_rows = conn.execute(
+            sqlalchemy.text(f"SELECT count(*) FROM {_TABLE} WHERE collection_id = :uuid"),
+            {"uuid": collection.uuid},
+        ).scalar()
+        table_bytes = conn.execute(
+            sqlalchemy.text(f"SELECT pg_total_relation_size('{_TABLE}')")
+        ).scalar()
+    return {
+        "collection": vector_store.collection_name,
+        "documents": n_rows,
+        "dimensions": collection_dimensions(vector_store),
+        "vector_type": getattr(vector_store, "vector_type", "vector"),
+        "table_total_bytes": table_bytes,
+        "indexes": list_collection_indexes(vector_store),
+        "explain": explain_search(
+            vector_store, k=k, ef_search=ef_search, probes=probes, analyze=analyze
+        ),
+    }
@@ -0,0 +1,223 @@
+"""
+pgvector 컬렉션 증분 동기화 모듈
+
+카탈로그 문서(테이블 단위)를 컬렉션과 비교하여 바뀐 테이블만 다시 임베딩합니다.
+
+- 테이블은 metadata의 table_name으로 구분하고, 내용 해시(page_content + metadata)로 변경 여부를 판단합니다.
+  해시는 저장된 document/cmetadata로부터 다시 계산하므로 별도 컬럼이나 metadata 키가 필요 없고,
+  이전에 from_documents로 만든 컬렉션도 그대로 동기화할 수 있습니다.
+- 새 테이블/바뀐 테이블만 임베딩하며(llm.concurrent_embeddings로 RPM/TPM 한도 안에서 동시 요청), 카탈로그에서 사라진 테이블과 이전 버전 행은 삭제합니다.
+- 쓰기는 행 단위 INSERT 대신 COPY ... FROM STDIN (CSV)으로 한 번에 적재하고,
+  삭제와 적재는 한 트랜잭션에서 실행하여 검색 중인 프로세스가 중간 상태를 보지 않습니다.
+- 같은 트랜잭션에서 컬렉션 cmetadata에 버전 스탬프({"version", "documents"})를 기록합니다.
+  검색 프로세스는 임베딩 행을 훑지 않고 컬렉션 행 하나만 읽어 버전을 확인합니다 (pgvector_db.collection_state).
+
+환경 변수:
+    PGVECTOR_SYNC_BATCH_SIZE: 요청 하나에 담을 문서 수 (기본값: 256)
+    EMBEDDING_CONCURRENCY / EMBEDDING_RPM / EMBEDDING_TPM: llm/concurrent_embeddings.py 참고
+"""
+
+import csv
+import io
+import json
+import os
+import uuid
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import sqlalchemy
+from langchain.schema import Document
+
+from llm_utils.llm.concurrent_embeddings import with_build_concurrency
+from llm_utils.table_document import content_hash, document_key
+
+_TABLE = "langchain_pg_embedding"
+_COLLECTION_TABLE = "langchain_pg_collection"
+# 컬렉션 cmetadata에서 동기화 버전 스탬프를 담는 키
+SYNC_STAMP_KEY = "lang2sql_sync"
+_COPY_SQL = (
+    f"COPY {_TABLE} (id, collection_id, embedding, document, cmetadata) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+
+class SyncPlan(NamedTuple):
+    """동기화 계획. upserts는 임베딩할 (행 ID, 문서), deletes는 삭제할 행 ID입니다."""
+
+    upserts: List[Tuple[str, Document]]
+    deletes: List[str]
+    added: int
+    updated: int
+    removed: int
+    unchanged: int
+
+
+def document_row_id(collection_uuid: uuid.UUID, key: str) -> str:
+    """컬렉션과 테이블 키로 결정되는 행 ID (id는 전체 컬렉션에서 유일해야 함)."""
+    return str(uuid.uuid5(collection_uuid, key))
+
+
+def plan_sync(
+    existing: Iterable[Tuple[str, str, str]],
+    documents: Iterable[Document],
+    collection_uuid: uuid.UUID,
+    delete_missing: bool = True,
+) -> SyncPlan:
+    """
+    저장된 행 (행 ID, 키, 내용 해시)과 새 문서를 비교하여 동기화 계획을 만듭니다.
+
+    같은 키의 문서가 여러 개면 마지막 문서를 사용합니다. 같은 키의 저장된 행이 여러 개면
+    해시가 같은 행 하나만 남기고 나머지는 삭제합니다.
+    """
+    stored: Dict[str, List[Tuple[str, str]]] = {}
+    for row_id, key, digest in existing:
+        stored.setdefault(key, []).append((row_id, digest))
+
+    incoming: Dict[str, Document] = {}
+    for doc in documents:
+        incoming[document_key(doc.page_content, doc.metadata)] = doc
+
+    upserts, deletes = [], []
+    added = updated = unchanged = 0
+    for key, doc in incoming.items():
+        rows = stored.pop(key, [])
+        digest = content_hash(doc.page_content, doc.metadata)
+        keep = next((row_id for row_id, row_digest in rows if row_digest == digest), None)
+        deletes.extend(row_id for row_id, _ in rows if row_id != keep)
+        if keep is not None:
+            unchanged += 1
+            continue
+        if rows:
+            updated += 1
+        else:
+            added += 1
+        upserts.append((document_row_id(collection_uuid, key), doc))
+
+    removed = 0
+    if delete_missing:
+        removed = len(stored)
+        for rows in stored.values():
+            deletes.extend(row_id for row_id, _ in rows)
+    return SyncPlan(upserts, deletes, added, updated, removed, unchanged)
+
+
+def _stored_rows(conn, collection_uuid: uuid.UUID) -> List[Tuple[str, str, str]]:
+    rows = conn.execute(
+        sqlalchemy.text(
+            f"SELECT id, document, cmetadata FROM {_TABLE} WHERE collection_id = :uuid"
+        ),
+        {"uuid": collection_uuid},
+    )
+    result = []
+    for row_id, document, metadata in rows:
+        if isinstance(metadata, str):
+            metadata = json.loads(metadata)
+        result.append(
+            (row_id, document_key(document, metadata), content_hash(document, metadata))
+        )
+    return result
+
+
+def _copy_rows(conn, rows: List[Tuple[str, uuid.UUID, List[float], str, Mapping]]) -> None:
+    """COPY FROM STDIN으로 행을 한 번에 적재합니다 (psycopg 3 / psycopg2 모두 지원)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row_id, collection_uuid, embedding, document, metadata in rows:
+        writer.writerow(
+            [
+                row_id,
+                str(collection_uuid),
+                "[" + ",".join(repr(float(x)) for x in embedding) + "]",
+                document,
+                json.dumps(metadata or {}, ensure_ascii=False, default=str),
+            ]
+        )
+
+    dbapi_conn = conn.connection.driver_connection
+    with dbapi_conn.cursor() as cursor:
+        if hasattr(cursor, "copy"):  # psycopg 3
+            with cursor.copy(_COPY_SQL) as copy:
+                copy.write(buffer.getvalue())
+        else:  # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(_COPY_SQL, buffer)
+
+
+def _write_sync_stamp(conn, collection_uuid: uuid.UUID) -> None:
+    """컬렉션 cmetadata에 새 버전과 현재 문서 수를 기록합니다 (호출한 트랜잭션 안에서)."""
+    conn.execute(
+        sqlalchemy.text(
+            f"UPDATE {_COLLECTION_TABLE} SET cmetadata = CAST("
+            "COALESCE(CAST(cmetadata AS jsonb), '{}'::jsonb) || jsonb_build_object("
+            f"'{SYNC_STAMP_KEY}', jsonb_build_object("
+            "'version', CAST(:version AS text), "
+            f"'documents', (SELECT count(*) FROM {_TABLE} WHERE collection_id = :uuid))"
+            ") AS json) WHERE uuid = :uuid"
+        ),
+        {"uuid": collection_uuid, "version": uuid.uuid4().hex},
+    )
+
+
+def sync_pgvector_collection(
+    vector_store,
+    documents: Iterable[Document],
+    delete_missing: bool = True,
+    batch_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    컬렉션을 documents와 같게 맞추고 added/updated/deleted/unchanged 수를 반환합니다.
+
+    vector_store는 컬렉션이 이미 만들어진 PGVector 인스턴스여야 합니다.
+    임베딩은 트랜잭션 밖에서 batch_size개씩 동시에 요청하고, 삭제와 COPY 적재, 버전 스탬프 기록만
+    한 트랜잭션에서 실행합니다. 바뀐 내용이 없고 스탬프가 이미 있으면 쓰지 않습니다.
+    delete_missing=False면 documents에 없는 테이블을 남겨 둡니다 (부분 갱신용).
+    """
+    batch_size = batch_size or int(os.getenv("PGVECTOR_SYNC_BATCH_SIZE", "256"))
+    with vector_store._make_sync_session() as session:
+        collection = vector_store.get_collection(session)
+    if collection is None:
+        raise ValueError(f"컬렉션이 없습니다: {vector_store.collection_name}")
+
+    with vector_store._engine.connect() as conn:
+        existing = _stored_rows(conn, collection.uuid)
+    plan = plan_sync(existing, documents, collection.uuid, delete_missing=delete_missing)
+    print(
+        f"🔄 pgvector 동기화 계획: 추가 {plan.added}, 변경 {plan.updated}, "
+        f"삭제 {plan.removed}, 유지 {plan.unchanged}"
+    )
+
+    rows = []
+    if plan.upserts:
+        embeddings = with_build_concurrency(vector_store.embeddings, batch_size=batch_size)
+        vectors = embeddings.embed_documents([doc.page_content for _, doc in plan.upserts])
+        rows = [
+            (row_id, collection.uuid, vector, doc.page_content, doc.metadata)
+            for (row_id, doc), vector in zip(plan.upserts, vectors)
+        ]
+
+    stamped = SYNC_STAMP_KEY in (collection.cmetadata or {})
+    if rows or plan.deletes or not stamped:
+        # 변경된 테이블은 같은 행 ID로 다시 적재하므로 먼저 삭제
+        stale = list(dict.fromkeys(plan.deletes + [row[0] for row in rows]))
+        with vector_store._engine.begin() as conn:
+            # 동시에 실행된 동기화가 서로의 커밋을 본 문서 수를 기록하도록 컬렉션 행을 잠금
+            conn.execute(
+                sqlalchemy.text(
+                    f"SELECT uuid FROM {_COLLECTION_TABLE} WHERE uuid = :uuid FOR UPDATE"
+                ),
+                {"uuid": collection.uuid},
+            )
+            if stale:
+                conn.execute(
+                    sqlalchemy.text(f"DELETE FROM {_TABLE} WHERE id = ANY(:ids)"),
+                    {"ids": stale},
+                )
+            if rows:
+                _copy_rows(conn, rows)
+            _write_sync_stamp(conn, collection.uuid)
+
+    return {
+        "added": plan.added,
+        "updated": plan.updated,
+        "deleted": plan.removed,
+        "unchanged": plan.unchanged,
+    }
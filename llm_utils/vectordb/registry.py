@@ -0,0 +1,113 @@
+"""
+VectorDB 레지스트리 - 로드된 벡터 스토어와 임베딩 클라이언트를 프로세스 단위로 재사용
+
+키: (vectordb_type, location, embedding provider, embedding model)
+저장 위치의 버전(FAISS: 인덱스 파일 mtime/크기)이 바뀐 경우에만 다시 로드합니다.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from llm_utils.llm import get_embeddings, get_embedding_identity
+
+StoreKey = Tuple[str, str, str, str]
+
+
+class VectorStoreRegistry:
+    """스레드 안전한 벡터 스토어/임베딩 클라이언트 캐시"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._embeddings: Dict[Tuple[str, str], Any] = {}
+        # key -> (version, store)
+        self._stores: Dict[StoreKey, Tuple[Hashable, Any]] = {}
+
+    def _lock_for(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get_embeddings(self):
+        """현재 공급자/모델에 해당하는 임베딩 클라이언트를 반환합니다."""
+        identity = get_embedding_identity()
+        embeddings = self._embeddings.get(identity)
+        if embeddings is not None:
+            return embeddings
+
+        with self._lock_for(("embeddings",) + identity):
+            embeddings = self._embeddings.get(identity)
+            if embeddings is None:
+                embeddings = get_embeddings()
+                self._embeddings[identity] = embeddings
+            return embeddings
+
+    def register_embeddings(self, embeddings) -> None:
+        """현재 공급자/모델 키에 미리 만든 임베딩 클라이언트를 등록합니다 (벤치마크/테스트용 임베딩 등)."""
+        with self._lock:
+            self._embeddings[get_embedding_identity()] = embeddings
+
+    def get_store(
+        self,
+        vectordb_type: str,
+        location: str,
+        loader: Callable[[Any], Any],
+        version_fn: Optional[Callable[[], Hashable]] = None,
+    ):
+        """
+        캐시된 벡터 스토어를 반환하고, 없거나 버전이 바뀌었으면 loader로 다시 로드합니다.
+
+        Args:
+            vectordb_type: VectorDB 타입 ("faiss", "pgvector" 등)
+            location: 정규화된 저장 위치 (디렉토리 경로 또는 연결 문자열)
+            loader: 임베딩 클라이언트를 받아 벡터 스토어를 반환하는 함수
+            version_fn: 저장 위치의 현재 버전을 반환하는 함수. None이면 최초 1회만 로드합니다.
+        """
+        key = (vectordb_type, location) + get_embedding_identity()
+        version = version_fn() if version_fn else None
+
+        cached = self._stores.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with self._lock_for(key):
+            cached = self._stores.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            if cached is not None:
+                print(f"🔄 벡터 스토어 변경 감지, 다시 로드합니다: {location}")
+            store = loader(self.get_embeddings())
+            # 로더가 인덱스를 새로 생성했을 수 있으므로 로드 후 버전을 다시 읽음
+            version = version_fn() if version_fn else None
+            self._stores[key] = (version, store)
+            return store
+
+    def get_version(self, vectordb_type: str, location: str) -> Optional[Hashable]:
+        """캐시된 벡터 스토어의 버전을 반환합니다. 캐시에 없으면 None."""
+        key = (vectordb_type, location) + get_embedding_identity()
+        cached = self._stores.get(key)
+        return cached[0] if cached else None
+
+    def invalidate(
+        self, vectordb_type: Optional[str] = None, location: Optional[str] = None
+    ) -> None:
+        """조건에 맞는 캐시 항목을 제거합니다. 인자를 생략하면 모든 스토어를 제거합니다."""
+        with self._lock:
+            for key in list(self._stores):
+                if vectordb_type is not None and key[0] != vectordb_type:
+                    continue
+                if location is not None and key[1] != location:
+                    continue
+                del self._stores[key]
+
+    def clear(self) -> None:
+        """모든 벡터 스토어와 임베딩 클라이언트 캐시를 비웁니다."""
+        with self._lock:
+            self._stores.clear()
+            self._embeddings.clear()
+
+
+vector_store_registry = VectorStoreRegistry()
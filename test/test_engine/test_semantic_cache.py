@@ -0,0 +1,87 @@
+"""
+SemanticCache의 유사 질문 캐시 동작을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 임계값 이상으로 유사한 질문은 저장된 결과(메시지 객체 포함)를 반환하는지 확인
+- 임계값 미만이거나 설정(scope)이 다르면 캐시를 사용하지 않는지 확인
+- hit/miss 기록이 통계에 반영되는지 확인
+- pgvector 컬렉션이 다시 동기화되면 인덱스 버전(캐시 scope)이 바뀌는지 확인
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from engine.semantic_cache import SemanticCache, current_index_version
+
+
+class TestSemanticCache(unittest.TestCase):
+    """
+    SemanticCache의 조회/저장/통계 기능을 검증하는 테스트 케이스입니다.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "semantic_cache.sqlite3")
+        self.cache = SemanticCache(self.path, threshold=0.95)
+        self.scope = SemanticCache.make_scope({"graph_type": "basic"}, "v1")
+        self.result = {
+            "messages": [HumanMessage(content="난청 연간환자수 CY별 성 연령")],
+            "generated_query": AIMessage(content="SELECT 1"),
+            "searched_tables": {"bill": {"table_description": "청구서"}},
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_similar_question_hits(self):
+        """유사도가 임계값 이상이면 저장된 결과를 반환해야 합니다."""
+        self.cache.store("난청 연간환자수 CY별 성 연령", [1.0, 0.0, 0.0], self.scope, self.result)
+
+        cached, similarity = self.cache.lookup(
+            "난청 CY별 성 연령 연간환자수", [0.99, 0.05, 0.0], self.scope
+        )
+
+        self.assertGreaterEqual(similarity, 0.95)
+        self.assertIsInstance(cached["generated_query"], AIMessage)
+        self.assertEqual(cached["generated_query"].content, "SELECT 1")
+        self.assertEqual(cached["searched_tables"], self.result["searched_tables"])
+
+    def test_dissimilar_or_other_scope_misses(self):
+        """유사도가 낮거나 scope가 다르면 None을 반환해야 합니다."""
+        self.cache.store("질문", [1.0, 0.0, 0.0], self.scope, self.result)
+        other_scope = SemanticCache.make_scope({"graph_type": "basic"}, "v2")
+
+        self.assertIsNone(self.cache.lookup("다른 질문", [0.0, 1.0, 0.0], self.scope)[0])
+        self.assertIsNone(self.cache.lookup("질문", [1.0, 0.0, 0.0], other_scope)[0])
+
+    def test_shared_between_instances_and_stats(self):
+        """다른 인스턴스가 저장한 항목을 조회할 수 있고 hit/miss가 기록되어야 합니다."""
+        other = SemanticCache(self.path, threshold=0.95)
+        self.cache.lookup("질문", [1.0, 0.0, 0.0], self.scope)
+        other.store("질문", [1.0, 0.0, 0.0], self.scope, self.result)
+        self.cache.lookup("질문", [1.0, 0.0, 0.0], self.scope)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["hit"]["count"], 1)
+        self.assertEqual(stats["miss"]["count"], 1)
+
+    def test_pgvector_index_version_follows_collection(self):
+        """pgvector 컬렉션 버전(문서 수, 동기화 버전)이 바뀌면 인덱스 버전도 바뀌어야 합니다."""
+        env = {"VECTORDB_TYPE": "pgvector", "PGVECTOR_COLLECTION": "tables"}
+        with mock.patch.dict(os.environ, env), mock.patch(
+            "llm_utils.vectordb.pgvector_db.pgvector_collection_version",
+            side_effect=[(10, "a1"), (10, "a1"), (10, "b2")],
+        ):
+            before = current_index_version()
+            self.assertEqual(current_index_version(), before)
+            # 같은 문서 수로 테이블 내용만 바뀐 동기화
+            self.assertNotEqual(current_index_version(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+컬럼 단위 2차 인덱스(column_index)를 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- ColumnSelector가 Arrow docstore의 metadata 컬럼을 한 번에 읽고 문서별 조회(docstore.search)를 하지 않는지 확인
+- 삭제된 테이블의 컬럼(tombstone)은 빼고, 남은 테이블의 컬럼 위치만 갖는지 확인
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from llm_utils.column_index import COLUMN_INDEX_DIR, ColumnSelector, sync_column_index
+from llm_utils.table_document import build_table_document
+from llm_utils.vectordb.faiss_storage import ArrowDocstore, load_faiss_store
+
+
+def make_tables(names):
+    return [
+        build_table_document(
+            name, f"{name} 테이블", [("id", "식별자", "int"), ("amount", "금액", "numeric")]
+        )
+        for name in names
+    ]
+
+
+class TestColumnIndex(unittest.TestCase):
+    """ColumnSelector 테스트 클래스"""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def sync(self, names):
+        return sync_column_index(make_tables(names), self.embeddings, self.path, "fake/16")
+
+    def test_selector_reads_metadata_in_batch(self):
+        """docstore.search 없이 테이블별 컬럼 위치를 만들고, 삭제된 테이블은 빼는지 확인합니다."""
+        self.sync(["orders", "users", "refunds"])
+        # refunds 삭제: 압축 임계값을 넘지 않으면 tombstone으로 남음
+        with mock.patch.dict(os.environ, {"FAISS_COMPACT_THRESHOLD": "0.9"}):
+            self.sync(["orders", "users"])
+        column_db = load_faiss_store(os.path.join(self.path, COLUMN_INDEX_DIR), self.embeddings)
+        self.assertEqual(column_db.docstore.deleted_positions().tolist(), [4, 5])
+
+        with mock.patch.object(ArrowDocstore, "search") as search:
+            selector = ColumnSelector(column_db)
+        search.assert_not_called()
+
+        self.assertEqual(sorted(selector.table_positions), ["orders", "users"])
+        self.assertEqual(selector.table_positions["users"].tolist(), [2, 3])
+        self.assertEqual(
+            selector.rank_columns(self.embeddings.embed_query("users.amount: 금액"), "users", 1),
+            ["amount"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
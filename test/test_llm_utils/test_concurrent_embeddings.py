@@ -0,0 +1,93 @@
+"""
+인덱스 빌드용 동시 임베딩(concurrent_embeddings)을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 여러 배치를 동시에 임베딩해도 입력 순서대로 결과를 반환하는지 확인
+- 요청 한도 초과(429) 시 동시 요청 수를 한 번만 절반으로 줄이고 재시도하는지 확인
+- 분당 토큰 한도를 넘으면 버킷이 채워질 때까지 기다리는지 확인
+"""
+
+import threading
+import time
+import unittest
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from llm_utils.llm.concurrent_embeddings import (
+    AdaptiveConcurrency,
+    ConcurrentEmbeddings,
+    RateLimiter,
+)
+
+
+_lock = threading.Lock()
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class ThrottledEmbedding(DeterministicFakeEmbedding):
+    """처음 failures번은 429 오류를 내는 가짜 임베딩"""
+
+    failures: int = 0
+
+    def embed_documents(self, texts):
+        with _lock:
+            if self.failures:
+                self.failures -= 1
+                raise RateLimitError("Too Many Requests")
+        time.sleep(0.01)  # 네트워크 지연 흉내
+        with _lock:  # DeterministicFakeEmbedding은 전역 numpy 난수 상태를 쓰므로 스레드 안전하지 않음
+            return super().embed_documents(texts)
+
+
+class TestConcurrentEmbeddings(unittest.TestCase):
+    """ConcurrentEmbeddings 테스트 클래스"""
+
+    def test_results_keep_input_order(self):
+        """동시 요청과 429 재시도 후에도 결과 순서와 통계가 맞는지 확인합니다."""
+        texts = [f"table_{i}" for i in range(50)]
+        expected = DeterministicFakeEmbedding(size=8).embed_documents(texts)
+
+        embeddings = ConcurrentEmbeddings(
+            ThrottledEmbedding(size=8, failures=1),
+            max_concurrency=4,
+            batch_size=5,
+            base_delay=0,
+            cost_per_1m_tokens=0.02,
+        )
+        self.assertEqual(embeddings.embed_documents(texts), expected)
+
+        stats = embeddings.stats()
+        self.assertEqual(stats["documents"], 50)
+        self.assertEqual(stats["requests"], 10)
+        self.assertEqual(stats["throttled"], 1)
+        self.assertGreater(stats["estimated_cost"], 0)
+
+    def test_throttle_halves_concurrency_once(self):
+        """같은 시점에 출발한 요청들이 함께 실패해도 동시성은 한 번만 줄어드는지 확인합니다."""
+        concurrency = AdaptiveConcurrency(8)
+        epochs = [concurrency.acquire() for _ in range(3)]
+        for epoch in epochs:
+            concurrency.on_throttle(epoch, 0)
+            concurrency.release()
+        self.assertEqual(concurrency.limit, 4)
+
+        for _ in range(4):
+            concurrency.acquire()
+            concurrency.on_success()
+            concurrency.release()
+        self.assertEqual(concurrency.limit, 5)
+
+    def test_token_limit_waits_for_refill(self):
+        """분당 토큰 한도를 다 쓰면 다음 요청이 버킷이 채워질 때까지 기다리는지 확인합니다."""
+        limiter = RateLimiter(tpm=600)  # 초당 10토큰
+        limiter.acquire(600)
+        start = time.monotonic()
+        limiter.acquire(3)
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+DataHub 일괄 조회(scrollAcrossEntities) 경로를 테스트하는 단위 테스트 모듈입니다.
+
+GMS 서버 없이 execute_graphql_query만 가짜 응답으로 바꾸어 확인합니다.
+data_utils.datahub_datasets는 SDK를 쓰지 않으므로 datahub 패키지 없이도 실행됩니다.
+
+주요 테스트 항목:
+- parse_dataset이 dbt_unique_id 접두어와 컬럼 형식(이름/설명/타입)을 URN별 조회와 같게 만드는지 확인
+- nextScrollId가 비어 있거나 없으면 페이지 조회를 멈추고, dbt 스키마를 schema 필터로 저장하는지 확인
+- GraphQL 응답에 errors가 있으면 URN별 조회(_get_info_per_urn)로 대체하는지 확인
+"""
+
+import unittest
+from unittest import mock
+
+from data_utils.datahub_datasets import parse_dataset, scroll_datasets
+from llm_utils.table_document import get_table_record
+from llm_utils.tools import datahub
+
+ORDERS = {
+    "urn": "urn:li:dataset:orders",
+    "properties": {
+        "name": "orders",
+        "description": "주문 내역",
+        "customProperties": [{"key": "dbt_unique_id", "value": "model.sales.orders"}],
+    },
+    "schemaMetadata": {
+        "fields": [
+            {"fieldPath": "id", "description": "주문 ID", "nativeDataType": "bigint"},
+            {"fieldPath": "memo", "description": None, "nativeDataType": " "},
+        ]
+    },
+    "tags": {"tags": [{"tag": {"urn": "urn:li:tag:finance"}}]},
+    "ownership": {"owners": [{"owner": {"urn": "urn:li:corpuser:alice"}}]},
+}
+NO_DESCRIPTION = {
+    "urn": "urn:li:dataset:tmp",
+    "properties": {"name": "tmp", "description": None, "customProperties": []},
+    "schemaMetadata": None,
+    "tags": None,
+    "ownership": None,
+}
+CUSTOMERS = {
+    "urn": "urn:li:dataset:customers",
+    "properties": {
+        "name": "customers",
+        "description": "고객 정보",
+        "customProperties": [{"key": "dbt_unique_id", "value": "model.crm.customers"}],
+    },
+}
+
+
+def page(entities, next_scroll_id):
+    scroll = {"total": 3, "searchResults": [{"entity": entity} for entity in entities]}
+    if next_scroll_id is not ...:
+        scroll["nextScrollId"] = next_scroll_id
+    return {"data": {"scrollAcrossEntities": scroll}}
+
+
+class FakeClient:
+    """execute_graphql_query 응답을 차례로 돌려주고 요청 변수를 기록하는 DataHub 클라이언트"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.variables = []
+
+    def execute_graphql_query(self, query, variables):
+        self.variables.append(variables["input"])
+        return self.responses.pop(0)
+
+
+class FakeFetcher:
+    """DatahubMetadataFetcher.scroll_datasets처럼 client로 일괄 조회하는 페처"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def scroll_datasets(self, batch_size=500):
+        return scroll_datasets(self.client, batch_size)
+
+
+class TestDatahubBulk(unittest.TestCase):
+    """DataHub 일괄 조회 테스트 클래스"""
+
+    def get_info(self, client, **kwargs):
+        with mock.patch.object(datahub, "_get_fetcher", return_value=FakeFetcher(client)):
+            return datahub.get_info_from_db(**kwargs)
+
+    def test_parse_dataset(self):
+        """dbt_unique_id의 스키마 부분을 테이블 이름 앞에 붙이고, 빈 타입은 None으로 바꾸는지 확인합니다."""
+        dataset = parse_dataset(ORDERS)
+        self.assertEqual(dataset["table_name"], "sales.orders")
+        self.assertEqual(dataset["table_description"], "주문 내역")
+        self.assertEqual(
+            dataset["columns"],
+            [
+                {"column_name": "id", "column_description": "주문 ID", "column_type": "bigint"},
+                {"column_name": "memo", "column_description": None, "column_type": None},
+            ],
+        )
+        self.assertEqual((dataset["tags"], dataset["owners"]), (["finance"], ["alice"]))
+
+        dataset = parse_dataset(NO_DESCRIPTION)
+        self.assertEqual(dataset["table_name"], ".tmp")
+        self.assertEqual((dataset["columns"], dataset["tags"], dataset["owners"]), ([], [], []))
+        self.assertIsNone(parse_dataset({"urn": "urn:li:dataset:x"})["table_name"])
+
+    def test_paging_stops(self):
+        """nextScrollId가 빈 문자열이거나 없으면 더 요청하지 않고, 설명 없는 테이블은 빼는지 확인합니다."""
+        for last in ("", None, ...):
+            client = FakeClient(
+                [page([ORDERS, NO_DESCRIPTION], "scroll-1"), page([CUSTOMERS], last)]
+            )
+            docs = self.get_info(client, batch_size=2)
+
+            self.assertEqual([v["scrollId"] for v in client.variables], [None, "scroll-1"])
+            self.assertEqual({v["count"] for v in client.variables}, {2})
+            self.assertEqual(
+                [doc.metadata["table_name"] for doc in docs], ["sales.orders", "crm.customers"]
+            )
+
+        # "<dbt 스키마>.<테이블>"은 database가 아니라 schema 필터로 저장
+        self.assertEqual(docs[0].metadata["schema"], "sales")
+        self.assertNotIn("database", docs[0].metadata)
+        orders = get_table_record(docs[0])
+        self.assertEqual(orders["columns"][0], ["id", "주문 ID", "bigint"])
+        self.assertEqual((docs[0].metadata["tags"], docs[0].metadata["owners"]), (["finance"], ["alice"]))
+
+    def test_errors_fall_back_to_per_urn(self):
+        """GraphQL errors 응답이면 URN별 조회 결과를 반환하는지 확인합니다."""
+        client = FakeClient([{"errors": [{"message": "Unknown type 'ScrollAcrossEntitiesInput'"}]}])
+        with mock.patch.object(datahub, "_get_info_per_urn", return_value=["per-urn"]) as per_urn:
+            docs = self.get_info(client, max_workers=3, batch_size=2)
+
+        self.assertEqual(docs, ["per-urn"])
+        per_urn.assert_called_once_with(max_workers=3)
+        self.assertEqual(len(client.variables), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
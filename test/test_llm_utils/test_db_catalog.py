@@ -0,0 +1,102 @@
+"""
+운영 DB 카탈로그 읽기(db_catalog)를 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 스키마마다 테이블/컬럼 조회 1번씩만 실행하고, 스레드마다 커넥터를 따로 만들어 모두 닫는지 확인
+- 코멘트/타입이 테이블 문서의 설명과 구조화 metadata로 들어가는지 확인 (대문자 결과 컬럼, NULL 코멘트 포함)
+"""
+
+import threading
+import unittest
+
+import pandas as pd
+
+from llm_utils.db_catalog import load_db_catalog_documents
+from llm_utils.table_document import get_table_record
+
+TABLES = {
+    "SALES": [("ORDERS", "주문 내역"), ("REFUNDS", None)],
+    "CRM": [("CUSTOMERS", "고객 정보")],
+}
+COLUMNS = {
+    "SALES": [
+        ("ORDERS", "ID", "NUMBER", "주문 ID"),
+        ("ORDERS", "AMOUNT", "NUMBER", None),
+        ("REFUNDS", "ORDER_ID", "NUMBER", "환불한 주문 ID"),
+    ],
+    "CRM": [("CUSTOMERS", "ID", "NUMBER", "고객 ID")],
+}
+
+
+class FakeSnowflakeConnector:
+    """시스템 카탈로그 조회에 Snowflake처럼 대문자 컬럼명으로 답하는 테스트용 커넥터"""
+
+    instances = []
+    queries = []
+    lock = threading.Lock()
+
+    def __init__(self):
+        self.database = "ANALYTICS"
+        self.closed = False
+        self.thread = threading.get_ident()
+        with self.lock:
+            self.instances.append(self)
+
+    def run_sql(self, sql: str) -> pd.DataFrame:
+        assert threading.get_ident() == self.thread, "커넥터를 다른 스레드와 공유함"
+        with self.lock:
+            self.queries.append(sql)
+        if "schemata" in sql:
+            return pd.DataFrame({"SCHEMA_NAME": list(TABLES)})
+        schema = next(name for name in TABLES if f"'{name}'" in sql)
+        if "information_schema.columns" in sql:
+            return pd.DataFrame(
+                COLUMNS[schema],
+                columns=["TABLE_NAME", "COLUMN_NAME", "DATA_TYPE", "COLUMN_COMMENT"],
+            )
+        return pd.DataFrame(TABLES[schema], columns=["TABLE_NAME", "TABLE_COMMENT"])
+
+    def close(self):
+        self.closed = True
+
+
+class TestDbCatalog(unittest.TestCase):
+    """load_db_catalog_documents 테스트 클래스"""
+
+    def setUp(self):
+        FakeSnowflakeConnector.instances = []
+        FakeSnowflakeConnector.queries = []
+
+    def test_bulk_reads_per_schema(self):
+        """스키마마다 조회 2번으로 테이블 문서를 만들고 커넥터를 모두 닫는지 확인합니다."""
+        docs = load_db_catalog_documents(
+            "snowflake", max_workers=2, connector_factory=FakeSnowflakeConnector
+        )
+
+        self.assertEqual(len(FakeSnowflakeConnector.queries), 1 + 2 * len(TABLES))
+        self.assertTrue(all(c.closed for c in FakeSnowflakeConnector.instances))
+        self.assertEqual(
+            [doc.metadata["table_name"] for doc in docs],
+            ["ANALYTICS.SALES.ORDERS", "ANALYTICS.SALES.REFUNDS", "ANALYTICS.CRM.CUSTOMERS"],
+        )
+
+        orders = get_table_record(docs[0])
+        self.assertEqual(orders["table_description"], "주문 내역")
+        self.assertEqual(orders["columns"], [["ID", "주문 ID", "NUMBER"], ["AMOUNT", "", "NUMBER"]])
+        self.assertEqual((docs[0].metadata["database"], docs[0].metadata["schema"]), ("ANALYTICS", "SALES"))
+        self.assertEqual(get_table_record(docs[1])["table_description"], "")
+
+    def test_selected_schemas_and_unknown_type(self):
+        """지정한 스키마만 읽고, 지원하지 않는 DB 종류는 ValueError인지 확인합니다."""
+        docs = load_db_catalog_documents(
+            "snowflake", schemas=["CRM"], connector_factory=FakeSnowflakeConnector
+        )
+        self.assertEqual([doc.metadata["table_name"] for doc in docs], ["ANALYTICS.CRM.CUSTOMERS"])
+        self.assertEqual(len(FakeSnowflakeConnector.queries), 2)
+
+        with self.assertRaises(ValueError):
+            load_db_catalog_documents("sqlite", connector_factory=FakeSnowflakeConnector)
+
+
+if __name__ == "__main__":
+    unittest.main()
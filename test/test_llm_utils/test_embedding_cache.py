@@ -0,0 +1,106 @@
+"""
+CachedEmbeddings의 메모리/디스크 캐시 동작을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 같은 질문(공백 차이 포함)에 대해 원본 임베딩이 한 번만 호출되는지 확인
+- 디스크 계층이 다른 인스턴스(다른 프로세스 역할)와 공유되는지 확인
+- embed_documents에서 캐시에 없는 텍스트만 임베딩하는지 확인
+"""
+
+import os
+import tempfile
+import unittest
+
+from langchain_core.embeddings import Embeddings
+
+from llm_utils.llm.embedding_cache import CachedEmbeddings, SQLiteEmbeddingStore
+
+
+class CountingEmbeddings(Embeddings):
+    """호출된 텍스트를 기록하는 테스트용 임베딩"""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return [float(len(text)), 0.0]
+
+
+class TestCachedEmbeddings(unittest.TestCase):
+    """
+    CachedEmbeddings가 원본 임베딩 호출을 줄이는지 검증하는 테스트 케이스입니다.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "embeddings.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_query_is_embedded_once(self):
+        """
+        공백만 다른 같은 질문은 한 번만 임베딩되는지 확인합니다.
+        """
+
+        base = CountingEmbeddings()
+        cached = CachedEmbeddings(base, "openai", "test-model")
+
+        first = cached.embed_query("난청 환자수")
+        second = cached.embed_query("  난청   환자수 ")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(base.calls), 1)
+
+    def test_disk_tier_is_shared(self):
+        """
+        디스크 계층에 저장된 벡터를 다른 인스턴스가 재사용하는지 확인합니다.
+        """
+
+        first_base = CountingEmbeddings()
+        CachedEmbeddings(
+            first_base, "openai", "test-model", store=SQLiteEmbeddingStore(self.path)
+        ).embed_query("실손 청구")
+
+        second_base = CountingEmbeddings()
+        vector = CachedEmbeddings(
+            second_base, "openai", "test-model", store=SQLiteEmbeddingStore(self.path)
+        ).embed_query("실손 청구")
+
+        self.assertEqual(second_base.calls, [])
+        self.assertEqual(vector, [5.0, 0.0])
+
+    def test_documents_only_missing_are_embedded(self):
+        """
+        embed_documents에서 캐시에 없는 텍스트만 원본 임베딩으로 전달되는지 확인합니다.
+        """
+
+        base = CountingEmbeddings()
+        cached = CachedEmbeddings(base, "openai", "test-model")
+
+        cached.embed_documents(["a", "bb"])
+        vectors = cached.embed_documents(["a", "bb", "ccc", "ccc"])
+
+        self.assertEqual(base.calls, ["a", "bb", "ccc"])
+        self.assertEqual(len(vectors), 4)
+
+    def test_model_is_part_of_key(self):
+        """
+        모델이 다르면 캐시를 공유하지 않는지 확인합니다.
+        """
+
+        store = SQLiteEmbeddingStore(self.path)
+        base = CountingEmbeddings()
+        CachedEmbeddings(base, "openai", "model-a", store=store).embed_query("bill")
+        CachedEmbeddings(base, "openai", "model-b", store=store).embed_query("bill")
+
+        self.assertEqual(len(base.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
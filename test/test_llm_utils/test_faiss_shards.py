@@ -0,0 +1,122 @@
+"""
+샤드 단위 병렬 인덱스 빌드(faiss_shards)를 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 프로세스 풀에서 만든 샤드 인덱스를 동시에 검색한 상위 k개가 단일 인덱스 검색 결과와 같은지 확인
+- get_faiss_vector_db가 샤드 레이아웃을 불러오고, 다시 실행하면 아무것도 임베딩하지 않는지 확인
+- 샤드를 단일 인덱스로 병합(merge_from / 저장된 벡터로 재생성)해도 검색 결과와 manifest가 유지되는지 확인
+"""
+
+import functools
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_core.documents import Document
+
+from llm_utils.vectordb.faiss_db import get_faiss_vector_db
+from llm_utils.vectordb.faiss_index import build_faiss_store
+from llm_utils.vectordb.faiss_shards import (
+    ShardedFAISS,
+    build_sharded_catalog,
+    read_shard_layout,
+)
+from llm_utils.vectordb.faiss_storage import load_faiss_store
+from llm_utils.vectordb.faiss_sync import read_manifest
+
+_lock = threading.Lock()
+
+
+class LockedEmbedding(DeterministicFakeEmbedding):
+    """DeterministicFakeEmbedding은 전역 numpy 난수 상태를 쓰므로 동시 임베딩 시 호출을 직렬화"""
+
+    def embed_documents(self, texts):
+        with _lock:
+            return super().embed_documents(texts)
+
+
+EMBEDDINGS_FACTORY = functools.partial(LockedEmbedding, size=16)
+
+
+def make_documents(n_tables):
+    return [
+        Document(
+            page_content=f"t{i:03d}: 테이블 {i}\nColumns:\n id: 식별자\n name: 이름 {i}",
+            metadata={"table_name": f"t{i:03d}"},
+        )
+        for i in range(n_tables)
+    ]
+
+
+class TestShardedCatalog(unittest.TestCase):
+    """build_sharded_catalog 테스트 클래스"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.documents = make_documents(40)
+        self.embeddings = EMBEDDINGS_FACTORY()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def build(self, output, merge=False, index_type="flat"):
+        return build_sharded_catalog(
+            self.documents,
+            output,
+            4,
+            "fake/16",
+            build_kwargs={"index_type": index_type, "vector_codec": "float32"},
+            column_vector_codec="float32",
+            embeddings_factory=EMBEDDINGS_FACTORY,
+            processes=2,
+            merge=merge,
+        )
+
+    def assert_same_top_k(self, db, k=5):
+        single = build_faiss_store(self.documents, self.embeddings, index_type="flat")
+        for i in (0, 13, 39):
+            query = self.documents[i].page_content
+            expected = [
+                doc.metadata["table_name"] for doc, _ in single.similarity_search_with_score(query, k=k)
+            ]
+            actual = [doc.metadata["table_name"] for doc, _ in db.similarity_search_with_score(query, k=k)]
+            self.assertEqual(actual, expected)
+
+    def test_sharded_search_and_rerun(self):
+        """샤드 레이아웃 검색이 단일 인덱스와 같고, 재실행 시 임베딩이 없는지 확인합니다."""
+        output = os.path.join(self.root, "table_info_db")
+        stats = self.build(output)
+        self.assertEqual(stats["added"], 40)
+        self.assertEqual(stats["embedding_documents"], 40 + 80)  # 테이블 40개 + 컬럼 80개
+        self.assertFalse(read_shard_layout(output)["merged"])
+
+        db = get_faiss_vector_db(output, self.embeddings)
+        self.assertIsInstance(db, ShardedFAISS)
+        self.assertEqual(sum(shard.index.ntotal for shard in db.shards), 40)
+        self.assert_same_top_k(db)
+
+        stats = self.build(output)
+        self.assertEqual(stats["unchanged"], 40)
+        self.assertEqual(stats["embedded"], 0)
+
+    def test_merge_shards(self):
+        """flat 샤드는 merge_from, HNSW 샤드는 저장된 벡터로 단일 인덱스를 만드는지 확인합니다."""
+        for index_type in ("flat", "hnsw"):
+            output = os.path.join(self.root, index_type)
+            self.build(output, merge=True, index_type=index_type)
+
+            db = load_faiss_store(output, self.embeddings)
+            self.assertEqual(db.index.ntotal, 40)
+            self.assertEqual(len(read_manifest(output)["groups"]), 40)
+            self.assertTrue(os.path.isdir(os.path.join(output, "columns")))
+            if index_type == "flat":
+                self.assert_same_top_k(db)
+            hits = db.similarity_search(self.documents[7].page_content, k=1)
+            self.assertEqual(hits[0].metadata["table_name"], "t007")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+FAISS 저장 형식(index.faiss + docstore.arrow)을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 저장 후 다시 열었을 때 검색 결과(문서, 점수, metadata)가 같은지 확인
+- 문서 ID로 docstore를 조회할 수 있는지 확인
+- 이전 형식(index.pkl)은 허용하지 않으면 pickle을 읽지 않는지 확인
+- 저장 중인 파일을 섞어 읽어 인덱스와 docstore 행 수가 다르면 다시 읽는지 확인
+- int8 압축 인덱스도 원본 벡터 재정렬로 float32 검색과 같은 결과를 반환하는지 확인
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from langchain.schema import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+
+from llm_utils.vectordb.faiss_index import build_faiss_store
+from llm_utils.vectordb.faiss_storage import (
+    DOCSTORE_FILE,
+    EXACT_VECTORS_FILE,
+    INDEX_FILE,
+    load_faiss_store,
+    read_faiss_index,
+    save_faiss_store,
+)
+
+
+class TestFaissStorage(unittest.TestCase):
+    """
+    save_faiss_store/load_faiss_store 왕복 동작을 검증하는 테스트 케이스입니다.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+        self.documents = [
+            Document(
+                page_content=f"table_{i}: 테이블 {i}",
+                metadata={"table_name": f"table_{i}", "columns": [["id", "ID", None]]},
+            )
+            for i in range(20)
+        ]
+        self.db = FAISS.from_documents(self.documents, self.embeddings)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        """저장 후 다시 연 스토어가 같은 검색 결과를 반환해야 합니다."""
+        save_faiss_store(self.db, self.tmpdir.name)
+        loaded = load_faiss_store(self.tmpdir.name, self.embeddings)
+
+        expected = self.db.similarity_search_with_score("table_3: 테이블 3", k=5)
+        actual = loaded.similarity_search_with_score("table_3: 테이블 3", k=5)
+
+        self.assertEqual(
+            [(doc.page_content, doc.metadata, score) for doc, score in expected],
+            [(doc.page_content, doc.metadata, score) for doc, score in actual],
+        )
+        self.assertEqual(len(loaded.index_to_docstore_id), 20)
+
+    def test_search_by_id(self):
+        """문서 ID로 조회하면 같은 문서를, 없는 ID는 문자열 메시지를 반환해야 합니다."""
+        save_faiss_store(self.db, self.tmpdir.name)
+        loaded = load_faiss_store(self.tmpdir.name, self.embeddings)
+
+        doc_id = self.db.index_to_docstore_id[7]
+        self.assertEqual(loaded.docstore.search(doc_id).page_content, "table_7: 테이블 7")
+        self.assertIsInstance(loaded.docstore.search("missing"), str)
+
+    def test_torn_save_is_retried(self):
+        """새 docstore.arrow와 이전 index.faiss를 함께 읽으면 다시 읽고, 계속 다르면 ValueError가 발생해야 합니다."""
+        save_faiss_store(FAISS.from_documents(self.documents[:5], self.embeddings), self.tmpdir.name)
+        stale_index = os.path.join(self.tmpdir.name, "stale.faiss")
+        shutil.copy(os.path.join(self.tmpdir.name, INDEX_FILE), stale_index)
+        save_faiss_store(self.db, self.tmpdir.name)
+
+        # 첫 번째 읽기만 교체 전 인덱스(5개)를 보고, 다음 읽기에서 새 인덱스(20개)를 봄
+        reads = [stale_index]
+        with mock.patch(
+            "llm_utils.vectordb.faiss_storage.read_faiss_index",
+            side_effect=lambda path: read_faiss_index(reads.pop() if reads else path),
+        ) as read_index:
+            loaded = load_faiss_store(self.tmpdir.name, self.embeddings)
+        self.assertEqual(read_index.call_count, 2)
+        self.assertEqual(loaded.index.ntotal, len(loaded.docstore))
+        self.assertEqual(loaded.similarity_search("table_12: 테이블 12", k=1)[0].page_content, "table_12: 테이블 12")
+
+        os.replace(stale_index, os.path.join(self.tmpdir.name, INDEX_FILE))
+        with mock.patch("llm_utils.vectordb.faiss_storage.time.sleep"):
+            with self.assertRaises(ValueError):
+                load_faiss_store(self.tmpdir.name, self.embeddings)
+
+    def test_legacy_pickle_requires_opt_in(self):
+        """index.pkl만 있으면 FAISS_ALLOW_PICKLE 없이 ValueError가 발생해야 합니다."""
+        self.db.save_local(self.tmpdir.name)
+
+        with mock.patch.dict(os.environ, {"FAISS_ALLOW_PICKLE": "false"}):
+            with self.assertRaises(ValueError):
+                load_faiss_store(self.tmpdir.name, self.embeddings)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, DOCSTORE_FILE)))
+
+    def test_quantized_store_reranks_exactly(self):
+        """int8 인덱스를 저장/로드한 뒤에도 float32 정확 검색과 같은 문서와 점수를 반환해야 합니다."""
+        quantized = build_faiss_store(self.documents, self.embeddings, vector_codec="int8")
+        save_faiss_store(quantized, self.tmpdir.name)
+        loaded = load_faiss_store(self.tmpdir.name, self.embeddings)
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir.name, EXACT_VECTORS_FILE)))
+
+        expected = self.db.similarity_search_with_score("table_3: 테이블 3", k=3)
+        actual = loaded.similarity_search_with_score("table_3: 테이블 3", k=3)
+
+        self.assertEqual(
+            [doc.page_content for doc, _ in expected],
+            [doc.page_content for doc, _ in actual],
+        )
+        for (_, expected_score), (_, actual_score) in zip(expected, actual):
+            self.assertAlmostEqual(expected_score, actual_score, places=4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+스트리밍 카탈로그 빌드(faiss_stream)를 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 빌드가 중간에 실패해도 다시 실행하면 체크포인트 이후 테이블만 임베딩하는지 확인
+- 완성된 인덱스를 불러와 검색할 수 있고, 이후 증분 갱신(sync_faiss_store)과 manifest가 호환되는지 확인
+- 요청 한도 초과(429) 오류는 재시도하는지 확인
+"""
+
+import csv
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from llm_utils.catalog_source import load_catalog_documents
+from llm_utils.llm.rate_limit import embed_with_retry
+from llm_utils.table_document import document_key
+from llm_utils.vectordb.faiss_storage import load_faiss_store
+from llm_utils.vectordb.faiss_stream import stream_build_catalog
+from llm_utils.vectordb.faiss_sync import sync_faiss_store
+
+
+_lock = threading.Lock()
+
+
+class FlakyEmbedding(DeterministicFakeEmbedding):
+    """임베딩한 문서 수를 세고, fail_after번째 호출부터 실패하는 가짜 임베딩"""
+
+    calls: int = 0
+    texts: int = 0
+    fail_after: int = -1
+
+    def embed_documents(self, texts):
+        # 빌드는 여러 배치를 동시에 임베딩하는데, DeterministicFakeEmbedding은 전역 numpy 난수 상태를 씀
+        with _lock:
+            if self.fail_after >= 0 and self.calls >= self.fail_after:
+                raise RuntimeError("embedding backend down")
+            self.calls += 1
+            self.texts += len(texts)
+            return super().embed_documents(texts)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def write_catalog(path, n_tables):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["table_name", "table_description", "column_name", "column_description"]
+        )
+        for i in range(n_tables):
+            writer.writerow([f"t{i:03d}", f"테이블 {i}", "id", "식별자"])
+            writer.writerow([f"t{i:03d}", f"테이블 {i}", "name", f"이름 {i}"])
+
+
+class TestStreamBuildCatalog(unittest.TestCase):
+    """stream_build_catalog 테스트 클래스"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.catalog = os.path.join(self.root, "catalog.csv")
+        self.output = os.path.join(self.root, "table_info_db")
+        write_catalog(self.catalog, 30)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def build(self, embeddings):
+        return stream_build_catalog(
+            self.catalog,
+            self.output,
+            embeddings,
+            "fake/16",
+            build_kwargs={"index_type": "flat", "vector_codec": "float32"},
+            batch_size=4,
+            checkpoint_every=10,
+        )
+
+    def test_resume_after_failure(self):
+        """실패 후 재실행하면 체크포인트 이후만 임베딩하고 증분 갱신과 이어지는지 확인합니다."""
+        # 테이블 10개마다 테이블 3번 + 컬럼 5번 호출 -> 두 번째 체크포인트 전에 실패
+        flaky = FlakyEmbedding(size=16, fail_after=12)
+        with self.assertRaises(RuntimeError):
+            self.build(flaky)
+        self.assertFalse(os.path.exists(self.output))
+
+        resumed = FlakyEmbedding(size=16)
+        result = self.build(resumed)
+        self.assertEqual(result, {"tables": 30, "resumed_from": 10})
+        self.assertEqual(resumed.texts, 20 + 40)  # 테이블 20개 + 컬럼 40개
+        self.assertFalse(os.path.exists(self.output + ".partial"))
+
+        docs = load_catalog_documents(self.catalog)
+        db = load_faiss_store(self.output, resumed)
+        self.assertEqual(db.index.ntotal, 30)
+        for i in (3, 17, 29):  # 체크포인트 전/후 조각의 위치가 문서와 맞는지
+            hits = db.similarity_search(docs[i].page_content, k=1)
+            self.assertEqual(hits[0].metadata["table_name"], f"t{i:03d}")
+
+        stats = sync_faiss_store(
+            self.output,
+            {document_key(doc.page_content, doc.metadata): [doc] for doc in docs},
+            resumed,
+            "fake/16",
+            {"index_type": "flat", "vector_codec": "float32"},
+        )
+        self.assertEqual(stats["unchanged"], 30)
+        self.assertEqual(stats["embedded"], 0)
+
+    def test_rate_limit_is_retried(self):
+        """429 오류는 재시도하고, 재시도할 수 없는 오류는 바로 발생시키는지 확인합니다."""
+
+        class ThrottledEmbedding(DeterministicFakeEmbedding):
+            failures: int = 2
+
+            def embed_documents(self, texts):
+                if self.failures:
+                    self.failures -= 1
+                    raise RateLimitError("Too Many Requests")
+                return super().embed_documents(texts)
+
+        vectors = embed_with_retry(ThrottledEmbedding(size=8), ["a", "b"], base_delay=0)
+        self.assertEqual(len(vectors), 2)
+        with self.assertRaises(RuntimeError):
+            embed_with_retry(FlakyEmbedding(size=8, fail_after=0), ["a"], base_delay=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+FAISS 인덱스 증분 갱신(faiss_sync)을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 바뀐 테이블만 다시 임베딩하고, 삭제 표시된 위치는 검색 결과와 문서 목록에서 빠지는지 확인
+- 삭제 비율이 임계값을 넘으면 다시 임베딩하지 않고 인덱스를 압축하는지 확인
+"""
+
+import shutil
+import tempfile
+import unittest
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from llm_utils.table_document import build_table_document, document_key
+from llm_utils.vectordb.documents import get_all_documents
+from llm_utils.vectordb.faiss_storage import load_faiss_store
+from llm_utils.vectordb.faiss_sync import sync_faiss_store
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    """임베딩한 문서 수를 세는 가짜 임베딩"""
+
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+
+def make_groups(n, changed=(), dropped=()):
+    documents = [
+        build_table_document(
+            f"t{i}", f"테이블 {i}" + (" (수정)" if i in changed else ""), [("id", "식별자")]
+        )
+        for i in range(n)
+        if i not in dropped
+    ]
+    return {document_key(doc.page_content, doc.metadata): [doc] for doc in documents}
+
+
+class TestFaissSync(unittest.TestCase):
+    """sync_faiss_store 테스트 클래스"""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.embeddings = CountingEmbedding(size=16)
+        self.build_kwargs = {"index_type": "hnsw", "vector_codec": "float32"}
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def sync(self, groups, **kwargs):
+        return sync_faiss_store(
+            self.path, groups, self.embeddings, "fake/16", self.build_kwargs, **kwargs
+        )
+
+    def test_only_changed_tables_are_embedded(self):
+        """바뀐 테이블만 임베딩되고 삭제된 테이블은 검색되지 않는지 확인합니다."""
+        self.sync(make_groups(50))
+        self.embeddings.calls = 0
+
+        stats = self.sync(make_groups(51, changed={3}, dropped={4}))
+
+        self.assertEqual(self.embeddings.calls, 2)
+        self.assertEqual(
+            (stats["added"], stats["updated"], stats["deleted"], stats["unchanged"]),
+            (1, 1, 1, 48),
+        )
+        db = load_faiss_store(self.path, self.embeddings)
+        self.assertEqual(sorted(db.docstore.deleted_positions().tolist()), [3, 4])
+        names = {doc.metadata["table_name"] for doc in get_all_documents(db)}
+        self.assertNotIn("t4", names)
+        self.assertEqual(len(names), 50)
+
+        deleted = make_groups(50)["t4"][0].page_content
+        results = db.similarity_search_with_score(deleted, k=5)
+        self.assertEqual(len(results), 5)
+        self.assertNotIn("t4", [doc.metadata["table_name"] for doc, _ in results])
+
+    def test_compaction_reuses_stored_vectors(self):
+        """삭제 비율이 임계값을 넘으면 재임베딩 없이 인덱스를 다시 만드는지 확인합니다."""
+        self.sync(make_groups(50))
+        self.embeddings.calls = 0
+
+        self.sync(make_groups(30), compact_threshold=0.2)
+
+        self.assertEqual(self.embeddings.calls, 0)
+        db = load_faiss_store(self.path, self.embeddings)
+        self.assertEqual(db.index.ntotal, 30)
+        self.assertEqual(len(db.docstore.deleted_positions()), 0)
+        query = make_groups(30)["t7"][0].page_content
+        self.assertEqual(
+            db.similarity_search_with_score(query, k=1)[0][0].metadata["table_name"], "t7"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+"""
+FAISS 인덱스 버전 관리(faiss_versions)를 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 버전 관리 이전 형식의 인덱스에서 첫 버전을 만들고, 이후 빌드가 현재 버전을 이어서 증분 갱신하는지 확인
+- CURRENT를 교체하면 레지스트리가 새 버전을 다시 로드하고, 이미 가져간 이전 스토어도 계속 검색되는지 확인
+- 검증에 실패한 빌드는 공개되지 않고, rollback_version으로 직전 버전으로 돌아가는지 확인
+- 두 프로세스가 동시에 수정해도 LOCK 파일 잠금으로 한쪽 수정이 사라지지 않는지 확인
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_core.documents import Document
+
+from llm_utils.table_document import document_key
+from llm_utils.vectordb.faiss_db import faiss_index_version, get_faiss_vector_db
+from llm_utils.vectordb.faiss_storage import INDEX_FILE, load_faiss_store
+from llm_utils.vectordb.faiss_sync import patch_faiss_store, read_manifest, sync_faiss_store
+from llm_utils.vectordb.faiss_versions import (
+    build_version,
+    current_version,
+    list_versions,
+    rollback_version,
+    version_path,
+)
+from llm_utils.vectordb.registry import VectorStoreRegistry
+
+SETTINGS = {"index_type": "flat", "vector_codec": "float32"}
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 테이블 t100을 추가하는 빌드를 시작하고, 시드를 복사한 뒤 잠시 멈추는 다른 프로세스
+CONCURRENT_EDIT = textwrap.dedent(
+    """
+    import sys, time
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+    from langchain_core.documents import Document
+    from llm_utils.vectordb.faiss_sync import patch_faiss_store
+    from llm_utils.vectordb.faiss_versions import build_version
+
+    embeddings = DeterministicFakeEmbedding(size=16)
+    doc = Document(page_content="t100: 새 테이블", metadata={"table_name": "t100"})
+
+    def build(path):
+        print("building", flush=True)
+        time.sleep(1.0)
+        return patch_faiss_store(path, {"t100": [doc]}, [], embeddings, "fake/16")
+
+    build_version(sys.argv[1], build, embeddings)
+    """
+)
+
+
+def make_documents(n_tables):
+    return [
+        Document(
+            page_content=f"t{i:03d}: 테이블 {i}\nColumns:\n id: 식별자",
+            metadata={"table_name": f"t{i:03d}"},
+        )
+        for i in range(n_tables)
+    ]
+
+
+class TestFaissVersions(unittest.TestCase):
+    """build_version / rollback_version 테스트 클래스"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "table_info_db")
+        self.embeddings = DeterministicFakeEmbedding(size=16)
+        self.env = mock.patch.dict(
+            os.environ,
+            {"EMBEDDING_PROVIDER": "openai", "OPEN_AI_EMBEDDING_MODEL": "test-model"},
+        )
+        self.env.start()
+        self.embeddings_patch = mock.patch(
+            "llm_utils.vectordb.registry.get_embeddings", return_value=self.embeddings
+        )
+        self.embeddings_patch.start()
+        self.registry = VectorStoreRegistry()
+
+    def tearDown(self):
+        self.embeddings_patch.stop()
+        self.env.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def sync(self, documents):
+        def build(path):
+            return sync_faiss_store(
+                path,
+                {document_key(doc.page_content, doc.metadata): [doc] for doc in documents},
+                self.embeddings,
+                "fake/16",
+                SETTINGS,
+            )
+
+        return build
+
+    def get_store(self):
+        # llm_utils.vectordb.factory.get_vector_db와 같은 방식으로 레지스트리에서 가져옴
+        return self.registry.get_store(
+            "faiss",
+            self.path,
+            loader=lambda embeddings: get_faiss_vector_db(self.path, embeddings),
+            version_fn=lambda: faiss_index_version(self.path),
+        )
+
+    def top_table(self, db, document):
+        return db.similarity_search(document.page_content, k=1)[0].metadata["table_name"]
+
+    def test_publish_reload_and_rollback(self):
+        """새 버전 공개 시 다시 로드되고, 이전 스토어와 이전 버전 파일은 그대로인지 확인합니다."""
+        documents = make_documents(20)
+        self.sync(documents[:10])(self.path)  # 버전 관리 이전 형식
+        before = self.get_store()
+
+        v1, stats = build_version(self.path, self.sync(documents[:10]), self.embeddings)
+        self.assertEqual(stats["embedded"], 0)  # 이전 형식 스토어를 이어서 사용
+        self.assertFalse(os.path.exists(os.path.join(self.path, INDEX_FILE)))
+        self.assertIsNot(self.get_store(), before)
+
+        old = self.get_store()
+        v2, stats = build_version(self.path, self.sync(documents), self.embeddings)
+        self.assertEqual(stats["embedded"], 10)
+        new = self.get_store()
+        self.assertIsNot(new, old)
+        self.assertEqual(self.top_table(new, documents[15]), "t015")
+        # 진행 중인 검색이 들고 있던 이전 스토어와 이전 버전 파일은 바뀌지 않음
+        self.assertEqual(old.index.ntotal, 10)
+        self.assertNotEqual(self.top_table(old, documents[15]), "t015")
+        self.assertEqual(load_faiss_store(version_path(self.path, v1), None).index.ntotal, 10)
+
+        self.assertEqual(rollback_version(self.path), v1)
+        self.assertEqual(self.get_store().index.ntotal, 10)
+        self.assertEqual(
+            [(entry["version"], entry["current"]) for entry in list_versions(self.path)],
+            [(v1, True), (v2, False)],
+        )
+
+    def test_failed_build_is_not_published(self):
+        """빌드 실패나 검증 실패(임베딩 차원 불일치) 시 CURRENT가 그대로인지 확인합니다."""
+        documents = make_documents(5)
+        v1, _ = build_version(self.path, self.sync(documents), self.embeddings)
+
+        with self.assertRaises(ValueError):
+            build_version(self.path, lambda path: None, self.embeddings, seed=False)
+        with self.assertRaises(ValueError):
+            build_version(self.path, self.sync(documents), DeterministicFakeEmbedding(size=8))
+
+        self.assertEqual(current_version(self.path), v1)
+        self.assertEqual(os.listdir(os.path.join(self.path, "versions")), [v1])
+        with self.assertRaises(ValueError):
+            rollback_version(self.path)
+
+    def test_concurrent_edits_are_not_lost(self):
+        """다른 프로세스가 빌드 중이면 기다렸다가 그 버전을 시드로 이어서 수정하는지 확인합니다."""
+        build_version(self.path, self.sync(make_documents(5)), self.embeddings)
+        child = subprocess.Popen(
+            [sys.executable, "-c", CONCURRENT_EDIT, self.path],
+            cwd=REPO_ROOT,
+            env={**os.environ, "PYTHONPATH": REPO_ROOT},
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            while child.stdout.readline().strip() != "building":
+                self.assertIsNone(child.poll(), "다른 프로세스가 빌드 전에 종료됨")
+            doc = Document(page_content="t101: 새 테이블", metadata={"table_name": "t101"})
+            build_version(
+                self.path,
+                lambda path: patch_faiss_store(path, {"t101": [doc]}, [], self.embeddings, "fake/16"),
+                self.embeddings,
+            )
+        finally:
+            child.communicate(timeout=60)
+        self.assertEqual(child.returncode, 0)
+
+        groups = read_manifest(version_path(self.path, current_version(self.path)))["groups"]
+        self.assertIn("t100", groups)
+        self.assertIn("t101", groups)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+테이블 검색 필터(database/schema/tags/owners)를 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- database 필터 metadata로 역색인이 조건에 맞는 위치만 반환하는지 확인
+- FAISS 스토어 검색이 IDSelector로 조건에 맞는 테이블만 반환하는지 확인
+- pgvector filter 형식 변환 확인
+"""
+
+import unittest
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from llm_utils.table_document import build_table_document
+from llm_utils.vectordb.faiss_index import build_faiss_store
+from llm_utils.vectordb.filters import FilterIndex, normalize_filters, to_pgvector_filter
+
+
+def make_documents():
+    return [
+        build_table_document(
+            f"{database}.t{i}",
+            f"{database} 테이블 {i}",
+            [("id", "식별자")],
+            database=database,
+            tags=["finance"] if i % 2 == 0 else ["marketing"],
+            owners=["alice"],
+        )
+        for i, database in enumerate(["sales", "crm", "sales", "ops", "sales", "crm"])
+    ]
+
+
+class TestFilters(unittest.TestCase):
+    """
+    필터 정규화, 역색인, 벡터 스토어 사전 필터를 검증하는 테스트 케이스입니다.
+    """
+
+    def test_filter_index_positions(self):
+        """여러 필드는 AND, 한 필드의 여러 값은 OR로 결합되어야 합니다."""
+        index = FilterIndex(doc.metadata for doc in make_documents())
+
+        self.assertEqual(index.positions({"database": "sales"}).tolist(), [0, 2, 4])
+        self.assertEqual(
+            index.positions({"database": ["crm", "ops"], "tags": "finance"}).tolist(), []
+        )
+        self.assertEqual(
+            index.positions({"database": ["sales", "crm"], "tags": "marketing"}).tolist(),
+            [1, 5],
+        )
+        self.assertIsNone(index.positions({"tags": []}))
+        with self.assertRaises(ValueError):
+            normalize_filters({"team": "x"})
+
+    def test_faiss_search_with_filters(self):
+        """조건에 맞는 테이블만 반환하고, 맞는 테이블이 없으면 빈 목록을 반환해야 합니다."""
+        db = build_faiss_store(make_documents(), DeterministicFakeEmbedding(size=16))
+
+        results = db.similarity_search("sales 테이블", k=5, filters={"database": "sales"})
+        self.assertEqual(
+            sorted(doc.metadata["table_name"] for doc in results),
+            ["sales.t0", "sales.t2", "sales.t4"],
+        )
+        self.assertEqual(db.similarity_search("x", k=5, filters={"owners": "bob"}), [])
+
+    def test_pgvector_filter(self):
+        """pgvector filter는 필드별 $eq 조건을 $or/$and로 결합해야 합니다."""
+        self.assertEqual(
+            to_pgvector_filter({"database": "sales", "tags": ["a", "b"]}),
+            {
+                "$and": [
+                    {"database": {"$eq": "sales"}},
+                    {"$or": [{"tags": {"$eq": "a"}}, {"tags": {"$eq": "b"}}]},
+                ]
+            },
+        )
+        self.assertIsNone(to_pgvector_filter(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+BM25 역색인과 RRF 결합 기능을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 식별자/한글 토큰화 규칙
+- 정확한 도메인 용어가 포함된 문서가 상위에 오는지 확인
+- Reciprocal Rank Fusion 결과 순서
+"""
+
+import unittest
+
+from llm_utils.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+class TestLexicalIndex(unittest.TestCase):
+    """
+    lexical_index 모듈의 토큰화, BM25 검색, RRF 결합을 검증하는 테스트 케이스입니다.
+    """
+
+    def test_tokenize_identifier_and_hangul(self):
+        """
+        밑줄 식별자는 원형과 조각으로, 한글은 문자 bigram으로 토큰화되는지 확인합니다.
+        """
+
+        tokens = tokenize("ACD_NO_YY 실손데이터")
+        self.assertIn("acd_no_yy", tokens)
+        self.assertIn("yy", tokens)
+        self.assertIn("실손", tokens)
+        self.assertIn("데이", tokens)
+
+    def test_exact_domain_term_ranks_first(self):
+        """
+        질문에 포함된 컬럼명을 가진 문서가 가장 높은 점수를 받는지 확인합니다.
+        """
+
+        index = BM25Index.from_texts(
+            [
+                ("bill", "bill: 인청구서\nColumns:\n all_kr_disz_cd_con: 전체 질병 코드"),
+                ("hosp", "hosp: 입원병원통원\nColumns:\n hosp_bzac_id: 병원 거래처 ID"),
+                ("srop", "srop: 수술\nColumns:\n srop_cd: 수술 코드"),
+            ]
+        )
+
+        results = index.search("ALL_KR_DISZ_CD_CON 값 분포", k=2)
+        self.assertEqual(results[0][0], "bill")
+
+    def test_search_without_match(self):
+        """
+        일치하는 토큰이 없으면 빈 결과를 반환하는지 확인합니다.
+        """
+
+        index = BM25Index.from_texts([("bill", "bill: 인청구서")])
+        self.assertEqual(index.search("zzz"), [])
+
+    def test_reciprocal_rank_fusion(self):
+        """
+        두 검색기에서 모두 상위인 문서가 RRF 결과의 1위가 되는지 확인합니다.
+        """
+
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a", "d"]])
+        self.assertEqual({fused[0][0], fused[1][0]}, {"a", "b"})
+        self.assertEqual({fused[2][0], fused[3][0]}, {"c", "d"})
+        self.assertAlmostEqual(fused[0][1], 1 / 61 + 1 / 62)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+LocalEmbeddings의 배치 처리 동작을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 여러 스레드에서 동시에 들어온 질의가 한 번의 모델 호출로 묶이는지 확인
+- 질의/문서 접두어가 모델 입력에 붙는지 확인
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from llm_utils.llm.local_embeddings import LocalEmbeddings
+
+
+class RecordingEncoder:
+    """모델 호출 단위를 기록하는 테스트용 인코더"""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def encode(self, texts, batch_size):
+        with self.lock:
+            self.batches.append(list(texts))
+        time.sleep(0.01)
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+
+class TestLocalEmbeddings(unittest.TestCase):
+    """
+    LocalEmbeddings가 요청을 배치로 모아 임베딩하는지 검증하는 테스트 케이스입니다.
+    """
+
+    def test_concurrent_queries_are_batched(self):
+        """동시 질의가 모델 호출 횟수보다 많아야 하며 각자 자신의 벡터를 받아야 합니다."""
+        encoder = RecordingEncoder()
+        embeddings = LocalEmbeddings(encoder, batch_size=16, batch_wait_ms=50)
+        questions = ["질문" + "x" * i for i in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            vectors = list(pool.map(embeddings.embed_query, questions))
+
+        self.assertEqual(vectors, [[float(len(q)), 1.0] for q in questions])
+        self.assertLess(len(encoder.batches), len(questions))
+
+    def test_prefixes(self):
+        """질의와 문서에 각각의 접두어가 붙어야 합니다."""
+        encoder = RecordingEncoder()
+        embeddings = LocalEmbeddings(
+            encoder, batch_wait_ms=0, query_prefix="query: ", document_prefix="passage: "
+        )
+
+        embeddings.embed_query("매출")
+        embeddings.embed_documents(["bill", "hosp"])
+        embeddings.embed_queries(["매출", "환자"])
+
+        self.assertEqual(
+            encoder.batches,
+            [["query: 매출"], ["passage: bill", "passage: hosp"], ["query: 매출", "query: 환자"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+pgvector 컬렉션 버전 조회(collection_state)를 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 동기화가 기록한 스탬프 한 행으로 (문서 수, 버전)을 만들고, 스탬프가 없으면 문서 수만 쓰는지 확인
+- TTL이 지난 뒤 여러 스레드가 동시에 물어도 한 번만 조회하는지 확인
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from llm_utils.vectordb import pgvector_db
+from llm_utils.vectordb.pgvector_sync import SYNC_STAMP_KEY
+
+CONNECTION = "postgresql://test/db"
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class FakeEngine:
+    """collection_state 조회에 정해진 행으로 답하고 조회 횟수를 세는 엔진"""
+
+    def __init__(self, row):
+        self.row = row
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params):
+        time.sleep(0.02)
+        with self.lock:
+            self.queries.append((str(statement), params))
+        return FakeResult(self.row)
+
+
+class TestCollectionState(unittest.TestCase):
+    """collection_state 테스트 클래스"""
+
+    def setUp(self):
+        pgvector_db._collection_states.clear()
+
+    def state(self, engine, name="tables", ttl=60):
+        with mock.patch.object(pgvector_db, "get_pgvector_engine", return_value=engine):
+            return pgvector_db.collection_state(CONNECTION, name, ttl=ttl)
+
+    def test_reads_sync_stamp(self):
+        """스탬프가 있으면 (문서 수, 버전)을, 없으면 (문서 수, None)을, 컬렉션이 없으면 None을 반환합니다."""
+        engine = FakeEngine(({"version": "v1", "documents": 12}, None))
+        self.assertEqual(self.state(engine), (12, "v1"))
+        self.assertIn(SYNC_STAMP_KEY, engine.queries[0][0])
+        self.assertNotIn("string_agg", engine.queries[0][0])
+
+        self.assertEqual(self.state(FakeEngine((None, 7)), name="legacy"), (7, None))
+        self.assertIsNone(self.state(FakeEngine(None), name="missing"))
+
+    def test_single_refresh_after_expiry(self):
+        """TTL 안에서는 캐시를 쓰고, 만료 후 동시에 들어온 요청은 한 번만 조회합니다."""
+        engine = FakeEngine(({"version": "v1", "documents": 3}, None))
+        self.state(engine)
+        self.state(engine)
+        self.assertEqual(len(engine.queries), 1)
+
+        engine.row = ({"version": "v2", "documents": 4}, None)
+        with mock.patch.object(pgvector_db, "get_pgvector_engine", return_value=engine):
+            pgvector_db._collection_states[(CONNECTION, "tables")] = (time.monotonic() - 3600, (3, "v1"))
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                states = list(
+                    pool.map(
+                        lambda _: pgvector_db.collection_state(CONNECTION, "tables", ttl=60),
+                        range(8),
+                    )
+                )
+        self.assertEqual(states, [(4, "v2")] * 8)
+        self.assertEqual(len(engine.queries), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+pgvector 증분 동기화 계획(plan_sync)을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 바뀐 테이블만 다시 임베딩하고, 사라진 테이블과 중복 행은 삭제하는지 확인
+- 저장된 metadata의 키 순서가 달라도 같은 내용으로 판단하는지 확인
+"""
+
+import unittest
+import uuid
+
+from llm_utils.table_document import build_table_document
+from llm_utils.vectordb.pgvector_sync import content_hash, document_key, plan_sync
+
+COLLECTION = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+def stored_row(row_id, doc):
+    """DB에서 읽은 행처럼 (행 ID, 키, 해시)를 만듭니다."""
+    return (
+        row_id,
+        document_key(doc.page_content, doc.metadata),
+        content_hash(doc.page_content, doc.metadata),
+    )
+
+
+class TestPlanSync(unittest.TestCase):
+    """plan_sync 테스트 클래스"""
+
+    def test_only_changed_tables_are_embedded(self):
+        """추가/변경 테이블만 upserts에 포함되고 삭제 대상이 정확한지 확인합니다."""
+        old = {
+            name: build_table_document(name, f"{name} 설명", [("id", "식별자")])
+            for name in ("orders", "users", "legacy")
+        }
+        new = [
+            old["orders"],
+            build_table_document("users", "사용자 정보 (수정)", [("id", "식별자")]),
+            build_table_document("payments", "결제 내역", [("id", "식별자")]),
+        ]
+        existing = [stored_row(f"row-{name}", doc) for name, doc in old.items()]
+        # 예전 from_documents로 중복 적재된 행
+        existing.append(stored_row("row-orders-dup", old["orders"]))
+
+        plan = plan_sync(existing, new, COLLECTION)
+
+        self.assertEqual(
+            sorted(doc.metadata["table_name"] for _, doc in plan.upserts),
+            ["payments", "users"],
+        )
+        self.assertEqual(sorted(plan.deletes), ["row-legacy", "row-orders-dup", "row-users"])
+        self.assertEqual((plan.added, plan.updated, plan.removed, plan.unchanged), (1, 1, 1, 1))
+
+        plan = plan_sync(existing, new, COLLECTION, delete_missing=False)
+        self.assertNotIn("row-legacy", plan.deletes)
+
+    def test_hash_ignores_metadata_key_order(self):
+        """jsonb에서 읽은 metadata의 키 순서가 달라도 해시가 같은지 확인합니다."""
+        doc = build_table_document("orders", "주문", [("id", "식별자", "bigint")], tags=["sales"])
+        reordered = dict(reversed(list(doc.metadata.items())))
+        self.assertEqual(
+            content_hash(doc.page_content, doc.metadata),
+            content_hash(doc.page_content, reordered),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
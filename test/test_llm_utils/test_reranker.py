@@ -0,0 +1,122 @@
+"""
+배치/LRU 캐시 reranker(RerankerModel)를 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- torch 백엔드와 ONNX 백엔드(배치 분할, 2열 logits, sigmoid)가 같은 점수를 쌍 순서대로 반환하는지 확인
+- 캐시에 있는 쌍은 모델로 다시 계산하지 않고, 크기를 넘으면 오래된 쌍부터 버리는지 확인
+"""
+
+import math
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+from llm_utils.reranker import RerankerModel, _OnnxCrossEncoder
+
+PAIRS = [
+    ("주문 테이블", "주문 내역"),
+    ("주문 테이블", "고객 정보"),
+    ("환불", "환불한 주문 ID"),
+    ("고객", "고객 ID와 이름"),
+    ("매출", "일별 매출 집계"),
+]
+
+
+def logit(query, text):
+    return (3 * len(query) - len(text)) / 10.0
+
+
+def sigmoid(value):
+    return 1.0 / (1.0 + math.exp(-value))
+
+
+class FakeCrossEncoder:
+    """sentence_transformers CrossEncoder처럼 sigmoid 점수를 반환하고 입력을 기록하는 인코더"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.calls.append(list(pairs))
+        return np.array([sigmoid(logit(q, d)) for q, d in pairs])
+
+
+class FakeTokenizer:
+    """쌍마다 logit 값 하나를 입력으로 만드는 토크나이저"""
+
+    def __call__(self, queries, texts, **kwargs):
+        return {"logit": np.array([logit(q, d) for q, d in zip(queries, texts)])}
+
+
+class FakeOnnxModel:
+    """(not_relevant, relevant) 두 열의 logits를 반환하고 배치 크기를 기록하는 ONNX 모델"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, logit):
+        self.batches.append(len(logit))
+        return SimpleNamespace(logits=np.stack([-logit, logit], axis=1))
+
+
+def make_reranker(backend="torch", batch_size=2, cache_size=4096):
+    """모델 다운로드 없이 가짜 인코더를 쓰는 RerankerModel을 만듭니다."""
+    if backend == "onnx":
+        encoder = _OnnxCrossEncoder.__new__(_OnnxCrossEncoder)
+        encoder.tokenizer = FakeTokenizer()
+        encoder.model = FakeOnnxModel()
+    else:
+        encoder = FakeCrossEncoder()
+    with mock.patch("llm_utils.reranker._ensure_local_model", return_value="ko_reranker_local"), \
+            mock.patch("llm_utils.reranker._OnnxCrossEncoder", return_value=encoder), \
+            mock.patch(
+                "llm_utils.reranker.load_reranker_model",
+                return_value=SimpleNamespace(client=encoder),
+            ):
+        model = RerankerModel(backend=backend, batch_size=batch_size, cache_size=cache_size)
+    return model, encoder
+
+
+class TestReranker(unittest.TestCase):
+    """RerankerModel 테스트 클래스"""
+
+    def test_score_parity(self):
+        """두 백엔드가 쌍 순서대로 같은 점수를 내고, ONNX는 batch_size개씩 나누어 계산하는지 확인합니다."""
+        expected = [sigmoid(logit(q, d)) for q, d in PAIRS]
+        torch_model, _ = make_reranker("torch")
+        onnx_model, encoder = make_reranker("onnx", batch_size=2)
+
+        torch_scores = torch_model.score(PAIRS)
+        onnx_scores = onnx_model.score(PAIRS)
+
+        np.testing.assert_allclose(torch_scores, expected, rtol=1e-6)
+        np.testing.assert_allclose(onnx_scores, torch_scores, rtol=1e-6)
+        self.assertEqual(encoder.model.batches, [2, 2, 1])
+        self.assertTrue(all(isinstance(score, float) for score in onnx_scores))
+
+    def test_cache_hit(self):
+        """캐시에 있는 쌍은 다시 계산하지 않고, cache_size를 넘으면 오래된 쌍부터 버리는지 확인합니다."""
+        model, encoder = make_reranker("torch", cache_size=3)
+
+        first = model.score(PAIRS[:3])
+        again = model.score([PAIRS[2], PAIRS[3], PAIRS[0]])
+        self.assertEqual(encoder.calls, [PAIRS[:3], [PAIRS[3]]])
+        self.assertEqual(again[0], first[2])
+        self.assertEqual(again[2], first[0])
+
+        # PAIRS[1]이 가장 오래전에 사용되어 캐시에서 빠짐
+        model.score([PAIRS[1], PAIRS[0]])
+        self.assertEqual(encoder.calls[-1], [PAIRS[1]])
+        self.assertLessEqual(len(model._cache), 3)
+
+        uncached, encoder = make_reranker("torch", cache_size=0)
+        uncached.score(PAIRS[:2])
+        uncached.score(PAIRS[:2])
+        self.assertEqual(len(encoder.calls), 2)
+        self.assertEqual(len(uncached._cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
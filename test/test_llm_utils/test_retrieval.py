@@ -0,0 +1,103 @@
+"""
+테이블 검색(retrieval)의 단일/배치 검색 일관성을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- search_tables_batch가 질문을 질의 임베딩(embed_query와 같은 접두어/캐시)으로 계산하여
+  search_tables와 같은 결과를 반환하는지 확인
+- 질의/문서 구분이 없는 공급자(OpenAI 등)는 캐시에 없는 질문 전체를 embed_documents 한 번으로 계산하는지 확인
+"""
+
+import unittest
+from unittest import mock
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_openai import OpenAIEmbeddings
+
+from llm_utils.llm import CachedEmbeddings, embed_queries
+from llm_utils.retrieval import search_tables, search_tables_batch
+from llm_utils.table_document import build_table_document
+from llm_utils.vectordb.faiss_index import build_faiss_store
+
+
+class PrefixedEmbedding(DeterministicFakeEmbedding):
+    """e5 모델처럼 질의/문서에 서로 다른 접두어를 붙이는 가짜 임베딩"""
+
+    def embed_documents(self, texts):
+        return super().embed_documents([f"passage: {text}" for text in texts])
+
+    def embed_query(self, text):
+        return super().embed_query(f"query: {text}")
+
+
+class CountingOpenAIEmbeddings(OpenAIEmbeddings):
+    """API 대신 가짜 벡터를 반환하고 embed_documents 호출(HTTP 요청)마다 입력을 기록하는 OpenAI 임베딩"""
+
+    calls: list = []
+
+    def embed_documents(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return DeterministicFakeEmbedding(size=16).embed_documents(texts)
+
+
+class TestSearchTablesBatch(unittest.TestCase):
+    """search_tables_batch 테스트 클래스"""
+
+    def setUp(self):
+        base = PrefixedEmbedding(size=16)
+        documents = [
+            build_table_document(f"t{i:02d}", f"테이블 {i} 설명", [("id", "식별자", "int")])
+            for i in range(20)
+        ]
+        self.db = build_faiss_store(documents, base)
+        self.embeddings = CachedEmbeddings(base, provider="fake", model="prefixed")
+        self.patches = [
+            mock.patch("llm_utils.retrieval.get_vector_db", return_value=self.db),
+            mock.patch(
+                "llm_utils.retrieval.vector_store_registry.get_embeddings",
+                return_value=self.embeddings,
+            ),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_batch_matches_single(self):
+        """배치 검색 결과가 질문별 search_tables 결과와 같고 질의 캐시 항목을 함께 쓰는지 확인합니다."""
+        query = "테이블 7 설명"
+        for retriever_name in ("기본", "hybrid"):
+            single = search_tables(query, retriever_name=retriever_name, top_n=3)
+            self.assertTrue(single)
+            self.assertEqual(
+                search_tables_batch([query], retriever_name=retriever_name, top_n=3),
+                [single],
+            )
+
+        other = "테이블 3 설명"
+        search_tables_batch([other], top_n=3)
+        self.assertIn(self.embeddings._key("query", other), self.embeddings._memory)
+        self.assertNotIn(self.embeddings._key("document", other), self.embeddings._memory)
+
+    def test_symmetric_provider_batches_queries(self):
+        """OpenAI 임베딩이면 캐시에 없는 질문 여러 개를 요청 한 번으로 임베딩하는지 확인합니다."""
+        provider = CountingOpenAIEmbeddings(api_key="test", calls=[])
+        self.assertEqual(len(embed_queries(provider, ["a", "b", "c"])), 3)
+        self.assertEqual(provider.calls, [["a", "b", "c"]])
+
+        provider.calls.clear()
+        embeddings = CachedEmbeddings(provider, provider="openai", model="counting")
+        queries = ["테이블 1 설명", "테이블 2 설명", "테이블 5 설명"]
+        with mock.patch(
+            "llm_utils.retrieval.vector_store_registry.get_embeddings", return_value=embeddings
+        ):
+            search_tables_batch(queries, top_n=3)
+            self.assertEqual(provider.calls, [queries])
+
+            search_tables_batch(queries + ["테이블 9 설명"], top_n=3)
+            self.assertEqual(provider.calls[1:], [["테이블 9 설명"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+테이블 문서 생성/해석 함수를 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- build_table_document가 page_content와 구조화 metadata를 함께 만드는지 확인
+- database/schema 필터 값을 "database.schema.table" 테이블명에서만 추출하는지 확인
+- metadata가 있으면 파싱 없이 레코드를 반환하는지 확인
+- 예전 형식(metadata 없음) 문서의 파싱과 ": "가 없는 컬럼 줄 처리
+"""
+
+import unittest
+
+from langchain.schema import Document
+
+from llm_utils.table_document import (
+    build_table_document,
+    get_table_record,
+    parse_table_document,
+)
+
+
+class TestTableDocument(unittest.TestCase):
+    """
+    table_document 모듈의 문서 생성과 구조화 레코드 복원을 검증하는 테스트 케이스입니다.
+    """
+
+    def test_build_keeps_column_types(self):
+        """
+        DataHub 형식 컬럼 dict의 타입 정보가 metadata에 보존되는지 확인합니다.
+        """
+
+        doc = build_table_document(
+            "bill",
+            "인청구서",
+            [
+                {
+                    "column_name": "clm_id",
+                    "column_description": "청구 ID",
+                    "column_type": "varchar",
+                }
+            ],
+        )
+
+        self.assertEqual(doc.page_content, "bill: 인청구서\nColumns:\n clm_id: 청구 ID")
+        self.assertEqual(doc.metadata["columns"], [["clm_id", "청구 ID", "varchar"]])
+
+    def test_filter_fields_from_name(self):
+        """
+        database/schema는 "database.schema.table" 테이블명에서만 추출하고, 직접 지정한 값을 우선하는지 확인합니다.
+        """
+
+        self.assertNotIn("database", build_table_document("sales.orders", "주문", []).metadata)
+        self.assertNotIn("schema", build_table_document("sales.orders", "주문", []).metadata)
+
+        metadata = build_table_document("dw.sales.orders", "주문", []).metadata
+        self.assertEqual((metadata["database"], metadata["schema"]), ("dw", "sales"))
+
+        metadata = build_table_document("sales.orders", "주문", [], schema="sales").metadata
+        self.assertEqual(metadata["schema"], "sales")
+        self.assertNotIn("database", metadata)
+
+    def test_record_from_metadata(self):
+        """
+        metadata에 레코드가 있으면 page_content와 무관하게 그대로 사용하는지 확인합니다.
+        """
+
+        doc = build_table_document("hosp", "입원병원통원", [("acd_no_yy", "사고 연도")])
+        doc.page_content = "형식이 깨진 텍스트"
+
+        record = get_table_record(doc)
+        self.assertEqual(record["table_name"], "hosp")
+        self.assertEqual(record["columns"][0][0], "acd_no_yy")
+
+    def test_record_from_legacy_content(self):
+        """
+        metadata가 없는 예전 문서는 page_content를 파싱하며, 설명 없는 컬럼도 유지하는지 확인합니다.
+        """
+
+        doc = Document(page_content="dgn: 진단\nColumns:\n dgn_cd: 진단 코드\ndgn_seq:\nremark")
+
+        record = get_table_record(doc)
+        names = [name for name, _, _ in record["columns"]]
+        self.assertEqual(record["table_description"], "진단")
+        self.assertEqual(names, ["dgn_cd", "dgn_seq", "remark"])
+
+    def test_parse_invalid_document(self):
+        """
+        첫 줄에 테이블 정보가 없으면 None을 반환하는지 확인합니다.
+        """
+
+        self.assertIsNone(parse_table_document("no table header"))
+
+
+if __name__ == "__main__":
+    unittest.main()
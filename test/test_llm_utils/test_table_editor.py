@@ -0,0 +1,159 @@
+"""
+테이블 단위 인덱스 수정(table_editor)을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 테이블 설명을 고치면 그 테이블 문서만 임베딩하고 구조화 metadata와 검색 결과에 바로 반영되는지 확인
+- 테이블을 삭제하면 테이블/컬럼 인덱스에서 빠지고, 바뀐 내용이 없으면 새 버전을 만들지 않는지 확인
+- 백그라운드 작업으로 실행했을 때 진행률과 결과가 기록되는지 확인
+- manifest와 구조화 metadata가 없는 예전 인덱스(배포된 table_info_db 형식)도 고칠 수 있는지 확인
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from langchain.schema import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from llm_utils.background_jobs import SUCCEEDED, job_registry
+from llm_utils.column_index import COLUMN_INDEX_DIR, sync_column_index
+from llm_utils.table_document import build_table_document, document_key
+from llm_utils.table_editor import (
+    delete_tables,
+    edit_table_document,
+    get_table_document,
+    submit_table_changes,
+    upsert_tables,
+)
+from llm_utils.vectordb.faiss_index import build_faiss_store
+from llm_utils.vectordb.faiss_storage import load_faiss_store, save_faiss_store
+from llm_utils.vectordb.faiss_sync import read_manifest, sync_faiss_store
+from llm_utils.vectordb.faiss_versions import build_version, current_version, resolve_current_path
+
+EMBEDDING_ID = "openai/test-model"
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    """임베딩한 문서 수를 세는 가짜 임베딩"""
+
+    texts: int = 0
+
+    def embed_documents(self, texts):
+        self.texts += len(texts)
+        return super().embed_documents(texts)
+
+
+def make_documents(n_tables):
+    return [
+        build_table_document(
+            f"t{i:03d}", f"테이블 {i}", [("id", "식별자", "int"), ("name", f"이름 {i}", "text")]
+        )
+        for i in range(n_tables)
+    ]
+
+
+class TestTableEditor(unittest.TestCase):
+    """table_editor 테스트 클래스"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "table_info_db")
+        self.embeddings = CountingEmbedding(size=16)
+        self.env = mock.patch.dict(
+            os.environ,
+            {"EMBEDDING_PROVIDER": "openai", "OPEN_AI_EMBEDDING_MODEL": "test-model"},
+        )
+        self.env.start()
+        self.embeddings_patch = mock.patch(
+            "llm_utils.vectordb.registry.get_embeddings", return_value=self.embeddings
+        )
+        self.embeddings_patch.start()
+
+        documents = make_documents(10)
+
+        def build(path):
+            sync_faiss_store(
+                path,
+                {document_key(doc.page_content, doc.metadata): [doc] for doc in documents},
+                self.embeddings,
+                EMBEDDING_ID,
+                {"index_type": "flat", "vector_codec": "float32"},
+            )
+            sync_column_index(documents, self.embeddings, path, EMBEDDING_ID)
+
+        build_version(self.path, build, self.embeddings)
+        self.embeddings.texts = 0
+
+    def tearDown(self):
+        self.embeddings_patch.stop()
+        self.env.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_update_and_delete_tables(self):
+        """설명 수정은 테이블 문서 하나만 임베딩하고, 삭제는 컬럼 인덱스에서도 빠지는지 확인합니다."""
+        doc = edit_table_document("t001", table_description="취소 포함 주문 내역", vectordb_location=self.path)
+        self.assertEqual(doc.metadata["columns"][1], ["name", "이름 1", "text"])
+
+        result = upsert_tables([doc], vectordb_location=self.path)
+        self.assertEqual((result["updated"], result["embedded"]), (1, 1))
+        self.assertEqual(current_version(self.path), result["version"])
+        stored = get_table_document("t001", self.path)
+        self.assertEqual(stored.metadata["table_description"], "취소 포함 주문 내역")
+
+        db = load_faiss_store(resolve_current_path(self.path), self.embeddings)
+        hits = db.similarity_search(doc.page_content, k=1)
+        self.assertEqual(hits[0].metadata["table_name"], "t001")
+
+        result = delete_tables(["t002"], vectordb_location=self.path)
+        self.assertEqual(result["deleted"], 1)
+        self.assertIsNone(get_table_document("t002", self.path))
+        columns = read_manifest(os.path.join(resolve_current_path(self.path), COLUMN_INDEX_DIR))
+        self.assertNotIn("t002", columns["groups"])
+
+        version = current_version(self.path)
+        result = upsert_tables([doc], vectordb_location=self.path)
+        self.assertIsNone(result["version"])
+        self.assertEqual(current_version(self.path), version)
+
+    def test_background_job(self):
+        """새 테이블 추가를 백그라운드 작업으로 실행하고 진행률/결과를 확인합니다."""
+        doc = build_table_document("t100", "새 테이블", [("id", "식별자", "int")], tags=["new"])
+        job = submit_table_changes(upserts=[doc], vectordb_location=self.path)
+        job = job_registry.wait(job.id, timeout=30)
+
+        self.assertEqual(job.status, SUCCEEDED, job.error)
+        self.assertEqual(job.progress, 1.0)
+        self.assertEqual(job.result["added"], 1)
+        self.assertEqual(self.embeddings.texts, 2)  # 테이블 문서 1개 + 컬럼 문서 1개
+        self.assertEqual(get_table_document("t100", self.path).metadata["tags"], ["new"])
+
+    def test_store_without_manifest(self):
+        """manifest 없이 텍스트만 저장한 인덱스에서 기존 테이블을 찾아 교체/삭제하는지 확인합니다."""
+        legacy = os.path.join(self.root, "legacy_db")
+        documents = [
+            Document(page_content=doc.page_content) for doc in make_documents(4)
+        ]
+        save_faiss_store(build_faiss_store(documents, self.embeddings), legacy)
+        self.assertIsNone(read_manifest(legacy))
+
+        doc = edit_table_document("t001", table_description="수정한 설명", vectordb_location=legacy)
+        self.assertEqual(doc.metadata["columns"][1][:2], ["name", "이름 1"])
+        result = upsert_tables([doc], vectordb_location=legacy)
+        self.assertEqual((result["added"], result["updated"], result["embedded"]), (0, 1, 1))
+
+        result = delete_tables(["t002"], vectordb_location=legacy)
+        self.assertEqual(result["deleted"], 1)
+        current = resolve_current_path(legacy)
+        self.assertEqual(
+            sorted(read_manifest(current)["groups"]), ["t000", "t001", "t003"]
+        )
+        stored = get_table_document("t001", legacy)
+        self.assertEqual(stored.metadata["table_description"], "수정한 설명")
+        db = load_faiss_store(current, self.embeddings)
+        self.assertEqual(len(db.similarity_search("테이블", k=10)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+VectorStoreRegistry의 캐시 동작을 테스트하는 단위 테스트 모듈입니다.
+
+주요 테스트 항목:
+- 같은 키에 대해 로더가 한 번만 호출되는지 확인
+- 버전이 바뀌면 다시 로드되는지 확인
+- invalidate 후 다시 로드되는지 확인
+"""
+
+import os
+import unittest
+from unittest import mock
+
+from llm_utils.vectordb.registry import VectorStoreRegistry
+
+
+class TestVectorStoreRegistry(unittest.TestCase):
+    """
+    VectorStoreRegistry가 로더 호출 횟수와 버전 변경을 올바르게 다루는지 검증하는 테스트 케이스입니다.
+    """
+
+    def setUp(self):
+        self.env = mock.patch.dict(
+            os.environ,
+            {"EMBEDDING_PROVIDER": "openai", "OPEN_AI_EMBEDDING_MODEL": "test-model"},
+        )
+        self.env.start()
+        self.embeddings_patch = mock.patch(
+            "llm_utils.vectordb.registry.get_embeddings", return_value=object()
+        )
+        self.embeddings_patch.start()
+        self.registry = VectorStoreRegistry()
+
+    def tearDown(self):
+        self.embeddings_patch.stop()
+        self.env.stop()
+
+    def test_loader_called_once_for_same_version(self):
+        """
+        버전이 그대로이면 캐시된 스토어를 반환하고 로더는 한 번만 호출되는지 확인합니다.
+        """
+
+        loader = mock.Mock(side_effect=lambda embeddings: object())
+        first = self.registry.get_store("faiss", "/tmp/db", loader, lambda: 1)
+        second = self.registry.get_store("faiss", "/tmp/db", loader, lambda: 1)
+
+        self.assertIs(first, second)
+        self.assertEqual(loader.call_count, 1)
+
+    def test_reload_on_version_change(self):
+        """
+        저장 위치의 버전이 바뀌면 스토어를 다시 로드하는지 확인합니다.
+        """
+
+        version = {"value": 1}
+        loader = mock.Mock(side_effect=lambda embeddings: object())
+        first = self.registry.get_store(
+            "faiss", "/tmp/db", loader, lambda: version["value"]
+        )
+        version["value"] = 2
+        second = self.registry.get_store(
+            "faiss", "/tmp/db", loader, lambda: version["value"]
+        )
+
+        self.assertIsNot(first, second)
+        self.assertEqual(loader.call_count, 2)
+        self.assertEqual(self.registry.get_version("faiss", "/tmp/db"), 2)
+
+    def test_invalidate(self):
+        """
+        invalidate 호출 후에는 로더가 다시 호출되는지 확인합니다.
+        """
+
+        loader = mock.Mock(side_effect=lambda embeddings: object())
+        self.registry.get_store("faiss", "/tmp/db", loader)
+        self.registry.invalidate("faiss")
+        self.registry.get_store("faiss", "/tmp/db", loader)
+
+        self.assertEqual(loader.call_count, 2)
+
+    def test_embeddings_cached_per_model(self):
+        """
+        임베딩 클라이언트가 공급자/모델 단위로 재사용되는지 확인합니다.
+        """
+
+        self.assertIs(self.registry.get_embeddings(), self.registry.get_embeddings())
+
+
+if __name__ == "__main__":
+    unittest.main()